@@ -42,6 +42,10 @@ from PySide6.QtWidgets import QApplication
 from function.controllers import UnifiedApp
 
 if __name__ == "__main__":
+    # 打包后的程序中，多进程任务（如分层并行合并）的子进程需要在此处接管
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     # 创建PySide6应用实例
     app = QApplication(sys.argv)
     
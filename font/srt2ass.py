@@ -4,96 +4,65 @@ SRT转ASS字幕转换模块
 """
 
 import os
-import sys
 import re
+import heapq
 import pysubs2
-import configparser
 import shutil
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from function.parsers import clean_subtitle_text_ass
-from function.file_utils import get_organized_path
+from function.file_utils import get_organized_path, emit_progress, ORGANIZED_DIRS
+from function.settings import settings_service
 
 # 预设硬编码默认样式
 DEFAULT_KOR_STYLE = "Style: KOR - Noto Serif KR,Noto Serif KR SemiBold,20,&H0026FCFF,&H000000FF,&H50000000,&H00000000,-1,0,0,0,100,100,0.1,0,1,0.6,0,2,10,10,34,1"
 DEFAULT_CHN_STYLE = "Style: CHN - Drama,小米兰亭,17,&H28FFFFFF,&H000000FF,&H64000000,&H00000000,-1,0,0,0,100,100,0,0,1,0.5,0,2,10,10,15,1"
 DEFAULT_JPN_STYLE = "Style: JPN - EPSON 太明朝体,EPSON 太明朝体Ｂ,14,&H00FFFFFF,&H000000FF,&H50000000,&H00000000,0,0,0,0,100,100,1,0,1,0.6,0,2,10,10,15,1"
 
-def get_config_path():
-    """获取配置文件路径，使用 exe 所在的目录"""
-    # 获取 exe 所在的目录或脚本所在目录
-    if getattr(sys, 'frozen', False):
-        # 如果是打包后的 exe
-        base_dir = os.path.dirname(sys.executable)
-    else:
-        # 如果是开发环境
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 补充默认样式配置节时延迟写入（秒），同一时间段内的多次补充只写一次文件
+_STYLE_SAVE_DELAY = 0.5
+
+# 序号、时间戳和文本挤在同一行的字幕块，例如：1 00:00:00,000 --> 00:00:06,260 こんにちは。
+# 各部分之间的空白不跨行，正常格式（序号、时间戳分行）不会被误匹配
+_SAME_LINE_CUE = re.compile(
+    r'^[^\S\n]*(\d+)[^\S\n]+(\d{2}:\d{2}:\d{2},\d{3}[^\S\n]*-->[^\S\n]*\d{2}:\d{2}:\d{2},\d{3})[^\S\n]+(.*\S)[^\S\n]*$',
+    re.MULTILINE
+)
 
-    return os.path.join(base_dir, "SubtitleToolbox.ini")
 
-def fix_srt_format(srt_path):
+def repair_srt_text(content):
     """
-    修复SRT文件格式，将序号、时间戳和文本分离到不同行
+    修复SRT文本格式，将同一行的序号、时间戳和文本分离到不同行
+
+    Args:
+        content: SRT文件内容
+
+    Returns:
+        str: 修复后的内容（不需要修复时原样返回）
+    """
+    return _SAME_LINE_CUE.sub(r'\1\n\2\n\3\n', content)
+
+
+def load_srt(srt_path):
+    """
+    读取并解析SRT文件，格式修复在内存中完成
+
+    文件只读取一次，原始文件不会被改写。
 
     Args:
         srt_path: SRT文件路径
 
     Returns:
-        bool: 是否进行了修复
+        pysubs2.SSAFile: 解析后的字幕
     """
-    try:
-        with open(srt_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # 检查是否需要修复（查找序号、时间戳和文本在同一行的情况）
-        # 格式示例：1 00:00:00,000 --> 00:00:06,260 こんにちは。
-        import re
-        pattern = r'^(\d+)\s+(\d{2}:\d{2}:\d{2},\d{3}\s*-->\s*\d{2}:\d{2}:\d{2},\d{3})\s+(.+)$'
-
-        needs_fix = False
-        for line in content.split('\n'):
-            if re.match(pattern, line.strip()):
-                needs_fix = True
-                break
-
-        if not needs_fix:
-            return False
-
-        # 修复格式
-        fixed_lines = []
-        for line in content.split('\n'):
-            line = line.strip()
-            if not line:
-                fixed_lines.append('')
-                continue
-
-            # 检查是否是序号、时间戳和文本在同一行的格式
-            match = re.match(pattern, line)
-            if match:
-                seq_num = match.group(1)
-                timestamp = match.group(2)
-                text = match.group(3)
-
-                # 分离到不同行
-                fixed_lines.append(seq_num)
-                fixed_lines.append(timestamp)
-                fixed_lines.append(text)
-                fixed_lines.append('')  # 空行分隔
-            else:
-                # 如果不是要修复的格式，保持原样
-                fixed_lines.append(line)
-
-        # 写回文件
-        with open(srt_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(fixed_lines))
-
-        return True
-    except Exception as e:
-        print(f"修复SRT格式时出错: {e}")
-        return False
+    with open(srt_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    return pysubs2.SSAFile.from_string(repair_srt_text(content))
 
 def get_config_styles(log_func=None):
     """获取ASS样式配置
 
-    从配置文件中读取ASS字幕样式，如果配置文件不存在则创建默认配置。
+    从共享的配置服务中读取ASS字幕样式（配置文件未变化时不访问磁盘），
+    如果配置文件不存在或缺少样式配置节，则补充默认配置（合并写入）。
 
     Args:
         log_func: 日志记录函数（可选）
@@ -101,68 +70,493 @@ def get_config_styles(log_func=None):
     Returns:
         dict: 包含kor、chn、jpn样式的字典
     """
-    config_path = get_config_path()
+    data = settings_service.get_all()
     styles = {"kor": DEFAULT_KOR_STYLE, "chn": DEFAULT_CHN_STYLE, "jpn": DEFAULT_JPN_STYLE}
 
-    if not os.path.exists(config_path):
+    missing = {}
+    if not data:
+        # 创建各种语言组合的配置节
+        missing = {
+            "Srt2Ass_kor_chn": {"kor": DEFAULT_KOR_STYLE, "chn": DEFAULT_CHN_STYLE},
+            "Srt2Ass_jpn_chn": {"jpn": DEFAULT_JPN_STYLE, "chn": DEFAULT_CHN_STYLE},
+            "Srt2Ass_eng_chn": {"eng": DEFAULT_KOR_STYLE, "chn": DEFAULT_CHN_STYLE},  # 使用kor样式作为eng的默认
+            "Srt2Ass_kor_jpn": {"kor": DEFAULT_KOR_STYLE, "jpn": DEFAULT_JPN_STYLE},
+        }
+    elif "Srt2Ass_kor_jpn" not in data:
+        # 确保 [Srt2Ass_kor_jpn] 配置节存在
+        missing = {"Srt2Ass_kor_jpn": {"kor": DEFAULT_KOR_STYLE, "jpn": DEFAULT_JPN_STYLE}}
+    if missing:
         try:
-            config = configparser.ConfigParser(interpolation=None)
-            # 创建各种语言组合的配置节
-            config["Srt2Ass_kor_chn"] = {
-                "kor": DEFAULT_KOR_STYLE,
-                "chn": DEFAULT_CHN_STYLE
-            }
-            config["Srt2Ass_jpn_chn"] = {
-                "jpn": DEFAULT_JPN_STYLE,
-                "chn": DEFAULT_CHN_STYLE
-            }
-            config["Srt2Ass_eng_chn"] = {
-                "eng": DEFAULT_KOR_STYLE,  # 使用kor样式作为eng的默认
-                "chn": DEFAULT_CHN_STYLE
-            }
-            config["Srt2Ass_kor_jpn"] = {
-                "kor": DEFAULT_KOR_STYLE,
-                "jpn": DEFAULT_JPN_STYLE
-            }
-            with open(config_path, 'w', encoding='utf-8-sig') as cf:
-                config.write(cf)
-        except:
-            pass
-    else:
-        try:
-            config = configparser.ConfigParser(interpolation=None)
-            config.read(config_path, encoding='utf-8-sig')
-
-            # 从各个配置节读取样式
-            if "Srt2Ass_kor_chn" in config:
-                styles["kor"] = config["Srt2Ass_kor_chn"].get("kor", DEFAULT_KOR_STYLE)
-                styles["chn"] = config["Srt2Ass_kor_chn"].get("chn", DEFAULT_CHN_STYLE)
-            if "Srt2Ass_jpn_chn" in config:
-                styles["jpn"] = config["Srt2Ass_jpn_chn"].get("jpn", DEFAULT_JPN_STYLE)
-            if "Srt2Ass_kor_jpn" in config:
-                # 优先使用 kor_jpn 配置节中的样式
-                styles["kor"] = config["Srt2Ass_kor_jpn"].get("kor", styles.get("kor", DEFAULT_KOR_STYLE))
-                styles["jpn"] = config["Srt2Ass_kor_jpn"].get("jpn", styles.get("jpn", DEFAULT_JPN_STYLE))
-
-            # 确保 [Srt2Ass_kor_jpn] 配置节存在
-            if "Srt2Ass_kor_jpn" not in config:
-                config["Srt2Ass_kor_jpn"] = {
-                    "kor": DEFAULT_KOR_STYLE,
-                    "jpn": DEFAULT_JPN_STYLE
-                }
-                # 保存更新后的配置
-                with open(config_path, 'w', encoding='utf-8-sig') as cf:
-                    config.write(cf)
-        except:
+            settings_service.update(missing, delay=_STYLE_SAVE_DELAY)
+        except Exception:
             pass
+        data = settings_service.get_all()
+
+    # 从各个配置节读取样式
+    if "Srt2Ass_kor_chn" in data:
+        styles["kor"] = data["Srt2Ass_kor_chn"].get("kor", DEFAULT_KOR_STYLE)
+        styles["chn"] = data["Srt2Ass_kor_chn"].get("chn", DEFAULT_CHN_STYLE)
+    if "Srt2Ass_jpn_chn" in data:
+        styles["jpn"] = data["Srt2Ass_jpn_chn"].get("jpn", DEFAULT_JPN_STYLE)
+    if "Srt2Ass_kor_jpn" in data:
+        # 优先使用 kor_jpn 配置节中的样式
+        styles["kor"] = data["Srt2Ass_kor_jpn"].get("kor", styles.get("kor", DEFAULT_KOR_STYLE))
+        styles["jpn"] = data["Srt2Ass_kor_jpn"].get("jpn", styles.get("jpn", DEFAULT_JPN_STYLE))
 
     return styles
 
-def run_ass_task(target_dir, styles, log_func, progress_bar, root, output_dir=None, stop_flag=[False]):
+# 文件名解析：集数标记、语言标签（方括号，内容取到第一个 ]）、音轨序号、中文字样，一次扫描全部找出
+# 方括号只消耗 [、中文字样只消耗 ch，标签内部的集数标记与相邻的字样仍能被找到
+_NAME_PATTERN = re.compile(
+    r'([Ss](\d{2})[Ee](\d{2}))'
+    r'|\[(?=([^\]]*)\])'
+    r'|_track(\d+)'
+    r'|(ch)(?=[nsti])',
+    re.IGNORECASE
+)
+# 去除语言标签（得到基础名）与截取音轨序号之前的部分（生成输出文件名）
+_TAG_PATTERN = re.compile(r'\[.*?\]')
+_TRACK_PATTERN = re.compile(r'_track\d+', re.IGNORECASE)
+
+# 各字体方案的上下两种语言（上方语言作为 oth，下方语言作为 chi）
+_MODE_LANGS = {
+    "kor_jpn": ("kor", "jpn"),
+    "kor_chn": ("kor", "chi"),
+    "jpn_chn": ("jpn", "chi"),
+    "eng_chn": ("eng", "chi"),
+}
+
+_LANG_NAMES = {"kor": "韩语", "jpn": "日语", "eng": "英语", "chi": "中文"}
+
+# 方括号语言标签与语言的对应关系
+_LANG_TAGS = {"kor": "kor", "ko": "kor", "jpn": "jpn", "jp": "jpn", "eng": "eng", "en": "eng"}
+_CHI_TAGS = ("chn", "chi", "chs", "cht")
+
+
+class _SubtitleName:
+    """字幕文件名的解析结果：集数键、方括号标签、中文字样、音轨序号"""
+
+    __slots__ = ("name", "ep", "tags", "zh_hint", "track")
+
+    def __init__(self, name):
+        self.name = name
+        self.ep = None          # 集数键（S01E02），没有集数标记时为 None
+        self.tags = set()       # 方括号标签（小写）
+        self.zh_hint = False    # 文件名中任意位置出现 chn/chs/cht/chi
+        self.track = None       # 第一个 _trackN 的序号
+        for ep, season, episode, tag, track, zh in _NAME_PATTERN.findall(name):
+            if ep:
+                if self.ep is None:
+                    self.ep = f"S{season}E{episode}"
+            elif tag:
+                self.tags.add(tag.lower())
+            elif track:
+                if self.track is None:
+                    self.track = int(track)
+            elif zh:
+                self.zh_hint = True
+
+    @property
+    def base(self):
+        """去除全部方括号标签后的基础名（用于没有集数标记的文件分组）"""
+        return _TAG_PATTERN.sub('', self.name).strip()
+
+    @property
+    def stem(self):
+        """音轨序号之前的部分"""
+        if self.track is None:
+            return self.name
+        return _TRACK_PATTERN.split(self.name, 1)[0]
+
+    def languages(self, with_episode):
+        """文件对应的语言（一个文件可能属于多种语言）
+
+        有集数标记的文件：中文使用 [chi] 标签，组内没有时由调用方按文件名中的中文字样回退；
+        没有集数标记的文件：中文使用 [chn]/[chi]/[chs]/[cht] 标签。
+        """
+        langs = {_LANG_TAGS[tag] for tag in self.tags if tag in _LANG_TAGS}
+        if with_episode:
+            if "chi" in self.tags:
+                langs.add("chi")
+        elif any(tag in self.tags for tag in _CHI_TAGS):
+            langs.add("chi")
+        return langs
+
+
+def _index_group(records, with_episode):
+    """建立一组文件的语言索引：语言 -> 文件名列表（保持扫描顺序）"""
+    index = {}
+    for rec in records:
+        for lang in rec.languages(with_episode):
+            index.setdefault(lang, []).append(rec.name)
+    if with_episode:
+        if "chi" not in index:
+            zh = [rec.name for rec in records if rec.zh_hint]
+            if zh:
+                index["chi"] = zh
+    elif "chi" in index:
+        # 同时存在 [chs] 和 [cht] 时优先选择 [chs]
+        chi_records = [rec for rec in records if rec.name in index["chi"]]
+        if any("chs" in rec.tags for rec in chi_records) and any("cht" in rec.tags for rec in chi_records):
+            index["chi"] = [rec.name for rec in chi_records if "chs" in rec.tags]
+    return index
+
+
+def build_pair_tasks(filenames, merge_mode, log_func=None):
+    """扫描文件名并按字体方案配对双语字幕
+
+    每个文件名只用一个正则解析一次，按集数（无集数时按去除标签后的基础名）分组建立语言索引，再查表配对。
+    视频自带的 .DUAL. 字样不影响识别，只排除真正以 .dual.srt 结尾的文件。
+
+    Args:
+        filenames: 目录中的文件名列表
+        merge_mode: 字体方案（kor_jpn / kor_chn / jpn_chn / eng_chn）
+        log_func: 日志记录函数
+
+    Returns:
+        list: 配对任务，每项包含 ep、chi_name、oth_name、oth_stem（韩日方案另有 lang_type）
+    """
+    episodes = {}
+    bases = {}
+    for f in filenames:
+        lower = f.lower()
+        if not lower.endswith('.srt') or lower.endswith('.dual.srt'):
+            continue
+        rec = _SubtitleName(f)
+        if rec.ep is not None:
+            episodes.setdefault(rec.ep, []).append(rec)
+        else:
+            bases.setdefault(rec.base, []).append(rec)
+
+    upper, lower_lang = _MODE_LANGS.get(merge_mode, _MODE_LANGS["kor_chn"])
+    suffix = "（韩日双语）" if merge_mode == "kor_jpn" else ""
+    tasks = []
+
+    def resolve(key, label, records, with_episode):
+        index = _index_group(records, with_episode)
+        oth, chi = index.get(upper), index.get(lower_lang)
+        # 在严格匹配模式下，只使用明确的语言标签进行匹配
+        if not oth and log_func:
+            log_func(f"❌ {label} 缺少{_LANG_NAMES[upper]}字幕")
+        if not chi and log_func:
+            log_func(f"❌ {label} 缺少{_LANG_NAMES[lower_lang]}字幕")
+        if oth and chi:
+            oth_record = next(rec for rec in records if rec.name == oth[0])
+            task = {"type": "merge", "ep": key, "chi_name": chi[0], "oth_name": oth[0], "oth_stem": oth_record.stem}
+            if merge_mode == "kor_jpn":
+                task["lang_type"] = "kor_jpn"
+            tasks.append(task)
+            if log_func:
+                log_func(f"✅ {label} 成功匹配{suffix}")
+
+    # 处理有集数标记的文件
+    for ep, records in episodes.items():
+        resolve(ep, f"集数 {ep}", records, True)
+
+    # 处理没有集数标记的文件（按基础文件名分组，至少需要两个文件）
+    for base_name, records in bases.items():
+        if len(records) >= 2:
+            resolve(base_name, f"文件 '{base_name}'", records, False)
+
+    return tasks
+
+
+def find_srt_dirs(root_dir):
+    """遍历目录树，找出所有包含SRT文件的目录
+
+    每个目录只用 os.scandir 读取一次，同时得到SRT文件名与子目录。
+    子目录按名称排序后深度优先遍历，结果顺序固定；
+    跳过隐藏目录、符号链接目录，以及 srt/script/other 归档目录（已转换的原始文件不会被重复处理）。
+
+    Args:
+        root_dir: 根目录
+
+    Returns:
+        list: [(目录路径, SRT文件名列表)]，根目录在最前
+    """
+    result = []
+    stack = [root_dir]
+    while stack:
+        current = stack.pop()
+        names = []
+        subdirs = []
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith('.') and entry.name.lower() not in ORGANIZED_DIRS:
+                            subdirs.append(entry.path)
+                    elif entry.name.lower().endswith('.srt'):
+                        names.append(entry.name)
+        except OSError:
+            continue
+        if len(names) >= 2:
+            result.append((current, names))
+        stack.extend(sorted(subdirs, reverse=True))
+    return result
+
+
+# 时间戳格式化表：厘秒部分预先生成，H:MM:SS 部分按秒缓存（字幕时间戳大量落在相同的秒上）
+_ASS_CENTISECONDS = [f".{cs:02d}" for cs in range(100)]
+_ass_seconds = {}
+
+
+def format_ass_time(ms):
+    """毫秒转换为ASS时间戳 H:MM:SS.cc
+
+    纯整数运算加查表，结果与 pysubs2.time.ms_to_str(ms, fractions=True) 去掉最后一位毫秒相同
+    （厘秒截断而不是四舍五入，负数带 - 号）。
+    """
+    if ms < 0:
+        return "-" + format_ass_time(-ms)
+    sec, cs = divmod(int(round(ms)) // 10, 100)
+    hms = _ass_seconds.get(sec)
+    if hms is None:
+        h, rem = divmod(sec, 3600)
+        m, s = divmod(rem, 60)
+        hms = _ass_seconds[sec] = f"{h}:{m:02d}:{s:02d}"
+    return hms + _ASS_CENTISECONDS[cs]
+
+
+def collect_cues(subs, stop_flag=None):
+    """清洗一条字幕轨的事件，去掉清洗后为空的事件
+
+    Args:
+        subs: 字幕事件序列（pysubs2.SSAFile）
+        stop_flag: 停止标志
+
+    Returns:
+        list: [开始毫秒, 结束毫秒, 文本] 列表；被停止时返回 None
+    """
+    cues = []
+    for l in subs:
+        if stop_flag is not None and stop_flag[0]:
+            return None
+
+        c = clean_subtitle_text_ass(l.text)
+        if c:
+            cues.append([l.start, l.end, c])
+    return cues
+
+
+def build_ass_events(cues, style_name, evs):
+    """把字幕以指定样式生成 Dialogue 行，追加到 evs
+
+    Args:
+        cues: [开始毫秒, 结束毫秒, 文本] 列表
+        style_name: ASS样式名
+        evs: Dialogue 行列表
+    """
+    prefix = "Dialogue: 0,"
+    fields = f",{style_name},,0,0,0,,"
+    for start, end, text in cues:
+        evs.append(prefix + format_ass_time(start) + "," + format_ass_time(end) + fields + text)
+
+
+def align_cues(upper, lower, tolerance, merge=False, lower_style=""):
+    """对齐上下两条字幕轨的时间轴
+
+    两条轨按开始时间排序后同时扫描：已经开始的下方字幕按结束时间放入堆中，结束的字幕从堆顶移除，
+    即使一条长字幕（如贯穿全片的标牌）仍在进行也不影响移除其他字幕。上方轨的每条字幕只与堆中仍在进行
+    以及在它结束前开始的下方字幕比较，排序之后整体为 O(n log n)。
+    - 吸附：开始（结束）时间相差不超过容差时，下方字幕的开始（结束）时间对齐到上方字幕
+    - 合并：开始与结束时间都在容差内的一对字幕合并为一条事件（上方样式，下方文本以 \\r 切换为下方样式），
+      合并后的字幕从两条轨中移除，放入返回的列表
+
+    Args:
+        upper: 上方轨 [开始毫秒, 结束毫秒, 文本] 列表（就地修改）
+        lower: 下方轨 [开始毫秒, 结束毫秒, 文本] 列表（就地修改）
+        tolerance: 容差（毫秒）
+        merge: 是否合并匹配的字幕
+        lower_style: 下方轨样式名（合并时使用）
+
+    Returns:
+        list: 合并后的事件（不合并时为空列表）
+    """
+    upper.sort(key=lambda cue: cue[0])
+    lower.sort(key=lambda cue: cue[0])
+    merged = []
+    used = set()
+    upper_rest = []
+    active = []  # (结束毫秒, 序号)：已开始的下方字幕
+    p = 0
+    n = len(lower)
+    for cue in upper:
+        start, end = cue[0], cue[1]
+        while p < n and lower[p][0] <= start:
+            heapq.heappush(active, (lower[p][1], p))
+            p += 1
+        # 结束时间不晚于当前开始时间的下方字幕不可能与之后的上方字幕重叠（吸附可能推迟了结束时间，按当前值重新放入）
+        while active and active[0][0] <= start:
+            _, k = heapq.heappop(active)
+            if lower[k][1] > start:
+                heapq.heappush(active, (lower[k][1], k))
+        candidates = sorted(k for _, k in active)
+        k = p
+        while k < n and lower[k][0] < end:
+            candidates.append(k)
+            k += 1
+        matched = None
+        for k in candidates:
+            other = lower[k]
+            if other[1] > start and k not in used:
+                start_close = abs(other[0] - start) <= tolerance
+                end_close = abs(other[1] - end) <= tolerance
+                if merge:
+                    if start_close and end_close:
+                        matched = k
+                        break
+                else:
+                    if start_close:
+                        other[0] = start
+                    if end_close:
+                        other[1] = end
+        if matched is None:
+            upper_rest.append(cue)
+        else:
+            used.add(matched)
+            merged.append([start, end, cue[2] + "\\N{\\r" + lower_style + "}" + lower[matched][2]])
+    if merge:
+        upper[:] = upper_rest
+        lower[:] = [cue for k, cue in enumerate(lower) if k not in used]
+    return merged
+
+
+def convert_pair(t, hdr, style_names, merge_mode, stop_flag=None, align="off", align_tolerance=200):
+    """转换一对双语字幕：生成ASS文件，写入成功后再归档这一对原始SRT文件
+
+    只依赖参数，可以在子进程中执行。
+
+    Args:
+        t: 配对任务（build_pair_tasks 的结果，另含 chi_path、oth_path 与输出目录 base_output）
+        hdr: ASS头信息
+        style_names: (外语样式名, 中文样式名, 日语样式名)
+        merge_mode: 字体方案
+        stop_flag: 停止标志（子进程中为 None）
+        align: 时间轴对齐方式（off 不对齐 / snap 吸附 / merge 合并）
+        align_tolerance: 对齐容差（毫秒）
+
+    Returns:
+        str: 生成的ASS文件名；被停止时返回 None（不写入文件、不归档）
+    """
+    style_name_k, style_name_c, style_name_j = style_names
+    base_output = t["base_output"]
+
+    # 加载字幕文件（格式修复在内存中完成，不改写原始文件），再逐行清洗
+    s1, s2 = load_srt(t["oth_path"]), load_srt(t["chi_path"])
+    evs = []
+
+    # 根据任务类型选择样式
+    lang_type = t.get("lang_type", "normal")  # 默认为正常的中外字幕
+
+    # 根据字体方案确定文件名后缀
+    if lang_type == "kor_jpn":
+        file_suffix = "[kor_jpn]"
+    elif merge_mode == "kor_chn":
+        file_suffix = "[kor_chn]"
+    elif merge_mode == "jpn_chn":
+        file_suffix = "[jpn_chn]"
+    elif merge_mode == "eng_chn":
+        file_suffix = "[eng_chn]"
+    else:
+        file_suffix = ""
+
+    # 外语（韩日字幕时为韩语）在上（oth_path），中文（韩日字幕时为日语）在下（chi_path）
+    lower_style = style_name_j if lang_type == "kor_jpn" else style_name_c
+    upper, lower = collect_cues(s1, stop_flag), collect_cues(s2, stop_flag)
+    if upper is None or lower is None:
+        return None
+    if align in ("snap", "merge"):
+        merged = align_cues(upper, lower, align_tolerance, merge=align == "merge", lower_style=lower_style)
+        build_ass_events(merged, style_name_k, evs)
+    build_ass_events(upper, style_name_k, evs)
+    build_ass_events(lower, lower_style, evs)
+
+    # 生成ASS文件
+    clean_name = t["oth_stem"].rstrip('._ ')
+    # 去除原有的语言标签（如 [kor]、[jpn]、[chn] 等）和 .srt 后缀
+    clean_name = re.sub(r'\[.*?\]', '', clean_name, flags=re.IGNORECASE)
+    clean_name = re.sub(r'\.srt$', '', clean_name, flags=re.IGNORECASE)
+    # 去除末尾的点和空格
+    clean_name = clean_name.rstrip('. ')
+    # 添加新的语言标签后缀（前面加点）
+    clean_name = clean_name + "." + file_suffix + ".ass"
+    # 递归模式下输出目录可能还不存在
+    os.makedirs(base_output, exist_ok=True)
+    save_path_ass = get_organized_path(base_output, clean_name)
+
+    # 头信息与全部事件拼接后一次写入
+    with open(save_path_ass, 'w', encoding='utf-8-sig') as f:
+        f.write(hdr + "\n" + "\n".join(evs))
+
+    # 归档原始SRT文件（ASS写入失败时会在上面抛出异常，原始文件保持不动）
+    archive_dir_chi = get_organized_path(base_output, t["chi_name"])
+    archive_dir_oth = get_organized_path(base_output, t["oth_name"])
+
+    shutil.move(t["chi_path"], archive_dir_chi)
+    shutil.move(t["oth_path"], archive_dir_oth)
+
+    return os.path.basename(save_path_ass)
+
+
+def _run_pairs_parallel(tasks, hdr, style_names, merge_mode, workers,
+                        log_func, progress_bar, stop_flag, **options):
+    """在进程池中并行转换各对字幕
+
+    子进程只负责转换与归档，日志由主进程按配对顺序输出（与串行执行的日志顺序一致），
+    进度按已完成的配对数汇总。停止时取消尚未开始的配对，已在进行中的配对会完整结束。
+    options 原样传给 convert_pair（时间轴对齐选项）。
+
+    Returns:
+        bool: 全部完成返回 True，被停止返回 False
+    """
+    total = len(tasks)
+    results = {}
+    next_log = 0
+
+    def log_result(i):
+        ass_name, error = results.pop(i)
+        if error is None:
+            log_func(f"📝 已生成: {ass_name}")
+        else:
+            log_func(f"❌ 处理 {tasks[i].get('ep')} 时出错: {error}")
+
+    def collect(future, i):
+        error = future.exception()
+        results[i] = (None, error) if error else (future.result(), None)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(convert_pair, t, hdr, style_names, merge_mode, **options): i
+                   for i, t in enumerate(tasks)}
+        while pending:
+            if stop_flag[0]:
+                # 取消尚未开始的配对，等待进行中的配对结束，按顺序补齐已完成配对的日志
+                executor.shutdown(wait=True, cancel_futures=True)
+                for future, i in pending.items():
+                    if not future.cancelled():
+                        collect(future, i)
+                for i in sorted(results):
+                    log_result(i)
+                return False
+            finished, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in finished:
+                collect(future, pending.pop(future))
+                emit_progress(progress_bar, int((total - len(pending)) / total * 100))
+            # 按配对顺序输出已完成的连续前缀
+            while next_log in results:
+                log_result(next_log)
+                next_log += 1
+    return True
+
+
+def run_ass_task(target_dir, styles, log_func, progress_bar, root, output_dir=None, stop_flag=[False], workers=1,
+                 align="off", align_tolerance=200, recursive=False):
     """
     运行SRT转ASS转换任务
     
     扫描目标目录，匹配双语字幕文件，转换为ASS格式，并归档原始SRT文件。
+    递归模式下扫描整个目录树，每个目录独立配对，所有目录的配对在同一个进程池中转换，
+    ASS与归档文件写在各自源目录对应的输出位置（指定输出目录时按相对路径镜像）。
     
     Args:
         target_dir: 目标目录
@@ -172,6 +566,10 @@ def run_ass_task(target_dir, styles, log_func, progress_bar, root, output_dir=No
         root: 根窗口
         output_dir: 输出目录（可选）
         stop_flag: 停止标志
+        workers: 并行转换的进程数，1 表示串行转换，0 表示CPU核心数
+        align: 上下两条字幕轨的时间轴对齐方式（off 不对齐 / snap 吸附 / merge 合并）
+        align_tolerance: 对齐容差（毫秒）
+        recursive: 是否递归处理所有子目录
     """
     # 路径自动纠偏
     if log_func: 
@@ -229,205 +627,23 @@ def run_ass_task(target_dir, styles, log_func, progress_bar, root, output_dir=No
            f"{l_k}\n{l_c}\n{l_j}\n\n"
            f"[Events]\nFormat: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text")
 
-    # 扫描任务
-    all_f = os.listdir(target_dir)
-    # 排除视频自带的 .DUAL. 干扰，只认真正的 .dual.srt 后缀
-    duals = [f for f in all_f if f.lower().endswith('.dual.srt')]
-    srts = [f for f in all_f if f.lower().endswith('.srt') and f not in duals]
-
+    # 扫描任务：每个文件名只解析一次，按集数/基础名建立语言索引后查表配对
+    base_output = output_dir if output_dir else target_dir
+    if recursive:
+        dir_groups = find_srt_dirs(target_dir)
+    else:
+        dir_groups = [(target_dir, os.listdir(target_dir))]
     tasks = []
-    EP_PATTERN = re.compile(r'[Ss](\d{2})[Ee](\d{2})')
-    gps = {}
-
-    # 先按集数分组
-    for f in srts:
-        m = EP_PATTERN.search(f)
-        if m:
-            ep = f"S{m.group(1)}E{m.group(2)}"
-            gps.setdefault(ep, []).append(f)
-
-    # 处理有集数标记的文件
-    for ep, fl in gps.items():
-        kor = [f for f in fl if '[kor]' in f.lower() or '[ko]' in f.lower()]
-        jpn = [f for f in fl if '[jpn]' in f.lower() or '[jp]' in f.lower()]
-        eng = [f for f in fl if '[eng]' in f.lower() or '[en]' in f.lower()]
-        chi = [f for f in fl if '[chi]' in f.lower()]
-        
-        if not chi:
-            chi = [f for f in fl if any(x in f.lower() for x in ['chn', 'chs', 'cht', 'chi'])]
-        
-        # 在严格匹配模式下，不自动推断语言标签
-        # 只使用明确的语言标签进行匹配
-
-        # 根据字体方案进行严格匹配
-        if merge_mode == "kor_jpn":
-            # 韩上日下：必须有 kor 和 jpn
-            if not kor:
-                if log_func:
-                    log_func(f"❌ 集数 {ep} 缺少韩语字幕")
-            if not jpn:
-                if log_func:
-                    log_func(f"❌ 集数 {ep} 缺少日语字幕")
-            if kor and jpn:
-                tasks.append({
-                    "type": "merge", "ep": ep,
-                    "chi_name": jpn[0], "chi_path": os.path.join(target_dir, jpn[0]),
-                    "oth_name": kor[0], "oth_path": os.path.join(target_dir, kor[0]),
-                    "lang_type": "kor_jpn"
-                })
-                if log_func:
-                    log_func(f"✅ 集数 {ep} 成功匹配（韩日双语）")
-        
-        elif merge_mode == "kor_chn":
-            # 韩上中下：必须有 kor 和 chn
-            if not kor:
-                if log_func:
-                    log_func(f"❌ 集数 {ep} 缺少韩语字幕")
-            if not chi:
-                if log_func:
-                    log_func(f"❌ 集数 {ep} 缺少中文字幕")
-            if kor and chi:
-                tasks.append({
-                    "type": "merge", "ep": ep,
-                    "chi_name": chi[0], "chi_path": os.path.join(target_dir, chi[0]),
-                    "oth_name": kor[0], "oth_path": os.path.join(target_dir, kor[0])
-                })
-                if log_func:
-                    log_func(f"✅ 集数 {ep} 成功匹配")
-        
-        elif merge_mode == "jpn_chn":
-            # 日上中下：必须有 jpn 和 chn
-            if not jpn:
-                if log_func:
-                    log_func(f"❌ 集数 {ep} 缺少日语字幕")
-            if not chi:
-                if log_func:
-                    log_func(f"❌ 集数 {ep} 缺少中文字幕")
-            if jpn and chi:
-                tasks.append({
-                    "type": "merge", "ep": ep,
-                    "chi_name": chi[0], "chi_path": os.path.join(target_dir, chi[0]),
-                    "oth_name": jpn[0], "oth_path": os.path.join(target_dir, jpn[0])
-                })
-                if log_func:
-                    log_func(f"✅ 集数 {ep} 成功匹配")
-        
-        elif merge_mode == "eng_chn":
-            # 英上中下：必须有 eng 和 chn
-            if not eng:
-                if log_func:
-                    log_func(f"❌ 集数 {ep} 缺少英语字幕")
-            if not chi:
-                if log_func:
-                    log_func(f"❌ 集数 {ep} 缺少中文字幕")
-            if eng and chi:
-                tasks.append({
-                    "type": "merge", "ep": ep,
-                    "chi_name": chi[0], "chi_path": os.path.join(target_dir, chi[0]),
-                    "oth_name": eng[0], "oth_path": os.path.join(target_dir, eng[0])
-                })
-                if log_func:
-                    log_func(f"✅ 集数 {ep} 成功匹配")
-
-    # 处理没有集数标记的文件（直接按语言标签匹配）
-    files_without_ep = [f for f in srts if not EP_PATTERN.search(f)]
-    if files_without_ep:
-        # 按基础文件名分组（去除语言标签和扩展名）
-        name_groups = {}
-        for f in files_without_ep:
-            # 提取基础名称：去除 [chn]、[kor] 等语言标签
-            base_name = re.sub(r'\[.*?\]', '', f, flags=re.IGNORECASE).strip()
-            name_groups.setdefault(base_name, []).append(f)
-
-        # 对每个基础名称组进行匹配
-        for base_name, fl in name_groups.items():
-            if len(fl) >= 2:  # 至少需要两个文件
-                # 识别各种语言字幕文件
-                kor = [f for f in fl if '[kor]' in f.lower() or '[ko]' in f.lower()]
-                jpn = [f for f in fl if '[jpn]' in f.lower() or '[jp]' in f.lower()]
-                eng = [f for f in fl if '[eng]' in f.lower() or '[en]' in f.lower()]
-                chi_candidates = [f for f in fl if '[chn]' in f.lower() or '[chi]' in f.lower() or '[chs]' in f.lower() or '[cht]' in f.lower()]
-
-                # 如果同时存在 [chs] 和 [cht]，优先选择 [chs]
-                if chi_candidates:
-                    has_chs = any('[chs]' in f.lower() for f in chi_candidates)
-                    has_cht = any('[cht]' in f.lower() for f in chi_candidates)
-                    if has_chs and has_cht:
-                        chi = [f for f in chi_candidates if '[chs]' in f.lower()]
-                    else:
-                        chi = chi_candidates
-                else:
-                    chi = []
-
-                # 根据字体方案进行严格匹配
-                if merge_mode == "kor_jpn":
-                    # 韩上日下：必须有 kor 和 jpn
-                    if not kor:
-                        if log_func:
-                            log_func(f"❌ 文件 '{base_name}' 缺少韩语字幕")
-                    if not jpn:
-                        if log_func:
-                            log_func(f"❌ 文件 '{base_name}' 缺少日语字幕")
-                    if kor and jpn:
-                        tasks.append({
-                            "type": "merge", "ep": base_name,
-                            "chi_name": jpn[0], "chi_path": os.path.join(target_dir, jpn[0]),
-                            "oth_name": kor[0], "oth_path": os.path.join(target_dir, kor[0]),
-                            "lang_type": "kor_jpn"
-                        })
-                        if log_func:
-                            log_func(f"✅ 文件 '{base_name}' 成功匹配（韩日双语）")
-                
-                elif merge_mode == "kor_chn":
-                    # 韩上中下：必须有 kor 和 chn
-                    if not kor:
-                        if log_func:
-                            log_func(f"❌ 文件 '{base_name}' 缺少韩语字幕")
-                    if not chi:
-                        if log_func:
-                            log_func(f"❌ 文件 '{base_name}' 缺少中文字幕")
-                    if kor and chi:
-                        tasks.append({
-                            "type": "merge", "ep": base_name,
-                            "chi_name": chi[0], "chi_path": os.path.join(target_dir, chi[0]),
-                            "oth_name": kor[0], "oth_path": os.path.join(target_dir, kor[0])
-                        })
-                        if log_func:
-                            log_func(f"✅ 文件 '{base_name}' 成功匹配")
-                
-                elif merge_mode == "jpn_chn":
-                    # 日上中下：必须有 jpn 和 chn
-                    if not jpn:
-                        if log_func:
-                            log_func(f"❌ 文件 '{base_name}' 缺少日语字幕")
-                    if not chi:
-                        if log_func:
-                            log_func(f"❌ 文件 '{base_name}' 缺少中文字幕")
-                    if jpn and chi:
-                        tasks.append({
-                            "type": "merge", "ep": base_name,
-                            "chi_name": chi[0], "chi_path": os.path.join(target_dir, chi[0]),
-                            "oth_name": jpn[0], "oth_path": os.path.join(target_dir, jpn[0])
-                        })
-                        if log_func:
-                            log_func(f"✅ 文件 '{base_name}' 成功匹配")
-                
-                elif merge_mode == "eng_chn":
-                    # 英上中下：必须有 eng 和 chn
-                    if not eng:
-                        if log_func:
-                            log_func(f"❌ 文件 '{base_name}' 缺少英语字幕")
-                    if not chi:
-                        if log_func:
-                            log_func(f"❌ 文件 '{base_name}' 缺少中文字幕")
-                    if eng and chi:
-                        tasks.append({
-                            "type": "merge", "ep": base_name,
-                            "chi_name": chi[0], "chi_path": os.path.join(target_dir, chi[0]),
-                            "oth_name": eng[0], "oth_path": os.path.join(target_dir, eng[0])
-                        })
-                        if log_func:
-                            log_func(f"✅ 文件 '{base_name}' 成功匹配")
+    for src_dir, names in dir_groups:
+        rel_dir = os.path.relpath(src_dir, target_dir)
+        if recursive and log_func:
+            log_func(f"📁 {rel_dir if rel_dir != '.' else os.path.basename(target_dir)}")
+        dir_output = base_output if rel_dir == '.' else os.path.join(base_output, rel_dir)
+        for t in build_pair_tasks(names, merge_mode, log_func):
+            t["chi_path"] = os.path.join(src_dir, t["chi_name"])
+            t["oth_path"] = os.path.join(src_dir, t["oth_name"])
+            t["base_output"] = dir_output
+            tasks.append(t)
 
     total = len(tasks)
     if total == 0:
@@ -435,115 +651,36 @@ def run_ass_task(target_dir, styles, log_func, progress_bar, root, output_dir=No
         return
 
     # 执行处理
-    base_output = output_dir if output_dir else target_dir
-    
+    style_names = (style_name_k, style_name_c, style_name_j)
+    if recursive:
+        done_message = f"📂 任务完成：共处理 {len(dir_groups)} 个目录，.ass 已生成在各自目录，原始 .srt 已归档至各目录的 srt/ 文件夹。"
+    else:
+        done_message = "📂 任务完成：.ass 已生成在根目录，原始 .srt 已归档至 srt/ 文件夹。"
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, total)
+
+    if workers > 1:
+        if _run_pairs_parallel(tasks, hdr, style_names, merge_mode, workers,
+                               log_func, progress_bar, stop_flag,
+                               align=align, align_tolerance=align_tolerance):
+            log_func(done_message)
+        return
+
     for i, t in enumerate(tasks):
         # 检查停止标志
         if stop_flag[0]:
             return
 
         try:
-            # 修复SRT文件格式（如果需要）
-            fix_srt_format(t["oth_path"])
-            fix_srt_format(t["chi_path"])
-
-            # 加载与清洗字幕文件
-            s1, s2 = pysubs2.load(t["oth_path"]), pysubs2.load(t["chi_path"])
-            evs = []
-
-            # 根据任务类型选择样式
-            lang_type = t.get("lang_type", "normal")  # 默认为正常的中外字幕
-
-            # 根据字体方案确定文件名后缀
-            if lang_type == "kor_jpn":
-                file_suffix = "[kor_jpn]"
-            elif merge_mode == "kor_chn":
-                file_suffix = "[kor_chn]"
-            elif merge_mode == "jpn_chn":
-                file_suffix = "[jpn_chn]"
-            elif merge_mode == "eng_chn":
-                file_suffix = "[eng_chn]"
-            else:
-                file_suffix = ""
-
-            if lang_type == "kor_jpn":
-                # 韩日字幕：韩语在上（oth_path），日语在下（chi_path）
-                for l in s1:  # 韩语字幕
-                    if stop_flag[0]:
-                        return
-
-                    c = clean_subtitle_text_ass(l.text)
-                    if c:
-                        st = pysubs2.time.ms_to_str(l.start, fractions=True).replace(',','.')[:-1]
-                        et = pysubs2.time.ms_to_str(l.end, fractions=True).replace(',','.')[:-1]
-                        evs.append(f"Dialogue: 0,{st},{et},{style_name_k},,0,0,0,,{c}")
-
-                for l in s2:  # 日语字幕
-                    if stop_flag[0]:
-                        return
-
-                    c = clean_subtitle_text_ass(l.text)
-                    if c:
-                        st = pysubs2.time.ms_to_str(l.start, fractions=True).replace(',','.')[:-1]
-                        et = pysubs2.time.ms_to_str(l.end, fractions=True).replace(',','.')[:-1]
-                        evs.append(f"Dialogue: 0,{st},{et},{style_name_j},,0,0,0,,{c}")
-            else:
-                # 正常的中外字幕：外语在上（oth_path），中文在下（chi_path）
-                for l in s1:  # 外语字幕
-                    if stop_flag[0]:
-                        return
-
-                    c = clean_subtitle_text_ass(l.text)
-                    if c:
-                        st = pysubs2.time.ms_to_str(l.start, fractions=True).replace(',','.')[:-1]
-                        et = pysubs2.time.ms_to_str(l.end, fractions=True).replace(',','.')[:-1]
-                        evs.append(f"Dialogue: 0,{st},{et},{style_name_k},,0,0,0,,{c}")
-
-                for l in s2:  # 中文字幕
-                    if stop_flag[0]:
-                        return
-
-                    c = clean_subtitle_text_ass(l.text)
-                    if c:
-                        st = pysubs2.time.ms_to_str(l.start, fractions=True).replace(',','.')[:-1]
-                        et = pysubs2.time.ms_to_str(l.end, fractions=True).replace(',','.')[:-1]
-                        evs.append(f"Dialogue: 0,{st},{et},{style_name_c},,0,0,0,,{c}")
-
-            # 生成ASS文件
-            clean_name = re.split(r'_track\d+', t["oth_name"], flags=re.IGNORECASE)[0].rstrip('._ ')
-            # 去除原有的语言标签（如 [kor]、[jpn]、[chn] 等）和 .srt 后缀
-            clean_name = re.sub(r'\[.*?\]', '', clean_name, flags=re.IGNORECASE)
-            clean_name = re.sub(r'\.srt$', '', clean_name, flags=re.IGNORECASE)
-            # 去除末尾的点和空格
-            clean_name = clean_name.rstrip('. ')
-            # 添加新的语言标签后缀（前面加点）
-            clean_name = clean_name + "." + file_suffix + ".ass"
-            save_path_ass = get_organized_path(base_output, clean_name)
-
-            with open(save_path_ass, 'w', encoding='utf-8-sig') as f:
-                f.write(hdr + "\n" + "\n".join(evs))
-
-            log_func(f"📝 已生成: {os.path.basename(save_path_ass)}")
-
-            # 归档原始SRT文件
-            archive_dir_chi = get_organized_path(base_output, t["chi_name"])
-            archive_dir_oth = get_organized_path(base_output, t["oth_name"])
-            
-            shutil.move(t["chi_path"], archive_dir_chi)
-            shutil.move(t["oth_path"], archive_dir_oth)
-
+            ass_name = convert_pair(t, hdr, style_names, merge_mode, stop_flag,
+                                    align=align, align_tolerance=align_tolerance)
+            if ass_name is None:
+                return
+            log_func(f"📝 已生成: {ass_name}")
         except Exception as e:
             log_func(f"❌ 处理 {t.get('ep')} 时出错: {e}")
 
-        # 更新进度，支持不同类型的进度回调
-        try:
-            # 尝试PyQt的信号方式（progress_bar是信号对象）
-            progress_bar.emit(int((i + 1) / total * 100))
-        except AttributeError:
-            try:
-                # 尝试直接调用方式（progress_bar是emit方法本身）
-                progress_bar(int((i + 1) / total * 100))
-            except Exception as e:
-                pass
-    
-    log_func("📂 任务完成：.ass 已生成在根目录，原始 .srt 已归档至 srt/ 文件夹。")
\ No newline at end of file
+        emit_progress(progress_bar, int((i + 1) / total * 100))
+
+    log_func(done_message)
\ No newline at end of file
@@ -1,5 +1,6 @@
 import os
 import sys
+import itertools
 
 # 仅在需要时从配置文件读取 CUDA 路径
 # 实际的 CUDA 路径检查将在 initialize_model 方法中进行
@@ -8,7 +9,8 @@ import sys
 class SubtitleGenerator:
     """字幕生成器核心类"""
     
-    def __init__(self, model_size="large-v3-turbo", model_path=None, device="auto", language=None, allow_download=False):
+    def __init__(self, model_size="large-v3-turbo", model_path=None, device="auto", language=None, allow_download=False,
+                 batch_size=0, calibration_file=None, parallel_files=1):
         """
         初始化字幕生成器
         
@@ -18,6 +20,9 @@ class SubtitleGenerator:
             device: 设备类型（auto/cuda/cpu）
             language: 指定语言代码（如 'ja', 'ko', 'en', 'zh'），None 表示自动检测
             allow_download: 是否允许下载模型（默认 False）
+            batch_size: 批量推理的批大小，0 或 1 表示逐块顺序识别
+            calibration_file: CPU模式自动调优时用于试跑的媒体文件（None 表示不调优）
+            parallel_files: 批量处理时同时识别的文件数，0 表示按CPU核心数与可用内存自动选择
         """
         self.model_size = model_size
         self.model_path = model_path
@@ -25,6 +30,13 @@ class SubtitleGenerator:
         self.language = language
         self.allow_download = allow_download
         self.model = None
+        self._model_key = None  # 从模型缓存获取的模型键，cleanup() 时释放
+        self.batch_size = batch_size
+        self._batched_pipeline = None  # 批量推理管线，None 表示尚未创建，False 表示不可用
+        self.calibration_file = calibration_file
+        self.parallel_files = parallel_files
+        self.segment_callback = None  # 每识别出一个片段时调用（无参数），语音识别进程据此判断识别仍在进行
+        self.workers = max(1, parallel_files)  # 同时识别的文件数（模型副本数），initialize_model 时确定
     
     def initialize_model(self, log_callback=None):
         """
@@ -34,6 +46,10 @@ class SubtitleGenerator:
             log_callback: 日志回调函数，用于显示日志消息
         """
         from faster_whisper import WhisperModel
+        from function.whisper_models import model_manager
+
+        # 重复初始化时先释放之前获取的模型
+        self.cleanup()
         
         if log_callback:
             if self.model_path:
@@ -115,17 +131,16 @@ class SubtitleGenerator:
                 error_msg += "3. 在设置中指定本地模型路径\n\n"
                 raise Exception(error_msg)
         
-        # 从配置文件读取引擎选择
-        from function.settings import ConfigManager
-        config_manager = ConfigManager()
-        config_manager.load_settings()
-        engine_type = config_manager.whisper_engine
+        # 从共享的配置服务读取引擎选择（配置文件未变化时不重新读取）
+        from function.settings import settings_service
+        autosub_config = settings_service.get_all().get("AutoSub", {})
+        engine_type = autosub_config.get("whisper_engine", "GPU")
         
         # 如果引擎选择为GPU，直接尝试使用GPU处理
         if engine_type == "GPU":
             try:
                 # 添加CUDA路径（如果配置了）
-                cuda_path = config_manager.cuda_library_path
+                cuda_path = autosub_config.get("cuda_library_path", "")
                 if cuda_path and os.path.exists(cuda_path):
                     # 添加所有子目录的bin文件夹到DLL搜索路径
                     for item in os.listdir(cuda_path):
@@ -145,14 +160,22 @@ class SubtitleGenerator:
                                 if bin_path not in current_path:
                                     os.environ['PATH'] = bin_path + os.pathsep + current_path
                 
-                # 直接尝试使用GPU进行处理
-                self.model = WhisperModel(
-                    model_input,
-                    device="cuda",
-                    compute_type="float16",
-                    num_workers=1,  # 使用 1 个工作线程，避免 GPU 内存问题
-                    device_index=0  # 使用第一个 GPU
+                # 直接尝试使用GPU进行处理（同一模型已加载时直接复用）
+                # 默认只识别 1 个文件（1 个工作线程），避免 GPU 内存问题
+                workers = self.workers = self._parallel_workers("cuda")
+                model_key = (model_input, "cuda", "float16", workers)
+                self.model = model_manager.acquire(
+                    model_key,
+                    lambda: WhisperModel(
+                        model_input,
+                        device="cuda",
+                        compute_type="float16",
+                        num_workers=workers,
+                        device_index=0  # 使用第一个 GPU
+                    ),
+                    log_callback
                 )
+                self._model_key = model_key
                 if log_callback:
                     log_callback("✓ 使用 GPU (CUDA) 进行处理")
             except Exception as e:
@@ -173,13 +196,28 @@ class SubtitleGenerator:
             if log_callback:
                 log_callback(f"ⓘ 已选择CPU模式，使用 CPU 进行处理")
             try:
-                self.model = WhisperModel(
-                    model_input,
-                    device="cpu",
-                    compute_type="float32",
-                    num_workers=1,
-                    cpu_threads=4  # 限制CPU线程数
+                compute_type, cpu_threads = self._cpu_config(model_input, autosub_config, log_callback)
+                # 同时识别多个文件时每个模型副本使用一部分线程，总线程数不变
+                workers = self.workers = self._parallel_workers("cpu")
+                cpu_threads = max(1, cpu_threads // workers)
+                model_key = (model_input, "cpu", compute_type, cpu_threads, workers)
+                self.model = model_manager.acquire(
+                    model_key,
+                    lambda: WhisperModel(
+                        model_input,
+                        device="cpu",
+                        compute_type=compute_type,
+                        num_workers=workers,
+                        cpu_threads=cpu_threads
+                    ),
+                    log_callback
                 )
+                self._model_key = model_key
+                if log_callback:
+                    if workers > 1:
+                        log_callback(f"ⓘ CPU 计算类型: {compute_type}，{workers} 个模型副本 × {cpu_threads} 线程")
+                    else:
+                        log_callback(f"ⓘ CPU 计算类型: {compute_type}，线程数: {cpu_threads}")
             except Exception as e:
                 if log_callback:
                     log_callback(f"❌ CPU初始化失败: {str(e)}")
@@ -188,21 +226,143 @@ class SubtitleGenerator:
         if self.model is None:
             raise Exception("模型初始化失败: model is None")
 
+    def _parallel_workers(self, device):
+        """同时识别的文件数：parallel_files 大于0时直接使用，否则按设备、CPU核心数与可用内存自动选择"""
+        if self.parallel_files > 0:
+            return self.parallel_files
+        if self.batch_size > 1:
+            # 批量推理已经用满多核，不再同时识别多个文件
+            return 1
+        from function.transcribe_scheduler import default_parallel_files
+        return default_parallel_files(device)
+
+    def _cpu_config(self, model_input, autosub_config, log_callback=None):
+        """
+        确定CPU模式的计算类型与线程数
+
+        配置项 [AutoSub] cpu_compute_type 指定了计算类型时直接使用；为 auto 时使用本机保存的调优结果，
+        没有结果时用 calibration_file 试跑各候选配置并保存最快的一组。cpu_threads 大于0时固定线程数。
+
+        Returns:
+            tuple: (计算类型, 线程数)
+        """
+        from function import whisper_tuning
+
+        compute_type = autosub_config.get("cpu_compute_type", "auto")
+        try:
+            cpu_threads = max(0, int(autosub_config.get("cpu_threads", "0")))
+        except ValueError:
+            cpu_threads = 0
+        default_threads = cpu_threads or os.cpu_count() or 4
+
+        if compute_type != "auto":
+            if compute_type not in whisper_tuning.CANDIDATE_COMPUTE_TYPES:
+                compute_type = whisper_tuning.DEFAULT_COMPUTE_TYPE
+            return compute_type, default_threads
+
+        tuned = whisper_tuning.parse_tuned(autosub_config.get("cpu_autotune", ""))
+        if tuned:
+            return tuned[0], cpu_threads or tuned[1]
+
+        if not self.calibration_file:
+            return whisper_tuning.DEFAULT_COMPUTE_TYPE, default_threads
+
+        from faster_whisper import WhisperModel
+        from function.settings import settings_service
+        if log_callback:
+            log_callback("⏱️ 首次在本机使用CPU模式，正在自动调优计算类型与线程数...")
+        try:
+            audio = whisper_tuning.load_calibration_audio(self.calibration_file)
+            compute_type, threads, _ = whisper_tuning.autotune_cpu(
+                lambda ct, n: WhisperModel(model_input, device="cpu", compute_type=ct, num_workers=1, cpu_threads=n),
+                audio,
+                language=self.language,
+                thread_counts=[cpu_threads] if cpu_threads else None,
+                log_callback=log_callback
+            )
+        except Exception as e:
+            if log_callback:
+                log_callback(f"⚠️ 自动调优失败，使用默认配置: {e}")
+            return whisper_tuning.DEFAULT_COMPUTE_TYPE, default_threads
+
+        # 保存到配置文件，之后在本机直接使用
+        settings_service.update({"AutoSub": {"cpu_autotune": whisper_tuning.format_tuned(compute_type, threads)}})
+        if log_callback:
+            log_callback(f"✓ 自动调优完成: {compute_type}，{threads} 线程（已保存）")
+        return compute_type, threads
+
     def cleanup(self):
-        """清理模型资源"""
-        if self.model is not None:
+        """释放模型引用
+
+        模型由模型缓存管理（function.whisper_models），这里只归还引用，不析构模型对象：
+        Whisper 模型的析构函数可能卡死。模型空闲超时后由缓存卸载，期间再次运行可直接复用。
+        """
+        if self._model_key is not None:
+            from function.whisper_models import model_manager
+            model_manager.release(self._model_key)
+            self._model_key = None
+        self.model = None
+        self._batched_pipeline = None
+
+    def _get_batched_pipeline(self, log_callback=None):
+        """获取批量推理管线（faster-whisper 的 BatchedInferencePipeline），不可用时返回 None"""
+        if self._batched_pipeline is None:
             try:
-                print("DEBUG: cleanup - 开始清理模型")
-                # 不删除模型对象，只是将引用设为 None
-                # 这样可以避免 Whisper 模型的析构函数卡死
-                self.model = None
-                print("DEBUG: cleanup - 模型已设为 None")
-                print("DEBUG: cleanup - 清理完成（跳过 gc.collect）")
+                from faster_whisper import BatchedInferencePipeline
+                self._batched_pipeline = BatchedInferencePipeline(model=self.model)
+                if log_callback:
+                    log_callback(f"⚡ 使用批量推理 (batch_size={self.batch_size})")
             except Exception as e:
-                print(f"DEBUG: cleanup - 清理出错: {e}")
-                pass  # 忽略清理过程中的错误
-        else:
-            print("DEBUG: cleanup - model 为 None，无需清理")
+                # 旧版本 faster-whisper 没有批量推理管线
+                if log_callback:
+                    log_callback(f"⚠️ 当前 faster-whisper 不支持批量推理，使用顺序识别: {e}")
+                self._batched_pipeline = False
+        return self._batched_pipeline or None
+
+    def _transcribe(self, audio_file, log_callback=None):
+        """
+        识别音频，返回 (片段迭代器, 识别信息)
+
+        batch_size 大于1时把 VAD 切分出的语音块成批送入模型（批量推理管线），多核CPU上吞吐量更高；
+        管线不可用，或在产出第一个片段之前出错时，自动回退到逐块的顺序识别，本次任务不再尝试批量推理。
+
+        Args:
+            audio_file: 音频文件路径
+            log_callback: 日志回调函数
+        """
+        # 优化参数以提高处理速度（顺序识别与批量推理共用）
+        options = dict(
+            word_timestamps=False,  # 关闭词级时间戳，大幅提高速度
+            language=self.language,  # 使用指定的语言，None 表示自动检测
+            condition_on_previous_text=False,
+            beam_size=1,  # 使用贪心搜索，更快
+            best_of=1,    # 只采样一次，更快
+            vad_filter=True,  # 启用语音活动检测
+            vad_parameters=dict(min_silence_duration_ms=500),  # 最小静音 500ms
+            # 提高语言检测的准确性
+            language_detection_threshold=0.5,  # 语言检测阈值
+            # 支持混合语言（如果音频中包含多种语言）
+            # faster-whisper 会自动处理混合语言
+        )
+
+        pipeline = self._get_batched_pipeline(log_callback) if self.batch_size > 1 else None
+        if pipeline is not None:
+            try:
+                segments, info = pipeline.transcribe(audio_file, batch_size=self.batch_size, **options)
+                # 片段是惰性生成的，先取出第一个片段，确认批量推理能正常运行
+                segments = iter(segments)
+                first = next(segments, None)
+                if first is None:
+                    return iter(()), info
+                return itertools.chain((first,), segments), info
+            except Exception as e:
+                if "cublas64_12.dll" in str(e):
+                    raise
+                if log_callback:
+                    log_callback(f"⚠️ 批量推理失败，改用顺序识别: {e}")
+                self._batched_pipeline = False
+
+        return self.model.transcribe(audio_file, **options)
 
     def generate_subtitle(self, audio_file, log_callback=None, progress_callback=None, stop_flag=None):
         """
@@ -224,20 +384,7 @@ class SubtitleGenerator:
             # 使用模型生成字幕
             # 调用transcribe，启用语言检测
             # 优化参数以提高处理速度
-            segments, info = self.model.transcribe(
-                audio_file,
-                word_timestamps=False,  # 关闭词级时间戳，大幅提高速度
-                language=self.language,  # 使用指定的语言，None 表示自动检测
-                condition_on_previous_text=False,
-                beam_size=1,  # 使用贪心搜索，更快
-                best_of=1,    # 只采样一次，更快
-                vad_filter=True,  # 启用语音活动检测
-                vad_parameters=dict(min_silence_duration_ms=500),  # 最小静音 500ms
-                # 提高语言检测的准确性
-                language_detection_threshold=0.5,  # 语言检测阈值
-                # 支持混合语言（如果音频中包含多种语言）
-                # faster-whisper 会自动处理混合语言
-            )
+            segments, info = self._transcribe(audio_file, log_callback)
 
             # 确保segments被完全处理，并收集所有片段
             segments_list = []
@@ -256,6 +403,8 @@ class SubtitleGenerator:
                     
                 segments_list.append(segment)
                 segment_count += 1
+                if self.segment_callback:
+                    self.segment_callback()
 
                 # 每处理 5 个片段更新一次进度条（动画效果）
                 if progress_callback and segment_count % 5 == 0:
@@ -372,40 +521,179 @@ class SubtitleGenerator:
             log_callback: 日志回调函数，用于显示日志消息
             progress_callback: 进度回调函数（可选），用于更新进度条
         """
+        from function.subconvert import Cue, write_cues
+
         try:
-            # 使用缓冲写入，避免卡死
-            content_lines = []
-            total_segments = len(segments)
-
-            for i, segment in enumerate(segments, 1):
-                # 不更新进度条，只处理字幕
-                # if progress_callback and total_segments > 0:
-                #     progress_value = int(90 + i / total_segments * 10)
-                #     progress_callback(progress_value)
-                
-                start_time = segment.start
-                end_time = segment.end
-                
-                def format_time(seconds):
-                    ms = int(seconds * 1000)
-                    s, ms = divmod(ms, 1000)
-                    m, s = divmod(s, 60)
-                    h, m = divmod(m, 60)
-                    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
-                
-                content_lines.append(f"{i}\n")
-                content_lines.append(f"{format_time(start_time)} --> {format_time(end_time)}\n")
-                content_lines.append(f"{segment.text.strip()}\n")
-                content_lines.append("\n")
-            
-            # 一次性写入所有内容
-            with open(output_file, "w", encoding="utf-8", buffering=8192) as f:
-                f.writelines(content_lines)
+            # 逐条流式写入（先写临时文件再替换，失败时不留下写了一半的字幕）
+            write_cues(
+                (Cue(int(segment.start * 1000), int(segment.end * 1000), segment.text.strip())
+                 for segment in segments),
+                output_file,
+                "srt"
+            )
         except Exception as e:
             if log_callback:
                 log_callback(f"❌ 写入字幕文件失败: {str(e)}")
             raise
     
+    def _process_file(self, media_file, idx, total_files, progress_callback=None, log_callback=None,
+                      skip_existing=True, stop_flag=None):
+        """
+        处理批量任务中的一个文件：已存在字幕时跳过，否则生成字幕
+
+        Args:
+            media_file: 媒体文件路径
+            idx: 文件在批量任务中的序号（从0开始）
+            total_files: 批量任务的文件总数
+
+        Returns:
+            tuple: ((媒体文件, 字幕文件, 是否成功), 是否已停止)
+        """
+        base_name = os.path.splitext(os.path.basename(media_file))[0]
+        dir_name = os.path.dirname(media_file)
+
+        # 检查是否已存在字幕
+        has_subtitle = False
+        existing_subtitle = None
+
+        # 检查 .whisper.[].srt 文件
+        for file in os.listdir(dir_name):
+            if file.startswith(f"{base_name}.whisper.[") and file.endswith("].srt"):
+                has_subtitle = True
+                existing_subtitle = os.path.join(dir_name, file)
+                break
+
+        # 检查同名 .srt 文件
+        if not has_subtitle:
+            srt_file = os.path.join(dir_name, f"{base_name}.srt")
+            if os.path.exists(srt_file):
+                has_subtitle = True
+                existing_subtitle = srt_file
+
+        if has_subtitle and skip_existing:
+            # 跳过已存在的字幕
+            result = (media_file, existing_subtitle, True)
+            if log_callback:
+                log_callback(f"⏭️ 跳过: {os.path.basename(media_file)} (已存在字幕)")
+            # 更新进度（多个文件时显示文件数进度）
+            if progress_callback and total_files > 1:
+                progress_value = int((idx + 1) / total_files * 100)
+                progress_callback(progress_value)
+            return result, False
+
+        if log_callback:
+            log_callback(f"═════════════════════════════════════════════════════\n正在处理: {os.path.basename(media_file)} ({idx+1}/{total_files})")
+
+        # 为当前文件创建一个包装后的 progress_callback
+        def create_animation_progress_callback():
+            def wrapped_progress_callback(segment_progress):
+                # 多个文件时显示文件数进度，单个文件时不显示
+                if progress_callback and total_files > 1:
+                    progress_value = int((idx + 1) / total_files * 100)
+                    progress_callback(progress_value)
+            return wrapped_progress_callback
+
+        file_progress_callback = create_animation_progress_callback()
+
+        try:
+            output_file = self.generate_subtitle(media_file, log_callback, file_progress_callback, stop_flag)
+            if output_file is None:
+                # 任务已停止
+                if log_callback:
+                    log_callback("⚠️ 任务已停止，未生成字幕文件")
+                return (media_file, None, False), True
+
+            if log_callback:
+                log_callback(f"✅ 已生成: {os.path.basename(output_file)}")
+            return (media_file, output_file, True), False
+        except Exception as e:
+            error_str = str(e)
+            if "❌ 未设置 CUDA 路径 (cublas64_12.dll)" in error_str:
+                # 直接抛出异常，不显示错误信息，由上层统一处理
+                raise e
+            else:
+                # 其他非致命错误，记录并继续处理下一个文件
+                error_msg = f"❌ 处理失败: {error_str}"
+                if log_callback:
+                    log_callback(error_msg)
+                return (media_file, None, False), False
+
+    def _process_parallel(self, new_files, existing_files, workers, progress_callback=None, log_callback=None,
+                          skip_existing=True, stop_flag=None):
+        """
+        同时识别多个文件（多个线程共享模型，每个线程的 transcribe 调用由一个模型副本执行）
+
+        待识别的文件按媒体时长从长到短开始识别；结果按 batch_process 的文件顺序返回，
+        停止后尚未开始的文件不出现在结果中（与顺序处理相同）。
+
+        Returns:
+            list: [(媒体文件, 字幕文件, 是否成功), ...]
+        """
+        import threading
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        from function.transcribe_scheduler import order_longest_first
+
+        all_files = new_files + existing_files
+        total_files = len(all_files)
+        positions = {media_file: idx for idx, media_file in enumerate(all_files)}
+        if skip_existing:
+            # 已有字幕的文件会被直接跳过，放在最后，不读取时长
+            order = order_longest_first(new_files) + existing_files
+        else:
+            order = order_longest_first(all_files)
+
+        # 同一目录下同名的媒体文件（如 ep1.mp3 与 ep1.mp4）生成同一个字幕，不同时处理，
+        # 后处理的文件与顺序处理时一样检查到已生成的字幕并跳过
+        name_locks = {}
+        for media_file in all_files:
+            name_locks.setdefault(os.path.splitext(media_file)[0], threading.Lock())
+
+        if self.batch_size > 1:
+            # 在启动识别线程之前创建批量推理管线
+            self._get_batched_pipeline(log_callback)
+        if log_callback:
+            log_callback(f"⚡ 同时识别 {workers} 个文件（按时长从长到短）")
+
+        cancelled = [False]
+
+        def process(media_file):
+            if cancelled[0] or (stop_flag and stop_flag[0]):
+                return None
+            idx = positions[media_file]
+            # 同时识别时日志交错输出，每条日志前加上文件序号
+            file_log = (lambda msg: log_callback(f"[{idx + 1}] {msg}")) if log_callback else None
+            with name_locks[os.path.splitext(media_file)[0]]:
+                if cancelled[0] or (stop_flag and stop_flag[0]):
+                    return None
+                result, _ = self._process_file(media_file, idx, total_files, None, file_log, skip_existing, stop_flag)
+                return result
+
+        results = {}
+        fatal_error = None
+        done = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcribe") as executor:
+            futures = [executor.submit(process, media_file) for media_file in order]
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # CUDA 路径错误等致命错误：不再开始新的文件，等正在识别的文件结束后抛出
+                    if fatal_error is None:
+                        fatal_error = e
+                    cancelled[0] = True
+                    continue
+                if result is None:
+                    continue
+                results[positions[result[0]]] = result
+                done += 1
+                # 多个文件时显示文件数进度
+                if progress_callback and total_files > 1:
+                    progress_callback(int(done / total_files * 100))
+
+        if fatal_error is not None:
+            raise fatal_error
+        return [results[idx] for idx in sorted(results)]
+
     def batch_process(self, input_dir, progress_callback=None, log_callback=None, skip_existing=True, stop_flag=None):
         """
         批量处理音频文件，生成字幕
@@ -482,90 +770,27 @@ class SubtitleGenerator:
                 log_callback(f"🎞️ 文件数/字幕数（ {total_files}/{total_subtitle}）：{stats_desc}")
 
             # 优先处理未生成的文件
-            results = []
             all_files = new_files + existing_files  # 先处理新的，再处理已存在的
-
             total_files = len(all_files)
-            # 动画循环计数器
-            animation_counter = 0
-
-            for idx, media_file in enumerate(all_files):
-                # 检查停止标志
-                if stop_flag and stop_flag[0]:
-                    break
-                    
-                base_name = os.path.splitext(os.path.basename(media_file))[0]
-                dir_name = os.path.dirname(media_file)
 
-                # 检查是否已存在字幕
-                has_subtitle = False
-                existing_subtitle = None
-                
-                # 检查 .whisper.[].srt 文件
-                for file in os.listdir(dir_name):
-                    if file.startswith(f"{base_name}.whisper.[") and file.endswith("].srt"):
-                        has_subtitle = True
-                        existing_subtitle = os.path.join(dir_name, file)
+            # 同时识别的文件数不超过需要识别的文件数
+            workers = min(self.workers, len(new_files) if skip_existing else total_files)
+            if workers > 1:
+                results = self._process_parallel(
+                    new_files, existing_files, workers, progress_callback, log_callback, skip_existing, stop_flag
+                )
+            else:
+                results = []
+                for idx, media_file in enumerate(all_files):
+                    # 检查停止标志
+                    if stop_flag and stop_flag[0]:
                         break
-                
-                # 检查同名 .srt 文件
-                if not has_subtitle:
-                    srt_file = os.path.join(dir_name, f"{base_name}.srt")
-                    if os.path.exists(srt_file):
-                        has_subtitle = True
-                        existing_subtitle = srt_file
-
-                if has_subtitle and skip_existing:
-                    # 跳过已存在的字幕
-                    results.append((media_file, existing_subtitle, True))
-                    if log_callback:
-                        log_callback(f"⏭️ 跳过: {os.path.basename(media_file)} (已存在字幕)")
-                    # 更新进度（多个文件时显示文件数进度）
-                    if progress_callback and total_files > 1:
-                        progress_value = int((idx + 1) / total_files * 100)
-                        progress_callback(progress_value)
-                    continue
-
-                if log_callback:
-                    log_callback(f"═════════════════════════════════════════════════════\n正在处理: {os.path.basename(media_file)} ({idx+1}/{total_files})")
-
-                # 为当前文件创建一个包装后的 progress_callback
-                def create_animation_progress_callback():
-                    def wrapped_progress_callback(segment_progress):
-                        # 多个文件时显示文件数进度，单个文件时不显示
-                        if progress_callback and total_files > 1:
-                            progress_value = int((idx + 1) / total_files * 100)
-                            progress_callback(progress_value)
-                    return wrapped_progress_callback
-
-                file_progress_callback = create_animation_progress_callback()
-
-                try:
-                    output_file = self.generate_subtitle(media_file, log_callback, file_progress_callback, stop_flag)
-                    if output_file is None:
-                        # 任务已停止
-                        results.append((media_file, None, False))
-                        if log_callback:
-                            log_callback("⚠️ 任务已停止，未生成字幕文件")
+                    result, stopped = self._process_file(
+                        media_file, idx, total_files, progress_callback, log_callback, skip_existing, stop_flag
+                    )
+                    results.append(result)
+                    if stopped:
                         break
-                    
-                    results.append((media_file, output_file, True))
-
-                    if log_callback:
-                        log_callback(f"✅ 已生成: {os.path.basename(output_file)}")
-                except Exception as e:
-                    error_str = str(e)
-                    if "❌ 未设置 CUDA 路径 (cublas64_12.dll)" in error_str:
-                        # 直接抛出异常，不显示错误信息，由上层统一处理
-                        raise e
-                    else:
-                        # 其他非致命错误，记录并继续处理下一个文件
-                        results.append((media_file, None, False))
-                        error_msg = f"❌ 处理失败: {error_str}"
-                        if log_callback:
-                            log_callback(error_msg)
-                        # 继续处理下一个文件
-                        continue
 
             # 确保所有处理完成后再返回结果
             # 多个文件时，重置进度条
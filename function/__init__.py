@@ -30,7 +30,8 @@ from .naming import (
 from .merge import (
     run_pdf_merge_task,
     run_txt_merge_task,
-    run_win32_merge_task
+    run_win32_merge_task,
+    run_xml_merge_task
 )
 
 # 文件清理相关
@@ -64,6 +65,7 @@ __all__ = [
     'run_pdf_merge_task',
     'run_txt_merge_task',
     'run_win32_merge_task',
+    'run_xml_merge_task',
     
     # 文件清理
     'clear_output_to_trash'
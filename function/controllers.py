@@ -10,7 +10,7 @@ import re
 import threading
 from PySide6.QtCore import Signal, QObject
 from PySide6.QtWidgets import QDialog, QInputDialog, QMessageBox
-from function.settings import ConfigManager, DEFAULT_KOR_STYLE, DEFAULT_CHN_STYLE
+from function.settings import ConfigManager, DEFAULT_KOR_STYLE, DEFAULT_CHN_STYLE, settings_service
 from function.tasks import execute_task
 from function.merge import execute_merge_tasks
 
@@ -526,10 +526,12 @@ class UnifiedApp(BaseController, UIController, TaskController, ToolController):
         self.gui.closeEvent = self.on_close
 
     def on_close(self, event):
-        """窗口关闭事件处理，退出前保存所有当前设置"""
+        """窗口关闭事件处理，退出前保存所有当前设置并结束语音识别进程"""
         try:
             self.save_settings()
         finally:
+            from function.transcribe_worker import transcription_worker
+            transcription_worker.kill()
             event.accept()
 
     def _on_show_overwrite_dialog(self, existing_count):
@@ -559,6 +561,8 @@ class UnifiedApp(BaseController, UIController, TaskController, ToolController):
 
     def refresh_config_file(self):
         """刷新配置文件并更新GUI"""
+        # 用户可能刚刚手动修改过配置文件，跳过修改时间检查的间隔立即重新读取
+        settings_service.reload()
         self.load_settings()
         self.refresh_parsed_styles()
         # 更新GUI界面
@@ -0,0 +1,674 @@
+"""
+DOCX XML级合并引擎
+纯Python实现的Word文档合并，不依赖Windows COM接口，可在Linux服务器上运行。
+逐个流式读取源文档的zip包，重映射样式、编号与关系ID，按内容哈希去重相同的样式与媒体文件，
+并以标题段落和分节符（分页）连接各文档的正文XML。正文先写入临时文件，内存占用不随文档数量增长。
+脚注与尾注合并后重新编号；批注不合并，其标记被移除并报告。
+"""
+
+import os
+import re
+import shutil
+import hashlib
+import zipfile
+from collections import Counter
+import tempfile
+import posixpath
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+__all__ = [
+    'DocxMerger',
+    'merge_docx_files'
+]
+
+# 常用OOXML命名空间，注册后序列化时保留 Word 习惯使用的前缀
+# （mc:Ignorable 与 mc:Choice Requires 通过前缀名引用命名空间，前缀必须保持不变）
+NAMESPACES = {
+    "wpc": "http://schemas.microsoft.com/office/word/2010/wordprocessingCanvas",
+    "mc": "http://schemas.openxmlformats.org/markup-compatibility/2006",
+    "o": "urn:schemas-microsoft-com:office:office",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "m": "http://schemas.openxmlformats.org/officeDocument/2006/math",
+    "v": "urn:schemas-microsoft-com:vml",
+    "wp14": "http://schemas.microsoft.com/office/word/2010/wordprocessingDrawing",
+    "wp": "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing",
+    "w10": "urn:schemas-microsoft-com:office:word",
+    "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "w14": "http://schemas.microsoft.com/office/word/2010/wordml",
+    "w15": "http://schemas.microsoft.com/office/word/2012/wordml",
+    "wpg": "http://schemas.microsoft.com/office/word/2010/wordprocessingGroup",
+    "wpi": "http://schemas.microsoft.com/office/word/2010/wordprocessingInk",
+    "wne": "http://schemas.microsoft.com/office/word/2006/wordml",
+    "wps": "http://schemas.microsoft.com/office/word/2010/wordprocessingShape",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "pic": "http://schemas.openxmlformats.org/drawingml/2006/picture",
+    "mo": "http://schemas.microsoft.com/office/mac/office/2008/main",
+    "mv": "urn:schemas-microsoft-com:mac:vml",
+}
+for _prefix, _uri in NAMESPACES.items():
+    ET.register_namespace(_prefix, _uri)
+
+_W = "{%s}" % NAMESPACES["w"]
+_R = "{%s}" % NAMESPACES["r"]
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_CT_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+_REL_TYPE_PREFIX = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+
+# 合并文档中只存在一份、不随正文复制的部件类型
+_SHARED_REL_TYPES = {
+    "styles", "stylesWithEffects", "numbering", "settings", "webSettings", "fontTable", "theme",
+    "customXml", "footnotes", "endnotes", "comments", "commentsExtended", "commentsIds",
+    "people", "glossaryDocument",
+}
+
+# 引用样式ID的元素
+_STYLE_REF_TAGS = {_W + "pStyle", _W + "rStyle", _W + "tblStyle", _W + "numStyle",
+                   _W + "basedOn", _W + "next", _W + "link"}
+
+# 引用未合并部件（批注）的元素，合并时移除以保证文档有效
+_DROPPED_TAGS = {_W + "commentReference", _W + "commentRangeStart", _W + "commentRangeEnd"}
+
+# 脚注与尾注引用 -> 注释类型（注释合并后按新ID重映射，找不到对应注释的引用被移除）
+_NOTE_REF_TAGS = {_W + "footnoteReference": "footnote", _W + "endnoteReference": "endnote"}
+
+# 被移除时需要报告的引用元素 -> 日志中的名称
+_DROPPED_NAMES = {_W + "footnoteReference": "脚注", _W + "endnoteReference": "尾注", _W + "commentReference": "批注"}
+
+# 随关系复制、需要重映射样式与编号引用的WordprocessingML部件（按内容类型后缀）
+_REMAPPED_PART_TYPES = (".header+xml", ".footer+xml")
+
+# 易变属性：不参与去重哈希（每次保存都可能不同）
+_VOLATILE_NUMBERING_TAGS = {_W + "nsid", _W + "tmpl"}
+
+_XML_DECL = "<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+_COPY_CHUNK = 1024 * 1024
+
+
+def _template_path():
+    """python-docx 自带默认模板的路径，作为合并文档的基础包"""
+    import docx
+    return os.path.join(os.path.dirname(docx.__file__), 'templates', 'default.docx')
+
+
+def _rels_path(part_name):
+    """部件对应的关系文件路径"""
+    directory, name = posixpath.split(part_name)
+    return posixpath.join(directory, "_rels", name + ".rels")
+
+
+def _resolve_target(source_part, target):
+    """将关系中的相对目标解析为包内部件名"""
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source_part), target))
+
+
+def _read_rels(zf, part_name):
+    """读取部件的关系列表 [(Id, Type, Target, TargetMode)]"""
+    rels_name = _rels_path(part_name)
+    if rels_name not in zf.namelist():
+        return []
+    root = ET.fromstring(zf.read(rels_name))
+    return [(rel.get("Id"), rel.get("Type"), rel.get("Target"), rel.get("TargetMode"))
+            for rel in root.iter("{%s}Relationship" % _PKG_REL_NS)]
+
+
+def _rels_xml(rels):
+    """生成关系文件XML"""
+    items = []
+    for rel_id, rel_type, target, mode in rels:
+        mode_attr = f' TargetMode="{escape(mode)}"' if mode else ''
+        items.append(f'<Relationship Id="{escape(rel_id)}" Type="{escape(rel_type)}" '
+                     f'Target="{escape(target, {chr(34): "&quot;"})}"{mode_attr}/>')
+    return f'{_XML_DECL}<Relationships xmlns="{_PKG_REL_NS}">{"".join(items)}</Relationships>'
+
+
+def _content_types(zf):
+    """读取内容类型 (defaults, overrides)"""
+    root = ET.fromstring(zf.read("[Content_Types].xml"))
+    defaults = {el.get("Extension").lower(): el.get("ContentType") for el in root.iter("{%s}Default" % _CT_NS)}
+    overrides = {el.get("PartName").lstrip("/"): el.get("ContentType") for el in root.iter("{%s}Override" % _CT_NS)}
+    return defaults, overrides
+
+
+_NS_DECL_RE = re.compile(r'\sxmlns:(\w+)="([^"]*)"')
+_IGNORABLE_RE = re.compile(r'\smc:Ignorable="([^"]*)"')
+_ROOT_TAG_RE = re.compile(rb'<(?![?!])[^>]*>')
+
+
+def _root_tostring(root):
+    """序列化部件根节点，并补全所有已注册命名空间的声明（mc:Ignorable 中的前缀必须已声明）"""
+    xml = ET.tostring(root, encoding="unicode")
+    tag_end = xml.index(">")
+    start_tag = xml[:tag_end]
+    start_tag += "".join(f' xmlns:{prefix}="{uri}"' for prefix, uri in NAMESPACES.items()
+                         if f'xmlns:{prefix}="' not in start_tag)
+    # 源部件中未使用的命名空间不会被序列化，从 mc:Ignorable 中去掉这些前缀
+    ignorable = _IGNORABLE_RE.search(start_tag)
+    if ignorable:
+        declared = {m.group(1) for m in _NS_DECL_RE.finditer(start_tag)}
+        kept = " ".join(prefix for prefix in ignorable.group(1).split() if prefix in declared)
+        start_tag = start_tag[:ignorable.start(1)] + kept + start_tag[ignorable.end(1):]
+    return _XML_DECL + start_tag + xml[tag_end:]
+
+
+def _parse_part(data):
+    """解析源文档部件；先注册其根节点声明的其他命名空间前缀，序列化时保持原前缀"""
+    root_tag = _ROOT_TAG_RE.search(data)
+    head = root_tag.group(0).decode("utf-8", "ignore") if root_tag else ""
+    for prefix, uri in _NS_DECL_RE.findall(head):
+        if prefix not in NAMESPACES and uri not in NAMESPACES.values():
+            try:
+                ET.register_namespace(prefix, uri)
+            except ValueError:
+                pass
+    return ET.fromstring(data)
+
+
+def _fragment_tostring(elem):
+    """序列化正文片段，去掉已在文档根节点声明的命名空间"""
+    xml = ET.tostring(elem, encoding="unicode")
+    tag_end = xml.index(">")
+    start_tag = _NS_DECL_RE.sub(
+        lambda m: "" if NAMESPACES.get(m.group(1)) == m.group(2) else m.group(0), xml[:tag_end])
+    return start_tag + xml[tag_end:]
+
+
+def _hash_element(elem, skip_attrs=(), skip_tags=()):
+    """计算元素内容哈希（忽略指定属性与子元素），用于去重"""
+    clone = ET.Element(elem.tag, {k: v for k, v in elem.attrib.items() if k not in skip_attrs})
+    clone.extend(child for child in elem if child.tag not in skip_tags)
+    return hashlib.sha1(ET.tostring(clone)).hexdigest()
+
+
+def _copy_spool(spool, out):
+    """把临时文件中的XML片段写入合并包中的部件"""
+    spool.seek(0)
+    while True:
+        chunk = spool.read(_COPY_CHUNK)
+        if not chunk:
+            break
+        out.write(chunk.encode("utf-8"))
+    spool.close()
+
+
+def _heading_xml(text):
+    """标题段落（Heading 1）"""
+    return (f'<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr>'
+            f'<w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>')
+
+
+class DocxMerger:
+    """DOCX XML级合并器
+
+    以 python-docx 默认模板为基础包，依次追加源文档。每个源文档：
+    - 样式：ID相同且内容相同则复用；内容相同但ID不同则映射到已有样式；ID冲突则重命名
+    - 编号：抽象编号按内容哈希去重，编号实例重新分配ID（保持各文档列表独立计数）
+    - 关系：图片、页眉页脚、超链接等重新分配关系ID，媒体文件按内容哈希去重
+    - 正文：逐个元素流式解析、重映射后写入临时文件
+    - 脚注与尾注：重新编号后写入临时文件，分隔符注释只保留第一份；批注不合并，其标记被移除
+    各文档之间以分节符分隔（新页开始），保留各自的页面设置与页眉页脚。
+
+    用法:
+        merger = DocxMerger(out_path)
+        for path in files:
+            merger.append(path, heading="标题")
+        merger.close()
+    """
+
+    def __init__(self, out_path, template_path=None):
+        self.out_path = out_path
+        self._doc_count = 0
+        self._rel_count = 0
+        self._pending_sect_pr = None
+
+        template_path = template_path or _template_path()
+        with zipfile.ZipFile(template_path) as tpl:
+            self._defaults, self._overrides = _content_types(tpl)
+            self._styles_root = ET.fromstring(tpl.read("word/styles.xml"))
+            self._numbering_root = (ET.fromstring(tpl.read("word/numbering.xml"))
+                                    if "word/numbering.xml" in tpl.namelist() else ET.Element(_W + "numbering"))
+            self._document_rels = [rel for rel in _read_rels(tpl, "word/document.xml")
+                                   if rel[1].rsplit("/", 1)[-1] in _SHARED_REL_TYPES]
+            document_xml = tpl.read("word/document.xml").decode("utf-8")
+            shared_parts = {_resolve_target("word/document.xml", rel[2]) for rel in self._document_rels}
+            shared_parts.update(_rels_path(part) for part in list(shared_parts))
+            self._zip = zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED)
+            for name in tpl.namelist():
+                if name in ("[Content_Types].xml", "word/document.xml", "word/_rels/document.xml.rels",
+                            "word/styles.xml", "word/numbering.xml"):
+                    continue
+                if name.startswith("word/") and not name.startswith("word/_rels/") and name not in shared_parts:
+                    continue
+                self._zip.writestr(name, tpl.read(name))
+
+        # 基础文档的最终分节属性（没有源文档时使用）
+        sect_match = re.search(r'<w:sectPr\b.*?</w:sectPr>', document_xml, re.S)
+        self._template_sect_pr = sect_match.group(0) if sect_match else "<w:sectPr/>"
+
+        # 样式表：ID -> 内容哈希；内容哈希 -> ID
+        self._style_hashes = {}
+        self._style_by_hash = {}
+        self._style_names = set()
+        # 样式表部件哈希 -> 样式映射
+        self._style_map_cache = {}
+        for style in self._styles_root.iter(_W + "style"):
+            self._register_style(style)
+
+        # 编号：抽象编号哈希 -> 抽象编号ID
+        self._abstract_by_hash = {}
+        self._abstract_nums = list(self._numbering_root.iter(_W + "abstractNum"))
+        self._nums = list(self._numbering_root.iter(_W + "num"))
+        for abstract in self._abstract_nums:
+            self._abstract_by_hash[self._abstract_hash(abstract)] = abstract.get(_W + "abstractNumId")
+        self._next_abstract_id = max([int(a.get(_W + "abstractNumId")) for a in self._abstract_nums] or [-1]) + 1
+        self._next_num_id = max([int(n.get(_W + "numId")) for n in self._nums] or [0]) + 1
+
+        # 媒体文件：内容哈希 -> 部件名
+        self._media_by_hash = {}
+
+        # 正文临时文件
+        self._spool = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+
+        # 脚注与尾注：注释类型 -> 临时文件、分隔符注释、下一个注释ID、注释部件的关系
+        self._note_spools = {}
+        self._note_separators = {}
+        self._next_note_id = {"footnote": 0, "endnote": 0}
+        self._note_rels = {"footnote": [], "endnote": []}
+
+    # ---------- 样式 ----------
+
+    @staticmethod
+    def _style_hash(style):
+        return _hash_element(style, skip_attrs=(_W + "styleId", _W + "default"))
+
+    def _register_style(self, style):
+        style_id = style.get(_W + "styleId")
+        style_hash = self._style_hash(style)
+        self._style_hashes[style_id] = style_hash
+        self._style_by_hash.setdefault(style_hash, style_id)
+        name = style.find(_W + "name")
+        if name is not None:
+            self._style_names.add(name.get(_W + "val"))
+
+    def _merge_styles(self, zf):
+        """合并源文档样式，返回 (源样式ID -> 合并后样式ID 的映射, 新增的样式列表)"""
+        if "word/styles.xml" not in zf.namelist():
+            return {}, []
+        data = zf.read("word/styles.xml")
+        # 同一模板生成的文档样式表完全相同，直接复用之前的映射
+        digest = hashlib.sha1(data).hexdigest()
+        if digest in self._style_map_cache:
+            return self._style_map_cache[digest], []
+        style_map = {}
+        added = []
+        for style in ET.fromstring(data).iter(_W + "style"):
+            style_id = style.get(_W + "styleId")
+            style_hash = self._style_hash(style)
+            if self._style_hashes.get(style_id) == style_hash:
+                style_map[style_id] = style_id
+            elif style_hash in self._style_by_hash:
+                style_map[style_id] = self._style_by_hash[style_hash]
+            else:
+                new_id = style_id
+                suffix = 1
+                while new_id in self._style_hashes:
+                    suffix += 1
+                    new_id = f"{style_id}{suffix}"
+                if new_id != style_id:
+                    style.set(_W + "styleId", new_id)
+                    name = style.find(_W + "name")
+                    if name is not None:
+                        # 样式名同样需要唯一，否则 Word 会按名称合并
+                        base_name = name.get(_W + "val")
+                        new_name = f"{base_name} {suffix}"
+                        while new_name in self._style_names:
+                            suffix += 1
+                            new_name = f"{base_name} {suffix}"
+                        name.set(_W + "val", new_name)
+                style.attrib.pop(_W + "default", None)
+                self._register_style(style)
+                self._style_by_hash[style_hash] = new_id
+                style_map[style_id] = new_id
+                added.append(style)
+        self._style_map_cache[digest] = style_map
+        return style_map, added
+
+    # ---------- 编号 ----------
+
+    @staticmethod
+    def _abstract_hash(abstract):
+        clone = ET.Element(abstract.tag)
+        clone.extend(child for child in abstract if child.tag not in _VOLATILE_NUMBERING_TAGS)
+        return hashlib.sha1(ET.tostring(clone)).hexdigest()
+
+    def _merge_numbering(self, zf):
+        """合并源文档编号定义，返回 源编号ID -> 合并后编号ID 的映射"""
+        if "word/numbering.xml" not in zf.namelist():
+            return {}
+        root = ET.fromstring(zf.read("word/numbering.xml"))
+        abstract_map = {}
+        for abstract in root.iter(_W + "abstractNum"):
+            old_id = abstract.get(_W + "abstractNumId")
+            abstract_hash = self._abstract_hash(abstract)
+            if abstract_hash not in self._abstract_by_hash:
+                new_id = str(self._next_abstract_id)
+                self._next_abstract_id += 1
+                abstract.set(_W + "abstractNumId", new_id)
+                self._abstract_nums.append(abstract)
+                self._abstract_by_hash[abstract_hash] = new_id
+            abstract_map[old_id] = self._abstract_by_hash[abstract_hash]
+
+        num_map = {}
+        for num in root.iter(_W + "num"):
+            new_id = str(self._next_num_id)
+            self._next_num_id += 1
+            num_map[num.get(_W + "numId")] = new_id
+            num.set(_W + "numId", new_id)
+            abstract_ref = num.find(_W + "abstractNumId")
+            if abstract_ref is not None:
+                abstract_ref.set(_W + "val", abstract_map.get(abstract_ref.get(_W + "val"), "0"))
+            self._nums.append(num)
+        return num_map
+
+    # ---------- 关系与部件 ----------
+
+    def _copy_part(self, zf, part_name, copied, overrides, style_map=None, num_map=None):
+        """复制部件（及其关系引用的部件）到合并包，返回新部件名；媒体文件按内容哈希去重
+
+        页眉页脚中的样式与编号引用按本文档的映射重写（部件自身的关系ID保持不变，无需重映射）。
+        """
+        if part_name in copied:
+            return copied[part_name]
+        data = zf.read(part_name)
+        directory, name = posixpath.split(part_name)
+        is_media = "/media/" in f"/{part_name}"
+        if is_media:
+            digest = hashlib.sha1(data).hexdigest()
+            if digest in self._media_by_hash:
+                copied[part_name] = self._media_by_hash[digest]
+                return copied[part_name]
+        new_name = posixpath.join(directory, f"m{self._doc_count}_{name}")
+        copied[part_name] = new_name
+        if is_media:
+            self._media_by_hash[digest] = new_name
+
+        # 部件自身的关系：目标部件同样复制，关系ID保持不变
+        rels = []
+        for rel_id, rel_type, target, mode in _read_rels(zf, part_name):
+            if mode != "External":
+                target_part = _resolve_target(part_name, target)
+                if target_part in zf.namelist():
+                    target = posixpath.relpath(
+                        self._copy_part(zf, target_part, copied, overrides, style_map, num_map), directory)
+            rels.append((rel_id, rel_type, target, mode))
+
+        if overrides.get(part_name, "").endswith(_REMAPPED_PART_TYPES):
+            root = _parse_part(data)
+            self._remap(root, style_map or {}, num_map or {}, {})
+            data = _root_tostring(root).encode("utf-8")
+        self._zip.writestr(new_name, data)
+        if rels:
+            self._zip.writestr(_rels_path(new_name), _rels_xml(rels))
+        if part_name in overrides:
+            self._overrides[new_name] = overrides[part_name]
+        return new_name
+
+    def _merge_relationships(self, zf, style_map, num_map):
+        """复制主文档引用的部件，返回 源关系ID -> 合并后关系ID 的映射"""
+        defaults, overrides = _content_types(zf)
+        for extension, content_type in defaults.items():
+            self._defaults.setdefault(extension, content_type)
+        rel_map = {}
+        copied = {}
+        for rel_id, rel_type, target, mode in _read_rels(zf, "word/document.xml"):
+            if rel_type.rsplit("/", 1)[-1] in _SHARED_REL_TYPES:
+                continue
+            if mode != "External":
+                target_part = _resolve_target("word/document.xml", target)
+                if target_part not in zf.namelist():
+                    continue
+                target = posixpath.relpath(
+                    self._copy_part(zf, target_part, copied, overrides, style_map, num_map), "word")
+            self._rel_count += 1
+            new_id = f"rIdM{self._rel_count}"
+            self._document_rels.append((new_id, rel_type, target, mode))
+            rel_map[rel_id] = new_id
+        return rel_map
+
+    # ---------- 脚注与尾注 ----------
+
+    def _merge_notes(self, zf, kind, style_map, num_map):
+        """合并源文档的脚注或尾注（kind 为 footnote/endnote），返回 源注释ID -> 合并后注释ID 的映射"""
+        part_name = None
+        for rel_id, rel_type, target, mode in _read_rels(zf, "word/document.xml"):
+            if rel_type.rsplit("/", 1)[-1] == kind + "s" and mode != "External":
+                part_name = _resolve_target("word/document.xml", target)
+        if part_name is None or part_name not in zf.namelist():
+            return {}
+
+        # 注释部件自身的关系（超链接、图片等）：目标部件复制到合并包，关系重新分配ID
+        _, overrides = _content_types(zf)
+        copied = {}
+        rel_map = {}
+        for rel_id, rel_type, target, mode in _read_rels(zf, part_name):
+            if mode != "External":
+                target_part = _resolve_target(part_name, target)
+                if target_part not in zf.namelist():
+                    continue
+                target = posixpath.relpath(
+                    self._copy_part(zf, target_part, copied, overrides, style_map, num_map), "word")
+            self._rel_count += 1
+            new_id = f"rIdM{self._rel_count}"
+            self._note_rels[kind].append((new_id, rel_type, target, mode))
+            rel_map[rel_id] = new_id
+
+        spool = self._note_spools.get(kind)
+        if spool is None:
+            spool = self._note_spools[kind] = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+        keep_separators = kind not in self._note_separators
+        separators = []
+        note_map = {}
+        for note in _parse_part(zf.read(part_name)).findall(_W + kind):
+            note_type = note.get(_W + "type", "normal")
+            if note_type != "normal" and not keep_separators:
+                continue
+            new_id = str(self._next_note_id[kind])
+            self._next_note_id[kind] += 1
+            if note_type != "normal":
+                # 分隔符与续接分隔符：各文档相同，只保留第一份
+                note.set(_W + "id", new_id)
+                separators.append(_fragment_tostring(note))
+                continue
+            note_map[note.get(_W + "id")] = new_id
+            note.set(_W + "id", new_id)
+            self._remap(note, style_map, num_map, rel_map)
+            spool.write(_fragment_tostring(note))
+        if separators:
+            self._note_separators[kind] = separators
+        return note_map
+
+    # ---------- 正文 ----------
+
+    @staticmethod
+    def _remap(elem, style_map, num_map, rel_map, note_maps=None, dropped=None):
+        """重映射元素树中的样式、编号、关系与注释引用，并移除未合并部件的引用
+
+        Args:
+            note_maps: {注释类型: 源注释ID -> 合并后注释ID}
+            dropped: Counter，累计被移除的引用元素
+        """
+        for parent in list(elem.iter()):
+            for child in list(parent):
+                if child.tag in _NOTE_REF_TAGS:
+                    new_id = (note_maps or {}).get(_NOTE_REF_TAGS[child.tag], {}).get(child.get(_W + "id"))
+                    if new_id is not None:
+                        child.set(_W + "id", new_id)
+                        continue
+                if child.tag in _DROPPED_TAGS or child.tag in _NOTE_REF_TAGS:
+                    parent.remove(child)
+                    if dropped is not None:
+                        dropped[child.tag] += 1
+            if parent.tag in _STYLE_REF_TAGS:
+                val = parent.get(_W + "val")
+                if val in style_map:
+                    parent.set(_W + "val", style_map[val])
+            elif parent.tag == _W + "numId":
+                val = parent.get(_W + "val")
+                if val in num_map:
+                    parent.set(_W + "val", num_map[val])
+            for key, val in parent.attrib.items():
+                if key.startswith(_R) and val in rel_map:
+                    parent.set(key, rel_map[val])
+
+    @staticmethod
+    def _as_page_section(sect_pr):
+        """分节属性作为文档间的分隔：强制从新页开始"""
+        sect_type = sect_pr.find(_W + "type")
+        if sect_type is not None:
+            sect_pr.remove(sect_type)
+        return sect_pr
+
+    def append(self, path, heading=None):
+        """追加一个源文档
+
+        Args:
+            path: 源DOCX路径
+            heading: 插入在文档内容前的标题（Heading 1），None 表示不插入
+
+        Returns:
+            dict: 被移除的内容 {名称: 数量}（如 {"批注": 2}），没有时为空
+        """
+        self._doc_count += 1
+        dropped = Counter()
+        with zipfile.ZipFile(path) as zf:
+            style_map, added_styles = self._merge_styles(zf)
+            num_map = self._merge_numbering(zf)
+            rel_map = self._merge_relationships(zf, style_map, num_map)
+            note_maps = {kind: self._merge_notes(zf, kind, style_map, num_map) for kind in ("footnote", "endnote")}
+            for style in added_styles:
+                self._remap(style, style_map, num_map, {})
+                self._styles_root.append(style)
+
+            # 上一个文档的最终分节属性作为分节符（分页）写在本文档之前
+            if self._pending_sect_pr is not None:
+                self._spool.write(f'<w:p><w:pPr>{self._pending_sect_pr}</w:pPr></w:p>')
+                self._pending_sect_pr = None
+            if heading:
+                self._spool.write(_heading_xml(heading))
+
+            # 流式解析正文：正文的直接子元素处理完即从树中移除
+            depth = 0
+            body = None
+            with zf.open("word/document.xml") as stream:
+                for event, elem in ET.iterparse(stream, events=("start", "end")):
+                    if event == "start":
+                        depth += 1
+                        if depth == 2 and elem.tag == _W + "body":
+                            body = elem
+                        continue
+                    if depth == 3 and body is not None:
+                        self._remap(elem, style_map, num_map, rel_map, note_maps, dropped)
+                        if elem.tag == _W + "sectPr":
+                            self._pending_sect_pr = _fragment_tostring(self._as_page_section(elem))
+                        else:
+                            self._spool.write(_fragment_tostring(elem))
+                        body.remove(elem)
+                    depth -= 1
+
+            if self._pending_sect_pr is None:
+                self._pending_sect_pr = self._template_sect_pr
+        return {_DROPPED_NAMES[tag]: count for tag, count in dropped.items() if tag in _DROPPED_NAMES}
+
+    def close(self):
+        """写入主文档、样式、编号、关系与内容类型，完成合并文件"""
+        # 主文档：根节点 + 临时文件中的正文 + 最后一个文档的分节属性
+        declarations = "".join(f' xmlns:{prefix}="{uri}"' for prefix, uri in NAMESPACES.items())
+        with self._zip.open("word/document.xml", "w") as out:
+            out.write(f'{_XML_DECL}<w:document{declarations} mc:Ignorable="w14 w15 wp14"><w:body>'.encode("utf-8"))
+            _copy_spool(self._spool, out)
+            out.write(f'{self._pending_sect_pr or self._template_sect_pr}</w:body></w:document>'.encode("utf-8"))
+
+        # 脚注与尾注：分隔符注释 + 临时文件中重新编号的注释
+        for kind, spool in self._note_spools.items():
+            part_name = f"word/{kind}s.xml"
+            with self._zip.open(part_name, "w") as out:
+                out.write(f'{_XML_DECL}<w:{kind}s{declarations} mc:Ignorable="w14 w15 wp14">'.encode("utf-8"))
+                for separator in self._note_separators.get(kind, []):
+                    out.write(separator.encode("utf-8"))
+                _copy_spool(spool, out)
+                out.write(f'</w:{kind}s>'.encode("utf-8"))
+            if self._note_rels[kind]:
+                self._zip.writestr(_rels_path(part_name), _rels_xml(self._note_rels[kind]))
+            self._document_rels.append((f"rIdM{kind.capitalize()}s", _REL_TYPE_PREFIX + kind + "s", f"{kind}s.xml", None))
+            self._overrides[part_name] = f"application/vnd.openxmlformats-officedocument.wordprocessingml.{kind}s+xml"
+
+        # 编号：抽象编号必须位于编号实例之前
+        numbering = ET.Element(self._numbering_root.tag, self._numbering_root.attrib)
+        numbering.extend(self._abstract_nums)
+        numbering.extend(self._nums)
+        self._zip.writestr("word/numbering.xml", _root_tostring(numbering))
+        self._zip.writestr("word/styles.xml", _root_tostring(self._styles_root))
+
+        if not any(rel[1].endswith("/numbering") for rel in self._document_rels):
+            self._document_rels.append(("rIdNumbering", _REL_TYPE_PREFIX + "numbering", "numbering.xml", None))
+        self._zip.writestr("word/_rels/document.xml.rels", _rels_xml(self._document_rels))
+
+        self._overrides["word/numbering.xml"] = \
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"
+        types = [f'<Default Extension="{escape(ext)}" ContentType="{escape(ct)}"/>'
+                 for ext, ct in sorted(self._defaults.items())]
+        types += [f'<Override PartName="/{escape(part)}" ContentType="{escape(ct)}"/>'
+                  for part, ct in sorted(self._overrides.items())]
+        self._zip.writestr("[Content_Types].xml",
+                           f'{_XML_DECL}<Types xmlns="{_CT_NS}">{"".join(types)}</Types>')
+        self._zip.close()
+
+    def abort(self):
+        """放弃合并并删除未完成的文件"""
+        try:
+            self._spool.close()
+            for spool in self._note_spools.values():
+                spool.close()
+            self._zip.close()
+        except Exception:
+            pass
+        if os.path.exists(self.out_path):
+            os.remove(self.out_path)
+
+
+def merge_docx_files(files, out_path, headings=None, stop_flag=None, on_file_done=None, log_func=None):
+    """合并多个DOCX文件
+
+    Args:
+        files: 源文件路径列表（按合并顺序）
+        out_path: 输出文件路径
+        headings: 与 files 对应的标题列表，None 表示不插入标题
+        stop_flag: 停止标志（单元素列表），被设置时放弃合并
+        on_file_done: 每合并完一个文件后的回调，参数为 (序号, 文件路径)
+        log_func: 日志函数，源文件中有未能合并而被移除的内容（如批注）时记录警告
+
+    Returns:
+        bool: 完成返回 True，被停止返回 False
+    """
+    # 先写入同目录下的临时文件，完成后再替换，避免留下不完整的输出
+    tmp_path = out_path + ".tmp"
+    merger = DocxMerger(tmp_path)
+    try:
+        for i, fp in enumerate(files):
+            if stop_flag is not None and stop_flag[0]:
+                merger.abort()
+                return False
+            dropped = merger.append(fp, heading=headings[i] if headings else None)
+            if dropped and log_func:
+                summary = "、".join(f"{name} {count} 处" for name, count in dropped.items())
+                log_func(f"⚠️ {os.path.basename(fp)}: 以下内容未能合并，已移除（{summary}）")
+            if on_file_done:
+                on_file_done(i, fp)
+        merger.close()
+    except BaseException:
+        merger.abort()
+        raise
+    shutil.move(tmp_path, out_path)
+    return True
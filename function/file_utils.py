@@ -3,14 +3,40 @@
 负责文件查找、路径处理和目录创建等功能。
 """
 
+import io
 import os
+import sys
+import codecs
+import shutil
 
 __all__ = [
+    'ORGANIZED_DIRS',
     'find_files_recursively',
     'get_organized_path',
-    'get_save_path'
+    'get_save_path',
+    'detect_text_encoding',
+    'copy_text_as_utf8',
+    'emit_progress'
 ]
 
+# BOM 与对应编码（UTF-32 LE 的 BOM 以 UTF-16 LE 的 BOM 开头，需先判断）
+_TEXT_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+# 非 UTF-8 文本依次尝试的编码
+_FALLBACK_ENCODINGS = ("gb18030", "big5", "cp949")
+
+# 整理目录（见 get_organized_path）：递归扫描源文件时跳过，已归档的原始文件不会被重复处理
+ORGANIZED_DIRS = frozenset({"srt", "script", "other"})
+
+# Linux 支持文件到文件的 sendfile，数据不经过用户态
+_HAS_FILE_SENDFILE = hasattr(os, "sendfile") and sys.platform.startswith("linux")
+
 def find_files_recursively(root_dir, extensions, exclude_dirs=None):
     """递归查找指定后缀的文件，排除特定目录
     
@@ -94,4 +120,104 @@ def get_save_path(target_dir, filename):
     Returns:
         str: 生成的完整文件路径
     """
-    return get_organized_path(target_dir, filename)
\ No newline at end of file
+    return get_organized_path(target_dir, filename)
+
+def detect_text_encoding(path, sample_size=65536, fallback_encodings=_FALLBACK_ENCODINGS):
+    """根据 BOM 和文件开头的样本识别文本编码
+    
+    Args:
+        path: 文件路径
+        sample_size: 样本字节数
+        fallback_encodings: 不是 UTF-8 时依次尝试的编码
+        
+    Returns:
+        tuple: (编码名, BOM字节数)，纯ASCII与UTF-8文本返回 "utf-8"
+    """
+    with open(path, 'rb') as f:
+        sample = f.read(sample_size)
+
+    for bom, encoding in _TEXT_BOMS:
+        if sample.startswith(bom):
+            return encoding, len(bom)
+
+    # 无 BOM 的 UTF-16：ASCII 字符的高字节为0，集中出现在奇数或偶数位置
+    if b"\x00" in sample:
+        even_zeros = sample[0::2].count(0)
+        odd_zeros = sample[1::2].count(0)
+        if odd_zeros > len(sample) // 4 and even_zeros < odd_zeros // 8:
+            return "utf-16-le", 0
+        if even_zeros > len(sample) // 4 and odd_zeros < even_zeros // 8:
+            return "utf-16-be", 0
+
+    # 样本可能在多字节字符中间截断，未读完时不作为最终块解码
+    is_complete = len(sample) < sample_size
+    for encoding in ("utf-8",) + tuple(fallback_encodings):
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=is_complete)
+            return encoding, 0
+        except UnicodeDecodeError:
+            continue
+    return fallback_encodings[0], 0
+
+
+def _copy_bytes(infile, outfile, chunk_size):
+    """将输入文件从当前位置起的内容原样追加到输出文件"""
+    if _HAS_FILE_SENDFILE:
+        outfile.flush()
+        offset = infile.tell()
+        try:
+            in_fd, out_fd = infile.fileno(), outfile.fileno()
+            while True:
+                sent = os.sendfile(out_fd, in_fd, offset, chunk_size)
+                if not sent:
+                    return
+                offset += sent
+        except (OSError, io.UnsupportedOperation):
+            # 不支持 sendfile（如网络文件系统），从已发送的位置起改用普通复制
+            infile.seek(offset)
+    shutil.copyfileobj(infile, outfile, chunk_size)
+
+
+def copy_text_as_utf8(path, outfile, chunk_size=1024 * 1024):
+    """将文本文件以 UTF-8 编码追加到已打开的二进制输出文件
+    
+    UTF-8 文本（去掉BOM后）直接按字节复制，不解码；其他编码分块增量解码后重新编码，
+    无法解码的字节以替换字符代替。换行符保持原样。
+    
+    Args:
+        path: 输入文件路径
+        outfile: 以二进制模式打开的输出文件
+        chunk_size: 每次读取的字节数
+        
+    Returns:
+        str: 识别到的输入编码
+    """
+    encoding, bom_length = detect_text_encoding(path)
+    with open(path, 'rb') as infile:
+        infile.seek(bom_length)
+        if encoding == "utf-8":
+            _copy_bytes(infile, outfile, chunk_size)
+        else:
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            while True:
+                chunk = infile.read(chunk_size)
+                if not chunk:
+                    break
+                outfile.write(decoder.decode(chunk).encode("utf-8"))
+            outfile.write(decoder.decode(b"", final=True).encode("utf-8"))
+    return encoding
+
+
+def emit_progress(progress_callback, value):
+    """更新进度，支持不同类型的进度回调（信号对象或函数，None 时忽略）"""
+    if progress_callback is None:
+        return
+    try:
+        # 尝试PyQt的信号方式（progress_callback是信号对象）
+        progress_callback.emit(value)
+    except AttributeError:
+        try:
+            # 尝试直接调用方式（progress_callback是emit方法本身）
+            progress_callback(value)
+        except Exception as e:
+            pass
@@ -5,6 +5,8 @@
 
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 __all__ = [
     'run_pdf_merge_task',
@@ -12,6 +14,8 @@ __all__ = [
     'run_md_merge_task',
     'run_docx_merge_task',
     'run_win32_merge_task',
+    'run_xml_merge_task',
+    'run_merge_jobs',
     'execute_merge_tasks'
 ]
 
@@ -28,6 +32,21 @@ try:
 except ImportError:
     HAS_DOCX = False
 
+# 纯Python的XML级Word合并引擎（跨平台）
+from function.docx_merge import merge_docx_files
+# 流式PDF合并（内存受限，按源文件生成书签）
+from function.pdf_stream import (
+    merge_pdf_files_streaming, merge_pdf_files_tree, append_pdf_files_incremental, optimize_pdf
+)
+# TXT/Markdown 按字节拼接（UTF-8 直接复制，其他编码增量转码）
+from function.file_utils import copy_text_as_utf8, emit_progress
+# 合并清单：只有新增文件时增量追加
+from function.merge_manifest import MergeManifest
+
+# TXT/Markdown 合并分隔符：预先编码，换行符与以前文本模式写入时一致
+_TXT_SEPARATOR = ("\n\n" + "=" * 50 + "\n\n").replace("\n", os.linesep).encode("utf-8")
+_MD_SEPARATOR = "\n\n---\n\n".replace("\n", os.linesep).encode("utf-8")
+
 # 尝试导入pywin32，用于更高效的Word合并
 try:
     import pythoncom
@@ -37,7 +56,8 @@ except ImportError:
     HAS_WIN32 = False
 
 
-def run_pdf_merge_task(target_dir, log_func, progress_bar, root, output_dir=None, stop_flag=False):
+def run_pdf_merge_task(target_dir, log_func, progress_bar, root, output_dir=None, stop_flag=False, streaming=False,
+                       optimize=False, compression_level=6, tree_threshold=500):
     """运行PDF文档合并任务
     
     合并多个PDF文档为一个。
@@ -48,6 +68,14 @@ def run_pdf_merge_task(target_dir, log_func, progress_bar, root, output_dir=None
         progress_bar: 进度条信号
         root: 根窗口
         output_dir: 输出目录
+        streaming: 是否使用流式合并（逐个读取源文件并立即写出，内存占用不随文件数量增长；
+            每个源文件生成一个以文件名命名的顶层书签，原有书签嵌套在其下）
+        optimize: 合并后是否优化（合并内容相同的字体、图片等对象并重新压缩流）
+        compression_level: 优化时使用的 zlib 压缩级别（1-9，0 表示不重新压缩）
+        tree_threshold: 输入文件数达到该值时使用分层并行合并（多进程，输出与流式合并一致），0 表示不使用
+
+    合并清单显示输入没有变化时跳过合并；流式模式下只新增了排在最后的文件时，以PDF增量更新追加到已有合并文件。
+    开启优化时不做增量追加：优化会重写整个合并文件，有新增文件时总是完整重建后再优化。
     """
     if PdfMerger is None: 
         return log_func("❌ 缺少 pypdf 库，请安装。")
@@ -70,6 +98,32 @@ def run_pdf_merge_task(target_dir, log_func, progress_bar, root, output_dir=None
     if not target_files: 
         return log_func("❌ 未找到 PDF 文件")
 
+    # 文件数量很多时使用分层并行合并，其输出布局与流式合并相同
+    tree = 0 < tree_threshold <= len(target_files)
+    if tree:
+        streaming = True
+
+    out_path = os.path.join(save_dir, "PDF合并.pdf")
+    # 合并模式与优化选项都影响输出内容，任一变化时完整重建
+    manifest = MergeManifest(out_path, "pdf", {
+        "mode": "stream" if streaming else "standard",
+        "optimize": bool(optimize),
+        "compression_level": compression_level
+    })
+    new_files = manifest.plan(target_files)
+    if new_files == []:
+        return log_func(f"✅ 合并文件已是最新: {out_path.replace('/', '\\')}")
+    if new_files and optimize:
+        # 优化会重写整个文件，增量追加保留已有字节的意义不复存在，直接完整重建
+        log_func("ⓘ 已开启优化，不使用增量追加，完整重新合并")
+        new_files = None
+
+    if streaming:
+        return _run_pdf_stream_merge(target_files, new_files, out_path, manifest, log_func, progress_bar, stop_flag,
+                                     optimize, compression_level, tree)
+
+    # 普通模式的书签布局由 PdfWriter 决定，有变化时总是完整重建
+    manifest.discard()
     merger = PdfMerger()
     try:
         for i, f in enumerate(target_files):
@@ -78,16 +132,7 @@ def run_pdf_merge_task(target_dir, log_func, progress_bar, root, output_dir=None
                     break
                 log_func(f"合并中: {os.path.basename(f)}")
                 merger.append(f)
-                # 更新进度，支持不同类型的进度回调
-                try:
-                    # 尝试PyQt的信号方式（progress_bar是信号对象）
-                    progress_bar.emit(int((i + 1) / len(target_files) * 100))
-                except AttributeError:
-                    try:
-                        # 尝试直接调用方式（progress_bar是emit方法本身）
-                        progress_bar(int((i + 1) / len(target_files) * 100))
-                    except Exception as e:
-                        pass
+                emit_progress(progress_bar, int((i + 1) / len(target_files) * 100))
             
         # 检查是否停止，停止则不输出文件
         if stop_flag[0]:
@@ -95,21 +140,138 @@ def run_pdf_merge_task(target_dir, log_func, progress_bar, root, output_dir=None
             log_func("⚠️ 任务已停止，未生成合并文件")
         else:
             # 输出合并后的PDF
-            out_path = os.path.join(save_dir, "PDF合并.pdf")
             merger.write(out_path)
             merger.close()
             log_func(f"✅ 合并成功: {out_path.replace('/', '\\')}")
+            if optimize:
+                _optimize_merged_pdf(out_path, log_func, compression_level, stop_flag)
+            manifest.save(target_files)
     except Exception as e: 
         log_func(f"❌ 错误: {e}")
     finally: 
         # 重置进度条
-        try:
-            progress_bar.emit(0)
-        except AttributeError:
-            try:
-                progress_bar(0)
-            except Exception as e:
-                pass
+        emit_progress(progress_bar, 0)
+
+
+def _run_pdf_stream_merge(target_files, new_files, out_path, manifest, log_func, progress_bar, stop_flag,
+                          optimize=False, compression_level=6, tree=False):
+    """流式合并PDF文件（run_pdf_merge_task 的流式模式）
+
+    new_files 不为 None 时以增量更新追加这些文件，已有合并文件不支持增量更新时改为完整重建；
+    tree 为 True 时完整重建使用分层并行合并。
+    """
+    incremental = new_files is not None
+    total = len(new_files) if incremental else len(target_files)
+
+    def on_file_done(i, fp):
+        log_func(f"合并中: {os.path.basename(fp)}")
+        emit_progress(progress_bar, int((i + 1) / total * 100))
+
+    try:
+        completed = None
+        if incremental:
+            log_func(f"➕ 增量合并: 追加 {len(new_files)} 个新文件")
+            completed = append_pdf_files_incremental(out_path, new_files, stop_flag=stop_flag,
+                                                     on_file_done=on_file_done)
+            if completed is None:
+                log_func("⚠️ 合并文件不支持增量更新，重新完整合并")
+                incremental = False
+                total = len(target_files)
+        if completed is None:
+            manifest.discard()
+            if tree:
+                log_func(f"📚 共 {len(target_files)} 个文件，使用分层并行合并")
+                completed = merge_pdf_files_tree(target_files, out_path, stop_flag=stop_flag,
+                                                 on_file_done=on_file_done)
+            else:
+                completed = merge_pdf_files_streaming(target_files, out_path, stop_flag=stop_flag,
+                                                      on_file_done=on_file_done)
+        if completed:
+            log_func(f"✅ 合并成功: {out_path.replace('/', '\\')}")
+            if optimize:
+                _optimize_merged_pdf(out_path, log_func, compression_level, stop_flag)
+            manifest.save(target_files)
+        elif incremental:
+            log_func("⚠️ 任务已停止，合并文件保持不变")
+        else:
+            log_func("⚠️ 任务已停止，未生成合并文件")
+    except Exception as e:
+        log_func(f"❌ 错误: {e}")
+    finally:
+        # 重置进度条
+        emit_progress(progress_bar, 0)
+
+
+def _optimize_merged_pdf(out_path, log_func, compression_level, stop_flag):
+    """优化合并后的PDF并记录优化前后的文件大小，被停止时保留未优化的合并文件"""
+    log_func("🗜️ 正在优化合并文件...")
+    before = os.path.getsize(out_path)
+    stats = optimize_pdf(out_path, out_path + ".opt", compression_level, stop_flag)
+    if stats is None:
+        log_func("⚠️ 优化已停止，保留未优化的合并文件")
+        return
+    os.replace(out_path + ".opt", out_path)
+    after = os.path.getsize(out_path)
+    saved = (1 - after / before) * 100 if before else 0
+    log_func(f"🗜️ 优化完成: {before / 1024 / 1024:.2f} MB → {after / 1024 / 1024:.2f} MB "
+             f"(-{saved:.1f}%)，合并重复对象 {stats['duplicates']} 个")
+
+
+def _run_text_merge(target_files, out_path, separator, kind, log_func, progress_bar, stop_flag):
+    """按字节拼接文本文件（TXT/Markdown 合并共用）
+
+    输出为 UTF-8：UTF-8 输入不解码直接复制，其他编码（GBK、UTF-16 等）增量转码；
+    每个文件后写入预先编码好的分隔符。
+    合并清单显示只新增了排在最后的文件时，直接追加到已有合并文件末尾。
+    """
+    manifest = MergeManifest(out_path, kind)
+    new_files = manifest.plan(target_files)
+    if new_files == []:
+        return log_func(f"✅ 合并文件已是最新: {out_path.replace('/', '\\')}")
+    incremental = new_files is not None
+    if incremental:
+        log_func(f"➕ 增量合并: 追加 {len(new_files)} 个新文件")
+    else:
+        new_files = target_files
+        manifest.discard()
+    total = len(new_files)
+
+    try:
+        original_stat = os.stat(out_path) if incremental else None
+        with open(out_path, 'r+b' if incremental else 'wb') as outfile:
+            original_size = outfile.seek(0, os.SEEK_END)
+            for i, fp in enumerate(new_files):
+                # 检查停止标志
+                if stop_flag[0]:
+                    break
+                log_func(f"合并中: {os.path.basename(fp)}")
+                encoding = copy_text_as_utf8(fp, outfile)
+                if encoding != "utf-8":
+                    log_func(f"   编码转换: {encoding.upper()} → UTF-8")
+                outfile.write(separator)
+                emit_progress(progress_bar, int((i + 1) / total * 100))
+            if stop_flag[0] and incremental:
+                # 撤销本次追加的内容，合并文件与清单保持上次的状态
+                outfile.truncate(original_size)
+
+        # 检查是否停止
+        if stop_flag[0]:
+            if incremental:
+                os.utime(out_path, ns=(original_stat.st_atime_ns, original_stat.st_mtime_ns))
+                log_func("⚠️ 任务已停止，合并文件保持不变")
+            else:
+                log_func("⚠️ 任务已停止，未生成完整合并文件")
+                # 删除不完整的文件
+                if os.path.exists(out_path):
+                    os.remove(out_path)
+        else:
+            manifest.save(target_files)
+            log_func(f"✅ 合并成功: {out_path.replace('/', '\\')}")
+    except Exception as e:
+        log_func(f"❌ 合并失败: {e}")
+    finally:
+        # 重置进度条
+        emit_progress(progress_bar, 0)
 
 
 def run_txt_merge_task(target_dir, log_func, progress_bar, root, output_dir=None, stop_flag=False):
@@ -146,49 +308,8 @@ def run_txt_merge_task(target_dir, log_func, progress_bar, root, output_dir=None
     if not target_files:
         return log_func("❌ 未找到 TXT 文件")
 
-    total = len(target_files)
     out_path = os.path.join(save_dir, "TXT合并.txt")
-
-    try:
-        with open(out_path, 'w', encoding='utf-8') as outfile:
-            for i, fp in enumerate(target_files):
-                # 检查停止标志
-                if stop_flag[0]:
-                    break
-                log_func(f"合并中: {os.path.basename(fp)}")
-                with open(fp, 'r', encoding='utf-8') as infile:
-                    outfile.write(infile.read())
-                    outfile.write("\n\n" + "="*50 + "\n\n") 
-                # 更新进度，支持不同类型的进度回调
-                try:
-                    # 尝试PyQt的信号方式（progress_bar是信号对象）
-                    progress_bar.emit(int((i + 1) / total * 100))
-                except AttributeError:
-                    try:
-                        # 尝试直接调用方式（progress_bar是emit方法本身）
-                        progress_bar(int((i + 1) / total * 100))
-                    except Exception as e:
-                        pass
-            
-        # 检查是否停止
-        if stop_flag[0]:
-            log_func("⚠️ 任务已停止，未生成完整合并文件")
-            # 删除不完整的文件
-            if os.path.exists(out_path):
-                os.remove(out_path)
-        else:
-            log_func(f"✅ 合并成功: {out_path.replace('/', '\\')}")
-    except Exception as e:
-        log_func(f"❌ 合并失败: {e}")
-    finally:
-        # 重置进度条
-        try:
-            progress_bar.emit(0)
-        except AttributeError:
-            try:
-                progress_bar(0)
-            except Exception as e:
-                pass
+    _run_text_merge(target_files, out_path, _TXT_SEPARATOR, "txt", log_func, progress_bar, stop_flag)
 
 
 def run_md_merge_task(target_dir, log_func, progress_bar, root, output_dir=None, stop_flag=False):
@@ -225,49 +346,8 @@ def run_md_merge_task(target_dir, log_func, progress_bar, root, output_dir=None,
     if not target_files:
         return log_func("❌ 未找到 Markdown 文件")
 
-    total = len(target_files)
     out_path = os.path.join(save_dir, "Markdown合并.md")
-
-    try:
-        with open(out_path, 'w', encoding='utf-8') as outfile:
-            for i, fp in enumerate(target_files):
-                # 检查停止标志
-                if stop_flag[0]:
-                    break
-                log_func(f"合并中: {os.path.basename(fp)}")
-                with open(fp, 'r', encoding='utf-8') as infile:
-                    outfile.write(infile.read())
-                    outfile.write("\n\n---\n\n") 
-                # 更新进度，支持不同类型的进度回调
-                try:
-                    # 尝试PyQt的信号方式（progress_bar是信号对象）
-                    progress_bar.emit(int((i + 1) / total * 100))
-                except AttributeError:
-                    try:
-                        # 尝试直接调用方式（progress_bar是emit方法本身）
-                        progress_bar(int((i + 1) / total * 100))
-                    except Exception as e:
-                        pass
-            
-        # 检查是否停止
-        if stop_flag[0]:
-            log_func("⚠️ 任务已停止，未生成完整合并文件")
-            # 删除不完整的文件
-            if os.path.exists(out_path):
-                os.remove(out_path)
-        else:
-            log_func(f"✅ 合并成功: {out_path.replace('/', '\\')}")
-    except Exception as e:
-        log_func(f"❌ 合并失败: {e}")
-    finally:
-        # 重置进度条
-        try:
-            progress_bar.emit(0)
-        except AttributeError:
-            try:
-                progress_bar(0)
-            except Exception as e:
-                pass
+    _run_text_merge(target_files, out_path, _MD_SEPARATOR, "md", log_func, progress_bar, stop_flag)
 
 
 def run_docx_merge_task(target_dir, log_func, progress_bar, root, output_dir=None, stop_flag=False):
@@ -526,6 +606,131 @@ def run_win32_merge_task(target_dir, log_func, progress_bar, root, output_dir=No
                     pass
 
 
+def _find_word_files(target_dir):
+    """查找待合并的Word文件：优先根目录，其次 script/word 子目录
+    
+    Returns:
+        tuple: (文件列表, 保存目录)
+    """
+    def list_docx(directory):
+        return sorted(os.path.join(directory, f) for f in os.listdir(directory)
+                      if f.lower().endswith('.docx') and "~$" not in f and "合并" not in f)
+
+    target_files = list_docx(target_dir)
+    save_dir = target_dir
+    if not target_files:
+        # 适配新的分类层级：检测 script/word
+        sub_dir = os.path.join(target_dir, "script", "word")
+        if os.path.exists(sub_dir):
+            target_files = list_docx(sub_dir)
+            save_dir = sub_dir
+    return target_files, save_dir
+
+
+def _merge_heading(filename):
+    """合并时插入的标题：去掉扩展名和前面的序号（如 "01.【第 Ⅰ 語基】" → "【第 Ⅰ 語基】"）"""
+    filename_no_ext = os.path.splitext(filename)[0]
+    match = re.match(r'^\d+\.\s*(.*)', filename_no_ext)
+    return match.group(1) if match else filename_no_ext
+
+
+def run_xml_merge_task(target_dir, log_func, progress_bar, root, output_dir=None, stop_flag=False):
+    """使用XML级合并引擎合并Word文档
+    
+    纯Python实现，不依赖Windows COM接口，可在Linux上运行。
+    保留源文档的样式、编号、图片、页眉页脚与脚注尾注，每个文档前插入文件名标题（Heading 1），文档之间分页。
+    批注不合并，含批注的文件会记录警告。
+    
+    Args:
+        target_dir: 目标目录
+        log_func: 日志记录函数
+        progress_bar: 进度条对象
+        root: 根窗口
+        output_dir: 输出目录
+    """
+    if not HAS_DOCX:
+        return log_func("❌ 错误: 缺少 python-docx 库")
+
+    log_func(f"🔍 扫描目录: {target_dir}")
+    target_files, save_dir = _find_word_files(target_dir)
+    if not target_files:
+        return log_func("❌ 未找到 Word 文件")
+
+    total_files = len(target_files)
+    log_func(f"📋 找到 {total_files} 个Word文件，准备合并...")
+    out_path = os.path.join(save_dir, "Word合并.docx")
+
+    def on_file_done(i, fp):
+        log_func(f"🔄 合并中: {os.path.basename(fp)} ({i+1}/{total_files})")
+        emit_progress(progress_bar, int((i + 1) / total_files * 100))
+
+    try:
+        headings = [_merge_heading(os.path.basename(fp)) for fp in target_files]
+        if merge_docx_files(target_files, out_path, headings=headings, stop_flag=stop_flag, on_file_done=on_file_done,
+                            log_func=log_func):
+            log_func(f"✅ 合并完成: {out_path}")
+        else:
+            log_func("⚠️ 任务已停止，未生成合并文件")
+    except PermissionError:
+        log_func(f"❌ 文件被占用，请关闭 Word 后重试")
+    except Exception as e:
+        log_func(f"❌ 合并失败: {e}")
+    finally:
+        # 重置进度条
+        emit_progress(progress_bar, 0)
+
+
+def run_merge_jobs(jobs, log_func, progress_bar, stop_flag):
+    """并发执行多个合并任务
+
+    各类合并读取的文件与写出的结果互不重叠，在线程池中同时执行，总耗时接近最慢的一个。
+    每个任务有独立的进度通道，进度条显示各通道的平均值；所有任务共享同一个停止标志。
+
+    Args:
+        jobs: [(名称, 任务函数)]，任务函数接收该任务专用的进度回调
+        log_func: 日志记录函数
+        progress_bar: 进度条信号
+        stop_flag: 停止标志（所有任务共享）
+    """
+    if not jobs:
+        return
+    lanes = [0] * len(jobs)
+    shown = [-1]
+    lock = threading.Lock()
+
+    def report():
+        value = sum(lanes) // len(lanes)
+        if value != shown[0]:
+            shown[0] = value
+            emit_progress(progress_bar, value)
+
+    def make_lane(index):
+        def lane(value):
+            with lock:
+                # 各合并任务结束时会把进度重置为0，通道进度只增不减
+                if value > lanes[index]:
+                    lanes[index] = value
+                    report()
+        return lane
+
+    def run(index, name, job):
+        try:
+            job(make_lane(index))
+        except Exception as e:
+            log_func(f"❌ {name}合并失败: {e}")
+        finally:
+            with lock:
+                lanes[index] = 100
+                report()
+
+    with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="merge") as executor:
+        for index, (name, job) in enumerate(jobs):
+            executor.submit(run, index, name, job)
+
+    # 重置进度条
+    emit_progress(progress_bar, 0)
+
+
 def execute_merge_tasks(path_var, output_path_var, log_callback, update_progress, root, gui, stop_flag=False):
     """
     执行合并任务
@@ -564,36 +769,47 @@ def execute_merge_tasks(path_var, output_path_var, log_callback, update_progress
             log_callback("❌ 请至少选择一个合并选项")
             return
         
-        # 根据选中的选项执行相应的合并任务
+        # 选中的合并任务并发执行，各自使用独立的进度通道
+        app = getattr(gui, 'app', None)
+        jobs = []
         if merge_pdf:
-            run_pdf_merge_task(
-                target_dir, 
-                log_callback, 
-                update_progress, 
-                root, 
+            jobs.append(("PDF", lambda progress: run_pdf_merge_task(
+                target_dir,
+                log_callback,
+                progress,
+                root,
                 output_dir=final_out,
-                stop_flag=stop_flag
-            )
-        
+                stop_flag=stop_flag,
+                streaming=getattr(app, 'pdf_merge_streaming', False),
+                optimize=getattr(app, 'pdf_merge_optimize', False),
+                compression_level=getattr(app, 'pdf_merge_compression_level', 6),
+                tree_threshold=getattr(app, 'pdf_merge_tree_threshold', 500)
+            )))
+
         if merge_word:
-            run_win32_merge_task(
-                target_dir, 
-                log_callback, 
-                update_progress, 
-                root, 
+            # Word合并引擎（配置项 [Merge] word_merge_engine：xml 跨平台 / win32 调用Word）
+            engine = getattr(app, 'word_merge_engine', "xml")
+            word_merge_task = run_win32_merge_task if engine == "win32" else run_xml_merge_task
+            jobs.append(("Word", lambda progress: word_merge_task(
+                target_dir,
+                log_callback,
+                progress,
+                root,
                 output_dir=final_out,
                 stop_flag=stop_flag
-            )
-        
+            )))
+
         if merge_txt:
-            run_txt_merge_task(
-                target_dir, 
-                log_callback, 
-                update_progress, 
-                root, 
+            jobs.append(("TXT", lambda progress: run_txt_merge_task(
+                target_dir,
+                log_callback,
+                progress,
+                root,
                 output_dir=final_out,
                 stop_flag=stop_flag
-            )
+            )))
+
+        run_merge_jobs(jobs, log_callback, update_progress, stop_flag)
             
     except Exception as e:
         log_callback(f"❌ Merge模式处理失败: {e}")
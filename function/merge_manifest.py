@@ -0,0 +1,143 @@
+"""
+合并清单模块
+在合并输出旁保存附属清单（JSON），记录参与合并的输入文件（路径、大小、修改时间、哈希）及其顺序，
+据此判断再次合并时能否只追加新增的文件，而不必从头重建合并文件。
+"""
+
+import os
+import json
+import hashlib
+
+__all__ = [
+    'MergeManifest'
+]
+
+# 清单文件后缀（保存在合并输出旁边）
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+
+
+def _file_hash(path, chunk_size=1024 * 1024):
+    """计算文件内容的 SHA-1"""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class MergeManifest:
+    """合并输出的附属清单
+
+    用法:
+        manifest = MergeManifest(out_path, "txt")
+        new_files = manifest.plan(target_files)
+        # None: 需要完整重建；[]: 已是最新；其他: 只需按顺序追加这些文件
+        ...
+        manifest.save(target_files)
+    """
+
+    def __init__(self, out_path, kind, options=None):
+        """
+        Args:
+            out_path: 合并输出文件路径
+            kind: 合并类型（如 "txt"、"md"、"pdf"），类型不同的清单不会被复用
+            options: 影响输出内容的其他选项（如PDF合并模式），与清单记录不一致时完整重建
+        """
+        self.out_path = out_path
+        self.path = out_path + MANIFEST_SUFFIX
+        self.kind = kind
+        self.options = options or {}
+        self._entries = {}
+
+    def _relative(self, path):
+        """输入文件相对于输出目录的路径（清单中统一使用 / 分隔）"""
+        return os.path.relpath(path, os.path.dirname(self.out_path)).replace("\\", "/")
+
+    def _load(self):
+        """读取清单，清单缺失、损坏或与当前输出不符时返回 None"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION
+                or data.get("kind") != self.kind or data.get("options") != self.options):
+            return None
+        # 合并输出在上次合并后被修改或替换过
+        try:
+            stat = os.stat(self.out_path)
+        except OSError:
+            return None
+        output = data.get("output", {})
+        if output.get("size") != stat.st_size or output.get("mtime") != stat.st_mtime_ns:
+            return None
+        return data
+
+    def _unchanged(self, entry, path):
+        """输入文件与清单记录一致：大小与修改时间相同，或修改时间变化但内容哈希相同"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if stat.st_size != entry.get("size"):
+            return False
+        if stat.st_mtime_ns == entry.get("mtime"):
+            return True
+        return _file_hash(path) == entry.get("sha1")
+
+    def plan(self, target_files):
+        """根据清单规划本次合并
+
+        清单中的输入必须与本次输入的前若干个完全一致（顺序与内容），新增的文件都排在它们之后，才能增量追加。
+
+        Args:
+            target_files: 本次要合并的全部文件（按合并顺序）
+
+        Returns:
+            list: 需要追加的新文件（空列表表示合并文件已是最新）；None 表示需要完整重建
+        """
+        data = self._load()
+        if data is None:
+            return None
+        inputs = data.get("inputs", [])
+        if not inputs or len(inputs) > len(target_files):
+            return None
+        for entry, path in zip(inputs, target_files):
+            if entry.get("path") != self._relative(path) or not self._unchanged(entry, path):
+                return None
+        self._entries = {entry["path"]: entry for entry in inputs}
+        return list(target_files[len(inputs):])
+
+    def save(self, target_files):
+        """合并完成后写入清单（复用未变化输入的哈希，只为新文件计算哈希）"""
+        inputs = []
+        for path in target_files:
+            relative = self._relative(path)
+            stat = os.stat(path)
+            entry = self._entries.get(relative)
+            if entry is None or entry.get("size") != stat.st_size or entry.get("mtime") != stat.st_mtime_ns:
+                entry = {"path": relative, "size": stat.st_size, "mtime": stat.st_mtime_ns,
+                         "sha1": _file_hash(path)}
+            inputs.append(entry)
+        stat = os.stat(self.out_path)
+        data = {
+            "version": MANIFEST_VERSION,
+            "kind": self.kind,
+            "options": self.options,
+            "output": {"size": stat.st_size, "mtime": stat.st_mtime_ns},
+            "inputs": inputs,
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        self._entries = {entry["path"]: entry for entry in inputs}
+
+    def discard(self):
+        """删除清单（完整重建开始前调用，避免重建中断后留下过期清单）"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
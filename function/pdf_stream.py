@@ -0,0 +1,878 @@
+"""
+流式PDF合并模块
+逐个读取源PDF，将页面及其引用的对象重新编号后立即写入输出文件，读完即关闭源文件，
+峰值内存只与单个输入有关，不随输入数量增长。
+合并结果使用扁平页面树，并为每个源文件生成一个以文件名命名的顶层书签，源文件原有书签嵌套在其下。
+已有的合并结果可通过PDF增量更新在文件末尾追加新的源文件，不改写原有内容。
+输入数量很多时可分层并行合并：各分块在独立进程中合并为中间文件，再把中间文件合并为最终结果。
+另提供合并后的优化处理：按内容哈希合并相同的间接对象（字体、图片、内容流等）并重新压缩流。
+"""
+
+import io
+import os
+import zlib
+import shutil
+import hashlib
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from pypdf import PdfReader
+from pypdf.generic import (
+    ArrayObject, DictionaryObject, IndirectObject, NameObject, NullObject,
+    NumberObject, StreamObject, TextStringObject
+)
+
+__all__ = [
+    'StreamingPdfWriter',
+    'merge_pdf_files_streaming',
+    'append_pdf_files_incremental',
+    'merge_pdf_files_tree',
+    'optimize_pdf'
+]
+
+# 页面可从父节点继承的属性，扁平化页面树时需要写到页面自身
+_INHERITABLE_PAGE_KEYS = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+# 分层并行合并的片段中对象号的固定宽度（右对齐，左侧以空格填充）
+_ID_WIDTH = 10
+
+# 具有唯一身份、不参与去重的对象类型（页面树结构与文档目录）
+_UNIQUE_TYPES = {"/Page", "/Pages", "/Catalog", "/Outlines"}
+
+# 书签目标类型对应的参数
+_DEST_ARGS = {
+    "/XYZ": ("/Left", "/Top", "/Zoom"),
+    "/FitH": ("/Top",),
+    "/FitBH": ("/Top",),
+    "/FitV": ("/Left",),
+    "/FitBV": ("/Left",),
+    "/FitR": ("/Left", "/Bottom", "/Right", "/Top"),
+}
+
+
+class _OutlineItem:
+    """待写入的书签节点"""
+
+    __slots__ = ("title", "page_id", "dest_type", "dest_args", "is_open", "children")
+
+    def __init__(self, title, page_id, dest_type="/Fit", dest_args=(), is_open=False):
+        self.title = title
+        self.page_id = page_id
+        self.dest_type = dest_type
+        self.dest_args = dest_args
+        self.is_open = is_open
+        self.children = []
+
+
+class _PdfObjectWriter:
+    """底层PDF对象写入器：对象号分配、间接对象写出与交叉引用表"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._offsets = [None]  # 对象号 -> 文件偏移，0号对象保留
+        self._stream.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    def _reserve(self):
+        """预留一个对象号"""
+        self._offsets.append(None)
+        return len(self._offsets) - 1
+
+    def _write_object(self, obj_id, obj):
+        """写入一个间接对象"""
+        self._offsets[obj_id] = self._stream.tell()
+        self._stream.write(f"{obj_id} 0 obj\n".encode("ascii"))
+        obj.write_to_stream(self._stream)
+        self._stream.write(b"\nendobj\n")
+
+    @staticmethod
+    def _remap(obj, ref):
+        """复制对象并将其中的间接引用替换为新对象号"""
+        remap = _PdfObjectWriter._remap
+        if isinstance(obj, IndirectObject):
+            return ref(obj)
+        if isinstance(obj, StreamObject):
+            clone = StreamObject()
+            for key, value in obj.items():
+                if key != "/Length":
+                    clone[NameObject(key)] = remap(value, ref)
+            # 保留原始（编码后）的流数据，不解压
+            clone._data = obj._data
+            return clone
+        if isinstance(obj, DictionaryObject):
+            clone = DictionaryObject()
+            for key, value in obj.items():
+                clone[NameObject(key)] = remap(value, ref)
+            return clone
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(remap(value, ref) for value in obj)
+        return obj
+
+    def _write_xref(self, root_id, info_id=None):
+        """写入交叉引用表与文件尾：未写出的预留对象标记为空闲"""
+        xref_offset = self._stream.tell()
+        self._stream.write(f"xref\n0 {len(self._offsets)}\n".encode("ascii"))
+        self._stream.write(b"0000000000 65535 f \n")
+        for offset in self._offsets[1:]:
+            if offset is None:
+                self._stream.write(b"0000000000 00000 f \n")
+            else:
+                self._stream.write(f"{offset:010d} 00000 n \n".encode("ascii"))
+        info = f" /Info {info_id} 0 R" if info_id is not None else ""
+        self._stream.write(f"trailer\n<< /Size {len(self._offsets)} /Root {root_id} 0 R{info} >>\n"
+                           f"startxref\n{xref_offset}\n%%EOF\n".encode("ascii"))
+
+
+class StreamingPdfWriter(_PdfObjectWriter):
+    """流式PDF写入器
+
+    对象一经生成立即写入文件，内存中只保留交叉引用表偏移、页面对象号和书签结构。
+
+    用法:
+        with open(path, "wb") as f:
+            writer = StreamingPdfWriter(f)
+            writer.append(src_path, title="文件名")
+            writer.close()
+    """
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self._page_ids = []
+        self._outline = []
+        self._pages_id = self._reserve()
+
+    @property
+    def page_count(self):
+        return len(self._page_ids)
+
+    def _ref(self, obj_id):
+        """复制源文件对象时使用的间接引用"""
+        return IndirectObject(obj_id, 0, None)
+
+    def append(self, path, title=None, stop_flag=None):
+        """追加一个源PDF的全部页面
+
+        Args:
+            path: 源PDF路径
+            title: 顶层书签标题，None 表示不生成书签
+            stop_flag: 停止标志（单元素列表），复制过程中被设置时提前返回
+
+        Returns:
+            bool: 完成返回 True，被停止返回 False
+        """
+        with PdfReader(path) as reader:
+            if reader.is_encrypted:
+                reader.decrypt("")
+
+            id_map = {}
+            queue = deque()
+
+            def ref(indirect):
+                key = (indirect.idnum, indirect.generation)
+                if key not in id_map:
+                    id_map[key] = self._reserve()
+                    queue.append(indirect)
+                return self._ref(id_map[key])
+
+            page_refs = []
+            for page in reader.pages:
+                page_ref = page.indirect_reference
+                key = (page_ref.idnum, page_ref.generation)
+                if key not in id_map:
+                    id_map[key] = self._reserve()
+                page_refs.append(page_ref)
+            page_keys = {(r.idnum, r.generation) for r in page_refs}
+
+            # 页面：扁平化继承属性，/Parent 指向合并后的页面树
+            for page, page_ref in zip(reader.pages, page_refs):
+                if stop_flag is not None and stop_flag[0]:
+                    return False
+                page_obj = DictionaryObject()
+                for key, value in page.items():
+                    if key != "/Parent":
+                        page_obj[NameObject(key)] = self._remap(value, ref)
+                for key in _INHERITABLE_PAGE_KEYS:
+                    if key not in page_obj:
+                        inherited = self._inherited(page, key)
+                        if inherited is not None:
+                            page_obj[NameObject(key)] = self._remap(inherited, ref)
+                page_obj[NameObject("/Parent")] = self._ref(self._pages_id)
+                new_id = id_map[(page_ref.idnum, page_ref.generation)]
+                self._write_object(new_id, page_obj)
+                self._page_ids.append(new_id)
+
+                # 页面引用的对象（资源、内容流、注释等）随后依次写出
+                while queue:
+                    indirect = queue.popleft()
+                    if (indirect.idnum, indirect.generation) in page_keys:
+                        continue
+                    obj = indirect.get_object()
+                    self._write_object(id_map[(indirect.idnum, indirect.generation)],
+                                       self._remap(obj, ref))
+
+            if title is not None:
+                first_page = id_map[(page_refs[0].idnum, page_refs[0].generation)] if page_refs else None
+                entry = _OutlineItem(title, first_page)
+                if first_page is not None:
+                    page_numbers = {(r.idnum, r.generation): id_map[(r.idnum, r.generation)] for r in page_refs}
+                    try:
+                        entry.children = self._convert_outline(reader, reader.outline, page_numbers)
+                    except Exception:
+                        # 损坏的书签不影响页面合并
+                        entry.children = []
+                self._outline.append(entry)
+        return True
+
+    @staticmethod
+    def _inherited(page, key):
+        """沿父节点查找可继承属性"""
+        node = page.get("/Parent")
+        while node is not None:
+            node = node.get_object()
+            if key in node:
+                return node[key]
+            node = node.get("/Parent")
+        return None
+
+    def _convert_outline(self, reader, outline, page_numbers):
+        """把源书签转换为合并文件中的书签节点"""
+        items = []
+        for node in outline:
+            if isinstance(node, list):
+                # 嵌套列表是上一个书签的子书签
+                if items:
+                    items[-1].children = self._convert_outline(reader, node, page_numbers)
+                continue
+            page = node.get("/Page")
+            if isinstance(page, IndirectObject):
+                page_id = page_numbers.get((page.idnum, page.generation))
+            elif isinstance(page, int):
+                page_id = self._page_ids[-len(page_numbers) + page] if 0 <= page < len(page_numbers) else None
+            else:
+                page_id = None
+            if page_id is None:
+                continue
+            dest_type = node.get("/Type", "/Fit")
+            dest_args = tuple(node.get(key, NullObject()) for key in _DEST_ARGS.get(dest_type, ()))
+            is_open = node.get("/Count", 0) > 0
+            items.append(_OutlineItem(str(node.title), page_id, dest_type, dest_args, is_open))
+        return items
+
+    def _write_outline(self, items, parent_id, prev_id=None):
+        """写入一层书签，返回 (首节点号, 末节点号, 可见节点数)
+
+        prev_id: 同层已有的前一个书签（增量追加时），首个新书签的 /Prev 指向它
+        """
+        ids = [self._reserve() for _ in items]
+        visible = 0
+        for i, (item, item_id) in enumerate(zip(items, ids)):
+            obj = DictionaryObject()
+            obj[NameObject("/Title")] = TextStringObject(item.title)
+            obj[NameObject("/Parent")] = IndirectObject(parent_id, 0, None)
+            dest = ArrayObject([IndirectObject(item.page_id, 0, None), NameObject(item.dest_type)])
+            dest.extend(arg if not isinstance(arg, IndirectObject) else NullObject() for arg in item.dest_args)
+            obj[NameObject("/Dest")] = dest
+            if i > 0:
+                obj[NameObject("/Prev")] = IndirectObject(ids[i - 1], 0, None)
+            elif prev_id is not None:
+                obj[NameObject("/Prev")] = IndirectObject(prev_id, 0, None)
+            if i < len(ids) - 1:
+                obj[NameObject("/Next")] = IndirectObject(ids[i + 1], 0, None)
+            if item.children:
+                first, last, count = self._write_outline(item.children, item_id)
+                obj[NameObject("/First")] = IndirectObject(first, 0, None)
+                obj[NameObject("/Last")] = IndirectObject(last, 0, None)
+                obj[NameObject("/Count")] = NumberObject(count if item.is_open else -count)
+                if item.is_open:
+                    visible += count
+            self._write_object(item_id, obj)
+            visible += 1
+        return ids[0], ids[-1], visible
+
+    def _append_fragment(self, path, fragment):
+        """拼接子进程写出的对象片段（见 _FragmentWriter），只改写对象号，不重新解析对象
+
+        Args:
+            path: 片段文件路径
+            fragment: _FragmentWriter.close() 返回的元数据
+        """
+        base = len(self._offsets) - 1
+        local_pages_id = fragment["pages_id"]
+
+        def new_id(local_id):
+            # 片段的页面树占位对象对应合并文件的页面树，其余对象号整体平移
+            return self._pages_id if local_id == local_pages_id else base + local_id
+
+        self._offsets.extend([None] * fragment["count"])
+        start = self._stream.tell()
+        with open(path, "rb") as src:
+            position = 0
+            for patch in fragment["positions"]:
+                self._stream.write(src.read(patch - position))
+                local_id = int(src.read(_ID_WIDTH))
+                self._stream.write(f"{new_id(local_id):>{_ID_WIDTH}d}".encode("ascii"))
+                position = patch + _ID_WIDTH
+            shutil.copyfileobj(src, self._stream, 1024 * 1024)
+        for local_id, offset in enumerate(fragment["offsets"]):
+            if offset is not None and local_id != local_pages_id:
+                obj_id = base + local_id
+                # 对象号右对齐，交叉引用表指向第一个数字
+                self._offsets[obj_id] = start + offset + _ID_WIDTH - len(str(obj_id))
+        self._page_ids.extend(new_id(i) for i in fragment["page_ids"])
+
+        def shift(items):
+            for item in items:
+                item.page_id = new_id(item.page_id) if item.page_id is not None else None
+                shift(item.children)
+            return items
+
+        self._outline.extend(shift(fragment["outline"]))
+
+    def close(self):
+        """写入页面树、书签、目录与交叉引用表"""
+        pages = DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(IndirectObject(i, 0, None) for i in self._page_ids),
+            NameObject("/Count"): NumberObject(len(self._page_ids)),
+        })
+        self._write_object(self._pages_id, pages)
+
+        catalog = DictionaryObject({
+            NameObject("/Type"): NameObject("/Catalog"),
+            NameObject("/Pages"): IndirectObject(self._pages_id, 0, None),
+        })
+        outline = [item for item in self._outline if item.page_id is not None]
+        if outline:
+            outlines_id = self._reserve()
+            first, last, count = self._write_outline(outline, outlines_id)
+            self._write_object(outlines_id, DictionaryObject({
+                NameObject("/Type"): NameObject("/Outlines"),
+                NameObject("/First"): IndirectObject(first, 0, None),
+                NameObject("/Last"): IndirectObject(last, 0, None),
+                NameObject("/Count"): NumberObject(count),
+            }))
+            catalog[NameObject("/Outlines")] = IndirectObject(outlines_id, 0, None)
+            catalog[NameObject("/PageMode")] = NameObject("/UseOutlines")
+        root_id = self._reserve()
+        self._write_object(root_id, catalog)
+
+        self._write_xref(root_id)
+
+
+def merge_pdf_files_streaming(files, out_path, titles=None, stop_flag=None, on_file_done=None):
+    """流式合并多个PDF文件
+
+    Args:
+        files: 源文件路径列表（按合并顺序）
+        out_path: 输出文件路径
+        titles: 与 files 对应的顶层书签标题，None 表示使用文件名（不含扩展名）
+        stop_flag: 停止标志（单元素列表），被设置时放弃合并
+        on_file_done: 每合并完一个文件后的回调，参数为 (序号, 文件路径)
+
+    Returns:
+        bool: 完成返回 True，被停止返回 False（不留下输出文件）
+    """
+    if titles is None:
+        titles = [os.path.splitext(os.path.basename(fp))[0] for fp in files]
+    tmp_path = out_path + ".tmp"
+    completed = False
+    try:
+        with open(tmp_path, "wb") as f:
+            writer = StreamingPdfWriter(f)
+            for i, fp in enumerate(files):
+                if stop_flag is not None and stop_flag[0]:
+                    return False
+                if not writer.append(fp, title=titles[i], stop_flag=stop_flag):
+                    return False
+                if on_file_done:
+                    on_file_done(i, fp)
+            writer.close()
+        os.replace(tmp_path, out_path)
+        completed = True
+        return True
+    finally:
+        if not completed and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class _PositionRecorder:
+    """输出流包装：记录片段中每个对象号的写出位置"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.positions = []
+
+    def write(self, data):
+        return self._stream.write(data)
+
+    def tell(self):
+        return self._stream.tell()
+
+
+class _FixedWidthRef(IndirectObject):
+    """以固定宽度写出对象号的间接引用，拼接时可原位改写"""
+
+    def write_to_stream(self, stream, encryption_key=None):
+        stream.positions.append(stream.tell())
+        stream.write(f"{self.idnum:>{_ID_WIDTH}d} 0 R".encode("ascii"))
+
+
+class _FragmentWriter(StreamingPdfWriter):
+    """片段写入器（分层并行合并的子进程使用）
+
+    与流式合并一样复制页面及其引用的对象，但只写出对象本身（无文件头、页面树与交叉引用表），
+    对象号一律以固定宽度写出并记录位置，主进程拼接时只需改写这些位置上的数字。
+    """
+
+    def __init__(self, stream):
+        self._stream = _PositionRecorder(stream)
+        self._offsets = [None]
+        self._page_ids = []
+        self._outline = []
+        self._pages_id = self._reserve()
+
+    def _ref(self, obj_id):
+        return _FixedWidthRef(obj_id, 0, None)
+
+    def _write_object(self, obj_id, obj):
+        self._offsets[obj_id] = self._stream.tell()
+        self._stream.positions.append(self._stream.tell())
+        self._stream.write(f"{obj_id:>{_ID_WIDTH}d} 0 obj\n".encode("ascii"))
+        obj.write_to_stream(self._stream)
+        self._stream.write(b"\nendobj\n")
+
+    def close(self):
+        """返回拼接所需的元数据"""
+        return {
+            "count": len(self._offsets) - 1,
+            "offsets": self._offsets,
+            "positions": self._stream.positions,
+            "pages_id": self._pages_id,
+            "page_ids": self._page_ids,
+            "outline": self._outline,
+        }
+
+
+def _write_fragment(files, fragment_path):
+    """子进程：把一个分块的源文件写成对象片段，每个源文件生成一个以文件名命名的顶层书签"""
+    with open(fragment_path, "wb") as f:
+        writer = _FragmentWriter(f)
+        for fp in files:
+            writer.append(fp, title=os.path.splitext(os.path.basename(fp))[0])
+        return writer.close()
+
+
+def merge_pdf_files_tree(files, out_path, workers=None, chunk_size=None, stop_flag=None, on_file_done=None):
+    """分层并行合并多个PDF文件
+
+    输入按顺序切分为若干分块，各分块在独立进程中解析并复制对象，写成中间片段；
+    主进程按顺序拼接片段，只改写对象号而不重新解析对象，最后写入页面树、书签与交叉引用表。
+    页面顺序与书签和流式合并完全一致。
+    中间片段保存在输出目录下的临时文件夹中，无论完成、停止还是出错都会被删除。
+
+    Args:
+        files: 源文件路径列表（按合并顺序）
+        out_path: 输出文件路径
+        workers: 进程数，None 表示CPU核心数
+        chunk_size: 每个分块的文件数，None 表示按进程数自动划分（每个进程约4个分块）
+        stop_flag: 停止标志（单元素列表），被设置时取消尚未开始的分块并放弃合并
+        on_file_done: 每个文件所在的分块完成后的回调，参数为 (序号, 文件路径)
+
+    Returns:
+        bool: 完成返回 True，被停止返回 False（不留下输出文件与中间片段）
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(16, -(-len(files) // (workers * 4)))
+    chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+    tmp_dir = tempfile.mkdtemp(prefix=".pdf_merge_", dir=os.path.dirname(os.path.abspath(out_path)))
+    parts = [os.path.join(tmp_dir, f"{i:05d}.part") for i in range(len(chunks))]
+    fragments = [None] * len(chunks)
+    try:
+        done_count = 0
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            pending = {executor.submit(_write_fragment, chunk, part): i
+                       for i, (chunk, part) in enumerate(zip(chunks, parts))}
+            while pending:
+                if stop_flag is not None and stop_flag[0]:
+                    # 取消尚未开始的分块，等待进行中的分块结束后再清理中间片段
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    return False
+                finished, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = pending.pop(future)
+                    fragments[index] = future.result()
+                    for fp in chunks[index]:
+                        if on_file_done:
+                            on_file_done(done_count, fp)
+                        done_count += 1
+
+        tmp_path = out_path + ".tmp"
+        completed = False
+        try:
+            with open(tmp_path, "wb") as f:
+                writer = StreamingPdfWriter(f)
+                for part, fragment in zip(parts, fragments):
+                    if stop_flag is not None and stop_flag[0]:
+                        return False
+                    writer._append_fragment(part, fragment)
+                writer.close()
+            os.replace(tmp_path, out_path)
+            completed = True
+            return True
+        finally:
+            if not completed and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _read_startxref(path):
+    """读取文件末尾的 startxref 偏移，只接受传统交叉引用表（不支持交叉引用流）"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 1024))
+        tail = f.read()
+        index = tail.rfind(b"startxref")
+        if index < 0:
+            return None
+        try:
+            offset = int(tail[index + len(b"startxref"):].split()[0])
+        except (IndexError, ValueError):
+            return None
+        f.seek(offset)
+        return offset if f.read(4) == b"xref" else None
+
+
+def _detach(indirect):
+    """保持对象号不变，只与读取器解除关联"""
+    return IndirectObject(indirect.idnum, indirect.generation, None)
+
+
+class IncrementalPdfAppender(StreamingPdfWriter):
+    """PDF增量更新写入器
+
+    在已有合并文件的末尾追加新页面的对象、更新后的页面树与书签，以及只包含变更对象的交叉引用表
+    （/Prev 指向原交叉引用表），原有内容一个字节都不改写。
+    只支持扁平页面树与传统交叉引用表（流式合并和优化处理生成的文件均满足）。
+    """
+
+    def __init__(self, stream, state):
+        self._stream = stream
+        self._offsets = [None] * state["size"]
+        self._page_ids = list(state["page_ids"])
+        self._outline = []
+        self._pages_id = state["pages_id"]
+        self._state = state
+        self._stream.seek(0, os.SEEK_END)
+        self._stream.write(b"\n")
+
+    @staticmethod
+    def read_state(path):
+        """读取增量追加所需的文件结构
+
+        Returns:
+            dict: 对象数、原交叉引用表偏移、目录、页面树与书签末节点；文件结构不支持增量更新时返回 None
+        """
+        prev = _read_startxref(path)
+        if prev is None:
+            return None
+        with PdfReader(path) as reader:
+            trailer = reader.trailer
+            root_ref = trailer.raw_get("/Root")
+            catalog = root_ref.get_object()
+            pages_ref = catalog.raw_get("/Pages")
+            if not isinstance(root_ref, IndirectObject) or not isinstance(pages_ref, IndirectObject):
+                return None
+            pages = pages_ref.get_object()
+            page_ids = []
+            for kid in pages.raw_get("/Kids"):
+                if not isinstance(kid, IndirectObject) or kid.generation != 0:
+                    return None
+                if kid.get_object().get("/Type") != "/Page":
+                    return None
+                page_ids.append(kid.idnum)
+            info_ref = trailer.raw_get("/Info") if "/Info" in trailer else None
+            state = {
+                "size": int(trailer["/Size"]),
+                "prev": prev,
+                "root_id": root_ref.idnum,
+                "info_id": info_ref.idnum if isinstance(info_ref, IndirectObject) else None,
+                "catalog": _PdfObjectWriter._remap(catalog, _detach),
+                "pages_id": pages_ref.idnum,
+                "pages": _PdfObjectWriter._remap(pages, _detach),
+                "page_ids": page_ids,
+                "outlines_id": None,
+            }
+            outlines_ref = catalog.raw_get("/Outlines") if "/Outlines" in catalog else None
+            if isinstance(outlines_ref, IndirectObject):
+                outlines = outlines_ref.get_object()
+                last_ref = outlines.raw_get("/Last") if "/Last" in outlines else None
+                if isinstance(last_ref, IndirectObject):
+                    state["outlines_id"] = outlines_ref.idnum
+                    state["outlines"] = _PdfObjectWriter._remap(outlines, _detach)
+                    state["last_id"] = last_ref.idnum
+                    state["last_item"] = _PdfObjectWriter._remap(last_ref.get_object(), _detach)
+        return state
+
+    def close(self):
+        """写入更新后的页面树、书签与增量交叉引用表"""
+        state = self._state
+        pages = state["pages"]
+        pages[NameObject("/Kids")] = ArrayObject(IndirectObject(i, 0, None) for i in self._page_ids)
+        pages[NameObject("/Count")] = NumberObject(len(self._page_ids))
+        self._write_object(self._pages_id, pages)
+
+        outline = [item for item in self._outline if item.page_id is not None]
+        if outline:
+            if state["outlines_id"] is None:
+                # 原文件没有书签：新建书签根并更新目录
+                outlines_id = self._reserve()
+                outlines = DictionaryObject({NameObject("/Type"): NameObject("/Outlines")})
+                prev_last, count = None, 0
+                catalog = state["catalog"]
+                catalog[NameObject("/Outlines")] = IndirectObject(outlines_id, 0, None)
+                catalog[NameObject("/PageMode")] = NameObject("/UseOutlines")
+                self._write_object(state["root_id"], catalog)
+            else:
+                outlines_id = state["outlines_id"]
+                outlines = state["outlines"]
+                prev_last, count = state["last_id"], max(int(outlines.get("/Count", 0)), 0)
+            first, last, visible = self._write_outline(outline, outlines_id, prev_id=prev_last)
+            if prev_last is None:
+                outlines[NameObject("/First")] = IndirectObject(first, 0, None)
+            else:
+                last_item = state["last_item"]
+                last_item[NameObject("/Next")] = IndirectObject(first, 0, None)
+                self._write_object(prev_last, last_item)
+            outlines[NameObject("/Last")] = IndirectObject(last, 0, None)
+            outlines[NameObject("/Count")] = NumberObject(count + visible)
+            self._write_object(outlines_id, outlines)
+
+        self._write_incremental_xref()
+
+    def _write_incremental_xref(self):
+        """写入只包含本次写出对象的交叉引用表，按连续对象号分段"""
+        state = self._state
+        xref_offset = self._stream.tell()
+        written = [i for i, offset in enumerate(self._offsets) if offset is not None]
+        self._stream.write(b"xref\n")
+        start = 0
+        while start < len(written):
+            end = start
+            while end + 1 < len(written) and written[end + 1] == written[end] + 1:
+                end += 1
+            self._stream.write(f"{written[start]} {end - start + 1}\n".encode("ascii"))
+            for obj_id in written[start:end + 1]:
+                self._stream.write(f"{self._offsets[obj_id]:010d} 00000 n \n".encode("ascii"))
+            start = end + 1
+        info = f" /Info {state['info_id']} 0 R" if state["info_id"] is not None else ""
+        self._stream.write(f"trailer\n<< /Size {len(self._offsets)} /Root {state['root_id']} 0 R{info}"
+                           f" /Prev {state['prev']} >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("ascii"))
+
+
+def append_pdf_files_incremental(out_path, files, titles=None, stop_flag=None, on_file_done=None):
+    """以PDF增量更新方式把新的源文件追加到已有合并文件的末尾
+
+    Args:
+        out_path: 已有的合并文件
+        files: 要追加的源文件路径列表（按合并顺序）
+        titles: 与 files 对应的顶层书签标题，None 表示使用文件名（不含扩展名）
+        stop_flag: 停止标志（单元素列表），被设置时放弃追加
+        on_file_done: 每追加完一个文件后的回调，参数为 (序号, 文件路径)
+
+    Returns:
+        完成返回 True；被停止返回 False（文件恢复原样）；文件结构不支持增量更新时返回 None（未修改文件）
+    """
+    state = IncrementalPdfAppender.read_state(out_path)
+    if state is None:
+        return None
+    if titles is None:
+        titles = [os.path.splitext(os.path.basename(fp))[0] for fp in files]
+    original_stat = os.stat(out_path)
+    completed = False
+    try:
+        with open(out_path, "r+b") as f:
+            original_size = f.seek(0, os.SEEK_END)
+            try:
+                writer = IncrementalPdfAppender(f, state)
+                for i, fp in enumerate(files):
+                    if stop_flag is not None and stop_flag[0]:
+                        return False
+                    if not writer.append(fp, title=titles[i], stop_flag=stop_flag):
+                        return False
+                    if on_file_done:
+                        on_file_done(i, fp)
+                writer.close()
+                completed = True
+                return True
+            finally:
+                if not completed:
+                    # 截断到追加前的长度，恢复原文件
+                    f.truncate(original_size)
+    finally:
+        if not completed:
+            # 同时恢复修改时间，合并清单仍能识别该文件
+            os.utime(out_path, ns=(original_stat.st_atime_ns, original_stat.st_mtime_ns))
+
+def _digest_object(obj, refs):
+    """计算对象自身内容的哈希：间接引用以占位符代替，并按出现顺序收集到 refs"""
+    h = hashlib.sha1()
+
+    def feed(o):
+        if isinstance(o, IndirectObject):
+            refs.append((o.idnum, o.generation))
+            h.update(b"R ")
+        elif isinstance(o, DictionaryObject):
+            h.update(b"S<<" if isinstance(o, StreamObject) else b"<<")
+            for key in sorted(o.keys()):
+                if key != "/Length":
+                    h.update(key.encode("utf-8"))
+                    feed(o.raw_get(key))
+            h.update(b">>")
+            if isinstance(o, StreamObject):
+                h.update(o._data)
+        elif isinstance(o, ArrayObject):
+            h.update(b"[")
+            for item in o:
+                feed(item)
+            h.update(b"]")
+        else:
+            buffer = io.BytesIO()
+            o.write_to_stream(buffer)
+            h.update(buffer.getvalue())
+            h.update(b" ")
+
+    feed(obj)
+    return h.digest()
+
+
+def _recompress(stream_obj, level):
+    """用指定级别重新压缩流：只处理未压缩或仅 FlateDecode（无预测器参数）的流，结果更小时才替换"""
+    filters = stream_obj.get("/Filter")
+    if isinstance(filters, ArrayObject) and len(filters) == 1:
+        filters = filters[0]
+    raw = stream_obj._data
+    if filters is None:
+        data = raw
+    elif filters == "/FlateDecode" and "/DecodeParms" not in stream_obj:
+        try:
+            data = zlib.decompress(raw)
+        except zlib.error:
+            return
+    else:
+        return
+    packed = zlib.compress(data, level)
+    if len(packed) < len(raw):
+        stream_obj[NameObject("/Filter")] = NameObject("/FlateDecode")
+        stream_obj._data = packed
+
+
+def optimize_pdf(in_path, out_path, compression_level=6, stop_flag=None):
+    """优化PDF：合并内容相同的间接对象，并重新压缩流
+
+    第一遍从文档目录出发遍历所有可达对象，只保存每个对象的内容哈希与引用列表；
+    随后迭代计算等价类（引用的对象被合并后，引用它们的对象也可能变得相同，如字体描述符、字体字典）。
+    第二遍只写出每个等价类的代表对象，未被引用的对象自然被丢弃。
+    读取过的对象会从读取器缓存中移除，内存占用与文件大小无关。
+
+    Args:
+        in_path: 输入PDF路径
+        out_path: 输出PDF路径（不能与输入相同）
+        compression_level: zlib 压缩级别（1-9），0 表示不重新压缩
+        stop_flag: 停止标志（单元素列表）
+
+    Returns:
+        dict: {"objects": 原对象数, "duplicates": 被合并的对象数}，被停止时返回 None
+    """
+    with PdfReader(in_path) as reader:
+        if reader.is_encrypted:
+            reader.decrypt("")
+        trailer = reader.trailer
+        roots = [trailer.raw_get(key) for key in ("/Root", "/Info")
+                 if key in trailer and isinstance(trailer.raw_get(key), IndirectObject)]
+
+        def load(key):
+            obj = reader.get_object(IndirectObject(key[0], key[1], reader))
+            # 用完即从读取器缓存移除，避免整个文件常驻内存
+            reader.resolved_objects.pop((key[1], key[0]), None)
+            return obj
+
+        # 第一遍：内容哈希与引用关系
+        digests = {}
+        references = {}
+        unique = set()
+        order = []
+        queue = deque((r.idnum, r.generation) for r in roots)
+        seen = set(queue)
+        while queue:
+            if stop_flag is not None and stop_flag[0]:
+                return None
+            key = queue.popleft()
+            order.append(key)
+            obj = load(key)
+            refs = []
+            digests[key] = _digest_object(obj, refs) if obj is not None else b""
+            references[key] = refs
+            if obj is None or (isinstance(obj, DictionaryObject) and obj.get("/Type") in _UNIQUE_TYPES):
+                unique.add(key)
+            for ref_key in refs:
+                if ref_key not in seen:
+                    seen.add(ref_key)
+                    queue.append(ref_key)
+
+        # 迭代合并等价对象，直到不再变化
+        canon = {key: key for key in order}
+        while True:
+            groups = {}
+            changed = False
+            for key in order:
+                if key in unique:
+                    continue
+                signature = (digests[key], tuple(canon.get(r, r) for r in references[key]))
+                representative = groups.setdefault(signature, key)
+                if canon[key] != representative:
+                    canon[key] = representative
+                    changed = True
+            if not changed:
+                break
+        digests.clear()
+        references.clear()
+
+        # 第二遍：只写出代表对象
+        tmp_path = out_path + ".tmp"
+        completed = False
+        try:
+            with open(tmp_path, "wb") as f:
+                writer = _PdfObjectWriter(f)
+                new_ids = {}
+                pending = deque()
+
+                def ref(indirect):
+                    key = canon.get((indirect.idnum, indirect.generation), (indirect.idnum, indirect.generation))
+                    if key not in new_ids:
+                        new_ids[key] = writer._reserve()
+                        pending.append(key)
+                    return IndirectObject(new_ids[key], 0, None)
+
+                root_refs = [ref(r) for r in roots]
+                while pending:
+                    if stop_flag is not None and stop_flag[0]:
+                        return None
+                    key = pending.popleft()
+                    obj = load(key)
+                    clone = writer._remap(obj, ref) if obj is not None else NullObject()
+                    if compression_level and isinstance(clone, StreamObject):
+                        _recompress(clone, compression_level)
+                    writer._write_object(new_ids[key], clone)
+                info_id = root_refs[1].idnum if len(root_refs) > 1 else None
+                writer._write_xref(root_refs[0].idnum, info_id)
+            os.replace(tmp_path, out_path)
+            completed = True
+        finally:
+            if not completed and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    distinct = len(set(canon.values()))
+    return {"objects": len(order), "duplicates": len(order) - distinct}
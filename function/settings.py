@@ -5,6 +5,9 @@
 
 import os
 import sys
+import time
+import atexit
+import threading
 import configparser
 
 # 全局常量与路径
@@ -29,72 +32,173 @@ DEFAULT_JPN_STYLE = "Style: JPN - EPSON 太明朝体,EPSON 太明朝体Ｂ,14,&H
 DEFAULT_ENG_STYLE = "Style: ENG,Bosch Office Sans,16,&H0126FCFF,&H000000FF,&H14000000,&H00000000,0,0,0,0,100,100,0,0,1,1.8,0,2,10,10,15,1"
 DEFAULT_CHN_STYLE = "Style: CHN - Drama,小米兰亭,17,&H28FFFFFF,&H000000FF,&H64000000,&H00000000,-1,0,0,0,100,100,0,0,1,0.5,0,2,10,10,15,1"
 
-class SettingsHandler:
-    """配置处理类，负责INI配置文件的读写操作"""
-    
-    @staticmethod
-    def load_all_configs():
-        """从SubtitleToolbox.ini读取所有配置
-        
-        Returns:
-            dict: 包含所有配置的字典
-        """
-        # 创建支持中文的ConfigParser实例
-        c = configparser.ConfigParser(
-            default_section='DEFAULT',
-            allow_no_value=False,
-            strict=True,
-            empty_lines_in_values=False,
-            comment_prefixes=('#', ';'),
-            inline_comment_prefixes=None,
-            delimiters=('=', ':'),
-            converters={},
-            interpolation=None
-        )
+def _new_config_parser():
+    """创建支持中文的ConfigParser实例"""
+    return configparser.ConfigParser(
+        default_section='DEFAULT',
+        allow_no_value=False,
+        strict=True,
+        empty_lines_in_values=False,
+        comment_prefixes=('#', ';'),
+        inline_comment_prefixes=None,
+        delimiters=('=', ':'),
+        converters={},
+        interpolation=None
+    )
+
+
+class SettingsService:
+    """进程内共享的配置服务
+
+    控制器、Srt2Ass 与字幕生成共用同一份内存中的配置：
+    - 读取时最多每 check_interval 秒检查一次文件的修改时间与大小，文件被外部修改时才重新解析，
+      热路径上不访问磁盘
+    - 解析后的样式记录按样式行缓存
+    - 保存时先写临时文件再替换，不会留下写了一半的配置文件；
+      指定 delay 时在延迟内的多次保存合并为一次写入
+    """
+
+    def __init__(self, path, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._data = None
+        self._signature = None
+        self._checked_at = 0.0
+        self._pending = None
+        self._timer = None
+        self._style_cache = {}
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _read(self):
+        c = _new_config_parser()
         data = {}
-        
-        if os.path.exists(CONFIG_FILE):
+        if os.path.exists(self.path):
             try:
-                # 使用utf-8编码读取配置文件
-                c.read(CONFIG_FILE, encoding="utf-8")
+                # utf-8-sig 同时兼容带 BOM 与不带 BOM 的配置文件
+                c.read(self.path, encoding="utf-8-sig")
                 # 读取所有 section
                 for section in c.sections():
                     data[section] = dict(c.items(section))
             except Exception as e:
                 print(f"配置文件读取失败: {e}")
-        
         return data
 
-    @staticmethod
-    def save_all_configs(config_data):
-        """保存所有配置到SubtitleToolbox.ini
-        
+    def get_all(self):
+        """返回所有配置 {section: {key: value}}（共享的只读数据，修改请使用 update 或 save）"""
+        with self._lock:
+            now = time.monotonic()
+            if self._data is None or now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                signature = self._file_signature()
+                if self._data is None or signature != self._signature:
+                    self._data = self._read()
+                    self._signature = signature
+            return self._data
+
+    def reload(self):
+        """立即重新读取配置文件（例如用户手动修改后点击"读取配置"）"""
+        with self._lock:
+            self._data = None
+            return self.get_all()
+
+    def parse_style(self, style_line):
+        """解析后的样式记录（按样式行缓存）"""
+        record = self._style_cache.get(style_line)
+        if record is None:
+            record = self._style_cache[style_line] = SettingsHandler.parse_ass_style(style_line)
+        return record
+
+    def save(self, config_data, delay=None):
+        """保存全部配置
+
         Args:
-            config_data: 包含所有配置的字典，格式为 {"section_name": {"key": "value"}}
+            config_data: {section: {key: value}}
+            delay: 延迟写入的秒数，None 表示立即写入；延迟期间再次保存时只写入最后一次的内容
         """
-        # 创建支持中文的ConfigParser实例
-        c = configparser.ConfigParser(
-            default_section='DEFAULT',
-            allow_no_value=False,
-            strict=True,
-            empty_lines_in_values=False,
-            comment_prefixes=('#', ';'),
-            inline_comment_prefixes=None,
-            delimiters=('=', ':'),
-            converters={},
-            interpolation=None
-        )
-        
+        data = {section: {key: str(value) for key, value in values.items()}
+                for section, values in config_data.items()}
+        with self._lock:
+            self._data = data
+            self._checked_at = time.monotonic()
+            self._pending = data
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if delay is None:
+                self._write_pending()
+            else:
+                self._timer = threading.Timer(delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def update(self, sections, delay=None):
+        """合并更新部分 section 后保存"""
+        with self._lock:
+            data = {section: dict(values) for section, values in self.get_all().items()}
+            for section, values in sections.items():
+                data.setdefault(section, {}).update(values)
+            self.save(data, delay=delay)
+
+    def flush(self):
+        """立即写入尚未写入的配置"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._write_pending()
+
+    def _write_pending(self):
+        if self._pending is None:
+            return
+        c = _new_config_parser()
         # 写入所有 section
-        for section_name, section_data in config_data.items():
+        for section_name, section_data in self._pending.items():
             if not c.has_section(section_name):
                 c.add_section(section_name)
             for key, value in section_data.items():
-                c.set(section_name, key, str(value))
+                c.set(section_name, key, value)
+
+        # 先写临时文件再替换，写入中断时原配置文件保持完整
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                c.write(f)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._pending = None
+        # 自己写入的文件不需要重新读取
+        self._signature = self._file_signature()
 
-        # 使用utf-8编码写入配置文件
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            c.write(f)
+
+class SettingsHandler:
+    """配置处理类，负责INI配置文件的读写操作"""
+    
+    @staticmethod
+    def load_all_configs():
+        """从SubtitleToolbox.ini读取所有配置（经由共享的配置服务，文件未变化时不重新读取）
+        
+        Returns:
+            dict: 包含所有配置的字典
+        """
+        return {section: dict(values) for section, values in settings_service.get_all().items()}
+
+    @staticmethod
+    def save_all_configs(config_data):
+        """保存所有配置到SubtitleToolbox.ini（原子替换）
+        
+        Args:
+            config_data: 包含所有配置的字典，格式为 {"section_name": {"key": "value"}}
+        """
+        settings_service.save(config_data)
 
     @staticmethod
     def parse_ass_style(style_line):
@@ -121,6 +225,19 @@ class SettingsHandler:
             "raw": style_line.strip()
         }
 
+# 进程内共享的配置服务（退出前写入尚未写入的延迟保存）
+settings_service = SettingsService(CONFIG_FILE)
+atexit.register(settings_service.flush)
+
+
+def _get_int(section, key, default):
+    """读取整数配置项，缺失、为空或不是整数（如手动改错）时使用默认值"""
+    try:
+        return int(section.get(key, default))
+    except (TypeError, ValueError):
+        return default
+
+
 class ConfigManager:
     """配置管理器，负责加载和保存所有应用程序配置"""
     
@@ -148,6 +265,11 @@ class ConfigManager:
         self.merge_output_dir = ""  # Merge模式输出目录
         self.srt2ass_dir = ""  # Srt2Ass模式源目录
         self.srt2ass_output_dir = ""  # Srt2Ass模式输出目录
+        self.srt2ass_workers = 1  # Srt2Ass并行转换的进程数（1表示串行，0表示CPU核心数）
+        self.srt2ass_align = "off"  # Srt2Ass时间轴对齐方式（off不对齐/snap吸附/merge合并）
+        self.srt2ass_align_tolerance = 200  # Srt2Ass时间轴对齐容差（毫秒）
+        self.srt2ass_recursive = False  # Srt2Ass是否递归处理所有子目录
+        self.srt2ass_convert_vtt = False  # Srt2Ass是否先把源目录中的VTT转换为SRT
         self.autosub_dir = ""  # AutoSub模式源目录
         self.autosub_output_dir = ""  # AutoSub模式输出目录
 
@@ -167,6 +289,11 @@ class ConfigManager:
         self.merge_word = True  # 是否合并Word
         self.merge_txt = True  # 是否合并TXT
         self.merge_md = True  # 是否合并Markdown
+        self.word_merge_engine = "xml"  # Word合并引擎（xml/win32）
+        self.pdf_merge_streaming = False  # 是否使用流式（内存受限）PDF合并模式
+        self.pdf_merge_optimize = False  # 合并后是否优化PDF（去除重复对象并重新压缩）
+        self.pdf_merge_compression_level = 6  # PDF优化时的zlib压缩级别（0表示不重新压缩）
+        self.pdf_merge_tree_threshold = 500  # PDF分层并行合并的启用文件数（0表示不使用）
 
         # 主题相关变量
         self.theme_mode = "System"  # 主题模式
@@ -174,12 +301,24 @@ class ConfigManager:
         # 分卷相关设置
         self.volume_pattern = "智能"  # 分卷模式
 
+        # PDF 生成相关设置
+        self.pdf_streaming = False  # 是否使用流式（内存受限）PDF生成模式
+        self.pdf_profile = "standard"  # PDF输出方案（standard/fast/compact/archival）
+        self.word_backend = "docx"  # Word生成后端（docx/stream）
+
         # Whisper 模型相关设置
         self.whisper_model = "默认"  # 当前 Whisper 模型
         self.whisper_model_path = "C:/Users/jiedi/AppData/Roaming/PotPlayerMini64/Model/faster-whisper-large-v3-turbo"  # Whisper 模型目录路径（默认值）
         self.whisper_language = "auto"  # Whisper 语言设置（"auto" 表示自动检测）
         self.whisper_engine = "GPU"  # Whisper 引擎设置（"GPU" 或 "CPU"）
         self.cuda_library_path = ""  # CUDA 库路径（用于 GPU 加速）
+        self.model_idle_timeout = 600  # AutoSub 模型空闲多久后卸载（秒），0 表示每次运行后立即卸载
+        self.worker_hang_timeout = 600  # AutoSub 识别进程多久没有识别进展视为卡死并结束（秒），0 表示不检查
+        self.whisper_batch_size = 0  # AutoSub 批量推理的批大小（0 或 1 表示逐块顺序识别）
+        self.cpu_compute_type = "auto"  # AutoSub CPU模式的计算类型（"auto" 表示自动调优，或 int8/int8_float32/float32）
+        self.cpu_threads = 0  # AutoSub CPU模式的线程数（0 表示由自动调优决定，未调优时使用全部核心）
+        self.cpu_autotune = ""  # AutoSub CPU自动调优结果（"机器标识;计算类型;线程数"）
+        self.parallel_files = 0  # AutoSub 批量处理时同时识别的文件数（0 表示按CPU核心数与可用内存自动选择，GPU模式为1）
 
     def load_settings(self):
         """从配置文件加载设置"""
@@ -199,6 +338,9 @@ class ConfigManager:
         self.output2word = script_config.get("output2word", "True") == "True"
         self.output2txt = script_config.get("output2txt", "True") == "True"
         self.output2md = script_config.get("output2md", "True") == "True"
+        self.pdf_streaming = script_config.get("pdf_streaming", "False") == "True"
+        self.pdf_profile = script_config.get("pdf_profile", "standard")
+        self.word_backend = script_config.get("word_backend", "docx")
 
         # Merge 模式路径
         merge_config = data.get("Merge", {})
@@ -208,11 +350,21 @@ class ConfigManager:
         self.merge_word = merge_config.get("merge_word", "True") == "True"
         self.merge_txt = merge_config.get("merge_txt", "True") == "True"
         self.merge_md = merge_config.get("merge_md", "True") == "True"
+        self.word_merge_engine = merge_config.get("word_merge_engine", "xml")
+        self.pdf_merge_streaming = merge_config.get("pdf_merge_streaming", "False") == "True"
+        self.pdf_merge_optimize = merge_config.get("pdf_merge_optimize", "False") == "True"
+        self.pdf_merge_compression_level = _get_int(merge_config, "pdf_merge_compression_level", 6)
+        self.pdf_merge_tree_threshold = _get_int(merge_config, "pdf_merge_tree_threshold", 500)
 
         # Srt2Ass 模式路径
         srt2ass_config = data.get("Srt2Ass", {})
         self.srt2ass_dir = srt2ass_config.get("srt2ass_dir", "")
         self.srt2ass_output_dir = srt2ass_config.get("srt2ass_output_dir", "")
+        self.srt2ass_workers = _get_int(srt2ass_config, "srt2ass_workers", 1)
+        self.srt2ass_align = srt2ass_config.get("srt2ass_align", "off")
+        self.srt2ass_align_tolerance = _get_int(srt2ass_config, "srt2ass_align_tolerance", 200)
+        self.srt2ass_recursive = srt2ass_config.get("srt2ass_recursive", "False") == "True"
+        self.srt2ass_convert_vtt = srt2ass_config.get("srt2ass_convert_vtt", "False") == "True"
 
         # AutoSub 模式路径
         autosub_config = data.get("AutoSub", {})
@@ -243,6 +395,13 @@ class ConfigManager:
         
         # 加载 CUDA 库路径
         self.cuda_library_path = autosub_config.get("cuda_library_path", "")
+        self.model_idle_timeout = _get_int(autosub_config, "model_idle_timeout", 600)
+        self.worker_hang_timeout = _get_int(autosub_config, "worker_hang_timeout", 600)
+        self.whisper_batch_size = _get_int(autosub_config, "whisper_batch_size", 0)
+        self.cpu_compute_type = autosub_config.get("cpu_compute_type", "auto")
+        self.cpu_threads = _get_int(autosub_config, "cpu_threads", 0)
+        self.cpu_autotune = autosub_config.get("cpu_autotune", "")
+        self.parallel_files = _get_int(autosub_config, "parallel_files", 0)
 
         # 加载主题设置
         appearance = data.get("Appearance", {})
@@ -368,6 +527,10 @@ class ConfigManager:
             "kor_jpn": "韩上日下"
         }
         ass_pattern_to_save = preset_mapping.get(self.ass_pattern, "韩上中下")
+
+        # CPU自动调优结果由识别进程写入配置文件，以文件中的值为准：
+        # 识别期间（首次调优可能需要几分钟）保存设置时不会用内存中的旧值覆盖刚写入的调优结果
+        self.cpu_autotune = settings_service.reload().get("AutoSub", {}).get("cpu_autotune", self.cpu_autotune)
         
         # 准备各部分的配置
         config_data = {
@@ -385,17 +548,32 @@ class ConfigManager:
                 "output2pdf": str(self.output2pdf),
                             "output2word": str(self.output2word),
                             "output2txt": str(self.output2txt),
-                            "output2md": str(self.output2md)            },
+                            "output2md": str(self.output2md),
+                "pdf_streaming": str(self.pdf_streaming),
+                "pdf_profile": self.pdf_profile,
+                "word_backend": self.word_backend
+            },
             "Merge": {
                 "merge_dir": self.merge_dir.strip() if hasattr(self, 'merge_dir') else "",
                 "merge_output_dir": self.merge_output_dir.strip() if hasattr(self, 'merge_output_dir') else "",
                 "merge_pdf": str(self.merge_pdf),
                             "merge_word": str(self.merge_word),
                             "merge_txt": str(self.merge_txt),
-                            "merge_md": str(self.merge_md)            },
+                            "merge_md": str(self.merge_md),
+                "word_merge_engine": self.word_merge_engine,
+                "pdf_merge_streaming": str(self.pdf_merge_streaming),
+                "pdf_merge_optimize": str(self.pdf_merge_optimize),
+                "pdf_merge_compression_level": str(self.pdf_merge_compression_level),
+                "pdf_merge_tree_threshold": str(self.pdf_merge_tree_threshold)
+            },
             "Srt2Ass": {
                 "srt2ass_dir": self.srt2ass_dir.strip() if hasattr(self, 'srt2ass_dir') else "",
-                "srt2ass_output_dir": self.srt2ass_output_dir.strip() if hasattr(self, 'srt2ass_output_dir') else ""
+                "srt2ass_output_dir": self.srt2ass_output_dir.strip() if hasattr(self, 'srt2ass_output_dir') else "",
+                "srt2ass_workers": str(self.srt2ass_workers),
+                "srt2ass_align": self.srt2ass_align,
+                "srt2ass_align_tolerance": str(self.srt2ass_align_tolerance),
+                "srt2ass_recursive": str(self.srt2ass_recursive),
+                "srt2ass_convert_vtt": str(self.srt2ass_convert_vtt)
             },
             "AutoSub": {
                 "autosub_dir": self.autosub_dir.strip() if hasattr(self, 'autosub_dir') else "",
@@ -409,7 +587,14 @@ class ConfigManager:
                     "zh": "中文"
                 }.get(self.whisper_language, "自动") if hasattr(self, 'whisper_language') else "自动",
                 "whisper_engine": self.whisper_engine if hasattr(self, 'whisper_engine') else "GPU",
-                "cuda_library_path": self.cuda_library_path.strip() if hasattr(self, 'cuda_library_path') else ""
+                "cuda_library_path": self.cuda_library_path.strip() if hasattr(self, 'cuda_library_path') else "",
+                "model_idle_timeout": str(self.model_idle_timeout),
+                "worker_hang_timeout": str(self.worker_hang_timeout),
+                "whisper_batch_size": str(self.whisper_batch_size),
+                "cpu_compute_type": self.cpu_compute_type,
+                "cpu_threads": str(self.cpu_threads),
+                "cpu_autotune": self.cpu_autotune,
+                "parallel_files": str(self.parallel_files)
             }
         }
 
@@ -443,8 +628,8 @@ class ConfigManager:
 
         if self.ass_pattern == "kor_jpn":
             # 韩日双语：解析 kor 和 jpn 样式
-            self.kor_parsed = SettingsHandler.parse_ass_style(curr_preset["kor"])
-            self.jpn_parsed = SettingsHandler.parse_ass_style(curr_preset["jpn"])
+            self.kor_parsed = settings_service.parse_style(curr_preset["kor"])
+            self.jpn_parsed = settings_service.parse_style(curr_preset["jpn"])
         else:
             # 其他预设：外语 + 中文
             lang_key_mapping = {
@@ -455,8 +640,8 @@ class ConfigManager:
             lang_key = lang_key_mapping[self.ass_pattern]
 
             # 解析外语和中文样式
-            self.kor_parsed = SettingsHandler.parse_ass_style(curr_preset[lang_key])
-            self.chn_parsed = SettingsHandler.parse_ass_style(curr_preset["chn"])
+            self.kor_parsed = settings_service.parse_style(curr_preset[lang_key])
+            self.chn_parsed = settings_service.parse_style(curr_preset["chn"])
 
     def get_whisper_model_config(self):
         """
@@ -726,8 +911,20 @@ class ConfigManager:
         self.merge_output_dir = controller.merge_output_dir if hasattr(controller, 'merge_output_dir') else ""
         self.srt2ass_dir = controller.srt2ass_dir if hasattr(controller, 'srt2ass_dir') else ""
         self.srt2ass_output_dir = controller.srt2ass_output_dir if hasattr(controller, 'srt2ass_output_dir') else ""
+        self.srt2ass_workers = controller.srt2ass_workers if hasattr(controller, 'srt2ass_workers') else 1
+        self.srt2ass_align = controller.srt2ass_align if hasattr(controller, 'srt2ass_align') else "off"
+        self.srt2ass_align_tolerance = controller.srt2ass_align_tolerance if hasattr(controller, 'srt2ass_align_tolerance') else 200
+        self.srt2ass_recursive = controller.srt2ass_recursive if hasattr(controller, 'srt2ass_recursive') else False
+        self.srt2ass_convert_vtt = controller.srt2ass_convert_vtt if hasattr(controller, 'srt2ass_convert_vtt') else False
         self.autosub_dir = controller.autosub_dir if hasattr(controller, 'autosub_dir') else ""
         self.autosub_output_dir = controller.autosub_output_dir if hasattr(controller, 'autosub_output_dir') else ""
+        self.model_idle_timeout = controller.model_idle_timeout if hasattr(controller, 'model_idle_timeout') else 600
+        self.worker_hang_timeout = controller.worker_hang_timeout if hasattr(controller, 'worker_hang_timeout') else 600
+        self.whisper_batch_size = controller.whisper_batch_size if hasattr(controller, 'whisper_batch_size') else 0
+        self.cpu_compute_type = controller.cpu_compute_type if hasattr(controller, 'cpu_compute_type') else "auto"
+        self.cpu_threads = controller.cpu_threads if hasattr(controller, 'cpu_threads') else 0
+        self.cpu_autotune = controller.cpu_autotune if hasattr(controller, 'cpu_autotune') else ""
+        self.parallel_files = controller.parallel_files if hasattr(controller, 'parallel_files') else 0
 
         # 预设相关变量
         self.ass_pattern = controller.ass_pattern
@@ -743,12 +940,20 @@ class ConfigManager:
         self.merge_word = controller.merge_word
         self.merge_txt = controller.merge_txt
         self.merge_md = controller.merge_md
+        self.word_merge_engine = controller.word_merge_engine if hasattr(controller, 'word_merge_engine') else "xml"
+        self.pdf_merge_streaming = controller.pdf_merge_streaming if hasattr(controller, 'pdf_merge_streaming') else False
+        self.pdf_merge_optimize = controller.pdf_merge_optimize if hasattr(controller, 'pdf_merge_optimize') else False
+        self.pdf_merge_compression_level = controller.pdf_merge_compression_level if hasattr(controller, 'pdf_merge_compression_level') else 6
+        self.pdf_merge_tree_threshold = controller.pdf_merge_tree_threshold if hasattr(controller, 'pdf_merge_tree_threshold') else 500
 
         # 主题相关变量
         self.theme_mode = controller.theme_mode
 
         # 分卷相关设置
         self.volume_pattern = controller.volume_pattern
+        self.pdf_streaming = controller.pdf_streaming if hasattr(controller, 'pdf_streaming') else False
+        self.pdf_profile = controller.pdf_profile if hasattr(controller, 'pdf_profile') else "standard"
+        self.word_backend = controller.word_backend if hasattr(controller, 'word_backend') else "docx"
         
         # Whisper 模型相关设置
         self.whisper_model = controller.whisper_model
@@ -768,6 +973,11 @@ class ConfigManager:
         controller.merge_output_dir = self.merge_output_dir if hasattr(self, 'merge_output_dir') else ""
         controller.srt2ass_dir = self.srt2ass_dir if hasattr(self, 'srt2ass_dir') else ""
         controller.srt2ass_output_dir = self.srt2ass_output_dir if hasattr(self, 'srt2ass_output_dir') else ""
+        controller.srt2ass_workers = self.srt2ass_workers
+        controller.srt2ass_align = self.srt2ass_align
+        controller.srt2ass_align_tolerance = self.srt2ass_align_tolerance
+        controller.srt2ass_recursive = self.srt2ass_recursive
+        controller.srt2ass_convert_vtt = self.srt2ass_convert_vtt
         controller.autosub_dir = self.autosub_dir if hasattr(self, 'autosub_dir') else ""
         controller.autosub_output_dir = self.autosub_output_dir if hasattr(self, 'autosub_output_dir') else ""
 
@@ -785,12 +995,20 @@ class ConfigManager:
         controller.merge_word = self.merge_word
         controller.merge_txt = self.merge_txt
         controller.merge_md = self.merge_md
+        controller.word_merge_engine = self.word_merge_engine
+        controller.pdf_merge_streaming = self.pdf_merge_streaming
+        controller.pdf_merge_optimize = self.pdf_merge_optimize
+        controller.pdf_merge_compression_level = self.pdf_merge_compression_level
+        controller.pdf_merge_tree_threshold = self.pdf_merge_tree_threshold
 
         # 主题相关变量
         controller.theme_mode = self.theme_mode
 
         # 分卷相关设置
         controller.volume_pattern = self.volume_pattern
+        controller.pdf_streaming = self.pdf_streaming
+        controller.pdf_profile = self.pdf_profile
+        controller.word_backend = self.word_backend
 
         # Whisper 模型相关设置
         controller.whisper_model = self.whisper_model
@@ -798,6 +1016,13 @@ class ConfigManager:
         controller.whisper_language = self.whisper_language if hasattr(self, 'whisper_language') else "auto"
         controller.whisper_engine = self.whisper_engine if hasattr(self, 'whisper_engine') else "GPU"
         controller.cuda_library_path = self.cuda_library_path if hasattr(self, 'cuda_library_path') else ""
+        controller.model_idle_timeout = self.model_idle_timeout
+        controller.worker_hang_timeout = self.worker_hang_timeout
+        controller.whisper_batch_size = self.whisper_batch_size
+        controller.cpu_compute_type = self.cpu_compute_type
+        controller.cpu_threads = self.cpu_threads
+        controller.cpu_autotune = self.cpu_autotune
+        controller.parallel_files = self.parallel_files
 
         # 同步解析后的样式
         controller.kor_parsed = self.kor_parsed
@@ -0,0 +1,512 @@
+"""
+字幕格式转换模块
+以毫秒为单位的统一字幕条目（Cue）为中间模型，提供 SRT / VTT / ASS / SMI 的流式读取与写入：
+读取器逐行解析、逐条产出，写入器逐条写出，转换时内存占用与文件大小无关。
+目录级批量转换把每个文件作为独立任务，可在进程池中并行转换。
+
+命令行用法：python -m function.subconvert 目录或文件... --to srt [--workers 0] [--output 输出目录]
+"""
+
+import os
+import re
+import html
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from function.file_utils import detect_text_encoding, emit_progress
+from font.srt2ass import format_ass_time
+
+__all__ = [
+    'Cue',
+    'SUPPORTED_FORMATS',
+    'read_cues',
+    'write_cues',
+    'convert_subtitle',
+    'collect_subtitle_files',
+    'convert_subtitle_batch'
+]
+
+# 统一的字幕条目：起止时间为整数毫秒，text 以 \n 分行，可包含 <i> <b> <u> 标记
+Cue = namedtuple("Cue", "start end text")
+
+SUPPORTED_FORMATS = ("srt", "vtt", "ass", "smi")
+
+# 后缀 -> 格式
+_EXTENSIONS = {".srt": "srt", ".vtt": "vtt", ".ass": "ass", ".ssa": "ass", ".smi": "smi", ".sami": "smi"}
+
+# 写入缓冲区大小
+_WRITE_BUFFER = 1024 * 1024
+
+# 时间轴行：SRT 用逗号、VTT 用点分隔毫秒，VTT 可省略小时
+_CLOCK = r'(?:\d+:)?\d{1,2}:\d{1,2}[,.]\d{1,3}'
+_TIMING = re.compile(rf'({_CLOCK})\s*-->\s*({_CLOCK})')
+
+# VTT 中需要跳过的非字幕块
+_VTT_SKIP_BLOCKS = ("NOTE", "STYLE", "REGION")
+
+# 保留的行内标记，其余标签（VTT 的 <c.xxx>、<v 说话人>、时间标签，SMI 的 <font> 等）去掉
+_OTHER_TAGS = re.compile(r'<(?!/?[ibu]>)[^>]*>', re.IGNORECASE)
+_ESCAPED_TAGS = re.compile(r'&lt;(/?[ibu])&gt;', re.IGNORECASE)
+
+# ASS 的覆盖标签与换行
+_ASS_OVERRIDE = re.compile(r'\{[^}]*\}')
+_ASS_MARKUP = {"<i>": r"{\i1}", "</i>": r"{\i0}", "<b>": r"{\b1}", "</b>": r"{\b0}", "<u>": r"{\u1}", "</u>": r"{\u0}"}
+_ASS_MARKUP_PATTERN = re.compile("|".join(re.escape(k) for k in _ASS_MARKUP), re.IGNORECASE)
+_ASS_TAGS = {v.lower(): k for k, v in _ASS_MARKUP.items()}
+_ASS_TAGS_PATTERN = re.compile("|".join(re.escape(v) for v in _ASS_MARKUP.values()), re.IGNORECASE)
+
+# SMI 的同步点、段落与换行
+_SMI_SYNC = re.compile(r'<sync\b[^>]*?start\s*=\s*["\']?(\d+)[^>]*>', re.IGNORECASE)
+_SMI_PARAGRAPH = re.compile(r'<p\b(?:[^>]*?class\s*=\s*["\']?([\w-]+))?[^>]*>', re.IGNORECASE)
+_SMI_BREAK = re.compile(r'<br\s*/?>', re.IGNORECASE)
+_SMI_END = re.compile(r'</(?:body|sami)>.*', re.IGNORECASE | re.DOTALL)
+# SMI 多为韩语字幕，不是 UTF-8 时优先按 CP949 解码
+_SMI_ENCODINGS = ("cp949", "gb18030", "big5")
+# 最后一个同步点之后没有清屏同步时，字幕的显示时长
+_SMI_LAST_DURATION = 5000
+
+_ASS_HEADER = (
+    "[Script Info]\nScriptType: v4.00+\nWrapStyle: 0\nScaledBorderAndShadow: yes\n\n"
+    "[V4+ Styles]\nFormat: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, "
+    "OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, "
+    "Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding\n"
+    "Style: Default,Arial,20,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,1,0,2,10,10,10,1\n\n"
+    "[Events]\nFormat: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+)
+
+_SMI_HEADER = (
+    "<SAMI>\n<HEAD>\n<TITLE></TITLE>\n<STYLE TYPE=\"text/css\">\n<!--\n"
+    "P { margin-left:8pt; margin-right:8pt; margin-bottom:2pt; margin-top:2pt;\n"
+    "    text-align:center; font-size:20pt; font-family:Arial, Sans-serif; font-weight:normal; color:white; }\n"
+    ".KRCC { Name:Korean; lang:ko-KR; SAMIType:CC; }\n"
+    "-->\n</STYLE>\n</HEAD>\n<BODY>\n"
+)
+
+
+def _open_text(path, fallback_encodings=None):
+    """按识别出的编码打开文本文件，跳过 BOM"""
+    if fallback_encodings:
+        encoding, bom_length = detect_text_encoding(path, fallback_encodings=fallback_encodings)
+    else:
+        encoding, bom_length = detect_text_encoding(path)
+    f = open(path, 'r', encoding=encoding, errors='replace')
+    if bom_length:
+        f.read(1)
+    return f
+
+
+def _parse_clock(value):
+    """[H:]MM:SS[,.]mmm 转换为毫秒（小数部分按位数补齐，.5 为 500 毫秒）"""
+    clock, fraction = re.split(r'[,.]', value.strip())
+    seconds = 0
+    for part in clock.split(':'):
+        seconds = seconds * 60 + int(part)
+    return seconds * 1000 + int(fraction[:3].ljust(3, '0'))
+
+
+def _format_clock(ms, separator):
+    """毫秒转换为 HH:MM:SS,mmm（VTT 使用 . 分隔）"""
+    s, ms = divmod(max(0, int(ms)), 1000)
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}{separator}{ms:03d}"
+
+
+def _clean_markup(text):
+    """去掉保留标记以外的标签并还原 HTML 实体"""
+    return html.unescape(_OTHER_TAGS.sub('', text))
+
+
+def _escape_markup(text):
+    """转义 & < >，保留 <i> <b> <u> 标记"""
+    return _ESCAPED_TAGS.sub(r'<\1>', html.escape(text, quote=False))
+
+
+def _read_timed_lines(lines, keep_rest, identifiers, skip_blocks=()):
+    """SRT / VTT 共用的逐行解析
+
+    时间轴行开始新的字幕条目，其后的非空行为字幕文本。时间轴行之前紧邻的一行若是序号
+    （SRT：纯数字行）或标识（VTT：空行后的第一行），不计入上一条字幕的文本。
+    序号、时间轴与文本写在同一行的 SRT 也能解析（keep_rest 为 True 时时间轴之后的内容作为文本）。
+
+    Args:
+        lines: 文本行迭代器
+        keep_rest: 时间轴之后的内容是否作为文本（VTT 中是位置设置，不保留）
+        identifiers: 是否按 VTT 规则识别标识行
+        skip_blocks: 以这些字样开头的块整块跳过
+
+    Yields:
+        tuple: (开始毫秒, 结束毫秒, 文本行列表)
+    """
+    cue = None
+    candidate = False  # 上一行可能是下一条字幕的序号/标识
+    after_blank = True
+    skipping = False
+    for line in lines:
+        line = line.strip()
+        if not line:
+            after_blank = True
+            skipping = False
+            continue
+        if skipping or (after_blank and skip_blocks and line.startswith(skip_blocks)):
+            skipping = True
+            after_blank = False
+            continue
+        m = _TIMING.search(line)
+        if m:
+            if cue is not None:
+                if candidate:
+                    cue[2].pop()
+                yield cue
+            rest = line[m.end():].strip() if keep_rest else ''
+            cue = (_parse_clock(m.group(1)), _parse_clock(m.group(2)), [rest] if rest else [])
+            candidate = False
+        elif cue is not None:
+            cue[2].append(line)
+            candidate = after_blank if identifiers else line.isdigit()
+        after_blank = False
+    if cue is not None:
+        yield cue
+
+
+def read_srt(path):
+    """流式读取SRT，逐条产出 Cue（文本为空的条目跳过）"""
+    with _open_text(path) as f:
+        for start, end, text in _read_timed_lines(f, keep_rest=True, identifiers=False):
+            if text:
+                yield Cue(start, end, "\n".join(text))
+
+
+def read_vtt(path):
+    """流式读取VTT，逐条产出 Cue；跳过头部、NOTE/STYLE/REGION 块与位置设置，去掉样式标签"""
+    with _open_text(path) as f:
+        for start, end, text in _read_timed_lines(f, keep_rest=False, identifiers=True,
+                                                  skip_blocks=_VTT_SKIP_BLOCKS):
+            text = "\n".join(t for t in (_clean_markup(line).strip() for line in text) if t)
+            if text:
+                yield Cue(start, end, text)
+
+
+def _ass_to_text(text):
+    """ASS 事件文本转换为 Cue 文本：单独的斜体/粗体/下划线标签转为 <i> 等标记，去掉其余覆盖标签，\\N 换行，\\h 空格"""
+    text = _ASS_TAGS_PATTERN.sub(lambda m: _ASS_TAGS[m.group(0).lower()], text)
+    text = _ASS_OVERRIDE.sub('', text).replace('\\N', '\n').replace('\\n', '\n').replace('\\h', ' ')
+    return "\n".join(t for t in (line.strip() for line in text.split('\n')) if t)
+
+
+def read_ass(path):
+    """流式读取ASS/SSA的 Dialogue 事件（按文件中的顺序），按 [Events] 的 Format 行确定字段位置"""
+    with _open_text(path) as f:
+        in_events = False
+        fields = None
+        for line in f:
+            line = line.strip()
+            if line.startswith('['):
+                in_events = line.lower() == '[events]'
+                continue
+            if not in_events:
+                continue
+            if line.lower().startswith('format:'):
+                fields = [name.strip().lower() for name in line[7:].split(',')]
+            elif line.startswith('Dialogue:') and fields:
+                values = line[9:].split(',', len(fields) - 1)
+                if len(values) < len(fields):
+                    continue
+                event = dict(zip(fields, values))
+                text = _ass_to_text(event.get('text', ''))
+                if text:
+                    yield Cue(_parse_clock(event['start']), _parse_clock(event['end']), text)
+
+
+def _smi_text(body, wanted_class):
+    """一个同步点内的内容转换为文本，指定语言类时只取该类的段落"""
+    body = _SMI_END.sub('', body)
+    if wanted_class is not None:
+        parts = _SMI_PARAGRAPH.split(body)
+        # split 结果：[第一个段落前的内容, 类名, 段落内容, 类名, 段落内容, ...]
+        body = "".join(parts[i + 1] for i in range(1, len(parts) - 1, 2)
+                       if (parts[i] or "").lower() == wanted_class)
+    # 源文件中的换行与空格等价，<br> 才是字幕中的换行
+    body = _SMI_BREAK.sub('\n', body.replace('\r', ' ').replace('\n', ' '))
+    return "\n".join(t for t in (_clean_markup(line).strip() for line in body.split('\n')) if t)
+
+
+def read_smi(path):
+    """流式读取SMI（SAMI）
+
+    每个同步点持续到下一个同步点，内容为空（&nbsp;）的同步点表示清屏。
+    多语言字幕只取第一个出现的语言类（如 KRCC）。最后一个同步点没有清屏时按固定时长结束。
+    """
+    start = None  # 当前同步点的开始时间
+    body = ""  # 当前同步点已读入的内容
+    wanted_class = None
+    with _open_text(path, _SMI_ENCODINGS) as f:
+        for line in f:
+            text = body + line if start is not None else line
+            pos = 0
+            for m in _SMI_SYNC.finditer(text):
+                if start is not None:
+                    content = text[pos:m.start()]
+                    if wanted_class is None:
+                        p = _SMI_PARAGRAPH.search(content)
+                        if p and p.group(1):
+                            wanted_class = p.group(1).lower()
+                    cue_text = _smi_text(content, wanted_class)
+                    if cue_text:
+                        yield Cue(start, int(m.group(1)), cue_text)
+                start = int(m.group(1))
+                pos = m.end()
+            if start is not None:
+                body = text[pos:]
+    if start is not None:
+        cue_text = _smi_text(body, wanted_class)
+        if cue_text:
+            yield Cue(start, start + _SMI_LAST_DURATION, cue_text)
+
+
+_READERS = {"srt": read_srt, "vtt": read_vtt, "ass": read_ass, "smi": read_smi}
+
+
+def subtitle_format(path):
+    """按后缀返回字幕格式（srt/vtt/ass/smi），不支持的后缀返回 None"""
+    return _EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def read_cues(path):
+    """按后缀选择读取器，流式产出 Cue"""
+    fmt = subtitle_format(path)
+    if fmt is None:
+        raise ValueError(f"不支持的字幕格式: {os.path.basename(path)}")
+    return _READERS[fmt](path)
+
+
+def _write_srt(cues, f):
+    count = 0
+    for count, cue in enumerate(cues, 1):
+        f.write(f"{count}\n{_format_clock(cue.start, ',')} --> {_format_clock(cue.end, ',')}\n{cue.text}\n\n")
+    return count
+
+
+def _write_vtt(cues, f):
+    f.write("WEBVTT\n\n")
+    count = 0
+    for count, cue in enumerate(cues, 1):
+        f.write(f"{_format_clock(cue.start, '.')} --> {_format_clock(cue.end, '.')}\n{_escape_markup(cue.text)}\n\n")
+    return count
+
+
+def _write_ass(cues, f):
+    f.write(_ASS_HEADER)
+    count = 0
+    for count, cue in enumerate(cues, 1):
+        text = _ASS_MARKUP_PATTERN.sub(lambda m: _ASS_MARKUP[m.group(0).lower()], cue.text).replace('\n', '\\N')
+        f.write(f"Dialogue: 0,{format_ass_time(cue.start)},{format_ass_time(cue.end)},Default,,0,0,0,,{text}\n")
+    return count
+
+
+def _write_smi(cues, f):
+    """每条字幕一个同步点；与下一条字幕之间有空隙（或是最后一条）时在结束时间写清屏同步点"""
+    f.write(_SMI_HEADER)
+    count = 0
+    previous = None
+    for count, cue in enumerate(cues, 1):
+        if previous is not None and previous.end < cue.start:
+            f.write(f"<SYNC Start={previous.end}><P Class=KRCC>&nbsp;\n")
+        text = _escape_markup(cue.text).replace('\n', '<br>')
+        f.write(f"<SYNC Start={cue.start}><P Class=KRCC>{text}\n")
+        previous = cue
+    if previous is not None:
+        f.write(f"<SYNC Start={previous.end}><P Class=KRCC>&nbsp;\n")
+    f.write("</BODY>\n</SAMI>\n")
+    return count
+
+
+_WRITERS = {"srt": _write_srt, "vtt": _write_vtt, "ass": _write_ass, "smi": _write_smi}
+
+
+def write_cues(cues, path, fmt=None):
+    """把 Cue 迭代器逐条写入字幕文件
+
+    先写入同目录下的临时文件，完成后替换目标文件；失败时删除临时文件，不留下写了一半的字幕。
+
+    Args:
+        cues: Cue 迭代器（可以是读取器产出的生成器）
+        path: 输出文件路径
+        fmt: 输出格式，None 时按 path 的后缀确定
+
+    Returns:
+        int: 写入的字幕条数
+    """
+    fmt = fmt or subtitle_format(path)
+    if fmt not in _WRITERS:
+        raise ValueError(f"不支持的字幕格式: {os.path.basename(path)}")
+    tmp_path = path + ".tmp"
+    try:
+        # ASS 沿用 Srt2Ass 输出的 UTF-8 BOM，其余格式写入无 BOM 的 UTF-8
+        with open(tmp_path, 'w', encoding='utf-8-sig' if fmt == "ass" else 'utf-8',
+                  buffering=_WRITE_BUFFER) as f:
+            count = _WRITERS[fmt](cues, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+def convert_subtitle(src_path, target_format, output_path=None):
+    """转换单个字幕文件
+
+    Args:
+        src_path: 源字幕文件
+        target_format: 目标格式（srt/vtt/ass/smi）
+        output_path: 输出路径，None 时与源文件同目录同名、后缀改为目标格式
+
+    Returns:
+        tuple: (输出路径, 字幕条数)
+    """
+    if output_path is None:
+        output_path = os.path.splitext(src_path)[0] + "." + target_format
+    return output_path, write_cues(read_cues(src_path), output_path, target_format)
+
+
+def collect_subtitle_files(paths, target_format, recursive=True, output_dir=None):
+    """从文件和文件夹中收集需要转换的字幕文件
+
+    已经是目标格式的文件不转换。指定输出目录时，文件夹中的文件按相对路径镜像到输出目录。
+
+    Returns:
+        tuple: ([(源文件路径, 输出文件路径), ...], 被跳过的无效路径列表)
+    """
+    jobs = []
+    invalid = []
+
+    def add(src_path, base_dir):
+        fmt = subtitle_format(src_path)
+        if fmt is None or fmt == target_format:
+            return False
+        name = os.path.splitext(os.path.basename(src_path))[0] + "." + target_format
+        out_dir = os.path.dirname(src_path)
+        if output_dir:
+            out_dir = os.path.normpath(os.path.join(output_dir, os.path.relpath(out_dir, base_dir)))
+        jobs.append((src_path, os.path.join(out_dir, name)))
+        return True
+
+    for path in paths:
+        if os.path.isdir(path):
+            if recursive:
+                for root, dirs, files in os.walk(path):
+                    dirs.sort()
+                    for name in sorted(files):
+                        add(os.path.join(root, name), path)
+            else:
+                for name in sorted(os.listdir(path)):
+                    if os.path.isfile(os.path.join(path, name)):
+                        add(os.path.join(path, name), path)
+        elif os.path.isfile(path) and subtitle_format(path) == target_format:
+            continue
+        elif not (os.path.isfile(path) and add(path, os.path.dirname(path))):
+            invalid.append(path)
+    return jobs, invalid
+
+
+def _convert_job(src_path, out_path, target_format):
+    """单个转换任务（可在子进程中执行）"""
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    return convert_subtitle(src_path, target_format, out_path)[1]
+
+
+def convert_subtitle_batch(paths, target_format, log_callback=None, progress_callback=None, stop_flag=None,
+                           workers=1, recursive=True, output_dir=None):
+    """
+    批量转换字幕格式（文件与文件夹均可）
+
+    每个文件独立流式转换，workers 大于1时在进程池中并行转换，日志按完成顺序输出；
+    停止时取消尚未开始的文件，进行中的文件会完整结束。
+
+    Args:
+        paths: 文件或文件夹路径列表
+        target_format: 目标格式（srt/vtt/ass/smi）
+        log_callback: 日志回调函数
+        progress_callback: 进度回调（信号或函数），参数为0-100
+        stop_flag: 停止标志（单元素列表）
+        workers: 并行转换的进程数，1 表示串行转换，0 表示CPU核心数
+        recursive: 文件夹是否递归查找
+        output_dir: 输出目录，None 时写在源文件旁边
+
+    Returns:
+        tuple: (成功数, 失败数)
+    """
+    log = log_callback or (lambda msg: None)
+    target_format = target_format.lower()
+    if target_format not in SUPPORTED_FORMATS:
+        log(f"❌ 不支持的目标格式: {target_format}")
+        return 0, 0
+    jobs, invalid = collect_subtitle_files(paths, target_format, recursive, output_dir)
+    for path in invalid:
+        log(f"⚠️ 跳过无效文件: {os.path.basename(path)} (不是支持的字幕文件)")
+    total = len(jobs)
+    if total == 0:
+        if not invalid:
+            log("⚠️ 未找到需要转换的字幕文件")
+        return 0, 0
+
+    succeeded = failed = 0
+
+    def report(src_path, out_path, count, error):
+        nonlocal succeeded, failed
+        if error is None:
+            succeeded += 1
+            log(f"✅ {os.path.basename(src_path)} -> {os.path.basename(out_path)} ({count} 条)")
+        else:
+            failed += 1
+            log(f"❌ 转换失败 {os.path.basename(src_path)}: {error}")
+
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    if workers == 1 or total == 1:
+        for done, (src_path, out_path) in enumerate(jobs, 1):
+            if stop_flag is not None and stop_flag[0]:
+                break
+            try:
+                report(src_path, out_path, _convert_job(src_path, out_path, target_format), None)
+            except Exception as e:
+                report(src_path, out_path, 0, e)
+            emit_progress(progress_callback, int(done / total * 100))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, total)) as executor:
+            pending = {executor.submit(_convert_job, src_path, out_path, target_format): (src_path, out_path)
+                       for src_path, out_path in jobs}
+            while pending:
+                if stop_flag is not None and stop_flag[0]:
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    for future, job in pending.items():
+                        if not future.cancelled():
+                            report(*job, future.result() if future.exception() is None else 0, future.exception())
+                    break
+                finished, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    report(*pending.pop(future), future.result() if future.exception() is None else 0,
+                           future.exception())
+                emit_progress(progress_callback, int((total - len(pending)) / total * 100))
+
+    log(f"📂 字幕格式转换完成：成功 {succeeded} 个，失败 {failed} 个")
+    return succeeded, failed
+
+
+def main(argv=None):
+    """命令行入口：批量转换目录或文件中的字幕"""
+    import argparse
+    parser = argparse.ArgumentParser(description="批量转换字幕格式（SRT/VTT/ASS/SMI）")
+    parser.add_argument("paths", nargs="+", help="字幕文件或文件夹")
+    parser.add_argument("--to", dest="target_format", required=True, choices=SUPPORTED_FORMATS, help="目标格式")
+    parser.add_argument("--workers", type=int, default=0, help="并行进程数，0 表示CPU核心数，1 表示串行")
+    parser.add_argument("--output", default=None, help="输出目录（默认写在源文件旁边）")
+    parser.add_argument("--no-recursive", dest="recursive", action="store_false", help="不查找子文件夹")
+    args = parser.parse_args(argv)
+    succeeded, failed = convert_subtitle_batch(args.paths, args.target_format, print, workers=args.workers,
+                                               recursive=args.recursive, output_dir=args.output)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -31,7 +31,8 @@ from logic.md_logic import run_md_creation_task
 from logic.pdf_logic import run_pdf_task
 from logic.word_logic import run_word_creation_task
 from font.srt2ass import run_ass_task
-from function.merge import run_pdf_merge_task, run_win32_merge_task, run_txt_merge_task, run_md_merge_task
+from function.vtt2srt import convert_vtt_batch
+from function.merge import run_pdf_merge_task, run_win32_merge_task, run_xml_merge_task, run_txt_merge_task, run_md_merge_task, run_merge_jobs
 from function.volumes import get_batch_size_from_volume_pattern
 
 
@@ -51,13 +52,6 @@ def execute_task(task_mode, path_var, output_path_var, log_callback, progress_ca
     """
 # 获取stop_flag（列表形式，[False]或[True]）
     stop_flag = kwargs.get('stop_flag', [False])
-    # 声明全局变量
-    global _global_generator
-    # 如果全局变量不存在，初始化它
-    try:
-        _global_generator
-    except NameError:
-        _global_generator = {}  # 使用字典来保存多个 generator 对象
     
     # 验证源目录
     target_dir = path_var.strip()
@@ -84,6 +78,20 @@ def execute_task(task_mode, path_var, output_path_var, log_callback, progress_ca
             # 获取当前样式字典（调用方法，而不是传递方法本身）
             styles_getter = kwargs.get('_get_current_styles', lambda: {'kor': '', 'chn': ''})
             current_styles = styles_getter()
+            # 先把源目录中的 .vtt 批量转换为 .srt（配置项 [Srt2Ass] srt2ass_convert_vtt）
+            if getattr(getattr(gui, 'app', None), 'srt2ass_convert_vtt', False):
+                convert_vtt_batch(
+                    [target_dir],
+                    log_callback,
+                    progress_callback,
+                    stop_flag=stop_flag,
+                    recursive=getattr(getattr(gui, 'app', None), 'srt2ass_recursive', False),
+                    # 已转换（SRT在旁边或已归档）的VTT不再重复转换，避免覆盖已生成的ASS与归档
+                    skip_converted=True,
+                    output_dir=final_out
+                )
+                if stop_flag[0]:
+                    return False
             run_ass_task(
                 target_dir, 
                 current_styles, 
@@ -91,7 +99,14 @@ def execute_task(task_mode, path_var, output_path_var, log_callback, progress_ca
                 progress_callback, 
                 root, 
                 output_dir=final_out,
-                stop_flag=stop_flag
+                stop_flag=stop_flag,
+                # 并行转换的进程数（配置项 [Srt2Ass] srt2ass_workers）
+                workers=getattr(getattr(gui, 'app', None), 'srt2ass_workers', 1),
+                # 上下字幕时间轴对齐（配置项 [Srt2Ass] srt2ass_align / srt2ass_align_tolerance）
+                align=getattr(getattr(gui, 'app', None), 'srt2ass_align', "off"),
+                align_tolerance=getattr(getattr(gui, 'app', None), 'srt2ass_align_tolerance', 200),
+                # 递归处理整个目录树（配置项 [Srt2Ass] srt2ass_recursive）
+                recursive=getattr(getattr(gui, 'app', None), 'srt2ass_recursive', False)
             )
         elif task_mode == "Script":
             # 根据分卷模式获取batch_size
@@ -116,6 +131,12 @@ def execute_task(task_mode, path_var, output_path_var, log_callback, progress_ca
                 volume_pattern = gui.volume_pattern
                 batch = get_batch_size_from_volume_pattern(volume_pattern)
             
+            # PDF流式生成模式与输出方案（配置项 [Script] pdf_streaming / pdf_profile）
+            pdf_streaming = getattr(getattr(gui, 'app', None), 'pdf_streaming', False)
+            pdf_profile = getattr(getattr(gui, 'app', None), 'pdf_profile', "standard")
+            # Word生成后端（配置项 [Script] word_backend）
+            word_backend = getattr(getattr(gui, 'app', None), 'word_backend', "docx")
+
             # 执行各类输出任务（按顺序：markdown → txt → word → pdf）
             if gui.Output2Md.isChecked():
                 run_md_creation_task(
@@ -148,7 +169,8 @@ def execute_task(task_mode, path_var, output_path_var, log_callback, progress_ca
                     batch, 
                     final_out, 
                     volume_pattern,
-                    stop_flag=stop_flag
+                    stop_flag=stop_flag,
+                    backend=word_backend
                 )
             if gui.Output2PDF.isChecked():
                 run_pdf_task(
@@ -159,7 +181,9 @@ def execute_task(task_mode, path_var, output_path_var, log_callback, progress_ca
                     batch, 
                     final_out, 
                     volume_pattern,
-                    stop_flag=stop_flag
+                    stop_flag=stop_flag,
+                    streaming=pdf_streaming,
+                    profile=pdf_profile
                 )
         elif task_mode == "Merge":
             # 执行合并任务
@@ -176,81 +200,91 @@ def execute_task(task_mode, path_var, output_path_var, log_callback, progress_ca
                     log_callback("❌ 请至少选择一个合并选项")
                     return False
                 
-                # 根据选中的选项执行相应的合并任务
+                # 选中的合并任务读写的文件互不重叠，并发执行，各自使用独立的进度通道
+                app = getattr(gui, 'app', None)
+                jobs = []
                 if merge_pdf:
-                    run_pdf_merge_task(
+                    jobs.append(("PDF", lambda progress: run_pdf_merge_task(
                         target_dir, 
                         log_callback, 
-                        progress_callback, 
+                        progress, 
                         root, 
                         output_dir=final_out,
-                        stop_flag=stop_flag
-                    )
+                        stop_flag=stop_flag,
+                        # 流式合并模式（配置项 [Merge] pdf_merge_streaming）
+                        streaming=getattr(app, 'pdf_merge_streaming', False),
+                        # 合并后优化（配置项 [Merge] pdf_merge_optimize / pdf_merge_compression_level）
+                        optimize=getattr(app, 'pdf_merge_optimize', False),
+                        compression_level=getattr(app, 'pdf_merge_compression_level', 6),
+                        # 分层并行合并的启用阈值（配置项 [Merge] pdf_merge_tree_threshold）
+                        tree_threshold=getattr(app, 'pdf_merge_tree_threshold', 500)
+                    )))
                 
                 if merge_word:
-                    run_win32_merge_task(
+                    # Word合并引擎（配置项 [Merge] word_merge_engine：xml 跨平台 / win32 调用Word）
+                    engine = getattr(app, 'word_merge_engine', "xml")
+                    word_merge_task = run_win32_merge_task if engine == "win32" else run_xml_merge_task
+                    jobs.append(("Word", lambda progress: word_merge_task(
                         target_dir, 
                         log_callback, 
-                        progress_callback, 
+                        progress, 
                         root, 
                         output_dir=final_out,
                         stop_flag=stop_flag
-                    )
+                    )))
                 
                 if merge_txt:
-                    run_txt_merge_task(
+                    jobs.append(("TXT", lambda progress: run_txt_merge_task(
                         target_dir, 
                         log_callback, 
-                        progress_callback, 
+                        progress, 
                         root, 
                         output_dir=final_out,
                         stop_flag=stop_flag
-                )
+                    )))
             
                 if merge_md:
-                    run_md_merge_task(
+                    jobs.append(("Markdown", lambda progress: run_md_merge_task(
                         target_dir, 
                         log_callback, 
-                        progress_callback, 
+                        progress, 
                         root, 
                         output_dir=final_out,
                         stop_flag=stop_flag
-                    )
+                    )))
+
+                run_merge_jobs(jobs, log_callback, progress_callback, stop_flag)
             except Exception as e:
                 log_callback(f"❌ Merge模式处理失败: {e}")
                 return False
         elif task_mode == "AutoSub":
-            # 执行自动字幕生成任务
-            from function.AutoSubtitles import SubtitleGenerator
+            # 执行自动字幕生成任务：模型加载与识别都在独立的语音识别进程中进行，
+            # GUI进程不加载 torch 与模型，停止或卡死时可直接结束该进程
+            from function.transcribe_worker import transcription_worker
 
             # 获取模型配置（从控制器获取，确保使用最新的设置）
             # 注意：root 在 PySide6 中可能是 None，所以直接使用传入的 gui 对象
             model_config = gui.app.config.get_whisper_model_config()
-            model_size = model_config["model_size"]
-            model_path = model_config["model_path"]
 
-            # 创建字幕生成器
-            language_setting = model_config.get("language", None)
-            
-            # 智能设备选择：优先使用 GPU，如果没有 NVIDIA 显卡则使用 CPU
-            import torch
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            
-            # 不清理之前的 generator 对象，直接创建新的
-            # 使用字典来保存多个 generator 对象，避免覆盖
-            
-            generator = SubtitleGenerator(
-                model_size=model_size,
-                model_path=model_path,
-                device=device,
-                language=language_setting,
-                allow_download=model_config.get("allow_download", False)
-            )
+            # 识别进程空闲超时后退出，模型随进程释放（配置项 [AutoSub] model_idle_timeout）
+            transcription_worker.idle_timeout = getattr(getattr(gui, 'app', None), 'model_idle_timeout', 600)
+            # 识别进程超过该时间没有识别进展时视为卡死并结束（配置项 [AutoSub] worker_hang_timeout，0 表示不检查）
+            transcription_worker.hang_timeout = getattr(getattr(gui, 'app', None), 'worker_hang_timeout', 600)
 
-            try:
-                # 初始化模型
-                generator.initialize_model(log_callback=log_callback)
+            generator_config = {
+                "model_size": model_config["model_size"],
+                "model_path": model_config["model_path"],
+                # 设备在识别进程中选择：优先使用 GPU，如果没有 NVIDIA 显卡则使用 CPU
+                "device": None,
+                "language": model_config.get("language", None),
+                "allow_download": model_config.get("allow_download", False),
+                # 批量推理的批大小（配置项 [AutoSub] whisper_batch_size，0 表示逐块顺序识别）
+                "batch_size": getattr(getattr(gui, 'app', None), 'whisper_batch_size', 0),
+                # 同时识别的文件数（配置项 [AutoSub] parallel_files，0 表示按CPU核心数与可用内存自动选择）
+                "parallel_files": getattr(getattr(gui, 'app', None), 'parallel_files', 0)
+            }
 
+            try:
                 # 检测已生成的字幕文件
                 media_files = []
                 for root, _, files in os.walk(target_dir):
@@ -285,14 +319,34 @@ def execute_task(task_mode, path_var, output_path_var, log_callback, progress_ca
                 if not skip_existing:
                     log_callback(f"将覆盖 {len(existing_files)} 个已存在的字幕文件")
 
-                # 批量处理
-                results = generator.batch_process(
-                    input_dir=target_dir,
-                    progress_callback=progress_callback,
-                    log_callback=log_callback,
-                    skip_existing=skip_existing,
-                    stop_flag=stop_flag
+                # CPU模式首次在本机运行时，用第一个待识别的文件试跑自动调优
+                calibration_files = new_files if skip_existing else media_files
+                generator_config["calibration_file"] = calibration_files[0] if calibration_files else None
+
+                # 识别进程从配置文件读取引擎与 CUDA 路径，先写入尚未落盘的配置
+                from function.settings import settings_service
+                settings_service.flush()
+
+                # 批量处理（在识别进程中执行）
+                results = transcription_worker.run(
+                    generator_config,
+                    target_dir,
+                    log_callback,
+                    progress_callback,
+                    stop_flag=stop_flag,
+                    skip_existing=skip_existing
                 )
+                if results is None:
+                    # 停止后识别进程未能及时结束，已被强制结束
+                    return False
+
+                # 识别进程可能写入了CPU自动调优结果，同步到内存中的设置，避免之后保存设置时被覆盖
+                cpu_autotune = settings_service.reload().get("AutoSub", {}).get("cpu_autotune", "")
+                app = getattr(gui, 'app', None)
+                if app is not None and cpu_autotune != getattr(app, 'cpu_autotune', ""):
+                    app.cpu_autotune = cpu_autotune
+                    if getattr(app, 'config', None) is not None:
+                        app.config.cpu_autotune = cpu_autotune
 
                 # 统计结果
                 success_count = sum(1 for _, _, success in results if success)
@@ -310,19 +364,6 @@ def execute_task(task_mode, path_var, output_path_var, log_callback, progress_ca
                     log_callback(f"❌ AutoSub模式处理失败: {e}")
                 # 不再输出详细错误，避免重复提示
                 return False
-        
-        # 不做任何清理操作，让 Python 的垃圾回收器自然处理
-        # 自动模式下 Whisper 的析构函数会卡死，所以不能显式清理
-        if task_mode == "AutoSub" and model_config.get("language") is None:
-            log_callback("自动模式，跳过模型清理（避免析构函数卡死）")
-        
-        # 将 generator 对象保存到全局变量中，防止它被清理
-        if 'generator' in locals():
-            # 使用字典来保存多个 generator 对象，避免覆盖
-            # 使用时间戳作为键，确保每次都是新的键
-            import time
-            language_key = f"{model_config.get('language', 'auto')}_{int(time.time() * 1000)}"
-            _global_generator[language_key] = generator        
     except Exception as e: 
         log_callback(f"❌ 出错: {e}")
         import traceback
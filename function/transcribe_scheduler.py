@@ -0,0 +1,83 @@
+"""
+多文件并行识别调度模块
+批量识别时同时识别多个文件：多个识别线程共享同一个模型（模型以 num_workers 个副本加载，
+每个线程的 transcribe 调用由一个副本执行），音频解码与特征提取也在各线程中并行进行。
+
+文件按媒体时长从长到短调度：最长的文件最先开始，避免最后只剩一个长文件在单独识别，总耗时更短。
+"""
+
+import os
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+__all__ = [
+    'probe_duration',
+    'order_longest_first',
+    'default_parallel_files'
+]
+
+# 每个并行识别线程使用的CPU核心数（单个识别流的速度超过该核心数后基本不再提升）
+_CORES_PER_FILE = 8
+
+# 每个并行识别线程预留的内存（MB）：解码后的音频、特征与模型副本的工作内存
+_MB_PER_FILE = 2048
+
+
+def probe_duration(media_file):
+    """读取媒体时长（秒，只读取文件头，不解码）；无法读取时返回 0"""
+    try:
+        import av
+        with av.open(media_file, metadata_errors="ignore") as container:
+            if container.duration:
+                return container.duration / av.time_base
+            stream = container.streams.audio[0]
+            if stream.duration and stream.time_base:
+                return float(stream.duration * stream.time_base)
+    except Exception:
+        pass
+    return 0.0
+
+
+def order_longest_first(media_files, probe=probe_duration):
+    """
+    按媒体时长从长到短排序（时长相同或无法读取时保持原顺序）
+
+    Args:
+        media_files: 媒体文件列表
+        probe: 读取时长的函数（默认为 probe_duration）
+
+    Returns:
+        list: 排序后的媒体文件列表
+    """
+    durations = {media_file: probe(media_file) for media_file in media_files}
+    return sorted(media_files, key=lambda f: -durations[f])
+
+
+def default_parallel_files(device, cores=None, available_mb=None):
+    """
+    自动选择同时识别的文件数
+
+    GPU 模式为 1（多个模型副本会成倍占用显存）；CPU 模式每 _CORES_PER_FILE 个核心一个，
+    并且不超过可用内存能容纳的数量（需要 psutil）。
+
+    Args:
+        device: 设备类型（cuda/cpu）
+        cores: CPU核心数（默认为本机核心数）
+        available_mb: 可用内存（MB，默认由 psutil 读取，未安装时不限制）
+    """
+    if device != "cpu":
+        return 1
+    cores = cores or os.cpu_count() or 1
+    workers = max(1, cores // _CORES_PER_FILE)
+    if available_mb is None and HAS_PSUTIL:
+        try:
+            available_mb = psutil.virtual_memory().available // (1024 * 1024)
+        except Exception:
+            available_mb = None
+    if available_mb is not None:
+        workers = min(workers, max(1, int(available_mb // _MB_PER_FILE)))
+    return workers
@@ -0,0 +1,316 @@
+"""
+语音识别工作进程模块
+在独立的子进程中运行 SubtitleGenerator，GUI进程只通过队列与其通信：
+任务（源目录与模型配置）送入子进程，日志、进度和每个文件的结果从子进程送回。
+
+子进程在两次任务之间保持运行（模型留在子进程中，下一次任务无需重新加载），
+空闲超时后退出，模型占用的显存与内存随进程退出全部归还系统。
+停止任务时先通知子进程在片段之间停止，超过宽限时间仍未结束（例如卡在模型析构或推理中）则直接结束进程。
+子进程每识别出片段都会发送心跳，超过 hang_timeout 秒没有任何识别进展（片段、日志或进度）时视为卡死并结束进程；
+长文件持续产出片段，不会被误判。
+"""
+
+import os
+import time
+import queue
+import threading
+import multiprocessing
+
+from function.file_utils import emit_progress
+
+__all__ = [
+    'TranscriptionWorker',
+    'transcription_worker'
+]
+
+# 请求停止后等待子进程自行结束的时间（秒），超时后强制结束
+DEFAULT_STOP_GRACE = 10
+
+# 空闲多久后关闭子进程（秒）
+DEFAULT_IDLE_TIMEOUT = 600
+
+# 没有识别进展多久后视为卡死（秒）
+DEFAULT_HANG_TIMEOUT = 600
+
+# 主动关闭时等待子进程退出的时间（秒）
+_SHUTDOWN_TIMEOUT = 5
+
+# 心跳最短间隔（秒），片段产出很快时不逐个发送
+_HEARTBEAT_INTERVAL = 1.0
+
+
+def run_generator_job(config, input_dir, log_callback, progress_callback, stop_flag, skip_existing, heartbeat):
+    """在子进程中执行一次批量识别（默认的任务执行函数）
+
+    Args:
+        config: SubtitleGenerator 的参数（device 为 None 时自动选择）
+        input_dir: 源目录
+        log_callback: 日志回调
+        progress_callback: 进度回调
+        stop_flag: 停止标志（单元素列表）
+        skip_existing: 是否跳过已存在字幕的文件
+        heartbeat: 识别有进展时调用（无参数），每识别出一个片段调用一次
+
+    Returns:
+        list: [(媒体文件, 字幕文件, 是否成功), ...]
+    """
+    from function.AutoSubtitles import SubtitleGenerator
+
+    config = dict(config)
+    if config.get("device") is None:
+        # 智能设备选择：优先使用 GPU，如果没有 NVIDIA 显卡则使用 CPU
+        import torch
+        config["device"] = "cuda" if torch.cuda.is_available() else "cpu"
+
+    generator = SubtitleGenerator(**config)
+    generator.segment_callback = heartbeat
+    try:
+        generator.initialize_model(log_callback=log_callback)
+        return generator.batch_process(
+            input_dir=input_dir,
+            progress_callback=progress_callback,
+            log_callback=log_callback,
+            skip_existing=skip_existing,
+            stop_flag=stop_flag
+        )
+    finally:
+        # 只归还模型引用，模型留在子进程的模型缓存中供下一次任务复用
+        generator.cleanup()
+
+
+def _worker_main(requests, events, runner, model_idle_timeout):
+    """子进程入口
+
+    监听线程持续读取请求：停止请求立即设置停止标志，任务请求转交主线程执行。
+    退出时使用 os._exit，跳过模型对象的析构（Whisper 模型的析构函数可能卡死）。
+    """
+    from function.whisper_models import model_manager
+    # 模型与进程的空闲超时一致：进程空闲时由父进程关闭，模型随进程一起释放
+    model_manager.idle_timeout = model_idle_timeout
+
+    stop_flag = [False]
+    jobs = queue.Queue()
+
+    def listen():
+        while True:
+            request = requests.get()
+            if request[0] == "stop":
+                stop_flag[0] = True
+                continue
+            if request[0] == "run":
+                # 请求按发送顺序处理，新任务开始前清除上一次的停止标志
+                stop_flag[0] = False
+            jobs.put(request)
+            if request[0] == "exit":
+                stop_flag[0] = True
+                return
+
+    threading.Thread(target=listen, daemon=True).start()
+
+    while True:
+        request = jobs.get()
+        if request[0] == "exit":
+            break
+        _, job_id, config, input_dir, skip_existing = request
+        last_beat = [0.0]
+
+        def heartbeat(job_id=job_id):
+            now = time.monotonic()
+            if now - last_beat[0] >= _HEARTBEAT_INTERVAL:
+                last_beat[0] = now
+                events.put(("alive", job_id, None))
+
+        try:
+            results = runner(
+                config,
+                input_dir,
+                lambda msg: events.put(("log", job_id, msg)),
+                lambda value: events.put(("progress", job_id, value)),
+                stop_flag,
+                skip_existing,
+                heartbeat
+            )
+            events.put(("done", job_id, results))
+        except Exception as e:
+            events.put(("error", job_id, str(e)))
+    events.close()
+    events.join_thread()
+    os._exit(0)
+
+
+class TranscriptionWorker:
+    """语音识别子进程的管理者（在GUI进程中使用）
+
+    run() 把任务交给子进程并阻塞等待结果，期间转发日志与进度、检查停止标志，应在任务线程中调用。
+    子进程按需启动，任务结束后空闲 idle_timeout 秒自动关闭。
+    """
+
+    def __init__(self, idle_timeout=DEFAULT_IDLE_TIMEOUT, stop_grace=DEFAULT_STOP_GRACE,
+                 hang_timeout=DEFAULT_HANG_TIMEOUT, runner=run_generator_job):
+        """
+        Args:
+            idle_timeout: 空闲多久后关闭子进程（秒），0 表示每次任务结束后立即关闭
+            stop_grace: 请求停止后等待子进程自行结束的时间（秒）
+            hang_timeout: 子进程多久没有识别进展（片段心跳、日志或进度）视为卡死并强制结束（秒），0 表示不检查
+            runner: 子进程中执行任务的函数（需可被子进程导入）
+        """
+        self.idle_timeout = idle_timeout
+        self.stop_grace = stop_grace
+        self.hang_timeout = hang_timeout
+        self.runner = runner
+        self._process = None
+        self._requests = None
+        self._events = None
+        self._job_id = 0
+        self._idle_timer = None
+        self._lock = threading.Lock()
+
+    @property
+    def pid(self):
+        """子进程的进程号（未运行时为 None）"""
+        return self._process.pid if self.is_alive() else None
+
+    def is_alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def run(self, config, input_dir, log_callback, progress_callback=None, stop_flag=None, skip_existing=True):
+        """
+        在子进程中批量识别源目录中的媒体文件
+
+        Args:
+            config: SubtitleGenerator 的参数字典（需可序列化）
+            input_dir: 源目录
+            log_callback: 日志回调函数
+            progress_callback: 进度回调（信号或函数）
+            stop_flag: 停止标志（单元素列表）
+            skip_existing: 是否跳过已存在字幕的文件
+
+        Returns:
+            list: [(媒体文件, 字幕文件, 是否成功), ...]；强制结束子进程时返回 None
+        """
+        with self._lock:
+            self._cancel_idle_timer()
+            if not self.is_alive():
+                self._start(log_callback)
+            self._job_id += 1
+            job_id = self._job_id
+            self._requests.put(("run", job_id, config, input_dir, skip_existing))
+
+        try:
+            return self._wait(job_id, log_callback, progress_callback, stop_flag)
+        finally:
+            with self._lock:
+                self._schedule_idle_shutdown()
+
+    def shutdown(self):
+        """关闭子进程：先请求退出，超时后强制结束"""
+        with self._lock:
+            self._cancel_idle_timer()
+            self._shutdown()
+
+    def kill(self):
+        """立即结束子进程"""
+        with self._lock:
+            self._kill()
+
+    def _start(self, log_callback=None):
+        ctx = multiprocessing.get_context("spawn")
+        self._requests = ctx.Queue()
+        self._events = ctx.Queue()
+        self._process = ctx.Process(
+            target=_worker_main,
+            args=(self._requests, self._events, self.runner, self.idle_timeout),
+            name="SubtitleToolbox-transcribe",
+            daemon=True
+        )
+        self._process.start()
+        if log_callback:
+            log_callback(f"ⓘ 已启动语音识别进程 (PID {self._process.pid})")
+
+    def _wait(self, job_id, log_callback, progress_callback, stop_flag):
+        """转发子进程的事件，直到任务完成、出错或子进程被结束"""
+        stop_requested_at = None
+        last_event = time.monotonic()
+        while True:
+            now = time.monotonic()
+            if stop_flag is not None and stop_flag[0] and stop_requested_at is None:
+                self._requests.put(("stop",))
+                stop_requested_at = now
+            if stop_requested_at is not None and now - stop_requested_at > self.stop_grace:
+                self.kill()
+                log_callback(f"⚠️ 语音识别进程在 {self.stop_grace} 秒内未停止，已强制结束")
+                return None
+            if self.hang_timeout and now - last_event > self.hang_timeout:
+                self.kill()
+                raise Exception(f"❌ 语音识别进程超过 {self.hang_timeout} 秒没有识别进展，已强制结束")
+
+            try:
+                kind, event_job, payload = self._events.get(timeout=0.2)
+            except queue.Empty:
+                if not self.is_alive():
+                    code = self._process.exitcode if self._process is not None else None
+                    self.kill()
+                    raise Exception(f"❌ 语音识别进程意外退出 (退出码 {code})")
+                continue
+            if event_job != job_id:
+                continue
+            # 任何事件（包括心跳 alive）都表示识别仍在进行
+            last_event = time.monotonic()
+            if kind == "log":
+                log_callback(payload)
+            elif kind == "progress":
+                emit_progress(progress_callback, payload)
+            elif kind == "done":
+                return payload
+            elif kind == "error":
+                raise Exception(payload)
+
+    def _schedule_idle_shutdown(self):
+        if not self.is_alive():
+            return
+        if self.idle_timeout <= 0:
+            self._shutdown()
+            return
+        timer = threading.Timer(self.idle_timeout, self._on_idle)
+        timer.args = (timer,)
+        timer.daemon = True
+        self._idle_timer = timer
+        timer.start()
+
+    def _on_idle(self, timer):
+        """空闲计时器回调：计时器被取消或替换（期间开始了新任务）时不关闭"""
+        with self._lock:
+            if self._idle_timer is timer:
+                self._idle_timer = None
+                self._shutdown()
+
+    def _cancel_idle_timer(self):
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _shutdown(self):
+        if self.is_alive():
+            try:
+                self._requests.put(("exit",))
+                self._process.join(_SHUTDOWN_TIMEOUT)
+            except Exception:
+                pass
+        self._kill()
+
+    def _kill(self):
+        if self._process is not None:
+            if self._process.is_alive():
+                self._process.kill()
+            self._process.join()
+            self._process = None
+        for q in (self._requests, self._events):
+            if q is not None:
+                q.cancel_join_thread()
+                q.close()
+        self._requests = None
+        self._events = None
+
+
+# 全局共享的语音识别进程
+transcription_worker = TranscriptionWorker()
@@ -1,12 +1,17 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QDragEnterEvent, QDropEvent, QFont
 from PySide6.QtWidgets import QLabel, QMessageBox
+from function.file_utils import emit_progress, ORGANIZED_DIRS
 
 
 def vtt_to_srt(vtt_path, log_callback=None):
     """
     将VTT文件转换为SRT格式
+
+    逐行读取、逐块写入，不把整个文件读入内存；转换失败时删除写了一半的SRT文件。
     
     Args:
         vtt_path: VTT文件路径
@@ -18,53 +23,45 @@ def vtt_to_srt(vtt_path, log_callback=None):
     """
     srt_path = vtt_path.rsplit('.', 1)[0] + '.srt'
     try:
-        with open(vtt_path, 'r', encoding='utf-8') as vtt_file:
-            lines = vtt_file.readlines()
-
-        srt_lines = []
-        counter = 1
-        temp_block = []
-        in_subtitle = False
-
-        for line in lines:
-            stripped = line.strip()
-            # 跳过空行、WEBVTT头部和元数据
-            if stripped == '' or stripped == 'WEBVTT' or stripped.startswith('Kind:') or stripped.startswith(
-                    'Language:'):
-                continue
-
-            if '-->' in stripped:
-                # 如果之前有字幕块，先写入
-                if in_subtitle and temp_block:
-                    srt_lines.append(str(counter))
-                    srt_lines.extend(temp_block)
-                    srt_lines.append('')
-                    counter += 1
-                    temp_block = []
-                
-                # 处理时间戳
-                parts = stripped.split('-->')
-                start_time = parts[0].strip().replace('.', ',')
-                end_time = parts[1].strip().replace('.', ',')
-                temp_block.append(f"{start_time} --> {end_time}")
-                in_subtitle = True
-            else:
-                # 跳过纯数字行（VTT的序号行）
-                if stripped.isdigit():
-                    continue
-                # 添加文本行
-                if in_subtitle:
-                    temp_block.append(stripped)
-
-        # 写入最后一个字幕块
-        if in_subtitle and temp_block:
-            srt_lines.append(str(counter))
-            srt_lines.extend(temp_block)
-            srt_lines.append('')
-
-        with open(srt_path, 'w', encoding='utf-8') as srt_file:
-            for line in srt_lines:
-                srt_file.write(line + '\n')
+        try:
+            with open(vtt_path, 'r', encoding='utf-8') as vtt_file, \
+                    open(srt_path, 'w', encoding='utf-8') as srt_file:
+                counter = 1
+                temp_block = None
+
+                for line in vtt_file:
+                    stripped = line.strip()
+                    # 跳过空行、WEBVTT头部和元数据
+                    if stripped == '' or stripped == 'WEBVTT' or stripped.startswith('Kind:') or stripped.startswith(
+                            'Language:'):
+                        continue
+
+                    if '-->' in stripped:
+                        # 如果之前有字幕块，先写入
+                        if temp_block:
+                            srt_file.write(f"{counter}\n" + "\n".join(temp_block) + "\n\n")
+                            counter += 1
+
+                        # 处理时间戳
+                        parts = stripped.split('-->')
+                        start_time = parts[0].strip().replace('.', ',')
+                        end_time = parts[1].strip().replace('.', ',')
+                        temp_block = [f"{start_time} --> {end_time}"]
+                    else:
+                        # 跳过纯数字行（VTT的序号行）
+                        if stripped.isdigit():
+                            continue
+                        # 添加文本行
+                        if temp_block is not None:
+                            temp_block.append(stripped)
+
+                # 写入最后一个字幕块
+                if temp_block:
+                    srt_file.write(f"{counter}\n" + "\n".join(temp_block) + "\n\n")
+        except Exception:
+            if os.path.exists(srt_path):
+                os.remove(srt_path)
+            raise
         
         if log_callback:
             log_callback(f"✅ VTT转换为SRT成功: {os.path.basename(vtt_path)} -> {os.path.basename(srt_path)}")
@@ -80,46 +77,150 @@ def vtt_to_srt(vtt_path, log_callback=None):
         return False, None
 
 
-def handle_drop_event(event, log_callback=None):
+def collect_vtt_files(paths, recursive=True):
+    """
+    从文件和文件夹中收集VTT文件
+
+    Args:
+        paths: 文件或文件夹路径列表
+        recursive: 是否递归查找子文件夹（跳过隐藏目录、符号链接目录与 srt/script/other 整理目录）
+
+    Returns:
+        tuple: (VTT文件路径列表, 被跳过的无效路径列表)
+    """
+    vtt_files = []
+    invalid = []
+    for path in paths:
+        if os.path.isdir(path):
+            if recursive:
+                for root, dirs, files in os.walk(path):
+                    dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d.lower() not in ORGANIZED_DIRS)
+                    vtt_files.extend(os.path.join(root, f) for f in sorted(files) if f.lower().endswith('.vtt'))
+            else:
+                vtt_files.extend(os.path.join(path, f) for f in sorted(os.listdir(path))
+                                 if f.lower().endswith('.vtt') and os.path.isfile(os.path.join(path, f)))
+        elif os.path.isfile(path) and path.lower().endswith('.vtt'):
+            vtt_files.append(path)
+        else:
+            invalid.append(path)
+    return vtt_files, invalid
+
+
+def is_converted(vtt_path, root_dir=None, output_dir=None):
+    """
+    VTT是否已经转换过：同目录下已有同名SRT，或SRT已被 SRT转ASS 归档到输出目录的 srt 文件夹
+
+    Args:
+        vtt_path: VTT文件路径
+        root_dir: 扫描的根目录（与 output_dir 一起确定子目录对应的输出目录）
+        output_dir: 输出目录，None 表示与源目录相同
+    """
+    folder = os.path.dirname(vtt_path)
+    srt_name = os.path.basename(vtt_path).rsplit('.', 1)[0] + '.srt'
+    if os.path.exists(os.path.join(folder, srt_name)):
+        return True
+    archive_base = folder
+    if root_dir and output_dir:
+        rel_dir = os.path.relpath(folder, root_dir)
+        archive_base = output_dir if rel_dir == '.' else os.path.join(output_dir, rel_dir)
+    return os.path.exists(os.path.join(archive_base, "srt", srt_name))
+
+
+def convert_vtt_batch(paths, log_callback=None, progress_callback=None, stop_flag=None, workers=None, recursive=True,
+                      skip_converted=False, output_dir=None):
+    """
+    批量转换VTT文件（文件与文件夹均可）
+
+    在线程池中转换，调用方所在线程只等待结果、汇总进度，日志按完成顺序输出。
+    从GUI调用时应放在后台线程中，并传入线程安全的回调（控制器的信号）。
+
+    Args:
+        paths: 文件或文件夹路径列表
+        log_callback: 日志回调函数
+        progress_callback: 进度回调（信号或函数），参数为0-100
+        stop_flag: 停止标志（单元素列表），被设置时取消尚未开始的转换
+        workers: 线程数，None 表示 min(8, CPU核心数 + 4)
+        recursive: 文件夹是否递归查找
+        skip_converted: 跳过已经转换过的VTT（见 is_converted），反复处理同一目录时不覆盖已有的SRT
+        output_dir: 归档所在的输出目录（skip_converted 时使用，对应 paths 中的文件夹），None 表示与源目录相同
+
+    Returns:
+        tuple: (成功数, 失败数)
+    """
+    vtt_files, invalid = collect_vtt_files(paths, recursive)
+    for file_path in invalid:
+        if log_callback:
+            log_callback(f"⚠️ 跳过无效文件: {os.path.basename(file_path)} (不是有效的.vtt文件)")
+    found = len(vtt_files)
+    if skip_converted:
+        roots = [path for path in paths if os.path.isdir(path)]
+        root_dir = roots[0] if len(roots) == 1 else None
+        vtt_files = [fp for fp in vtt_files if not is_converted(fp, root_dir, output_dir)]
+        if log_callback and found > len(vtt_files):
+            log_callback(f"⏭️ 跳过已转换的VTT: {found - len(vtt_files)} 个")
+    total = len(vtt_files)
+    if total == 0:
+        if log_callback and not invalid and not found:
+            log_callback("⚠️ 未找到 .vtt 文件")
+        return 0, 0
+
+    succeeded = failed = done = 0
+    workers = workers or min(8, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=min(workers, total), thread_name_prefix="vtt2srt") as executor:
+        pending = {executor.submit(vtt_to_srt, fp, log_callback or (lambda msg: None)) for fp in vtt_files}
+        while pending:
+            if stop_flag is not None and stop_flag[0]:
+                executor.shutdown(wait=True, cancel_futures=True)
+                break
+            finished, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done += 1
+                if future.result()[0]:
+                    succeeded += 1
+                else:
+                    failed += 1
+            emit_progress(progress_callback, int(done / total * 100))
+
+    if log_callback:
+        log_callback(f"📂 VTT转换完成：成功 {succeeded} 个，失败 {failed} 个")
+    return succeeded, failed
+
+
+def handle_drop_event(event, log_callback=None, progress_callback=None):
     """
     处理Qt拖放事件
+
+    拖入的文件和文件夹在后台线程中批量转换，拖放处理函数立即返回，界面不会卡住。
     
     Args:
         event: QDropEvent事件对象
-        log_callback: 日志回调函数
+        log_callback: 日志回调函数（需线程安全，例如控制器的 log）
+        progress_callback: 进度回调（需线程安全，例如控制器的 update_progress 信号）
+
+    Returns:
+        threading.Thread: 执行转换的后台线程（没有拖入文件时为 None）
     """
-    if event.mimeData().hasUrls():
-        event.acceptProposedAction()
-        valid_files = []
-        invalid_files = []
-        
-        for url in event.mimeData().urls():
-            file_path = url.toLocalFile()
-            if os.path.isfile(file_path) and file_path.lower().endswith('.vtt'):
-                valid_files.append(file_path)
-            else:
-                invalid_files.append(file_path)
-        
-        # 处理有效文件
-        for file_path in valid_files:
-            vtt_to_srt(file_path, log_callback)
-        
-        # 处理无效文件
-        for file_path in invalid_files:
-            error_msg = f"⚠️ 跳过无效文件: {os.path.basename(file_path)} (不是有效的.vtt文件)"
-            if log_callback:
-                log_callback(error_msg)
-            else:
-                QMessageBox.warning(None, "警告", error_msg)
+    if not event.mimeData().hasUrls():
+        return None
+    event.acceptProposedAction()
+    paths = [url.toLocalFile() for url in event.mimeData().urls()]
+    worker = threading.Thread(
+        target=convert_vtt_batch,
+        args=(paths, log_callback, progress_callback),
+        daemon=True
+    )
+    worker.start()
+    return worker
     
 
-def setup_vtt2srt_drop_area(drop_widget, log_callback=None):
+def setup_vtt2srt_drop_area(drop_widget, log_callback=None, progress_callback=None):
     """
     设置VTT到SRT的拖放区域
     
     Args:
         drop_widget: 用于拖放的QLabel或其他QWidget
-        log_callback: 日志回调函数
+        log_callback: 日志回调函数（需线程安全）
+        progress_callback: 进度回调（需线程安全）
     """
     # 设置拖放属性
     drop_widget.setAcceptDrops(True)
@@ -140,7 +241,7 @@ def setup_vtt2srt_drop_area(drop_widget, log_callback=None):
         drop_widget.style().polish(drop_widget)
     
     def drop_event(event: QDropEvent):
-        handle_drop_event(event, log_callback)
+        handle_drop_event(event, log_callback, progress_callback)
         # 拖放完成后恢复默认样式
         drop_widget.setProperty("active", "false")
         drop_widget.style().unpolish(drop_widget)
@@ -0,0 +1,185 @@
+"""
+Whisper模型管理模块
+按 (模型路径, 设备, 计算类型[, CPU线程数], 模型副本数) 缓存已加载的 faster-whisper 模型，多次运行 AutoSub 时复用同一个模型，
+不再每次从磁盘重新加载。模型在空闲超时、缓存数量超限或系统可用内存不足时卸载。
+
+卸载时（retire_model，模型管理器与 CPU 自动调优共用）调用 CTranslate2 的 unload_model() 释放模型权重（显存与大部分内存），模型对象本身暂时保留：
+Whisper 模型对象在持有权重时于工作线程中析构可能卡死。保留的空壳仍包含分词器与特征提取器（每个约数MB），
+因此只保留最近卸载的 _MAX_RETIRED 个，更早的空壳交给垃圾回收（权重已释放，析构时不再释放显存）。
+"""
+
+import time
+import threading
+from collections import OrderedDict, deque
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+__all__ = [
+    'WhisperModelManager',
+    'model_manager',
+    'retire_model'
+]
+
+# 默认空闲多久后卸载模型（秒）
+DEFAULT_IDLE_TIMEOUT = 600
+
+# 系统可用内存低于该值（MB）时卸载空闲模型（需要 psutil）
+_MIN_AVAILABLE_MB = 2048
+
+# 最多保留的已卸载模型对象数量
+_MAX_RETIRED = 2
+
+# 已释放权重的模型对象（不在卸载的线程中析构）
+_retired = deque(maxlen=_MAX_RETIRED)
+
+
+def retire_model(model):
+    """释放模型权重，模型对象移入保留列表（不在此析构，保留列表满时最早的空壳被丢弃）"""
+    inner = getattr(model, "model", None)
+    try:
+        if inner is not None and hasattr(inner, "unload_model"):
+            inner.unload_model()
+    except Exception as e:
+        print(f"DEBUG: 卸载模型出错: {e}")
+    _retired.append(model)
+
+
+class _ModelEntry:
+    """一个已加载的模型及其使用状态"""
+
+    def __init__(self, model):
+        self.model = model
+        self.refs = 0
+        self.last_used = time.monotonic()
+        self.timer = None
+
+
+class WhisperModelManager:
+    """Whisper模型缓存
+
+    acquire() 返回已加载的模型（没有时调用 loader 加载），使用完毕后必须调用 release()。
+    正在使用的模型不会被卸载；引用计数归零后开始计算空闲时间。
+    """
+
+    def __init__(self, idle_timeout=DEFAULT_IDLE_TIMEOUT, max_models=1, min_available_mb=_MIN_AVAILABLE_MB):
+        """
+        Args:
+            idle_timeout: 空闲多久后卸载（秒），0 表示释放后立即卸载
+            max_models: 最多同时保留的模型数量
+            min_available_mb: 系统可用内存低于该值时卸载空闲模型（未安装 psutil 时不检查）
+        """
+        self.idle_timeout = idle_timeout
+        self.max_models = max_models
+        self.min_available_mb = min_available_mb
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def acquire(self, key, loader, log_callback=None):
+        """
+        获取模型，已加载时直接复用
+
+        Args:
+            key: 模型键 (模型路径, 设备, 计算类型[, CPU线程数], 模型副本数)
+            loader: 无参函数，返回新加载的模型
+            log_callback: 日志回调函数
+
+        Returns:
+            已加载的模型
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._cancel_timer(entry)
+                entry.refs += 1
+                self._entries.move_to_end(key)
+                if log_callback:
+                    log_callback("♻️ 复用已加载的模型")
+                return entry.model
+
+            # 加载新模型前先腾出位置：卸载最久未使用的空闲模型
+            idle = [k for k, e in self._entries.items() if e.refs == 0]
+            while idle and (len(self._entries) >= self.max_models or self._memory_low()):
+                self._unload(idle.pop(0), log_callback)
+
+            entry = _ModelEntry(loader())
+            entry.refs = 1
+            self._entries[key] = entry
+            return entry.model
+
+    def release(self, key):
+        """释放一次模型引用，引用归零后按空闲超时卸载（内存不足时立即卸载）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.refs == 0:
+                return
+            entry.refs -= 1
+            entry.last_used = time.monotonic()
+            if entry.refs > 0:
+                return
+            if self.idle_timeout <= 0 or self._memory_low():
+                self._unload(key)
+                return
+            self._cancel_timer(entry)
+            entry.timer = threading.Timer(self.idle_timeout, self._evict_if_idle, args=(key, entry))
+            entry.timer.daemon = True
+            entry.timer.start()
+
+    def evict_idle(self, max_idle=None):
+        """卸载空闲时间超过 max_idle 秒（默认为 idle_timeout）的模型
+
+        Returns:
+            int: 卸载的模型数量
+        """
+        max_idle = self.idle_timeout if max_idle is None else max_idle
+        now = time.monotonic()
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if e.refs == 0 and now - e.last_used >= max_idle]
+            for key in keys:
+                self._unload(key)
+            return len(keys)
+
+    def unload_all(self):
+        """卸载所有空闲模型（正在使用的模型保留）"""
+        return self.evict_idle(0)
+
+    def loaded_keys(self):
+        """当前已加载的模型键（按最近使用排序）"""
+        with self._lock:
+            return list(self._entries)
+
+    def _evict_if_idle(self, key, entry):
+        """空闲计时器回调：期间没有被重新使用时卸载"""
+        with self._lock:
+            if self._entries.get(key) is entry and entry.refs == 0:
+                self._unload(key)
+
+    def _memory_low(self):
+        if not HAS_PSUTIL or not self.min_available_mb:
+            return False
+        try:
+            return psutil.virtual_memory().available < self.min_available_mb * 1024 * 1024
+        except Exception:
+            return False
+
+    @staticmethod
+    def _cancel_timer(entry):
+        if entry.timer is not None:
+            entry.timer.cancel()
+            entry.timer = None
+
+    def _unload(self, key, log_callback=None):
+        """卸载模型（见 retire_model）"""
+        entry = self._entries.pop(key)
+        self._cancel_timer(entry)
+        retire_model(entry.model)
+        entry.model = None
+        if log_callback:
+            log_callback("ⓘ 已卸载空闲的模型")
+
+
+# 全局共享的模型缓存
+model_manager = WhisperModelManager()
@@ -0,0 +1,179 @@
+"""
+Whisper CPU模式自动调优模块
+CPU 上不同的计算类型（int8 / int8_float32 / float32）与线程数速度差别很大，且与机器有关。
+首次在一台机器上使用 CPU 模式时，用待识别的第一个媒体文件中的一小段音频试跑各候选配置，
+选出最快的一组，按机器标识保存到配置文件（[AutoSub] cpu_autotune），之后在同一台机器上直接使用。
+"""
+
+import os
+import time
+import platform
+
+from function.whisper_models import retire_model
+
+__all__ = [
+    'CANDIDATE_COMPUTE_TYPES',
+    'DEFAULT_COMPUTE_TYPE',
+    'machine_fingerprint',
+    'candidate_thread_counts',
+    'supported_compute_types',
+    'format_tuned',
+    'parse_tuned',
+    'load_calibration_audio',
+    'autotune_cpu'
+]
+
+# 候选计算类型（按通常的速度从快到慢）
+CANDIDATE_COMPUTE_TYPES = ("int8", "int8_float32", "float32")
+
+# 未调优（或调优失败）时使用的计算类型
+DEFAULT_COMPUTE_TYPE = "float32"
+
+# 试跑使用的音频长度（秒）
+CALIBRATION_SECONDS = 15
+
+# faster-whisper 的采样率
+_SAMPLING_RATE = 16000
+
+def machine_fingerprint():
+    """机器标识：主机名、CPU架构与核心数，任一变化时重新调优"""
+    return f"{platform.node()}|{platform.machine()}|{os.cpu_count() or 1}"
+
+
+def candidate_thread_counts(cores=None):
+    """候选线程数：全部、一半与四分之一核心（从多到少，去重）"""
+    cores = cores or os.cpu_count() or 1
+    return sorted({cores, max(1, cores // 2), max(1, cores // 4)}, reverse=True)
+
+
+def supported_compute_types():
+    """当前 CTranslate2 在 CPU 上支持的候选计算类型（无法查询时返回全部候选）"""
+    try:
+        import ctranslate2
+        supported = ctranslate2.get_supported_compute_types("cpu")
+    except Exception:
+        return CANDIDATE_COMPUTE_TYPES
+    return tuple(ct for ct in CANDIDATE_COMPUTE_TYPES if ct in supported) or (DEFAULT_COMPUTE_TYPE,)
+
+
+def format_tuned(compute_type, threads, fingerprint=None):
+    """调优结果的配置文件格式："机器标识;计算类型;线程数" """
+    return f"{fingerprint or machine_fingerprint()};{compute_type};{threads}"
+
+
+def parse_tuned(value, fingerprint=None):
+    """
+    解析配置文件中的调优结果
+
+    Returns:
+        tuple: (计算类型, 线程数)；没有结果、格式错误或不是本机的结果时返回 None
+    """
+    parts = (value or "").rsplit(";", 2)
+    if len(parts) != 3:
+        return None
+    saved_fingerprint, compute_type, threads = parts
+    if saved_fingerprint != (fingerprint or machine_fingerprint()) or compute_type not in CANDIDATE_COMPUTE_TYPES:
+        return None
+    try:
+        threads = int(threads)
+    except ValueError:
+        return None
+    return (compute_type, threads) if threads > 0 else None
+
+
+def load_calibration_audio(media_file, seconds=CALIBRATION_SECONDS):
+    """
+    解码媒体文件中的一小段音频用于试跑（16kHz 单声道 float32）
+
+    从时长的三分之一处开始取，避开片头的静音与音乐；只解码需要的部分，不解码整个文件。
+    """
+    import av
+    import numpy as np
+
+    needed = int(seconds * _SAMPLING_RATE)
+    chunks = []
+    total = 0
+    resampler = av.audio.resampler.AudioResampler(format="s16", layout="mono", rate=_SAMPLING_RATE)
+    with av.open(media_file, metadata_errors="ignore") as container:
+        stream = container.streams.audio[0]
+        if container.duration and container.duration > 3 * seconds * av.time_base:
+            try:
+                container.seek(container.duration // 3)
+            except Exception:
+                pass
+        for frame in container.decode(stream):
+            frame.pts = None
+            for resampled in resampler.resample(frame):
+                data = resampled.to_ndarray().reshape(-1)
+                chunks.append(data)
+                total += len(data)
+            if total >= needed:
+                break
+    if not chunks:
+        raise Exception(f"无法解码音频: {os.path.basename(media_file)}")
+    return np.concatenate(chunks)[:needed].astype(np.float32) / 32768.0
+
+
+def _measure(load_model, compute_type, threads, audio, language):
+    """加载一组配置的模型并识别试跑音频，返回识别耗时（秒，不含加载时间）"""
+    model = load_model(compute_type, threads)
+    try:
+        start = time.perf_counter()
+        segments, _ = model.transcribe(
+            audio,
+            language=language,
+            beam_size=1,
+            best_of=1,
+            condition_on_previous_text=False,
+            vad_filter=False  # 试跑音频很短，不做语音检测，各配置识别的内容相同
+        )
+        for _ in segments:
+            pass
+        return time.perf_counter() - start
+    finally:
+        retire_model(model)
+
+
+def autotune_cpu(load_model, audio, language=None, compute_types=None, thread_counts=None, log_callback=None):
+    """
+    试跑候选配置，选出识别最快的计算类型与线程数
+
+    先用最多的线程数比较各计算类型，再用最快的计算类型比较其余线程数。
+
+    Args:
+        load_model: 函数 (计算类型, 线程数) -> 模型，每组配置加载一次
+        audio: 试跑音频（load_calibration_audio 的返回值或音频文件路径）
+        language: 语言代码，None 表示自动检测
+        compute_types: 候选计算类型（默认为当前 CTranslate2 支持的候选）
+        thread_counts: 候选线程数（默认为 candidate_thread_counts()）
+        log_callback: 日志回调函数
+
+    Returns:
+        tuple: (计算类型, 线程数, {(计算类型, 线程数): 耗时})
+    """
+    compute_types = tuple(compute_types or supported_compute_types())
+    thread_counts = sorted(set(thread_counts or candidate_thread_counts()), reverse=True)
+    timings = {}
+
+    def run(compute_type, threads):
+        try:
+            elapsed = _measure(load_model, compute_type, threads, audio, language)
+        except Exception as e:
+            if log_callback:
+                log_callback(f"⚠️ 调优 {compute_type} / {threads} 线程失败: {e}")
+            return
+        timings[(compute_type, threads)] = elapsed
+        if log_callback:
+            log_callback(f"ⓘ 调优 {compute_type} / {threads} 线程: {elapsed:.2f} 秒")
+
+    for compute_type in compute_types:
+        run(compute_type, thread_counts[0])
+    if not timings:
+        raise Exception("所有计算类型均无法运行")
+
+    best_type = min(timings, key=timings.get)[0]
+    for threads in thread_counts[1:]:
+        run(best_type, threads)
+
+    compute_type, threads = min(timings, key=timings.get)
+    return compute_type, threads, timings
@@ -119,6 +119,7 @@ class ToolboxGUI(QMainWindow, Ui_SubtitleToolbox):
         
         # Srt2Ass选项卡中的下拉框
         self.AssPatternSelect.currentIndexChanged.connect(self._on_ass_pattern_changed)
+        self.AssAlignSelect.currentIndexChanged.connect(self._on_ass_align_changed)
         
         # Script选项卡中的输出选项
         self.Output2PDF.toggled.connect(self._on_pdf_state_changed)
@@ -160,10 +161,14 @@ class ToolboxGUI(QMainWindow, Ui_SubtitleToolbox):
         
         # Whisper引擎选择下拉框信号
         self.WhisperEngineSelect.currentIndexChanged.connect(self._on_whisper_engine_changed)
+        self.CpuComputeTypeSelect.currentIndexChanged.connect(self._on_cpu_compute_type_changed)
         
-        # VTT to SRT 拖放区域设置
+        # VTT to SRT 拖放区域设置（在后台线程中转换，通过控制器的信号线程安全地输出日志与进度）
         from function.vtt2srt import setup_vtt2srt_drop_area
-        setup_vtt2srt_drop_area(self.Vtt2SrtDrop, self.log)
+        if hasattr(self.app, 'update_progress'):
+            setup_vtt2srt_drop_area(self.Vtt2SrtDrop, self.app.log, self.app.update_progress)
+        else:
+            setup_vtt2srt_drop_area(self.Vtt2SrtDrop, self.log)
 
         # 连接控制器信号到GUI槽函数（线程安全更新）
         if hasattr(self.app, 'update_log'):
@@ -378,9 +383,11 @@ class ToolboxGUI(QMainWindow, Ui_SubtitleToolbox):
         label_widgets = [
             self.VolumeLabel,
             self.AssPatternLabel,
+            self.AssAlignLabel,
             self.WhisperModelLabel,
             self.WhisperLanguageLabel,
-            self.WhisperEngineLabel
+            self.WhisperEngineLabel,
+            self.CpuComputeTypeLabel
         ]
 
         for label in label_widgets:
@@ -635,6 +642,18 @@ class ToolboxGUI(QMainWindow, Ui_SubtitleToolbox):
         # 记录日志
         self.log(f"已选择 ASS 字体方案: {pattern_name_cn}")
     
+    def _on_ass_align_changed(self, value):
+        """
+        时间轴对齐方式选择变化时的处理
+
+        Args:
+            value: 对齐方式索引（0=不对齐, 1=吸附, 2=合并）
+        """
+        align_map = {0: "off", 1: "snap", 2: "merge"}
+        if hasattr(self.app, 'srt2ass_align'):
+            self.app.srt2ass_align = align_map.get(value, "off")
+        self.log(f"已选择时间轴对齐方式: {self.AssAlignSelect.currentText()}")
+
     def _open_whisper_model_dir(self):
         """打开 Whisper 模型目录"""
         import os
@@ -913,6 +932,30 @@ class ToolboxGUI(QMainWindow, Ui_SubtitleToolbox):
 
         # 记录日志
         self.log(f"✓ 已切换 Whisper 引擎: {engine_type}")
+
+    def _on_cpu_compute_type_changed(self, value):
+        """
+        CPU 计算类型选择变化时的处理
+
+        Args:
+            value: 计算类型索引（0 为自动调优）
+        """
+        compute_type = "auto" if value == 0 else self.CpuComputeTypeSelect.currentText()
+
+        # 更新控制器的计算类型设置
+        if hasattr(self.app, 'cpu_compute_type'):
+            self.app.cpu_compute_type = compute_type
+
+        # 保存到配置
+        if hasattr(self.app, 'config'):
+            self.app.config.cpu_compute_type = compute_type
+            self.app.config.save_settings()
+
+        # 记录日志
+        if compute_type == "auto":
+            self.log("✓ CPU 计算类型: 自动调优")
+        else:
+            self.log(f"✓ CPU 计算类型: {compute_type}")
     
 
     
@@ -1029,6 +1072,13 @@ class ToolboxGUI(QMainWindow, Ui_SubtitleToolbox):
             # 恢复信号发射
             self.WhisperEngineSelect.blockSignals(False)
 
+        # 更新CPU计算类型选择（"auto" 对应第一项"自动调优"）
+        if hasattr(self.app, 'cpu_compute_type'):
+            self.CpuComputeTypeSelect.blockSignals(True)
+            compute_index = self.CpuComputeTypeSelect.findText(self.app.cpu_compute_type)
+            self.CpuComputeTypeSelect.setCurrentIndex(compute_index if compute_index >= 0 else 0)
+            self.CpuComputeTypeSelect.blockSignals(False)
+
         # 更新ASS字体方案选择
         if hasattr(self.app, 'ass_pattern'):
             # 阻止信号发射
@@ -1056,6 +1106,13 @@ class ToolboxGUI(QMainWindow, Ui_SubtitleToolbox):
             
             # 恢复信号发射
             self.AssPatternSelect.blockSignals(False)
+
+        # 更新时间轴对齐方式选择
+        if hasattr(self.app, 'srt2ass_align'):
+            self.AssAlignSelect.blockSignals(True)
+            align_to_index = {"off": 0, "snap": 1, "merge": 2}
+            self.AssAlignSelect.setCurrentIndex(align_to_index.get(self.app.srt2ass_align, 0))
+            self.AssAlignSelect.blockSignals(False)
         
         # 恢复信号发射
         self.ReadPathInput.blockSignals(False)
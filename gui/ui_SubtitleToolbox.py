@@ -1108,6 +1108,46 @@ class Ui_SubtitleToolbox(object):
 
         self.horizontalLayout_3.addLayout(self.verticalLayout)
 
+        self.verticalLayout_7 = QVBoxLayout()
+        self.verticalLayout_7.setSpacing(0)
+        self.verticalLayout_7.setObjectName(u"verticalLayout_7")
+        self.AssAlignLabel = QLabel(self.Srt2Ass)
+        self.AssAlignLabel.setObjectName(u"AssAlignLabel")
+        sizePolicy.setHeightForWidth(self.AssAlignLabel.sizePolicy().hasHeightForWidth())
+        self.AssAlignLabel.setSizePolicy(sizePolicy)
+        self.AssAlignLabel.setMinimumSize(QSize(0, 30))
+        self.AssAlignLabel.setMaximumSize(QSize(16777215, 30))
+        self.AssAlignLabel.setFont(font10)
+        self.AssAlignLabel.setLayoutDirection(Qt.LayoutDirection.LeftToRight)
+        self.AssAlignLabel.setStyleSheet(u"color: rgb(0, 0, 0);")
+        self.AssAlignLabel.setFrameShape(QFrame.Shape.NoFrame)
+        self.AssAlignLabel.setTextFormat(Qt.TextFormat.PlainText)
+        self.AssAlignLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.AssAlignLabel.setWordWrap(False)
+
+        self.verticalLayout_7.addWidget(self.AssAlignLabel, 0, Qt.AlignmentFlag.AlignHCenter)
+
+        self.AssAlignSelect = QComboBox(self.Srt2Ass)
+        self.AssAlignSelect.addItem("")
+        self.AssAlignSelect.addItem("")
+        self.AssAlignSelect.addItem("")
+        self.AssAlignSelect.setObjectName(u"AssAlignSelect")
+        sizePolicy.setHeightForWidth(self.AssAlignSelect.sizePolicy().hasHeightForWidth())
+        self.AssAlignSelect.setSizePolicy(sizePolicy)
+        self.AssAlignSelect.setMinimumSize(QSize(80, 30))
+        self.AssAlignSelect.setMaximumSize(QSize(80, 30))
+        self.AssAlignSelect.setFont(font11)
+        self.AssAlignSelect.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
+        self.AssAlignSelect.setLayoutDirection(Qt.LayoutDirection.LeftToRight)
+        # 与字体方案下拉框使用相同的样式
+        self.AssAlignSelect.setStyleSheet(self.AssPatternSelect.styleSheet())
+        self.AssAlignSelect.setEditable(False)
+
+        self.verticalLayout_7.addWidget(self.AssAlignSelect, 0, Qt.AlignmentFlag.AlignHCenter)
+
+
+        self.horizontalLayout_3.addLayout(self.verticalLayout_7)
+
         self.DividingLine_2 = QFrame(self.Srt2Ass)
         self.DividingLine_2.setObjectName(u"DividingLine_2")
         self.DividingLine_2.setMinimumSize(QSize(10, 0))
@@ -1165,7 +1205,8 @@ class Ui_SubtitleToolbox(object):
         self.horizontalLayout_3.addWidget(self.Vtt2SrtDrop)
 
         self.horizontalLayout_3.setStretch(0, 1)
-        self.horizontalLayout_3.setStretch(2, 3)
+        self.horizontalLayout_3.setStretch(1, 1)
+        self.horizontalLayout_3.setStretch(3, 3)
 
         self.verticalLayout_9.addLayout(self.horizontalLayout_3)
 
@@ -1465,6 +1506,46 @@ class Ui_SubtitleToolbox(object):
 
         self.gridLayout.addLayout(self.horizontalLayout_4, 1, 1, 1, 1)
 
+        self.horizontalLayout_10 = QHBoxLayout()
+        self.horizontalLayout_10.setSpacing(10)
+        self.horizontalLayout_10.setObjectName(u"horizontalLayout_10")
+        self.CpuComputeTypeLabel = QLabel(self.AutoSub)
+        self.CpuComputeTypeLabel.setObjectName(u"CpuComputeTypeLabel")
+        sizePolicy.setHeightForWidth(self.CpuComputeTypeLabel.sizePolicy().hasHeightForWidth())
+        self.CpuComputeTypeLabel.setSizePolicy(sizePolicy)
+        self.CpuComputeTypeLabel.setMinimumSize(QSize(0, 30))
+        self.CpuComputeTypeLabel.setMaximumSize(QSize(16777215, 30))
+        self.CpuComputeTypeLabel.setFont(font10)
+        self.CpuComputeTypeLabel.setLayoutDirection(Qt.LayoutDirection.LeftToRight)
+        self.CpuComputeTypeLabel.setStyleSheet(u"color: rgb(0, 0, 0);")
+        self.CpuComputeTypeLabel.setFrameShape(QFrame.Shape.NoFrame)
+        self.CpuComputeTypeLabel.setTextFormat(Qt.TextFormat.PlainText)
+        self.CpuComputeTypeLabel.setAlignment(Qt.AlignmentFlag.AlignRight|Qt.AlignmentFlag.AlignTrailing|Qt.AlignmentFlag.AlignVCenter)
+
+        self.horizontalLayout_10.addWidget(self.CpuComputeTypeLabel)
+
+        self.CpuComputeTypeSelect = QComboBox(self.AutoSub)
+        self.CpuComputeTypeSelect.addItem("")
+        self.CpuComputeTypeSelect.addItem("")
+        self.CpuComputeTypeSelect.addItem("")
+        self.CpuComputeTypeSelect.addItem("")
+        self.CpuComputeTypeSelect.setObjectName(u"CpuComputeTypeSelect")
+        sizePolicy.setHeightForWidth(self.CpuComputeTypeSelect.sizePolicy().hasHeightForWidth())
+        self.CpuComputeTypeSelect.setSizePolicy(sizePolicy)
+        self.CpuComputeTypeSelect.setMinimumSize(QSize(110, 30))
+        self.CpuComputeTypeSelect.setMaximumSize(QSize(110, 30))
+        self.CpuComputeTypeSelect.setFont(font11)
+        self.CpuComputeTypeSelect.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
+        self.CpuComputeTypeSelect.setLayoutDirection(Qt.LayoutDirection.LeftToRight)
+        # 与引擎下拉框使用相同的样式
+        self.CpuComputeTypeSelect.setStyleSheet(self.WhisperEngineSelect.styleSheet())
+        self.CpuComputeTypeSelect.setEditable(False)
+
+        self.horizontalLayout_10.addWidget(self.CpuComputeTypeSelect)
+
+
+        self.gridLayout.addLayout(self.horizontalLayout_10, 2, 1, 1, 1)
+
 
         self.verticalLayout_8.addLayout(self.gridLayout)
 
@@ -1894,6 +1975,13 @@ class Ui_SubtitleToolbox(object):
         self.AssPatternSelect.setItemText(1, QCoreApplication.translate("SubtitleToolbox", u"\u65e5\u4e0a\u4e2d\u4e0b", None))
         self.AssPatternSelect.setItemText(2, QCoreApplication.translate("SubtitleToolbox", u"\u82f1\u4e0a\u4e2d\u4e0b", None))
         self.AssPatternSelect.setItemText(3, QCoreApplication.translate("SubtitleToolbox", u"\u97e9\u4e0a\u65e5\u4e0b", None))
+        self.AssAlignLabel.setText(QCoreApplication.translate("SubtitleToolbox", u"\u65f6\u95f4\u8f74\u5bf9\u9f50", None))
+        self.AssAlignSelect.setItemText(0, QCoreApplication.translate("SubtitleToolbox", u"\u4e0d\u5bf9\u9f50", None))
+        self.AssAlignSelect.setItemText(1, QCoreApplication.translate("SubtitleToolbox", u"\u5438\u9644", None))
+        self.AssAlignSelect.setItemText(2, QCoreApplication.translate("SubtitleToolbox", u"\u5408\u5e76", None))
+#if QT_CONFIG(tooltip)
+        self.AssAlignSelect.setToolTip(QCoreApplication.translate("SubtitleToolbox", u"\u5438\u9644\uff1a\u65f6\u95f4\u76f8\u8fd1\u7684\u4e0a\u4e0b\u5b57\u5e55\u5bf9\u9f50\u8fb9\u754c\uff1b\u5408\u5e76\uff1a\u5408\u5e76\u4e3a\u4e00\u6761\u4e8b\u4ef6", None))
+#endif // QT_CONFIG(tooltip)
 
 #if QT_CONFIG(tooltip)
         self.Vtt2SrtDrop.setToolTip("")
@@ -1914,6 +2002,15 @@ class Ui_SubtitleToolbox(object):
         self.WhisperEngineSelect.setItemText(0, QCoreApplication.translate("SubtitleToolbox", u"GPU", None))
         self.WhisperEngineSelect.setItemText(1, QCoreApplication.translate("SubtitleToolbox", u"CPU", None))
 
+        self.CpuComputeTypeLabel.setText(QCoreApplication.translate("SubtitleToolbox", u"CPU\u8ba1\u7b97", None))
+        self.CpuComputeTypeSelect.setItemText(0, QCoreApplication.translate("SubtitleToolbox", u"\u81ea\u52a8\u8c03\u4f18", None))
+        self.CpuComputeTypeSelect.setItemText(1, QCoreApplication.translate("SubtitleToolbox", u"int8", None))
+        self.CpuComputeTypeSelect.setItemText(2, QCoreApplication.translate("SubtitleToolbox", u"int8_float32", None))
+        self.CpuComputeTypeSelect.setItemText(3, QCoreApplication.translate("SubtitleToolbox", u"float32", None))
+#if QT_CONFIG(tooltip)
+        self.CpuComputeTypeSelect.setToolTip(QCoreApplication.translate("SubtitleToolbox", u"\u81ea\u52a8\u8c03\u4f18\uff1a\u9996\u6b21\u4f7f\u7528CPU\u6a21\u5f0f\u65f6\u6d4b\u8bd5\u5404\u8ba1\u7b97\u7c7b\u578b\u4e0e\u7ebf\u7a0b\u6570\uff0c\u4fdd\u5b58\u6700\u5feb\u7684\u914d\u7f6e", None))
+#endif // QT_CONFIG(tooltip)
+
         self.WhisperLanguageLabel.setText(QCoreApplication.translate("SubtitleToolbox", u"\u8bed\u8a00", None))
         self.WhisperLanguageSelect.setItemText(0, QCoreApplication.translate("SubtitleToolbox", u"\u81ea\u52a8", None))
         self.WhisperLanguageSelect.setItemText(1, QCoreApplication.translate("SubtitleToolbox", u"\u97e9\u8bed", None))
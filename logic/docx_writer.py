@@ -0,0 +1,232 @@
+"""
+流式DOCX写入模块
+直接以流式方式将 word/document.xml 写入 zip 包，不在内存中构建完整的文档树。
+样式、主题、字体表等部件复用预先加载的模板（python-docx 自带的默认模板），
+因此输出的可见效果与 python-docx 生成的文档一致。
+"""
+
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+__all__ = [
+    'StreamingDocxWriter',
+    'load_docx_template',
+    'mm_to_twips'
+]
+
+# 模板中由写入器自行生成的部件
+_GENERATED_PARTS = ("[Content_Types].xml", "word/document.xml", "word/_rels/document.xml.rels")
+
+_HEADER_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml"
+_HEADER_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/header"
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+# XML 1.0 不允许的控制字符（python-docx 遇到这些字符会直接报错）
+_INVALID_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# 写入缓冲阈值，累积到一定大小再交给 zlib 压缩，减少逐段写入的开销
+_FLUSH_THRESHOLD = 64 * 1024
+
+# 模板缓存：进程内只读取一次
+_TEMPLATE_CACHE = {}
+
+
+def mm_to_twips(value_mm):
+    """毫米转换为 Word 使用的 twips（1/20 磅），与 python-docx 的取整方式一致"""
+    return int(round(value_mm * 36000)) // 635
+
+
+def _default_template_path():
+    """python-docx 自带默认模板的路径"""
+    import docx
+    return os.path.join(os.path.dirname(docx.__file__), 'templates', 'default.docx')
+
+
+def load_docx_template(template_path=None):
+    """加载并缓存DOCX模板
+
+    读取模板包中除主文档、主文档关系与内容类型外的所有部件，
+    并提取主文档根节点声明与页面尺寸，供流式写入器复用。
+
+    Args:
+        template_path: 模板路径，默认使用 python-docx 自带的默认模板
+
+    Returns:
+        dict: 模板信息
+    """
+    if template_path is None:
+        template_path = _default_template_path()
+    if template_path in _TEMPLATE_CACHE:
+        return _TEMPLATE_CACHE[template_path]
+
+    with zipfile.ZipFile(template_path) as zf:
+        parts = [(name, zf.read(name)) for name in zf.namelist() if name not in _GENERATED_PARTS]
+        document_xml = zf.read("word/document.xml").decode('utf-8')
+        rels_xml = zf.read("word/_rels/document.xml.rels").decode('utf-8')
+        content_types_xml = zf.read("[Content_Types].xml").decode('utf-8')
+
+    # 复用模板主文档的根节点（包含全部命名空间声明）
+    root_match = re.search(r'<w:document\b[^>]*>', document_xml)
+    document_open = root_match.group(0) if root_match else f'<w:document xmlns:w="{_W_NS}" xmlns:r="{_R_NS}">'
+    # 复用模板的页面尺寸
+    pg_sz_match = re.search(r'<w:pgSz\b[^>]*/>', document_xml)
+    pg_sz = pg_sz_match.group(0) if pg_sz_match else '<w:pgSz w:w="12240" w:h="15840"/>'
+
+    template = {
+        "parts": parts,
+        "document_open": document_open,
+        "pg_sz": pg_sz,
+        "rels_xml": rels_xml,
+        "content_types_xml": content_types_xml,
+    }
+    _TEMPLATE_CACHE[template_path] = template
+    return template
+
+
+def _run_xml(text, bold=False):
+    """生成一个文本 run，制表符与换行转换为对应的 Word 元素（与 python-docx 一致）"""
+    text = _INVALID_XML_CHARS.sub('', text)
+    out = ['<w:r>']
+    if bold:
+        out.append('<w:rPr><w:b/></w:rPr>')
+    for i, line in enumerate(text.split('\n')):
+        if i:
+            out.append('<w:br/>')
+        for j, chunk in enumerate(line.split('\t')):
+            if j:
+                out.append('<w:tab/>')
+            if not chunk:
+                continue
+            if chunk[0].isspace() or chunk[-1].isspace():
+                out.append(f'<w:t xml:space="preserve">{escape(chunk)}</w:t>')
+            else:
+                out.append(f'<w:t>{escape(chunk)}</w:t>')
+    out.append('</w:r>')
+    return ''.join(out)
+
+
+class StreamingDocxWriter:
+    """流式DOCX写入器
+
+    按顺序追加分节、标题与段落，段落XML写入 zip 后即释放，内存占用不随文档长度增长。
+    每个分节拥有独立的页眉（居中显示分节标题）和相同的页边距。
+
+    用法:
+        with StreamingDocxWriter(path) as writer:
+            writer.start_section("标题")
+            writer.add_heading("标题", level=1)
+            writer.add_cue("00:00:01", "台词")
+    """
+
+    def __init__(self, path, margin_mm=25, template_path=None):
+        self.path = path
+        self._template = load_docx_template(template_path)
+        margin = mm_to_twips(margin_mm)
+        self._pg_mar = (f'<w:pgMar w:top="{margin}" w:right="{margin}" w:bottom="{margin}" '
+                        f'w:left="{margin}" w:header="720" w:footer="720" w:gutter="0"/>')
+        self._headers = []
+        self._buffer = []
+        self._buffer_size = 0
+        self._zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+        self._stream = self._zip.open("word/document.xml", 'w')
+        self._write('<?xml version=\'1.0\' encoding=\'UTF-8\' standalone=\'yes\'?>\n')
+        self._write(self._template["document_open"])
+        self._write('<w:body>')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def _write(self, text):
+        self._buffer.append(text)
+        self._buffer_size += len(text)
+        if self._buffer_size >= _FLUSH_THRESHOLD:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self._stream.write(''.join(self._buffer).encode('utf-8'))
+            self._buffer = []
+            self._buffer_size = 0
+
+    def _sect_pr(self):
+        """当前分节的分节属性"""
+        header_ref = ''
+        if self._headers:
+            header_ref = f'<w:headerReference w:type="default" r:id="rIdHdr{len(self._headers)}"/>'
+        return (f'<w:sectPr>{header_ref}{self._template["pg_sz"]}{self._pg_mar}'
+                f'<w:cols w:space="720"/><w:docGrid w:linePitch="360"/></w:sectPr>')
+
+    def start_section(self, header_text):
+        """开始新的分节，并设置该分节的页眉文字
+
+        Args:
+            header_text: 页眉文字
+        """
+        if self._headers:
+            # 与 python-docx 相同：上一分节的属性放在分节符段落中
+            self._write(f'<w:p><w:pPr>{self._sect_pr()}</w:pPr></w:p>')
+        self._headers.append(header_text)
+
+    def add_heading(self, text, level=1):
+        """添加标题段落"""
+        self._write(f'<w:p><w:pPr><w:pStyle w:val="Heading{level}"/></w:pPr>{_run_xml(text)}</w:p>')
+
+    def add_paragraph(self, text):
+        """添加普通段落"""
+        self._write(f'<w:p>{_run_xml(text)}</w:p>')
+
+    def add_cue(self, time_str, text, space_after_pt=4):
+        """添加一条字幕：加粗的时间戳 + 正文，段后间距默认4磅"""
+        self._write(f'<w:p><w:pPr><w:spacing w:after="{space_after_pt * 20}"/></w:pPr>'
+                    f'{_run_xml(f"[{time_str}]  ", bold=True)}{_run_xml(text)}</w:p>')
+
+    def _write_package_parts(self):
+        """写入页眉、主文档关系、内容类型以及模板中的其余部件"""
+        template = self._template
+        rels = []
+        overrides = []
+        for i, header_text in enumerate(self._headers, 1):
+            self._zip.writestr(
+                f"word/header{i}.xml",
+                '<?xml version=\'1.0\' encoding=\'UTF-8\' standalone=\'yes\'?>\n'
+                f'<w:hdr xmlns:w="{_W_NS}" xmlns:r="{_R_NS}"><w:p><w:pPr><w:pStyle w:val="Header"/>'
+                f'<w:jc w:val="center"/></w:pPr>{_run_xml(header_text)}</w:p></w:hdr>'
+            )
+            rels.append(f'<Relationship Id="rIdHdr{i}" Type="{_HEADER_REL_TYPE}" Target="header{i}.xml"/>')
+            overrides.append(f'<Override PartName="/word/header{i}.xml" ContentType="{_HEADER_CONTENT_TYPE}"/>')
+
+        self._zip.writestr("word/_rels/document.xml.rels",
+                           template["rels_xml"].replace('</Relationships>', ''.join(rels) + '</Relationships>'))
+        self._zip.writestr("[Content_Types].xml",
+                           template["content_types_xml"].replace('</Types>', ''.join(overrides) + '</Types>'))
+        for name, data in template["parts"]:
+            self._zip.writestr(name, data)
+
+    def close(self):
+        """结束文档并写入其余部件"""
+        self._write(self._sect_pr())
+        self._write('</w:body></w:document>')
+        self._flush()
+        self._stream.close()
+        self._write_package_parts()
+        self._zip.close()
+
+    def abort(self):
+        """放弃写入并删除未完成的文件"""
+        try:
+            self._stream.close()
+            self._zip.close()
+        except Exception:
+            pass
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -19,11 +19,39 @@ FONT_NAME_BODY = "Helvetica"
 FONT_NAME_ENG = "Helvetica"
 FONT_NAME_KR = "Helvetica"
 
-def init_fonts():
+# PDF输出方案：控制流压缩、字体子集化策略、可重现输出以及是否生成目录页
+# - standard: 与以往一致的默认输出
+# - fast: 不压缩页面流、不生成目录页（单轮排版），渲染最快
+# - compact: 压缩页面流、紧凑字体子集（不为ASCII预留子集）、不生成目录页，文件最小
+# - archival: 压缩页面流、可重现输出（固定时间戳与文档ID）、保留目录页
+PDF_PROFILES = {
+    "standard": {"page_compression": 1, "ascii_readable": True, "invariant": False, "toc": True},
+    "fast": {"page_compression": 0, "ascii_readable": True, "invariant": False, "toc": False},
+    "compact": {"page_compression": 1, "ascii_readable": False, "invariant": False, "toc": False},
+    "archival": {"page_compression": 1, "ascii_readable": True, "invariant": True, "toc": True},
+}
+DEFAULT_PDF_PROFILE = "standard"
+
+def get_pdf_profile(profile_name):
+    """获取PDF输出方案配置，未知名称回退到默认方案
+    
+    Args:
+        profile_name: 方案名称
+        
+    Returns:
+        dict: 方案配置
+    """
+    return PDF_PROFILES.get(profile_name, PDF_PROFILES[DEFAULT_PDF_PROFILE])
+
+def init_fonts(ascii_readable=True):
     """初始化PDF字体
     
     优先从项目font文件夹加载字体，然后尝试系统字体。
     支持中文（NotoSansSC）和韩语（NotoSansKR-Medium）。
+    
+    Args:
+        ascii_readable: 字体子集化策略，True 时第一个子集固定保留ASCII字符（文本可读），
+            False 时按实际使用的字符紧凑分配子集，嵌入的字体更小
     """
     global FONT_NAME_BODY, FONT_NAME_ENG, FONT_NAME_KR
     
@@ -44,9 +72,9 @@ def init_fonts():
         try:
             if os.path.exists(font_path):
                 if font_path.endswith('.ttc'):
-                    pdfmetrics.registerFont(TTFont('NotoSansSC', font_path, subfontIndex=0))
+                    pdfmetrics.registerFont(TTFont('NotoSansSC', font_path, subfontIndex=0, asciiReadable=ascii_readable))
                 else:
-                    pdfmetrics.registerFont(TTFont('NotoSansSC', font_path))
+                    pdfmetrics.registerFont(TTFont('NotoSansSC', font_path, asciiReadable=ascii_readable))
                 FONT_NAME_BODY = "NotoSansSC"
                 FONT_NAME_ENG = "NotoSansSC"
                 break
@@ -63,7 +91,7 @@ def init_fonts():
     for font_path in kr_fonts:
         try:
             if os.path.exists(font_path):
-                pdfmetrics.registerFont(TTFont('NotoSansKR-Medium', font_path))
+                pdfmetrics.registerFont(TTFont('NotoSansKR-Medium', font_path, asciiReadable=ascii_readable))
                 FONT_NAME_KR = "NotoSansKR-Medium"
                 break
         except Exception:
@@ -97,7 +125,7 @@ try:
 except ImportError:
     PdfMerger = None
 
-from function.file_utils import find_files_recursively, get_organized_path, get_save_path
+from function.file_utils import find_files_recursively, get_organized_path, get_save_path, emit_progress
 from function.parsers import parse_subtitle_to_list
 from function.naming import generate_output_name, clean_filename_title
 from function.volumes import smart_group_files
@@ -270,11 +298,118 @@ class MyDocTemplate(SimpleDocTemplate):
         c.line(20*mm, page_height - 18*mm, page_width - 20*mm, page_height - 18*mm)
         c.restoreState()
 
-def run_pdf_task(target_dir, log_func, progress_bar, root, batch_size=0, output_dir=None, volume_pattern="智能", stop_flag=[False]):
+class TaskStopped(Exception):
+    """用户停止任务时用于中断PDF排版流程的异常"""
+    pass
+
+class StreamingStory(list):
+    """惰性生成的PDF故事列表（流式模式）
+
+    reportlab 在排版时会不断从列表头部取出并删除流对象，
+    因此只需在缓冲区耗尽时再生成下一集的流对象即可。
+    已排版的流对象会随之释放，峰值内存只与单集大小相关。
+    """
+    def __init__(self, head, episode_factory):
+        """初始化流式故事列表
+
+        Args:
+            head: 固定的开头流对象（目录页等）
+            episode_factory: 返回逐集流对象列表迭代器的工厂函数
+        """
+        list.__init__(self, head)
+        self._head = list(head)
+        self._episode_factory = episode_factory
+        self._episodes = episode_factory()
+
+    def _refill(self):
+        """缓冲区为空时生成下一集的流对象"""
+        for chunk in self._episodes:
+            if chunk:
+                self.extend(chunk)
+                break
+
+    def __len__(self):
+        if not list.__len__(self):
+            self._refill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # multiBuild 每一轮通过 story[:] 复制故事，这里返回重新开始的惰性副本
+            if index.start is None and index.stop is None and index.step is None:
+                return StreamingStory(self._head, self._episode_factory)
+            return list.__getitem__(self, index)
+        if not list.__len__(self):
+            self._refill()
+        return list.__getitem__(self, index)
+
+def _build_episode_flowables(fp, is_first, bookmark_key, body, body_styles, stop_flag):
+    """生成单集字幕对应的PDF流对象
+
+    Args:
+        fp: 字幕文件路径
+        is_first: 是否为分卷中的第一集（第一集前不插入分页符）
+        bookmark_key: 章节书签标识符
+        body: 无对白提示使用的正文样式
+        body_styles: 按字体名缓存的正文样式字典
+        stop_flag: 停止标志
+
+    Returns:
+        list: 本集的流对象列表
+    """
+    clean_title = clean_filename_title(os.path.basename(fp))
+    flowables = [SetHeaderTitle(clean_title)]
+    if not is_first:
+        flowables.append(PageBreak())
+
+    # 根据标题内容动态选择字体
+    title_font = detect_font_for_text(clean_title)
+    # 创建动态标题样式
+    dynamic_h1 = ParagraphStyle('ChapterTitle',
+                               fontName=title_font,
+                               fontSize=16,
+                               leading=20,
+                               spaceAfter=10,
+                               textColor=colors.darkblue)
+    p = Paragraph(clean_title, dynamic_h1)
+    p._bookmarkName = bookmark_key
+    flowables.extend([Bookmark(bookmark_key), OutlineEntry(clean_title, bookmark_key), p, Spacer(1, 10)])
+
+    # 解析字幕内容
+    content_list = parse_subtitle_to_list(fp)
+    if not content_list:
+        flowables.append(Paragraph("<i>[无对白]</i>", body))
+        return flowables
+
+    for time_str, text in content_list:
+        # 检查停止标志
+        if stop_flag[0]:
+            raise TaskStopped()
+
+        safe_text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        # 根据文本内容选择合适的字体，同一字体的样式只创建一次
+        font_name = detect_font_for_text(text)
+        dynamic_body = body_styles.get(font_name)
+        if dynamic_body is None:
+            dynamic_body = ParagraphStyle('DynamicBody',
+                                        fontName=font_name,
+                                        fontSize=10,
+                                        leading=14,
+                                        spaceAfter=4,
+                                        alignment=TA_LEFT)
+            body_styles[font_name] = dynamic_body
+        flowables.append(Paragraph(f"<b>[{time_str}]</b>  {safe_text}", dynamic_body))
+    return flowables
+
+def run_pdf_task(target_dir, log_func, progress_bar, root, batch_size=0, output_dir=None, volume_pattern="智能", stop_flag=[False], streaming=False, profile=DEFAULT_PDF_PROFILE):
     """运行PDF文档生成任务
     
     从指定目录扫描字幕文件，生成带时间戳和目录的PDF文档。
     
+    流式模式下不会预先构建整卷的故事列表，而是在排版时逐集解析字幕并生成流对象，
+    已排版的流对象随即释放，目录数据由 TableOfContents 在排版过程中逐条收集。
+    代价是每一轮排版（通常为2~3轮）都会重新解析一次字幕文件。
+    
     Args:
         target_dir: 目标目录
         log_func: 日志记录函数
@@ -283,10 +418,16 @@ def run_pdf_task(target_dir, log_func, progress_bar, root, batch_size=0, output_
         batch_size: 批量大小
         output_dir: 输出目录
         volume_pattern: 分卷模式
+        stop_flag: 停止标志
+        streaming: 是否使用流式（内存受限）生成模式
+        profile: PDF输出方案名称（见 PDF_PROFILES）
     """
+    profile_settings = get_pdf_profile(profile)
     # 初始化字体
-    init_fonts()
+    init_fonts(ascii_readable=profile_settings["ascii_readable"])
     log_func(f"[PDF生成] 扫描目录: {target_dir.replace('/', '\\')}", tag="pdf_red")
+    if profile in PDF_PROFILES and profile != DEFAULT_PDF_PROFILE:
+        log_func(f"[PDF生成] 输出方案: {profile}", tag="pdf_red")
     # 递归查找字幕文件
     files = find_files_recursively(target_dir, ('.srt', '.vtt', '.ass'))
     if not files: 
@@ -301,12 +442,6 @@ def run_pdf_task(target_dir, log_func, progress_bar, root, batch_size=0, output_
     styles = getSampleStyleSheet()
     
     # 使用已加载的字体
-    h1 = ParagraphStyle('ChapterTitle', 
-                       fontName=FONT_NAME_BODY, 
-                       fontSize=16, 
-                       leading=20, 
-                       spaceAfter=10, 
-                       textColor=colors.darkblue)
     toc_h = ParagraphStyle('TOCHeader', 
                           fontName=FONT_NAME_BODY, 
                           fontSize=20, 
@@ -330,6 +465,9 @@ def run_pdf_task(target_dir, log_func, progress_bar, root, batch_size=0, output_
     styles.add(toc_text)
     styles.add(toc_link)
 
+    # 正文样式缓存（按字体名）
+    body_styles = {}
+
     # 确定基础输出目录
     base_output_dir = output_dir if output_dir else target_dir
 
@@ -348,7 +486,9 @@ def run_pdf_task(target_dir, log_func, progress_bar, root, batch_size=0, output_
         
         try:
             # 生成PDF文档
-            doc = MyDocTemplate(out_path, pagesize=A4, topMargin=25*mm, bottomMargin=25*mm, leftMargin=25*mm, rightMargin=25*mm)
+            doc = MyDocTemplate(out_path, pagesize=A4, topMargin=25*mm, bottomMargin=25*mm, leftMargin=25*mm, rightMargin=25*mm,
+                                pageCompression=profile_settings["page_compression"],
+                                invariant=1 if profile_settings["invariant"] else 0)
             frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
             doc.addPageTemplates([PageTemplate(id='normal', frames=frame)])
             # 创建目录对象并配置样式
@@ -367,81 +507,49 @@ def run_pdf_task(target_dir, log_func, progress_bar, root, batch_size=0, output_
                              firstLineIndent=-20, 
                              spaceBefore=3)
             ]
-            story = [Bookmark("TOC"), OutlineEntry("Content", "TOC"), Paragraph("Content", toc_h), toc, TOCFinished(), PageBreak()]
-            
-            for i, fp in enumerate(group):
-                # 检查停止标志
-                if stop_flag[0]:
-                    log_func("⚠️ 任务已被用户停止")
-                    return
-                    
-                clean_title = clean_filename_title(os.path.basename(fp))
-                story.append(SetHeaderTitle(clean_title))
-                if i > 0: 
-                    story.append(PageBreak())
-                    
-                # 根据标题内容动态选择字体
-                title_font = detect_font_for_text(clean_title)
-                # 创建动态标题样式
-                dynamic_h1 = ParagraphStyle('ChapterTitle', 
-                                           fontName=title_font, 
-                                           fontSize=16, 
-                                           leading=20, 
-                                           spaceAfter=10, 
-                                           textColor=colors.darkblue)
-                p = Paragraph(clean_title, dynamic_h1)
-                p._bookmarkName = f"CH_{processed_count}"
-                story.extend([Bookmark(p._bookmarkName), OutlineEntry(clean_title, p._bookmarkName), p, Spacer(1, 10)])
-                
-                # 解析字幕内容
-                content_list = parse_subtitle_to_list(fp)
-                if not content_list:
-                    story.append(Paragraph("<i>[无对白]</i>", body))
-                else:
-                    for time_str, text in content_list:
-                        # 检查停止标志
+            if profile_settings["toc"]:
+                head = [Bookmark("TOC"), OutlineEntry("Content", "TOC"), Paragraph("Content", toc_h), toc, TOCFinished(), PageBreak()]
+            else:
+                # 不生成目录页时没有索引流对象，multiBuild 只需一轮排版
+                head = []
+            first_key = processed_count
+
+            if streaming:
+                # 流式模式：每轮排版都从头逐集生成，进度只在首次生成某集时推进
+                reported = set()
+
+                def episode_factory():
+                    for i, fp in enumerate(group):
                         if stop_flag[0]:
-                            log_func("⚠️ 任务已被用户停止")
-                            return
-                            
-                        safe_text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                        # 根据文本内容选择合适的字体
-                        font_name = detect_font_for_text(text)
-                        # 创建动态字体样式
-                        dynamic_body = ParagraphStyle('DynamicBody', 
-                                                    fontName=font_name, 
-                                                    fontSize=10, 
-                                                    leading=14, 
-                                                    spaceAfter=4, 
-                                                    alignment=TA_LEFT)
-                        story.append(Paragraph(f"<b>[{time_str}]</b>  {safe_text}", dynamic_body))
-                
-                processed_count += 1
-                # 更新进度，支持不同类型的进度回调
-                try:
-                    # 尝试PyQt的信号方式（progress_bar是信号对象）
-                    progress_bar.emit(int(processed_count / total_files * 100))
-                except AttributeError:
-                    try:
-                        # 尝试直接调用方式（progress_bar是emit方法本身）
-                        progress_bar(int(processed_count / total_files * 100))
-                    except Exception as e:
-                        pass
+                            raise TaskStopped()
+                        yield _build_episode_flowables(fp, i == 0, f"CH_{first_key + i}", body, body_styles, stop_flag)
+                        if i not in reported:
+                            reported.add(i)
+                            emit_progress(progress_bar, int((first_key + len(reported)) / total_files * 100))
+
+                story = StreamingStory(head, episode_factory)
+            else:
+                story = head
+                for i, fp in enumerate(group):
+                    # 检查停止标志
+                    if stop_flag[0]:
+                        log_func("⚠️ 任务已被用户停止")
+                        return
+                    story.extend(_build_episode_flowables(fp, i == 0, f"CH_{first_key + i}", body, body_styles, stop_flag))
+                    emit_progress(progress_bar, int((first_key + i + 1) / total_files * 100))
+
+            processed_count += len(group)
             
             # 生成PDF
             doc.multiBuild(story)
             # 使用实际生成的文件路径
             relative_path = os.path.relpath(out_path, base_output_dir)
             log_func(f"📄 已生成: {relative_path.replace('/', '\\')}", tag="pdf_red")
+        except TaskStopped:
+            log_func("⚠️ 任务已被用户停止")
+            return
         except Exception as e: 
             log_func(f"❌ 失败: {e}")
     
     # 重置进度条
-    try:
-        progress_bar.emit(0)
-    except AttributeError:
-        try:
-            progress_bar(0)
-        except Exception as e:
-            pass
-
+    emit_progress(progress_bar, 0)
@@ -3,13 +3,15 @@ Word文档生成与合并模块
 负责将字幕文件转换为Word文档，并提供Word文档合并功能。
 """
 
+import io
 import os
-import pythoncom
-from docx.shared import Pt, RGBColor, Mm
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+import copy
 
 try: 
     from docx import Document
+    from docx.shared import Pt, RGBColor, Mm
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.oxml.ns import qn
     HAS_DOCX = True
 except ImportError: 
     HAS_DOCX = False
@@ -21,12 +23,179 @@ except ImportError:
     HAS_WIN32 = False
 
 # 导入自定义模块
-from function.file_utils import get_organized_path, get_save_path, find_files_recursively
+from function.file_utils import get_organized_path, get_save_path, find_files_recursively, emit_progress
 from function.parsers import parse_subtitle_to_list
 from function.naming import generate_output_name, clean_filename_title
 from function.volumes import smart_group_files
+from logic.docx_writer import StreamingDocxWriter
 
-def run_word_creation_task(target_dir, log_func, progress_bar, root, batch_size=0, output_dir=None, volume_pattern="智能", stop_flag=[False]):
+# Word生成后端：docx 使用 python-docx 构建文档树；stream 流式写入 document.xml，内存平稳、速度更快
+WORD_BACKENDS = ("docx", "stream")
+DEFAULT_WORD_BACKEND = "docx"
+
+def _setup_section(section):
+    """配置分节版式：25mm页边距、独立且居中的页眉"""
+    section.top_margin = section.bottom_margin = Mm(25)
+    section.left_margin = section.right_margin = Mm(25)
+    # 每个分节使用独立页眉，不沿用上一分节的页眉
+    section.header.is_linked_to_previous = False
+    section.header.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+def _new_base_document():
+    """创建配置好版式的基础文档"""
+    doc = Document()
+    _setup_section(doc.sections[0])
+    return doc
+
+def build_base_snapshot():
+    """构建配置好的基础文档（样式、页边距、页眉版式）并序列化为字节
+    
+    每次运行只构建一次，各分卷直接从内存快照创建文档，
+    避免每个分卷都从磁盘加载默认模板并重新配置版式（单集模式下尤为明显）。
+    快照中去掉了仅供 Word 2010 使用的 stylesWithEffects 部件和缩略图，
+    每个分卷少解压/压缩约 440KB 的XML，可见效果不变。
+    
+    Returns:
+        bytes: 基础文档的DOCX字节
+    """
+    doc = _new_base_document()
+    for rel in list(doc.part.rels.values()):
+        if rel.reltype.endswith("/stylesWithEffects"):
+            doc.part.drop_rel(rel.rId)
+    package_rels = doc.part.package.rels
+    for rel in list(package_rels.values()):
+        if rel.reltype.endswith("/thumbnail"):
+            package_rels.pop(rel.rId)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def _cue_prototype(doc):
+    """构建字幕段落原型：段后4磅，加粗的时间戳 run + 正文 run
+    
+    每条字幕从原型深拷贝后填入文字，省去逐条通过 python-docx 接口插入 run、设置加粗与段落格式的开销。
+    
+    Returns:
+        元素: 未挂到文档中的 w:p 元素
+    """
+    p = doc.add_paragraph()
+    p.paragraph_format.space_after = Pt(4)
+    run = p.add_run()
+    run.bold = True
+    p.add_run()
+    element = p._p
+    element.getparent().remove(element)
+    return element
+
+def _fill_text(t_element, text):
+    """设置 w:t 文字，首尾有空白时保留空白（与 python-docx 一致）"""
+    t_element.text = text
+    if text and (text[0].isspace() or text[-1].isspace()):
+        t_element.set(qn('xml:space'), 'preserve')
+
+def _build_docx_volume(group, out_path, stop_flag, on_episode_done, base_snapshot=None):
+    """使用 python-docx 生成一个分卷文档
+    
+    Args:
+        base_snapshot: build_base_snapshot() 生成的基础文档快照，None 时现场创建基础文档
+    
+    Returns:
+        bool: 完成返回 True，被用户停止返回 False
+    """
+    doc = Document(io.BytesIO(base_snapshot)) if base_snapshot else _new_base_document()
+    cue_prototype = _cue_prototype(doc)
+    w_r, w_t = qn('w:r'), qn('w:t')
+    # 正文段落插入在文档末尾的分节属性之前
+    body_sect_pr = doc.element.body.sectPr
+    for i, fp in enumerate(group):
+        # 检查停止标志
+        if stop_flag[0]:
+            return False
+            
+        title_text = clean_filename_title(os.path.basename(fp))
+        if i == 0:
+            # 第一个分节的版式已在基础文档中配置好
+            section = doc.sections[0]
+        else:
+            section = doc.add_section()
+            _setup_section(section)
+        
+        # 设置页眉
+        section.header.paragraphs[0].text = title_text
+
+        # 添加标题
+        doc.add_heading(title_text, level=1)
+        
+        # 解析字幕内容
+        content_list = parse_subtitle_to_list(fp)
+        
+        if not content_list:
+            doc.add_paragraph("[无对白内容]")
+        else:
+            for time_str, text in content_list:
+                # 检查停止标志
+                if stop_flag[0]:
+                    return False
+                    
+                cue = copy.deepcopy(cue_prototype)
+                time_run, text_run = cue.iterchildren(w_r)
+                time_t = time_run.makeelement(w_t)
+                time_run.append(time_t)
+                _fill_text(time_t, f"[{time_str}]  ")
+                if text:
+                    text_t = text_run.makeelement(w_t)
+                    text_run.append(text_t)
+                    _fill_text(text_t, text)
+                body_sect_pr.addprevious(cue)
+
+        on_episode_done()
+    
+    # 保存文档
+    doc.save(out_path)
+    return True
+
+def _build_stream_volume(group, out_path, stop_flag, on_episode_done, base_snapshot=None):
+    """使用流式写入器生成一个分卷文档，可见效果与 python-docx 后端一致
+    
+    Args:
+        base_snapshot: 不使用（流式写入器自带模板缓存），保持与 python-docx 后端相同的调用方式
+    
+    Returns:
+        bool: 完成返回 True，被用户停止返回 False（未完成的文件会被删除）
+    """
+    writer = StreamingDocxWriter(out_path, margin_mm=25)
+    try:
+        for fp in group:
+            # 检查停止标志
+            if stop_flag[0]:
+                writer.abort()
+                return False
+
+            title_text = clean_filename_title(os.path.basename(fp))
+            writer.start_section(title_text)
+            writer.add_heading(title_text, level=1)
+
+            # 解析字幕内容
+            content_list = parse_subtitle_to_list(fp)
+
+            if not content_list:
+                writer.add_paragraph("[无对白内容]")
+            else:
+                for time_str, text in content_list:
+                    # 检查停止标志
+                    if stop_flag[0]:
+                        writer.abort()
+                        return False
+                    writer.add_cue(time_str, text)
+
+            on_episode_done()
+    except Exception:
+        writer.abort()
+        raise
+    writer.close()
+    return True
+
+def run_word_creation_task(target_dir, log_func, progress_bar, root, batch_size=0, output_dir=None, volume_pattern="智能", stop_flag=[False], backend=DEFAULT_WORD_BACKEND):
     """运行Word文档生成任务
     
     从指定目录扫描字幕文件，生成带时间戳的Word文档。
@@ -39,6 +208,8 @@ def run_word_creation_task(target_dir, log_func, progress_bar, root, batch_size=
         batch_size: 批量大小
         output_dir: 输出目录
         volume_pattern: 分卷模式
+        stop_flag: 停止标志
+        backend: 生成后端（"docx" 或 "stream"）
     """
     if not HAS_DOCX: 
         return log_func("❌ 错误: 缺少 python-docx 库")
@@ -54,6 +225,15 @@ def run_word_creation_task(target_dir, log_func, progress_bar, root, batch_size=
     total_files = len(files)
     count = 0
 
+    def on_episode_done():
+        nonlocal count
+        count += 1
+        emit_progress(progress_bar, int(count / total_files * 100))
+
+    build_volume = _build_stream_volume if backend == "stream" else _build_docx_volume
+    # python-docx 后端：基础文档每次运行只构建一次
+    base_snapshot = build_base_snapshot() if backend != "stream" else None
+
     # 确定基础输出目录
     base_output_dir = output_dir if output_dir else target_dir
 
@@ -71,58 +251,9 @@ def run_word_creation_task(target_dir, log_func, progress_bar, root, batch_size=
         out_path = get_organized_path(base_output_dir, out_name)
         
         try:
-            doc = Document()
-            for i, fp in enumerate(group):
-                # 检查停止标志
-                if stop_flag[0]:
-                    log_func("⚠️ 任务已被用户停止")
-                    return
-                    
-                title_text = clean_filename_title(os.path.basename(fp))
-                section = doc.sections[0] if i == 0 else doc.add_section()
-                section.top_margin = section.bottom_margin = Mm(25)
-                section.left_margin = section.right_margin = Mm(25)
-                
-                # 设置页眉
-                header_para = section.header.paragraphs[0]
-                header_para.text = title_text
-                header_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-                # 添加标题
-                doc.add_heading(title_text, level=1)
-                
-                # 解析字幕内容
-                content_list = parse_subtitle_to_list(fp)
-                
-                if not content_list:
-                    doc.add_paragraph("[无对白内容]")
-                else:
-                    for time_str, text in content_list:
-                        # 检查停止标志
-                        if stop_flag[0]:
-                            log_func("⚠️ 任务已被用户停止")
-                            return
-                            
-                        p = doc.add_paragraph()
-                        p.paragraph_format.space_after = Pt(4)
-                        run = p.add_run(f"[{time_str}]  ")
-                        run.bold = True
-                        p.add_run(text)
-
-                count += 1
-                # 更新进度，支持不同类型的进度回调
-                try:
-                    # 尝试PyQt的信号方式（progress_bar是信号对象）
-                    progress_bar.emit(int(count / total_files * 100))
-                except AttributeError:
-                    try:
-                        # 尝试直接调用方式（progress_bar是emit方法本身）
-                        progress_bar(int(count / total_files * 100))
-                    except Exception as e:
-                        pass
-            
-            # 保存文档
-            doc.save(out_path)
+            if not build_volume(group, out_path, stop_flag, on_episode_done, base_snapshot):
+                log_func("⚠️ 任务已被用户停止")
+                return
             # 使用实际生成的文件路径
             relative_path = os.path.relpath(out_path, base_output_dir)
             log_func(f"📄 已生成: {relative_path.replace('/', '\\')}", tag="word_blue")
@@ -130,11 +261,4 @@ def run_word_creation_task(target_dir, log_func, progress_bar, root, batch_size=
             log_func(f"❌ 生成失败: {e}")
     
     # 重置进度条
-    try:
-        progress_bar.emit(0)
-    except AttributeError:
-        try:
-            progress_bar(0)
-        except Exception as e:
-            pass
-
+    emit_progress(progress_bar, 0)
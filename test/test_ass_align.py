@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试双语字幕时间轴对齐
+验证容差内的边界吸附、合并为单条事件、容差外与不重叠的字幕保持不变，
+并可单独运行输出电影长度字幕轨的对齐耗时
+"""
+
+import os
+import sys
+import time
+import random
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from font.srt2ass import align_cues
+
+
+def _tracks():
+    upper = [[1000, 3000, "안녕"], [4000, 6000, "잘 가"], [8000, 9000, "음"], [20000, 22000, "끝"]]
+    lower = [[1150, 2900, "你好"], [4500, 6100, "再见"], [12000, 13000, "独白"], [20050, 21980, "结束"]]
+    return upper, lower
+
+
+def test_snap():
+    """开始、结束时间分别在容差内时对齐到上方字幕，上方字幕不变"""
+    upper, lower = _tracks()
+    assert align_cues(upper, lower, 200) == []
+    assert upper == _tracks()[0]
+    assert lower == [[1000, 3000, "你好"], [4500, 6000, "再见"], [12000, 13000, "独白"], [20000, 22000, "结束"]]
+
+
+def test_merge():
+    """开始与结束时间都在容差内的字幕合并为一条事件，其余字幕保留在各自轨中"""
+    upper, lower = _tracks()
+    merged = align_cues(upper, lower, 200, merge=True, lower_style="CHN")
+    assert merged == [[1000, 3000, "안녕\\N{\\rCHN}你好"], [20000, 22000, "끝\\N{\\rCHN}结束"]]
+    assert upper == [[4000, 6000, "잘 가"], [8000, 9000, "음"]]
+    assert lower == [[4500, 6100, "再见"], [12000, 13000, "独白"]]
+
+
+def test_unsorted_and_long_cue():
+    """输入未排序、下方一条长字幕覆盖多条上方字幕时，两端分别吸附"""
+    upper = [[5000, 7000, "b"], [1000, 3000, "a"]]
+    lower = [[1100, 6900, "长"]]
+    align_cues(upper, lower, 200)
+    assert upper == [[1000, 3000, "a"], [5000, 7000, "b"]]
+    assert lower == [[1000, 7000, "长"]]
+
+
+def test_spanning_cue_stays_linear():
+    """下方一条贯穿全片的长字幕不影响其他字幕的比较范围：规模翻倍时耗时约翻倍，结果与没有长字幕时相同"""
+    rng = random.Random(1)
+    timings = []
+    for n in (2000, 8000):
+        upper = _random_track(n, rng, 0)
+        lower = _random_track(n, rng, 300)
+        expected_upper, expected_lower = [c[:] for c in upper], [c[:] for c in lower]
+        expected = align_cues(expected_upper, expected_lower, 200, merge=True, lower_style="CHN")
+        lower.append([0, n * 4000, "标牌"])
+        start = time.perf_counter()
+        merged = align_cues(upper, lower, 200, merge=True, lower_style="CHN")
+        timings.append(time.perf_counter() - start)
+        assert merged == expected and upper == expected_upper
+        assert lower == [[0, n * 4000, "标牌"]] + expected_lower
+    # 之前每条上方字幕都会重新扫描之后的全部下方字幕，4 倍规模耗时约 16 倍
+    assert timings[1] < timings[0] * 10 + 0.05
+
+
+def _random_track(count, rng, jitter):
+    track = []
+    start = 0
+    for i in range(count):
+        start += rng.randint(500, 4000)
+        track.append([start + rng.randint(-jitter, jitter), start + 2000 + rng.randint(-jitter, jitter), str(i)])
+    return track
+
+
+def benchmark_align(count=2000):
+    """电影长度字幕轨的对齐耗时（规模翻倍时耗时应约翻倍）"""
+    rng = random.Random(0)
+    for n in (count, count * 2, count * 4):
+        upper = _random_track(n, rng, 0)
+        lower = _random_track(n, rng, 300)
+        start = time.perf_counter()
+        align_cues(upper, lower, 200, merge=True, lower_style="CHN")
+        print(f"{n} + {n} 条字幕: {(time.perf_counter() - start) * 1000:.1f} 毫秒")
+
+
+if __name__ == "__main__":
+    test_snap()
+    test_merge()
+    test_unsorted_and_long_cue()
+    test_spanning_cue_stays_linear()
+    benchmark_align()
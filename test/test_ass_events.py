@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试ASS事件生成
+验证整数运算的时间戳与 pysubs2 的格式化结果一致、Dialogue 行格式不变，
+并可单独运行输出与原逐行格式化方式的耗时对比
+"""
+
+import os
+import sys
+import time
+import random
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pysubs2
+from function.parsers import clean_subtitle_text_ass
+from font.srt2ass import format_ass_time, collect_cues, build_ass_events
+
+
+def _legacy_time(ms):
+    """原实现：pysubs2 格式化后替换分隔符并截掉最后一位毫秒"""
+    return pysubs2.time.ms_to_str(ms, fractions=True).replace(',', '.')[:-1]
+
+
+def _legacy_events(subs, style_name):
+    evs = []
+    for l in subs:
+        c = clean_subtitle_text_ass(l.text)
+        if c:
+            st = _legacy_time(l.start)
+            et = _legacy_time(l.end)
+            evs.append(f"Dialogue: 0,{st},{et},{style_name},,0,0,0,,{c}")
+    return evs
+
+
+def _make_subs(count):
+    subs = pysubs2.SSAFile()
+    rng = random.Random(0)
+    start = 0
+    for i in range(count):
+        start += rng.randint(1, 4000)
+        text = "- [음악] 안녕하세요 {\\i1}반갑습니다{\\i0}" if i % 3 else ""
+        subs.append(pysubs2.SSAEvent(start=start, end=start + rng.randint(1, 5000), text=text))
+    return subs
+
+
+def test_format_ass_time():
+    """时间戳与原实现逐一相同（含截断、进位边界、超过10小时与负数）"""
+    values = [0, 9, 10, 999, 1000, 59999, 60000, 3599999, 3600000, 36000000, 123456789, -1, -1234, 5.5, 9.6]
+    values += list(range(0, 200000, 7))
+    for ms in values:
+        assert format_ass_time(ms) == _legacy_time(ms), ms
+
+
+def test_build_ass_events():
+    """Dialogue 行与原实现相同，停止时返回 None"""
+    subs = _make_subs(500)
+    evs = []
+    build_ass_events(collect_cues(subs), "KOR", evs)
+    assert evs == _legacy_events(subs, "KOR")
+    assert collect_cues(subs, stop_flag=[True]) is None
+
+
+def benchmark_events(count=100000):
+    """原逐行格式化 vs 整数时间戳"""
+    subs = _make_subs(count)
+    start = time.perf_counter()
+    _legacy_events(subs, "KOR")
+    legacy = time.perf_counter() - start
+    start = time.perf_counter()
+    build_ass_events(collect_cues(subs), "KOR", [])
+    fast = time.perf_counter() - start
+
+    times = [(e.start, e.end) for e in subs]
+    start = time.perf_counter()
+    for st, et in times:
+        _legacy_time(st), _legacy_time(et)
+    legacy_ts = time.perf_counter() - start
+    start = time.perf_counter()
+    for st, et in times:
+        format_ass_time(st), format_ass_time(et)
+    fast_ts = time.perf_counter() - start
+
+    print(f"{count} 个事件")
+    print(f"时间戳格式化: 原实现 {legacy_ts:.3f} 秒，整数运算 {fast_ts:.3f} 秒 ({legacy_ts / fast_ts:.2f}x)")
+    print(f"完整事件生成（含文本清洗）: 原实现 {legacy:.3f} 秒，新实现 {fast:.3f} 秒 ({legacy / fast:.2f}x)")
+
+
+if __name__ == "__main__":
+    benchmark_events()
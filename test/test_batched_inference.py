@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试批量推理与回退
+用替身模型与管线（不加载真实模型）验证：批大小传给批量推理管线、管线不可用或出错时回退到顺序识别；
+并可单独运行，在参考音频集上对比顺序识别与批量推理的实时率（RTF，识别耗时 / 音频时长）：
+
+    python test/test_batched_inference.py 音频目录 模型路径 [批大小 ...]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.AutoSubtitles import SubtitleGenerator
+
+SEGMENTS = [SimpleNamespace(start=0.0, end=1.5, text=" 안녕하세요 "), SimpleNamespace(start=2.0, end=3.0, text="네")]
+INFO = SimpleNamespace(language="ko", language_probability=0.98)
+
+
+class _FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio_file, **options):
+        self.calls.append(options)
+        return iter(SEGMENTS), INFO
+
+
+class _FakePipeline:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    def transcribe(self, audio_file, batch_size=8, **options):
+        self.calls.append(batch_size)
+
+        def generate():
+            if self.fail:
+                raise RuntimeError("batched decoding failed")
+            yield from SEGMENTS
+        return generate(), INFO
+
+
+def _generate(generator, work_dir):
+    audio = os.path.join(work_dir, "ep1.mp3")
+    logs = []
+    output = generator.generate_subtitle(audio, logs.append)
+    with open(output, encoding='utf-8') as f:
+        content = f.read()
+    return os.path.basename(output), content, logs
+
+
+def test_batched_and_fallback():
+    """批量推理与顺序识别生成相同的字幕；管线出错时回退，之后不再尝试批量推理"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        sequential = SubtitleGenerator(language=None)
+        sequential.model = _FakeModel()
+        name, expected, _ = _generate(sequential, work_dir)
+        assert name == "ep1.whisper.[kor].srt"
+
+        batched = SubtitleGenerator(batch_size=16)
+        batched.model = _FakeModel()
+        batched._batched_pipeline = _FakePipeline()
+        assert _generate(batched, work_dir)[1] == expected
+        assert batched._batched_pipeline.calls == [16] and batched.model.calls == []
+
+        failing = SubtitleGenerator(batch_size=8)
+        failing.model = _FakeModel()
+        pipeline = failing._batched_pipeline = _FakePipeline(fail=True)
+        _, content, logs = _generate(failing, work_dir)
+        assert content == expected and len(failing.model.calls) == 1
+        assert any(msg.startswith("⚠️ 批量推理失败，改用顺序识别") for msg in logs)
+        _generate(failing, work_dir)
+        assert pipeline.calls == [8] and len(failing.model.calls) == 2
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_pipeline_unavailable():
+    """无法创建批量推理管线时（例如未安装或旧版 faster-whisper）使用顺序识别，并只尝试一次"""
+    try:
+        from faster_whisper import BatchedInferencePipeline
+        return  # 当前环境支持批量推理，此场景无法复现
+    except ImportError:
+        pass
+    work_dir = tempfile.mkdtemp()
+    try:
+        generator = SubtitleGenerator(batch_size=8)
+        generator.model = _FakeModel()
+        _, _, logs = _generate(generator, work_dir)
+        _generate(generator, work_dir)
+        assert [msg for msg in logs if msg.startswith("⚠️")][0].startswith("⚠️ 当前 faster-whisper 不支持批量推理")
+        assert generator._batched_pipeline is False and len(generator.model.calls) == 2
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _audio_duration(path):
+    from faster_whisper.audio import decode_audio
+    return len(decode_audio(path)) / 16000
+
+
+def benchmark_rtf(audio_dir, model_path, batch_sizes=(0, 8, 16)):
+    """参考音频集上顺序识别与批量推理的实时率（需要 faster-whisper 与本地模型，CPU 模式）"""
+    from faster_whisper import WhisperModel
+
+    files = sorted(os.path.join(audio_dir, f) for f in os.listdir(audio_dir)
+                   if f.lower().endswith((".mp3", ".wav", ".flac", ".mp4", ".mkv")))
+    total_audio = sum(_audio_duration(f) for f in files)
+    # 与 SubtitleGenerator 的 CPU 模式相同的模型参数
+    model = WhisperModel(model_path, device="cpu", compute_type="float32", num_workers=1, cpu_threads=4)
+    print(f"参考音频: {len(files)} 个文件，共 {total_audio / 60:.1f} 分钟，CPU核心数 {os.cpu_count()}")
+    for batch_size in batch_sizes:
+        generator = SubtitleGenerator(model_path=model_path, batch_size=batch_size)
+        generator.model = model
+        start = time.perf_counter()
+        for path in files:
+            segments, _ = generator._transcribe(path)
+            for _ in segments:
+                pass
+        elapsed = time.perf_counter() - start
+        label = "顺序识别" if batch_size <= 1 else f"批量推理 batch_size={batch_size}"
+        print(f"{label}: {elapsed:7.1f} 秒，RTF {elapsed / total_audio:.3f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    benchmark_rtf(sys.argv[1], sys.argv[2], tuple(int(v) for v in sys.argv[3:]) or (0, 8, 16))
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试DOCX XML级合并引擎
+验证样式冲突重命名、相同样式与媒体去重、编号与关系ID重映射、页眉保留以及脚注合并
+"""
+
+import os
+import re
+import sys
+import zlib
+import struct
+import shutil
+import zipfile
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.shared import Pt, Mm
+from function.merge import run_xml_merge_task
+
+
+def _png_bytes():
+    """生成一个 1x1 的PNG图片"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(b"\x00\xff\x00\x00")) + chunk(b"IEND", b""))
+
+
+def _make_source(path, title, style_size, image_path):
+    """生成测试用的源文档：自定义样式、编号列表、图片、表格与页眉（页眉使用自定义样式）"""
+    doc = Document()
+    style = doc.styles.add_style("Quote Custom", WD_STYLE_TYPE.PARAGRAPH)
+    style.font.size = Pt(style_size)
+    header = doc.sections[0].header.paragraphs[0]
+    header.text = f"页眉 {title}"
+    header.style = style
+    doc.add_paragraph(f"{title} 引用段落", style="Quote Custom")
+    doc.add_paragraph(f"{title} 列表项一", style="List Number")
+    doc.add_paragraph(f"{title} 列表项二", style="List Number")
+    doc.add_picture(image_path, width=Mm(10))
+    table = doc.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = f"{title} 单元格"
+    doc.save(path)
+
+
+def test_xml_merge():
+    """XML级合并：样式、编号、媒体与页眉"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        image_path = os.path.join(work_dir, "dot.png")
+        with open(image_path, 'wb') as f:
+            f.write(_png_bytes())
+        _make_source(os.path.join(work_dir, "01. 第一课.docx"), "第一课", 12, image_path)
+        _make_source(os.path.join(work_dir, "02. 第二课.docx"), "第二课", 20, image_path)
+        _make_source(os.path.join(work_dir, "03. 第三课.docx"), "第三课", 12, image_path)
+        os.remove(image_path)
+
+        logs = []
+        run_xml_merge_task(work_dir, lambda msg, **k: logs.append(msg), lambda v: None, None, stop_flag=[False])
+        out_path = os.path.join(work_dir, "Word合并.docx")
+        assert os.path.exists(out_path), logs
+
+        merged = Document(out_path)
+        texts = [p.text for p in merged.paragraphs if p.text]
+        # 每个文档前插入去掉序号的标题
+        headings = [p.text for p in merged.paragraphs if p.style.name == "Heading 1"]
+        assert headings == ["第一课", "第二课", "第三课"]
+        assert texts.index("第一课") < texts.index("第一课 引用段落") < texts.index("第二课")
+
+        # 样式：第二课的同名不同内容样式被重命名，第三课复用第一课的样式
+        quote_styles = {p.text.split()[0]: p.style for p in merged.paragraphs if "引用段落" in p.text}
+        assert quote_styles["第一课"].style_id == quote_styles["第三课"].style_id
+        assert quote_styles["第二课"].style_id != quote_styles["第一课"].style_id
+        assert quote_styles["第二课"].font.size == Pt(20)
+        assert quote_styles["第一课"].font.size == Pt(12)
+
+        # 每个文档保留各自的页眉（一个文档一个分节）
+        assert [s.header.paragraphs[0].text for s in merged.sections] == ["页眉 第一课", "页眉 第二课", "页眉 第三课"]
+        # 页眉中的样式引用同样重映射：第二课的页眉使用重命名后的样式
+        header_styles = [s.header.paragraphs[0].style.style_id for s in merged.sections]
+        assert header_styles == [quote_styles[t].style_id for t in ("第一课", "第二课", "第三课")]
+        assert merged.sections[1].header.paragraphs[0].style.font.size == Pt(20)
+        assert len(merged.tables) == 3
+
+        with zipfile.ZipFile(out_path) as zf:
+            names = zf.namelist()
+            document_xml = zf.read("word/document.xml").decode("utf-8")
+            rels_xml = zf.read("word/_rels/document.xml.rels").decode("utf-8")
+            numbering_xml = zf.read("word/numbering.xml").decode("utf-8")
+
+        # 相同图片只保存一份
+        assert len([n for n in names if n.startswith("word/media/")]) == 1
+        # 正文引用的关系ID与编号ID都存在
+        rel_ids = set(re.findall(r'Id="([^"]+)"', rels_xml))
+        for rel_id in re.findall(r'r:(?:id|embed)="([^"]+)"', document_xml):
+            assert rel_id in rel_ids
+        num_ids = set(re.findall(r'<w:num w:numId="(\d+)"', numbering_xml))
+        for num_id in re.findall(r'<w:numId w:val="(\d+)"', document_xml):
+            assert num_id in num_ids
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def _add_notes(path, text, comment=False):
+    """给源文档加上一个脚注（python-docx 不支持脚注，直接写入XML），可选加上一个批注标记"""
+    with zipfile.ZipFile(path) as zf:
+        parts = {name: zf.read(name) for name in zf.namelist()}
+    refs = '<w:r><w:footnoteReference w:id="1"/></w:r>'
+    if comment:
+        refs += '<w:r><w:commentReference w:id="0"/></w:r>'
+    document = parts["word/document.xml"].decode("utf-8")
+    parts["word/document.xml"] = document.replace("</w:p>", refs + "</w:p>", 1).encode("utf-8")
+    parts["word/footnotes.xml"] = (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<w:footnotes xmlns:w="{_W_NS}">'
+        '<w:footnote w:type="separator" w:id="-1"><w:p><w:r><w:separator/></w:r></w:p></w:footnote>'
+        '<w:footnote w:type="continuationSeparator" w:id="0"><w:p><w:r><w:continuationSeparator/></w:r></w:p></w:footnote>'
+        f'<w:footnote w:id="1"><w:p><w:r><w:footnoteRef/></w:r><w:r><w:t>{text}</w:t></w:r></w:p></w:footnote>'
+        '</w:footnotes>').encode("utf-8")
+    rels = parts["word/_rels/document.xml.rels"].decode("utf-8")
+    parts["word/_rels/document.xml.rels"] = rels.replace("</Relationships>", (
+        '<Relationship Id="rIdNotes" Target="footnotes.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/footnotes"/></Relationships>'
+    )).encode("utf-8")
+    types = parts["[Content_Types].xml"].decode("utf-8")
+    parts["[Content_Types].xml"] = types.replace("</Types>", (
+        '<Override PartName="/word/footnotes.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.footnotes+xml"/></Types>'
+    )).encode("utf-8")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in parts.items():
+            zf.writestr(name, data)
+
+
+def test_xml_merge_notes():
+    """脚注合并并重新编号；批注标记被移除并记录警告"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        for i, comment in ((1, False), (2, True)):
+            doc = Document()
+            doc.add_paragraph(f"正文 {i}")
+            path = os.path.join(work_dir, f"{i}.docx")
+            doc.save(path)
+            _add_notes(path, f"脚注 {i}", comment=comment)
+
+        logs = []
+        run_xml_merge_task(work_dir, lambda msg, **k: logs.append(msg), lambda v: None, None, stop_flag=[False])
+        out_path = os.path.join(work_dir, "Word合并.docx")
+        assert os.path.exists(out_path), logs
+        assert [msg for msg in logs if msg.startswith("⚠️")] == ["⚠️ 2.docx: 以下内容未能合并，已移除（批注 1 处）"]
+
+        Document(out_path)
+        with zipfile.ZipFile(out_path) as zf:
+            document_xml = zf.read("word/document.xml").decode("utf-8")
+            footnotes_xml = zf.read("word/footnotes.xml").decode("utf-8")
+            rels_xml = zf.read("word/_rels/document.xml.rels").decode("utf-8")
+            types_xml = zf.read("[Content_Types].xml").decode("utf-8")
+        assert "commentReference" not in document_xml
+        assert "relationships/footnotes" in rels_xml and "/word/footnotes.xml" in types_xml
+
+        # 两个文档的脚注 1 重新编号后各自对应自己的脚注内容；分隔符只保留一份
+        notes = dict(re.findall(r'<w:footnote w:id="(\d+)">.*?<w:t>([^<]*)</w:t>', footnotes_xml))
+        refs = re.findall(r'<w:footnoteReference w:id="(\d+)"', document_xml)
+        assert [notes[ref] for ref in refs] == ["脚注 1", "脚注 2"]
+        assert footnotes_xml.count('w:type="separator"') == 1
+        assert footnotes_xml.count('w:type="continuationSeparator"') == 1
+        ids = re.findall(r'<w:footnote [^>]*w:id="(-?\d+)"', footnotes_xml)
+        assert len(ids) == len(set(ids)) == 4
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_xml_merge_stop():
+    """停止合并时不留下合并文件"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        for i in range(2):
+            doc = Document()
+            doc.add_paragraph(f"文档 {i}")
+            doc.save(os.path.join(work_dir, f"{i}.docx"))
+        run_xml_merge_task(work_dir, lambda *a, **k: None, lambda v: None, None, stop_flag=[True])
+        assert sorted(os.listdir(work_dir)) == ["0.docx", "1.docx"]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_xml_merge()
+    test_xml_merge_notes()
+    test_xml_merge_stop()
+    print("✅ DOCX合并测试通过")
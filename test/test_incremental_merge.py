@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试增量合并
+验证合并清单：只新增排在最后的文件时追加（TXT原样追加、PDF增量更新），
+输入无变化时跳过，顺序或内容变化时完整重建，停止时合并文件保持不变
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+from function.merge import run_txt_merge_task, run_pdf_merge_task
+
+
+def _write_text(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def _merge_txt(work_dir):
+    """执行一次TXT合并，返回 (日志, 合并结果)"""
+    logs = []
+    run_txt_merge_task(work_dir, lambda msg, **k: logs.append(msg), lambda v: None, None, stop_flag=[False])
+    with open(os.path.join(work_dir, "TXT合并.txt"), 'rb') as f:
+        return logs, f.read()
+
+
+def _expected_txt(work_dir, names):
+    separator = ("\n\n" + "=" * 50 + "\n\n").replace("\n", os.linesep).encode("utf-8")
+    result = b""
+    for name in names:
+        with open(os.path.join(work_dir, name), 'rb') as f:
+            result += f.read() + separator
+    return result
+
+
+def test_txt_incremental_merge():
+    """TXT：新增文件追加、无变化跳过、内容或顺序变化时重建"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        _write_text(os.path.join(work_dir, "02.txt"), "第二集")
+        _write_text(os.path.join(work_dir, "03.txt"), "第三集")
+        logs, merged = _merge_txt(work_dir)
+        assert not any("增量合并" in msg for msg in logs)
+        assert merged == _expected_txt(work_dir, ["02.txt", "03.txt"])
+
+        # 新增排在最后的文件：只追加新文件
+        _write_text(os.path.join(work_dir, "04.txt"), "第四集")
+        logs, merged = _merge_txt(work_dir)
+        assert any("追加 1 个新文件" in msg for msg in logs), logs
+        assert merged == _expected_txt(work_dir, ["02.txt", "03.txt", "04.txt"])
+
+        # 输入没有变化：跳过合并
+        logs, _ = _merge_txt(work_dir)
+        assert any("已是最新" in msg for msg in logs), logs
+
+        # 只修改时间变化、内容不变：仍可追加
+        os.utime(os.path.join(work_dir, "02.txt"), ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+        _write_text(os.path.join(work_dir, "05.txt"), "第五集")
+        logs, merged = _merge_txt(work_dir)
+        assert any("追加 1 个新文件" in msg for msg in logs), logs
+
+        # 新文件排在已有文件之前：完整重建
+        _write_text(os.path.join(work_dir, "01.txt"), "第一集")
+        logs, merged = _merge_txt(work_dir)
+        assert not any("增量合并" in msg for msg in logs)
+        assert merged == _expected_txt(work_dir, ["01.txt", "02.txt", "03.txt", "04.txt", "05.txt"])
+
+        # 已合并的文件内容变化：完整重建
+        _write_text(os.path.join(work_dir, "03.txt"), "第三集（修订）")
+        logs, merged = _merge_txt(work_dir)
+        assert not any("增量合并" in msg for msg in logs)
+        assert merged == _expected_txt(work_dir, ["01.txt", "02.txt", "03.txt", "04.txt", "05.txt"])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _make_pdf(path, label, pages=2):
+    """生成测试PDF：每页一个书签"""
+    c = canvas.Canvas(path)
+    for i in range(pages):
+        c.drawString(72, 720, f"{label} page {i + 1}")
+        c.bookmarkPage(f"{label}_{i}")
+        c.addOutlineEntry(f"{label} 第{i + 1}页", f"{label}_{i}", level=0)
+        c.showPage()
+    c.save()
+
+
+def test_pdf_incremental_merge():
+    """PDF：以增量更新追加新文件，原有字节不变，页面与书签完整；停止时恢复原文件"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        for label in ("A", "B"):
+            _make_pdf(os.path.join(work_dir, f"{label}.pdf"), label)
+        out_path = os.path.join(work_dir, "PDF合并.pdf")
+        run_pdf_merge_task(work_dir, lambda *a, **k: None, lambda v: None, None, stop_flag=[False], streaming=True)
+        with open(out_path, 'rb') as f:
+            original = f.read()
+
+        # 停止：合并文件恢复原样
+        _make_pdf(os.path.join(work_dir, "C.pdf"), "C", pages=3)
+        stop_flag = [False]
+
+        def progress(value):
+            if value:
+                stop_flag[0] = True
+
+        _make_pdf(os.path.join(work_dir, "D.pdf"), "D")
+        run_pdf_merge_task(work_dir, lambda *a, **k: None, progress, None, stop_flag=stop_flag, streaming=True)
+        with open(out_path, 'rb') as f:
+            assert f.read() == original
+
+        logs = []
+        run_pdf_merge_task(work_dir, lambda msg, **k: logs.append(msg), lambda v: None, None,
+                           stop_flag=[False], streaming=True)
+        assert any("追加 2 个新文件" in msg for msg in logs), logs
+        with open(out_path, 'rb') as f:
+            assert f.read().startswith(original)
+
+        reader = PdfReader(out_path)
+        texts = [page.extract_text().strip() for page in reader.pages]
+        assert texts == ["A page 1", "A page 2", "B page 1", "B page 2",
+                         "C page 1", "C page 2", "C page 3", "D page 1", "D page 2"]
+        top_level = [(item.title, reader.get_destination_page_number(item))
+                     for item in reader.outline if not isinstance(item, list)]
+        assert top_level == [("A", 0), ("B", 2), ("C", 4), ("D", 7)]
+        assert [item.title for item in reader.outline[5]] == ["C 第1页", "C 第2页", "C 第3页"]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_pdf_optimize_options():
+    """PDF：优化选项或压缩级别变化时完整重建；开启优化时新增文件也完整重建，不增量追加"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        for label in ("A", "B"):
+            _make_pdf(os.path.join(work_dir, f"{label}.pdf"), label)
+
+        def merge(**options):
+            logs = []
+            run_pdf_merge_task(work_dir, lambda msg, **k: logs.append(msg), lambda v: None, None,
+                               stop_flag=[False], streaming=True, **options)
+            return logs
+
+        merge(optimize=False)
+        assert any("已是最新" in msg for msg in merge(optimize=False))
+        logs = merge(optimize=True, compression_level=6)
+        assert any("优化完成" in msg for msg in logs), logs
+        assert any("已是最新" in msg for msg in merge(optimize=True, compression_level=6))
+        logs = merge(optimize=True, compression_level=9)
+        assert any("优化完成" in msg for msg in logs), logs
+
+        _make_pdf(os.path.join(work_dir, "C.pdf"), "C")
+        logs = merge(optimize=True, compression_level=9)
+        assert not any("增量合并" in msg for msg in logs), logs
+        assert any("完整重新合并" in msg for msg in logs) and any("优化完成" in msg for msg in logs)
+        assert len(PdfReader(os.path.join(work_dir, "PDF合并.pdf")).pages) == 6
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_txt_incremental_merge()
+    test_pdf_incremental_merge()
+    test_pdf_optimize_options()
+    print("✅ 增量合并测试通过")
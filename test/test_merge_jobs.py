@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试并发合并任务
+验证多个合并任务同时执行、进度通道合并为单一进度、失败任务不影响其他任务，以及混合目录下的实际合并
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.pdfgen import canvas
+from function.merge import run_merge_jobs, run_pdf_merge_task, run_txt_merge_task, run_md_merge_task
+
+
+def test_merge_jobs_run_concurrently():
+    """各任务并发执行，总进度单调上升后重置为0，失败任务被记录"""
+    progress_values = []
+    logs = []
+
+    def slow_job(progress):
+        for value in (0, 50, 100, 0):
+            time.sleep(0.05)
+            progress(value)
+
+    def failing_job(progress):
+        raise RuntimeError("boom")
+
+    start = time.perf_counter()
+    run_merge_jobs([("A", slow_job), ("B", slow_job), ("C", slow_job), ("D", failing_job)],
+                   logs.append, progress_values.append, [False])
+    elapsed = time.perf_counter() - start
+
+    # 串行执行至少需要 0.6 秒
+    assert elapsed < 0.45, elapsed
+    assert logs == ["❌ D合并失败: boom"]
+    assert progress_values[-1] == 0
+    assert progress_values[:-1] == sorted(progress_values[:-1])
+    assert progress_values[-2] == 100
+
+
+def test_merge_jobs_mixed_folder():
+    """混合目录：PDF、TXT、Markdown 合并同时完成"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        for i in range(3):
+            c = canvas.Canvas(os.path.join(work_dir, f"{i}.pdf"))
+            c.drawString(72, 720, f"page {i}")
+            c.showPage()
+            c.save()
+            with open(os.path.join(work_dir, f"{i}.txt"), 'w', encoding='utf-8') as f:
+                f.write(f"第{i}集")
+            with open(os.path.join(work_dir, f"{i}.md"), 'w', encoding='utf-8') as f:
+                f.write(f"# 第{i}集")
+        stop_flag = [False]
+
+        def log(msg, **kwargs):
+            pass
+
+        jobs = [
+            ("PDF", lambda progress: run_pdf_merge_task(work_dir, log, progress, None, stop_flag=stop_flag, streaming=True)),
+            ("TXT", lambda progress: run_txt_merge_task(work_dir, log, progress, None, stop_flag=stop_flag)),
+            ("Markdown", lambda progress: run_md_merge_task(work_dir, log, progress, None, stop_flag=stop_flag)),
+        ]
+        run_merge_jobs(jobs, log, lambda v: None, stop_flag)
+        for name in ("PDF合并.pdf", "TXT合并.txt", "Markdown合并.md"):
+            assert os.path.exists(os.path.join(work_dir, name)), name
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_merge_jobs_run_concurrently()
+    test_merge_jobs_mixed_folder()
+    print("✅ 并发合并测试通过")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试多文件并行识别
+用替身模型（不加载真实模型）验证：按时长从长到短排序、自动选择并行数，
+并行识别与顺序识别的结果相同（包括跳过已有字幕与同名媒体文件），同时识别多个文件时总耗时更短，以及停止任务
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.AutoSubtitles import SubtitleGenerator
+from function.transcribe_scheduler import default_parallel_files, order_longest_first
+
+INFO = SimpleNamespace(language="ko", language_probability=0.98)
+
+
+class _FakeModel:
+    """每个片段耗时 delay 秒，记录同时识别的最大文件数"""
+
+    def __init__(self, delay=0.05, segments=4):
+        self.delay = delay
+        self.segments = segments
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio_file, **options):
+        def generate():
+            with self._lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            try:
+                for i in range(self.segments):
+                    time.sleep(self.delay)
+                    yield SimpleNamespace(start=float(i), end=i + 0.5, text=f"{os.path.basename(audio_file)} {i}")
+            finally:
+                with self._lock:
+                    self.active -= 1
+        return generate(), INFO
+
+
+def _make_media_dir():
+    """6 个媒体文件：ep1~ep4 待识别，ep5 已有字幕，dup.mp3 与 dup.mp4 生成同一个字幕"""
+    work_dir = tempfile.mkdtemp()
+    for name in ("ep1.mp3", "ep2.mp3", "ep3.mp4", "ep4.mkv", "ep5.mp3", "dup.mp3", "dup.mp4"):
+        open(os.path.join(work_dir, name), "wb").close()
+    with open(os.path.join(work_dir, "ep5.srt"), "w", encoding="utf-8") as f:
+        f.write("1\n00:00:00,000 --> 00:00:01,000\n已有字幕\n")
+    return work_dir
+
+
+def _run(parallel_files, stop_after=None):
+    work_dir = _make_media_dir()
+    try:
+        generator = SubtitleGenerator(parallel_files=parallel_files)
+        generator.model = _FakeModel()
+        stop_flag = [False]
+        logs = []
+        progress = []
+
+        def log(msg):
+            logs.append(msg)
+            if stop_after and msg.endswith("✅ 已生成: " + stop_after):
+                stop_flag[0] = True
+
+        start = time.perf_counter()
+        results = generator.batch_process(work_dir, progress.append, log, skip_existing=True, stop_flag=stop_flag)
+        elapsed = time.perf_counter() - start
+        results = [(os.path.basename(m), os.path.basename(o) if o else None, ok) for m, o, ok in results]
+        outputs = sorted(f for f in os.listdir(work_dir) if f.endswith(".srt"))
+        return results, outputs, logs, progress, elapsed, generator.model.peak
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_ordering_and_defaults():
+    """按时长从长到短排序，时长相同或读取失败时保持原顺序；GPU 模式只识别一个文件"""
+    durations = {"a.mp3": 60.0, "b.mp4": 2700.0, "c.mkv": 0.0, "d.mp3": 60.0}
+    assert order_longest_first(list(durations), durations.get) == ["b.mp4", "a.mp3", "d.mp3", "c.mkv"]
+    # 未安装 PyAV 或文件无法读取时时长为 0，顺序不变
+    assert order_longest_first(["x.mp3", "y.mp3"]) == ["x.mp3", "y.mp3"]
+
+    assert default_parallel_files("cuda", cores=64) == 1
+    assert default_parallel_files("cpu", cores=64, available_mb=64000) == 8
+    assert default_parallel_files("cpu", cores=64, available_mb=5000) == 2
+    assert default_parallel_files("cpu", cores=4, available_mb=64000) == 1
+    assert SubtitleGenerator(parallel_files=0, batch_size=8)._parallel_workers("cpu") == 1
+    assert SubtitleGenerator(parallel_files=3)._parallel_workers("cuda") == 3
+
+
+def test_parallel_matches_sequential():
+    """并行与顺序识别的结果与生成的字幕相同；同时识别多个文件，总耗时更短"""
+    seq_results, seq_outputs, _, _, seq_elapsed, seq_peak = _run(1)
+    par_results, par_outputs, logs, progress, par_elapsed, par_peak = _run(3)
+
+    assert par_results == seq_results and par_outputs == seq_outputs
+    assert ("ep5.mp3", "ep5.srt", True) in par_results
+    # 同名媒体文件只识别一次，另一个跳过
+    dup = [r for r in par_results if r[0].startswith("dup.")]
+    assert [r[1] for r in dup] == ["dup.whisper.[kor].srt"] * 2 and all(r[2] for r in dup)
+    assert sum(1 for msg in logs if "⏭️ 跳过: dup." in msg) == 1
+    assert len(par_outputs) == 6 and all(ok for _, _, ok in par_results)
+
+    assert seq_peak == 1 and par_peak == 3
+    assert par_elapsed < seq_elapsed
+    assert progress[-1] == 0 and max(progress) == 100
+    assert any(msg.startswith("⚡ 同时识别 3 个文件") for msg in logs)
+
+
+def test_parallel_stop():
+    """停止后不再开始新的文件，正在识别的文件返回未成功"""
+    results, _, logs, _, _, _ = _run(2, stop_after="ep1.whisper.[kor].srt")
+    assert 0 < len(results) < 7
+    assert ("ep1.mp3", "ep1.whisper.[kor].srt", True) in results
+    assert not any(r[0] == "ep5.mp3" for r in results)
+
+
+if __name__ == "__main__":
+    test_ordering_and_defaults()
+    test_parallel_matches_sequential()
+    test_parallel_stop()
+    print("✅ 多文件并行识别测试通过")
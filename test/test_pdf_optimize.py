@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试合并后PDF优化
+验证相同图片只保留一份、未压缩的内容流被重新压缩、页面文字与书签不变，以及停止时不留下临时文件
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+from function.merge import run_pdf_merge_task
+from function.pdf_stream import optimize_pdf
+
+
+def _make_pdf(path, label, image_path, pages=2):
+    """生成测试PDF：未压缩的内容流，每页绘制同一张图片"""
+    c = canvas.Canvas(path, pageCompression=0)
+    for i in range(pages):
+        c.drawString(72, 720, f"{label} page {i + 1}")
+        for j in range(40):
+            c.drawString(72, 700 - j * 12, f"{label} filler line {j}")
+        c.drawImage(image_path, 300, 600, 64, 64)
+        c.bookmarkPage(f"{label}_{i}")
+        c.addOutlineEntry(f"{label} 第{i + 1}页", f"{label}_{i}", level=0)
+        c.showPage()
+    c.save()
+
+
+def _image_ids(reader):
+    """收集所有页面引用的图片对象号"""
+    ids = set()
+    for page in reader.pages:
+        xobjects = page["/Resources"]["/XObject"]
+        for value in xobjects.values():
+            ids.add(value.idnum)
+    return ids
+
+
+def test_merge_optimize():
+    """合并后优化：重复图片合并、文件变小、内容不变"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        image_path = os.path.join(work_dir, "image.png")
+        Image.effect_noise((64, 64), 80).convert("RGB").save(image_path)
+        for label in ("A", "B", "C"):
+            _make_pdf(os.path.join(work_dir, f"{label}.pdf"), label, image_path)
+        os.remove(image_path)
+
+        out_path = os.path.join(work_dir, "PDF合并.pdf")
+        run_pdf_merge_task(work_dir, lambda *a, **k: None, lambda v: None, None,
+                           stop_flag=[False], streaming=True)
+        plain_size = os.path.getsize(out_path)
+        plain_reader = PdfReader(out_path)
+        plain_texts = [page.extract_text() for page in plain_reader.pages]
+        plain_titles = [item.title for item in plain_reader.outline if not isinstance(item, list)]
+        assert len(_image_ids(plain_reader)) == 3
+        os.remove(out_path)
+
+        logs = []
+        run_pdf_merge_task(work_dir, lambda msg, **k: logs.append(msg), lambda v: None, None,
+                           stop_flag=[False], streaming=True, optimize=True, compression_level=9)
+        assert any("优化完成" in msg for msg in logs), logs
+        assert os.path.getsize(out_path) < plain_size
+
+        reader = PdfReader(out_path)
+        assert [page.extract_text() for page in reader.pages] == plain_texts
+        assert [item.title for item in reader.outline if not isinstance(item, list)] == plain_titles
+        # 三个源文件中相同的图片只保存一份
+        assert len(_image_ids(reader)) == 1
+        # 内容流已压缩
+        assert all(page["/Contents"].get_object().get("/Filter") == "/FlateDecode" for page in reader.pages)
+        assert sorted(os.listdir(work_dir)) == ["A.pdf", "B.pdf", "C.pdf", "PDF合并.pdf", "PDF合并.pdf.manifest.json"]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_optimize_stop():
+    """停止优化时不生成输出文件和临时文件"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        image_path = os.path.join(work_dir, "image.png")
+        Image.new("RGB", (8, 8), "red").save(image_path)
+        in_path = os.path.join(work_dir, "in.pdf")
+        _make_pdf(in_path, "A", image_path)
+        assert optimize_pdf(in_path, os.path.join(work_dir, "out.pdf"), stop_flag=[True]) is None
+        assert sorted(os.listdir(work_dir)) == ["image.png", "in.pdf"]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_merge_optimize()
+    test_optimize_stop()
+    print("✅ PDF优化测试通过")
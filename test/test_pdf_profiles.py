@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试PDF输出方案
+验证各输出方案的目录页、可重现输出与文件大小，并可单独运行输出渲染耗时/文件大小对照表
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pypdf import PdfReader
+from logic.pdf_logic import run_pdf_task, PDF_PROFILES
+
+
+def _make_corpus(target_dir, episodes, cues):
+    """生成参考语料（一季剧集的SRT字幕）"""
+    for ep in range(episodes):
+        path = os.path.join(target_dir, f"Reference.Drama.S01E{ep + 1:02d}.srt")
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(cues):
+                start = i * 4
+                f.write(f"{i + 1}\n")
+                f.write(f"00:{start // 60:02d}:{start % 60:02d},000 --> 00:{start // 60:02d}:{start % 60:02d},800\n")
+                f.write(f"Episode {ep + 1}, cue {i + 1}: a reference line of dialogue used for profile benchmarks.\n\n")
+
+
+def _render(corpus_dir, profile):
+    """按指定方案渲染语料，返回 (耗时秒数, 输出文件路径)"""
+    out_dir = tempfile.mkdtemp()
+    start = time.perf_counter()
+    run_pdf_task(corpus_dir, lambda *a, **k: None, lambda v: None, None, 0, out_dir, "整季",
+                 stop_flag=[False], profile=profile)
+    elapsed = time.perf_counter() - start
+    return elapsed, os.path.join(out_dir, "script", "Reference.Drama.S01.pdf")
+
+
+def test_pdf_profiles(episodes=3, cues=80):
+    """各输出方案的行为"""
+    corpus_dir = tempfile.mkdtemp()
+    outputs = []
+    try:
+        _make_corpus(corpus_dir, episodes, cues)
+        results = {}
+        for profile in PDF_PROFILES:
+            elapsed, out_path = _render(corpus_dir, profile)
+            outputs.append(out_path)
+            reader = PdfReader(out_path)
+            results[profile] = (elapsed, os.path.getsize(out_path), len(reader.pages), len(reader.outline))
+
+        # 目录页只在 standard / archival 方案中生成
+        assert results["standard"][3] == episodes + 1
+        assert results["archival"][3] == episodes + 1
+        assert results["fast"][3] == episodes
+        assert results["compact"][3] == episodes
+        assert results["fast"][2] < results["standard"][2]
+
+        # 压缩页面流的方案文件更小
+        assert results["compact"][1] < results["fast"][1]
+
+        # archival 方案两次渲染结果逐字节一致
+        _, again = _render(corpus_dir, "archival")
+        outputs.append(again)
+        with open(outputs[list(PDF_PROFILES).index("archival")], 'rb') as a, open(again, 'rb') as b:
+            assert a.read() == b.read()
+    finally:
+        shutil.rmtree(corpus_dir, ignore_errors=True)
+        for out_path in outputs:
+            shutil.rmtree(os.path.dirname(os.path.dirname(out_path)), ignore_errors=True)
+
+
+def benchmark_pdf_profiles(episodes=16, cues=400):
+    """输出各方案在参考语料上的渲染耗时与文件大小对照表"""
+    corpus_dir = tempfile.mkdtemp()
+    try:
+        _make_corpus(corpus_dir, episodes, cues)
+        print(f"参考语料: {episodes} 集 × {cues} 条字幕")
+        print(f"{'方案':<10}{'耗时(秒)':>10}{'大小(KB)':>12}{'页数':>8}")
+        for profile in PDF_PROFILES:
+            elapsed, out_path = _render(corpus_dir, profile)
+            size_kb = os.path.getsize(out_path) / 1024
+            pages = len(PdfReader(out_path).pages)
+            print(f"{profile:<10}{elapsed:>10.2f}{size_kb:>12.1f}{pages:>8}")
+            shutil.rmtree(os.path.dirname(os.path.dirname(out_path)), ignore_errors=True)
+    finally:
+        shutil.rmtree(corpus_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    benchmark_pdf_profiles()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试流式PDF合并
+验证页面顺序、按源文件嵌套的书签以及书签目标页，并可单独运行输出合并数百个PDF时的峰值内存（RSS）
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+from function.merge import run_pdf_merge_task
+from function.pdf_stream import merge_pdf_files_streaming
+
+
+def _make_pdf(path, label, pages, filler_lines=0, compress=True):
+    """生成测试PDF：每页一个书签，第二页起的书签嵌套在第一页书签下"""
+    c = canvas.Canvas(path, pageCompression=1 if compress else 0)
+    for i in range(pages):
+        c.drawString(72, 720, f"{label} page {i + 1}")
+        for j in range(filler_lines):
+            c.drawString(72, 700 - j * 12 % 600, f"{label} filler line {j} " * 3)
+        key = f"{label}_{i}"
+        c.bookmarkPage(key)
+        c.addOutlineEntry(f"{label} 第{i + 1}页", key, level=0 if i == 0 else 1)
+        c.showPage()
+    c.save()
+
+
+def _outline_tree(reader, outline):
+    """书签树转换为 [(标题, 页码, 子节点)]"""
+    items = []
+    for node in outline:
+        if isinstance(node, list):
+            title, page, _ = items[-1]
+            items[-1] = (title, page, _outline_tree(reader, node))
+        else:
+            items.append((node.title, reader.get_destination_page_number(node), []))
+    return items
+
+
+def test_stream_merge_outline():
+    """流式合并：页面顺序与按文件嵌套的书签"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        _make_pdf(os.path.join(work_dir, "A.pdf"), "A", 2)
+        _make_pdf(os.path.join(work_dir, "B.pdf"), "B", 3)
+        logs = []
+        run_pdf_merge_task(work_dir, lambda msg, **k: logs.append(msg), lambda v: None, None,
+                           stop_flag=[False], streaming=True)
+        out_path = os.path.join(work_dir, "PDF合并.pdf")
+        assert os.path.exists(out_path), logs
+
+        reader = PdfReader(out_path)
+        texts = [page.extract_text().strip() for page in reader.pages]
+        assert texts == ["A page 1", "A page 2", "B page 1", "B page 2", "B page 3"]
+        assert _outline_tree(reader, reader.outline) == [
+            ("A", 0, [("A 第1页", 0, [("A 第2页", 1, [])])]),
+            ("B", 2, [("B 第1页", 2, [("B 第2页", 3, []), ("B 第3页", 4, [])])]),
+        ]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_stream_merge_stop():
+    """停止时不留下合并文件和临时文件"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        files = []
+        for label in ("A", "B"):
+            files.append(os.path.join(work_dir, f"{label}.pdf"))
+            _make_pdf(files[-1], label, 1)
+        stop_flag = [False]
+
+        def on_file_done(i, fp):
+            stop_flag[0] = True
+
+        out_path = os.path.join(work_dir, "out.pdf")
+        assert not merge_pdf_files_streaming(files, out_path, stop_flag=stop_flag, on_file_done=on_file_done)
+        assert sorted(os.listdir(work_dir)) == ["A.pdf", "B.pdf"]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+class _PeakRss:
+    """后台线程采样当前进程的RSS峰值"""
+
+    def __init__(self, interval=0.01):
+        import psutil
+        self._process = psutil.Process()
+        self._interval = interval
+        self.peak = 0
+        self._running = False
+
+    def __enter__(self):
+        self._running = True
+        self.peak = self._process.memory_info().rss
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while self._running:
+            self.peak = max(self.peak, self._process.memory_info().rss)
+            time.sleep(self._interval)
+
+    def __exit__(self, *exc):
+        self._running = False
+        self._thread.join()
+
+
+def benchmark_pdf_merge(count=300, pages=10, filler_lines=150):
+    """合并数百个PDF：普通模式（内存中的 PdfWriter）与流式模式的耗时和峰值RSS对比
+
+    两种模式分别在独立进程中运行，避免互相影响RSS峰值。
+    """
+    import subprocess
+    work_dir = tempfile.mkdtemp()
+    try:
+        for i in range(count):
+            _make_pdf(os.path.join(work_dir, f"{i:04d}.pdf"), f"Doc{i}", pages, filler_lines, compress=False)
+        total_mb = sum(os.path.getsize(os.path.join(work_dir, f)) for f in os.listdir(work_dir)) / 1e6
+        print(f"输入: {count} 个PDF × {pages} 页，共 {total_mb:.1f} MB")
+        for streaming in (False, True):
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--run", work_dir, str(streaming)], check=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _run_once(work_dir, streaming):
+    """子进程：执行一次合并并输出耗时与峰值RSS"""
+    with _PeakRss() as rss:
+        start = time.perf_counter()
+        run_pdf_merge_task(work_dir, lambda *a, **k: None, lambda v: None, None,
+                           stop_flag=[False], streaming=streaming)
+        elapsed = time.perf_counter() - start
+    out_path = os.path.join(work_dir, "PDF合并.pdf")
+    size_mb = os.path.getsize(out_path) / 1e6
+    os.remove(out_path)
+    mode = "流式" if streaming else "普通"
+    print(f"{mode}: 耗时 {elapsed:6.2f} 秒  峰值RSS {rss.peak / 1e6:7.1f} MB  输出 {size_mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--run":
+        _run_once(sys.argv[2], sys.argv[3] == "True")
+    else:
+        benchmark_pdf_merge()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试PDF流式生成模式
+验证流式模式的峰值内存不随集数线性增长，且输出与普通模式一致
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import tracemalloc
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pypdf import PdfReader
+from logic.pdf_logic import run_pdf_task
+
+
+def _make_episodes(target_dir, episodes, cues):
+    """生成测试用的SRT字幕文件"""
+    for ep in range(episodes):
+        path = os.path.join(target_dir, f"Show.S01E{ep + 1:03d}.srt")
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(cues):
+                start = i * 3
+                f.write(f"{i + 1}\n")
+                f.write(f"00:{start // 60:02d}:{start % 60:02d},000 --> 00:{start // 60:02d}:{start % 60:02d},900\n")
+                f.write(f"Episode {ep + 1} line {i + 1}: some dialogue text for the memory benchmark.\n\n")
+
+
+def _measure(episodes, cues, streaming):
+    """运行一次PDF生成，返回 (峰值内存字节数, 输出文件路径, 临时目录)"""
+    work_dir = tempfile.mkdtemp()
+    _make_episodes(work_dir, episodes, cues)
+    tracemalloc.start()
+    try:
+        run_pdf_task(work_dir, lambda *a, **k: None, lambda v: None, None, 0, work_dir, "整季",
+                     stop_flag=[False], streaming=streaming)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    out_path = os.path.join(work_dir, "script", "Show.S01.pdf")
+    return peak, out_path, work_dir
+
+
+def test_streaming_memory_flat(small=3, large=12, cues=100):
+    """流式模式：集数增加4倍时，峰值内存仍低于普通模式处理少量集数时的峰值"""
+    print("=== 测试PDF流式生成内存 ===")
+    results = {}
+    dirs = []
+    try:
+        for streaming in (False, True):
+            for episodes in (small, large):
+                peak, out_path, work_dir = _measure(episodes, cues, streaming)
+                dirs.append(work_dir)
+                reader = PdfReader(out_path)
+                results[(streaming, episodes)] = (peak, len(reader.pages), len(reader.outline))
+                print(f"streaming={streaming!s:<5} 集数={episodes:<4} 峰值={peak / 1e6:7.1f} MB  页数={len(reader.pages)}")
+
+        # 两种模式输出的页数和书签数一致
+        for episodes in (small, large):
+            assert results[(False, episodes)][1:] == results[(True, episodes)][1:]
+
+        normal_small = results[(False, small)][0]
+        normal_large = results[(False, large)][0]
+        stream_small = results[(True, small)][0]
+        stream_large = results[(True, large)][0]
+
+        # 流式模式处理大卷的峰值低于普通模式处理小卷的峰值
+        assert stream_large < normal_small
+        # 流式模式的内存增长斜率远小于普通模式
+        assert (stream_large - stream_small) < 0.25 * (normal_large - normal_small)
+    finally:
+        for d in dirs:
+            shutil.rmtree(d, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_streaming_memory_flat(small=10, large=40, cues=300)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试分层并行PDF合并
+验证多进程分块合并的页面顺序、书签与流式合并一致，停止时清理中间片段，
+并可单独运行输出合并上千个PDF时与流式合并的耗时对比
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+from function.merge import run_pdf_merge_task
+from function.pdf_stream import merge_pdf_files_streaming, merge_pdf_files_tree
+
+
+def _make_pdf(path, label, pages):
+    """生成测试PDF：每页一个书签，第二页起的书签嵌套在第一页书签下"""
+    c = canvas.Canvas(path)
+    for i in range(pages):
+        c.drawString(72, 720, f"{label} page {i + 1}")
+        c.bookmarkPage(f"{label}_{i}")
+        c.addOutlineEntry(f"{label} 第{i + 1}页", f"{label}_{i}", level=0 if i == 0 else 1)
+        c.showPage()
+    c.save()
+
+
+def _outline_tree(reader, outline):
+    """书签树转换为 [(标题, 页码, 子节点)]"""
+    items = []
+    for node in outline:
+        if isinstance(node, list):
+            title, page, _ = items[-1]
+            items[-1] = (title, page, _outline_tree(reader, node))
+        else:
+            items.append((node.title, reader.get_destination_page_number(node), []))
+    return items
+
+
+def _make_inputs(work_dir, count):
+    files = []
+    for i in range(count):
+        files.append(os.path.join(work_dir, f"{i:03d}.pdf"))
+        _make_pdf(files[-1], f"Doc{i}", i % 3 + 1)
+    return files
+
+
+def test_tree_merge_matches_streaming():
+    """分层并行合并与流式合并的页面、书签一致，交叉引用表偏移准确"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        files = _make_inputs(work_dir, 23)
+        stream_path = os.path.join(work_dir, "stream.out")
+        tree_path = os.path.join(work_dir, "tree.out")
+        merge_pdf_files_streaming(files, stream_path)
+        done = []
+        assert merge_pdf_files_tree(files, tree_path, workers=2, chunk_size=4,
+                                    on_file_done=lambda i, fp: done.append(i))
+        assert sorted(done) == list(range(len(files)))
+
+        expected = PdfReader(stream_path)
+        # strict 模式下交叉引用表偏移错误会报错
+        merged = PdfReader(tree_path, strict=True)
+        assert [p.extract_text() for p in merged.pages] == [p.extract_text() for p in expected.pages]
+        assert _outline_tree(merged, merged.outline) == _outline_tree(expected, expected.outline)
+        assert sorted(os.listdir(work_dir)) == sorted([os.path.basename(f) for f in files] + ["stream.out", "tree.out"])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_tree_merge_stop_cleans_up():
+    """停止时不留下合并文件与中间片段"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        files = _make_inputs(work_dir, 12)
+        stop_flag = [False]
+
+        def on_file_done(i, fp):
+            stop_flag[0] = True
+
+        out_path = os.path.join(work_dir, "out.pdf")
+        assert not merge_pdf_files_tree(files, out_path, workers=2, chunk_size=3,
+                                        stop_flag=stop_flag, on_file_done=on_file_done)
+        assert sorted(os.listdir(work_dir)) == sorted(os.path.basename(f) for f in files)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_tree_merge_threshold():
+    """输入数量达到阈值时自动使用分层并行合并"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        _make_inputs(work_dir, 5)
+        logs = []
+        run_pdf_merge_task(work_dir, lambda msg, **k: logs.append(msg), lambda v: None, None,
+                           stop_flag=[False], tree_threshold=5)
+        assert any("分层并行合并" in msg for msg in logs), logs
+        assert len(PdfReader(os.path.join(work_dir, "PDF合并.pdf")).pages) == 1 + 2 + 3 + 1 + 2
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def benchmark_tree_merge(count=1200, pages=3):
+    """合并上千个PDF：流式合并 vs 分层并行合并"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        files = []
+        for i in range(count):
+            files.append(os.path.join(work_dir, f"{i:05d}.pdf"))
+            _make_pdf(files[-1], f"Doc{i}", pages)
+        print(f"输入: {count} 个PDF × {pages} 页，CPU核心数 {os.cpu_count()}")
+        out_path = os.path.join(work_dir, "out.pdf")
+
+        start = time.perf_counter()
+        merge_pdf_files_streaming(files, out_path)
+        stream_elapsed = time.perf_counter() - start
+        print(f"流式合并:     {stream_elapsed:6.2f} 秒")
+
+        start = time.perf_counter()
+        merge_pdf_files_tree(files, out_path)
+        tree_elapsed = time.perf_counter() - start
+        print(f"分层并行合并: {tree_elapsed:6.2f} 秒 ({stream_elapsed / tree_elapsed:.2f}x)")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    benchmark_tree_merge()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试共享配置服务
+验证文件未变化时不重新读取、外部修改后重新读取、延迟保存合并为一次写入、原子保存，
+整数配置项为空或写错时使用默认值，以及保存设置时不覆盖识别进程写入的调优结果
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function import settings
+from function.settings import ConfigManager, SettingsService, DEFAULT_KOR_STYLE
+
+
+class _CountingService(SettingsService):
+    """记录读取与写入次数"""
+
+    def __init__(self, path, check_interval=0.0):
+        super().__init__(path, check_interval=check_interval)
+        self.reads = 0
+        self.writes = 0
+
+    def _read(self):
+        self.reads += 1
+        return super()._read()
+
+    def _write_pending(self):
+        if self._pending is not None:
+            self.writes += 1
+        super()._write_pending()
+
+
+def test_mtime_checked_reload():
+    """文件未变化时使用缓存，外部修改后重新读取；检查间隔内不访问磁盘"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(work_dir, "settings.ini")
+        with open(path, 'w', encoding='utf-8-sig') as f:
+            f.write("[General]\ntask_mode = Merge\n")
+        service = _CountingService(path)
+        assert service.get_all()["General"]["task_mode"] == "Merge"
+        for _ in range(100):
+            service.get_all()
+        assert service.reads == 1
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("[General]\ntask_mode = Script\n")
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+        assert service.get_all()["General"]["task_mode"] == "Script"
+        assert service.reads == 2
+
+        # 检查间隔内外部修改不会被立即发现，reload 强制重新读取
+        slow = _CountingService(path, check_interval=3600)
+        slow.get_all()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("[General]\ntask_mode = AutoSub\n")
+        assert slow.get_all()["General"]["task_mode"] == "Script"
+        assert slow.reload()["General"]["task_mode"] == "AutoSub"
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_coalesced_atomic_save():
+    """延迟保存合并为一次写入，写入后不重新读取自己写的文件，不留下临时文件"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(work_dir, "settings.ini")
+        service = _CountingService(path)
+        for i in range(20):
+            service.update({"Srt2Ass": {"srt2ass_workers": i}}, delay=60)
+        # 尚未写入，但内存中已是最新配置
+        assert not os.path.exists(path)
+        assert service.get_all()["Srt2Ass"]["srt2ass_workers"] == "19"
+        service.flush()
+        assert service.writes == 1
+
+        service.save({"Srt2Ass_kor_chn": {"kor": DEFAULT_KOR_STYLE}})
+        assert service.writes == 2
+        assert sorted(os.listdir(work_dir)) == ["settings.ini"]
+        reads = service.reads
+        assert service.get_all() == {"Srt2Ass_kor_chn": {"kor": DEFAULT_KOR_STYLE}}
+        assert service.reads == reads
+        assert SettingsService(path).get_all() == {"Srt2Ass_kor_chn": {"kor": DEFAULT_KOR_STYLE}}
+        assert service.parse_style(DEFAULT_KOR_STYLE) is service.parse_style(DEFAULT_KOR_STYLE)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_invalid_int_settings():
+    """整数配置项为空或不是整数时使用默认值，程序仍能启动"""
+    data = {
+        "Merge": {"pdf_merge_compression_level": "", "pdf_merge_tree_threshold": "1000"},
+        "Srt2Ass": {"srt2ass_workers": "四", "srt2ass_align_tolerance": " 150 "},
+        "AutoSub": {"model_idle_timeout": "10m", "cpu_threads": "8"}
+    }
+    original = settings.SettingsHandler.load_all_configs
+    settings.SettingsHandler.load_all_configs = staticmethod(lambda: data)
+    try:
+        manager = ConfigManager()
+        manager.load_settings()
+    finally:
+        settings.SettingsHandler.load_all_configs = original
+    assert manager.pdf_merge_compression_level == 6 and manager.pdf_merge_tree_threshold == 1000
+    assert manager.srt2ass_workers == 1 and manager.srt2ass_align_tolerance == 150
+    assert manager.model_idle_timeout == 600 and manager.cpu_threads == 8 and manager.parallel_files == 0
+
+
+def test_save_keeps_external_autotune():
+    """识别进程写入CPU调优结果后，界面用内存中的旧设置保存时保留文件中的调优结果"""
+    work_dir = tempfile.mkdtemp()
+    original = settings.settings_service
+    try:
+        path = os.path.join(work_dir, "settings.ini")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("[AutoSub]\ncpu_compute_type = auto\ncpu_autotune = \n")
+        settings.settings_service = SettingsService(path, check_interval=3600)
+        manager = ConfigManager()
+        manager.load_settings()
+        assert manager.cpu_autotune == ""
+
+        # 识别进程（另一个配置服务）写入调优结果
+        SettingsService(path).update({"AutoSub": {"cpu_autotune": "node|x86_64|16;int8;8"}})
+        manager.cpu_compute_type = "int8"
+        manager.save_settings()
+        saved = SettingsService(path).get_all()["AutoSub"]
+        assert saved["cpu_autotune"] == "node|x86_64|16;int8;8" and saved["cpu_compute_type"] == "int8"
+        assert manager.cpu_autotune == "node|x86_64|16;int8;8"
+    finally:
+        settings.settings_service = original
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_mtime_checked_reload()
+    test_coalesced_atomic_save()
+    test_invalid_int_settings()
+    test_save_keeps_external_autotune()
+    print("✅ 配置服务测试通过")
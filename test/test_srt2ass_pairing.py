@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试Srt2Ass双语字幕配对
+验证按集数与按基础名的配对规则、缺失语言的日志，并可单独运行输出5000个文件的配对耗时
+"""
+
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from font.srt2ass import build_pair_tasks
+
+
+def test_episode_pairing():
+    """按集数配对：明确标签优先，中文可按文件名字样回退，缺失语言记录日志"""
+    names = [
+        "Show.S01E01_track3.[kor].srt",
+        "Show.S01E01.[chi].srt",
+        "Show.S01E02.[ko].srt",
+        "Show.S01E02.chs.srt",
+        "Show.S01E03.[chi].srt",
+        "Show.S01E04.[kor].dual.srt",
+        "Show.S01E04.[kor].srt",
+        "Show.S01E05.DUAL.[kor].srt",
+        "Show.S01E05.[chi].srt",
+        "notes.txt",
+    ]
+    logs = []
+    tasks = build_pair_tasks(names, "kor_chn", logs.append)
+    assert [(t["ep"], t["oth_name"], t["chi_name"]) for t in tasks] == [
+        ("S01E01", "Show.S01E01_track3.[kor].srt", "Show.S01E01.[chi].srt"),
+        ("S01E02", "Show.S01E02.[ko].srt", "Show.S01E02.chs.srt"),
+        ("S01E05", "Show.S01E05.DUAL.[kor].srt", "Show.S01E05.[chi].srt"),
+    ]
+    assert tasks[0]["oth_stem"] == "Show.S01E01"
+    assert logs == [
+        "✅ 集数 S01E01 成功匹配",
+        "✅ 集数 S01E02 成功匹配",
+        "❌ 集数 S01E03 缺少韩语字幕",
+        "❌ 集数 S01E04 缺少中文字幕",
+        "✅ 集数 S01E05 成功匹配",
+    ]
+
+
+def test_base_name_pairing():
+    """没有集数标记：按去除标签后的基础名分组，[chs] 优先于 [cht]"""
+    names = [
+        "Lecture 1.[jpn].srt",
+        "Lecture 1.[cht].srt",
+        "Lecture 1.[chs].srt",
+        "Lecture 2.[jp].srt",
+        "Lecture 2.[en].srt",
+        "Single.[jpn].srt",
+    ]
+    logs = []
+    tasks = build_pair_tasks(names, "kor_jpn", logs.append)
+    assert logs == [
+        "❌ 文件 'Lecture 1..srt' 缺少韩语字幕",
+        "❌ 文件 'Lecture 2..srt' 缺少韩语字幕",
+    ]
+    assert tasks == []
+
+    logs = []
+    tasks = build_pair_tasks(names, "jpn_chn", logs.append)
+    assert [(t["ep"], t["oth_name"], t["chi_name"]) for t in tasks] == [
+        ("Lecture 1..srt", "Lecture 1.[jpn].srt", "Lecture 1.[chs].srt"),
+    ]
+    assert "lang_type" not in tasks[0]
+    assert logs == [
+        "✅ 文件 'Lecture 1..srt' 成功匹配",
+        "❌ 文件 'Lecture 2..srt' 缺少中文字幕",
+    ]
+
+
+def benchmark_pairing(seasons=40, episodes=63):
+    """5000个文件的配对耗时"""
+    names = [f"Show.S{s:02d}E{e:02d}.[{lang}].srt"
+             for s in range(1, seasons + 1) for e in range(1, episodes + 1) for lang in ("kor", "chi")]
+    start = time.perf_counter()
+    tasks = build_pair_tasks(names, "kor_chn")
+    elapsed = time.perf_counter() - start
+    print(f"配对 {len(names)} 个文件（{len(tasks)} 对）: {elapsed * 1000:.1f} 毫秒")
+
+
+if __name__ == "__main__":
+    test_episode_pairing()
+    test_base_name_pairing()
+    benchmark_pairing()
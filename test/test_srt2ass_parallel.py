@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试Srt2Ass并行转换
+验证进程池转换的输出与日志顺序和串行转换一致，以及ASS写入失败时原始SRT不被归档，
+并可单独运行输出串行与并行转换的耗时对比
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from font.srt2ass import run_ass_task, DEFAULT_KOR_STYLE, DEFAULT_CHN_STYLE
+
+STYLES = {"kor": DEFAULT_KOR_STYLE, "chn": DEFAULT_CHN_STYLE}
+
+
+def _write_srt(path, text, count):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            f.write(f"{i + 1}\n00:{i // 60:02d}:{i % 60:02d},000 --> 00:{i // 60:02d}:{i % 60:02d},900\n{text} {i}\n\n")
+
+
+def _make_folder(episodes, lines=20):
+    work_dir = tempfile.mkdtemp()
+    for ep in range(1, episodes + 1):
+        _write_srt(os.path.join(work_dir, f"Show.S01E{ep:02d}.[kor].srt"), "안녕하세요", lines)
+        _write_srt(os.path.join(work_dir, f"Show.S01E{ep:02d}.[chi].srt"), "你好", lines)
+    return work_dir
+
+
+def _run(work_dir, workers):
+    logs = []
+    progress = []
+    run_ass_task(work_dir, STYLES, logs.append, progress.append, None, stop_flag=[False], workers=workers)
+    return logs, progress
+
+
+def _snapshot(work_dir):
+    """目录内容：相对路径 -> 文件内容"""
+    result = {}
+    for root, _, files in os.walk(work_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                result[os.path.relpath(path, work_dir)] = f.read()
+    return result
+
+
+def test_parallel_matches_serial():
+    """并行转换生成的文件、归档结果与日志顺序与串行转换一致"""
+    serial_dir = _make_folder(6)
+    parallel_dir = _make_folder(6)
+    try:
+        serial_logs, _ = _run(serial_dir, 1)
+        parallel_logs, progress = _run(parallel_dir, 3)
+        # 第一条日志是目录路径，其余日志（含生成顺序）应完全一致
+        assert parallel_logs[1:] == serial_logs[1:]
+        assert _snapshot(parallel_dir) == _snapshot(serial_dir)
+        assert len(os.listdir(os.path.join(parallel_dir, "srt"))) == 12
+        assert progress == sorted(progress) and progress[-1] == 100
+    finally:
+        shutil.rmtree(serial_dir, ignore_errors=True)
+        shutil.rmtree(parallel_dir, ignore_errors=True)
+
+
+def test_failed_pair_keeps_sources():
+    """ASS写入失败的配对不归档原始SRT，其他配对正常完成"""
+    work_dir = _make_folder(3)
+    try:
+        # 用同名文件夹占住第二集的输出路径
+        os.mkdir(os.path.join(work_dir, "Show.S01E02.[kor_chn].ass"))
+        logs, _ = _run(work_dir, 2)
+        assert sorted(msg[0] for msg in logs if msg[0] in "📝❌") == sorted("📝❌📝"), logs
+        assert os.path.exists(os.path.join(work_dir, "Show.S01E02.[kor].srt"))
+        assert os.path.exists(os.path.join(work_dir, "Show.S01E02.[chi].srt"))
+        assert sorted(os.listdir(os.path.join(work_dir, "srt"))) == [
+            "Show.S01E01.[chi].srt", "Show.S01E01.[kor].srt",
+            "Show.S01E03.[chi].srt", "Show.S01E03.[kor].srt",
+        ]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def benchmark_parallel(episodes=200, lines=1500):
+    """串行 vs 并行转换"""
+    print(f"输入: {episodes} 对字幕 × {lines} 行，CPU核心数 {os.cpu_count()}")
+    for workers in (1, 0):
+        work_dir = _make_folder(episodes, lines)
+        try:
+            start = time.perf_counter()
+            _run(work_dir, workers)
+            label = "串行" if workers == 1 else "并行"
+            print(f"{label}转换: {time.perf_counter() - start:6.2f} 秒")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    benchmark_parallel()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试Srt2Ass递归模式
+验证按目录独立配对、输出与归档写在各自目录（或按相对路径镜像到输出目录），以及跳过归档目录
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from font.srt2ass import find_srt_dirs, run_ass_task, DEFAULT_KOR_STYLE, DEFAULT_CHN_STYLE
+
+STYLES = {"kor": DEFAULT_KOR_STYLE, "chn": DEFAULT_CHN_STYLE}
+
+
+def _write_srt(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"1\n00:00:01,000 --> 00:00:02,000\n{text}\n")
+
+
+def _make_library(root):
+    """Show A/Season 1、Show A/Season 2、Show B 各有两集，同名集数分布在不同目录"""
+    for season in ("Show A/Season 1", "Show A/Season 2", "Show B"):
+        for ep in (1, 2):
+            _write_srt(os.path.join(root, season, f"Show.S01E0{ep}.[kor].srt"), "안녕")
+            _write_srt(os.path.join(root, season, f"Show.S01E0{ep}.[chi].srt"), "你好")
+    # 已归档的原始文件与只有单个字幕的目录不参与处理
+    _write_srt(os.path.join(root, "Show B", "srt", "Show.S01E09.[kor].srt"), "안녕")
+    _write_srt(os.path.join(root, "Show B", "srt", "Show.S01E09.[chi].srt"), "你好")
+    _write_srt(os.path.join(root, "Extras", "Show.S01E01.[kor].srt"), "안녕")
+
+
+def test_find_srt_dirs():
+    """一次遍历找出包含可配对字幕的目录，顺序固定，跳过归档目录"""
+    root = tempfile.mkdtemp()
+    try:
+        _make_library(root)
+        found = [(os.path.relpath(d, root), sorted(names)) for d, names in find_srt_dirs(root)]
+        assert [d for d, _ in found] == [os.path.join("Show A", "Season 1"), os.path.join("Show A", "Season 2"), "Show B"]
+        assert found[0][1] == ["Show.S01E01.[chi].srt", "Show.S01E01.[kor].srt",
+                               "Show.S01E02.[chi].srt", "Show.S01E02.[kor].srt"]
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_recursive_in_place():
+    """未指定输出目录：ASS与归档写在各自源目录"""
+    root = tempfile.mkdtemp()
+    try:
+        _make_library(root)
+        logs = []
+        run_ass_task(root, STYLES, logs.append, lambda v: None, None, stop_flag=[False], workers=2, recursive=True)
+        for season in ("Show A/Season 1", "Show A/Season 2", "Show B"):
+            folder = os.path.join(root, season)
+            assert sorted(f for f in os.listdir(folder) if f.endswith(".ass")) == [
+                "Show.S01E01.[kor_chn].ass", "Show.S01E02.[kor_chn].ass"]
+            assert len([f for f in os.listdir(os.path.join(folder, "srt")) if f.startswith("Show.S01E0")]) >= 4
+        # 已归档目录中的字幕没有被再次转换
+        assert not os.path.exists(os.path.join(root, "Show B", "srt", "Show.S01E09.[kor_chn].ass"))
+        assert sum(msg.startswith("📝") for msg in logs) == 6
+        assert logs[-1].startswith("📂 任务完成：共处理 3 个目录")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_recursive_mirrored_output():
+    """指定输出目录：按相对路径镜像目录结构"""
+    root = tempfile.mkdtemp()
+    out = tempfile.mkdtemp()
+    try:
+        _make_library(root)
+        run_ass_task(root, STYLES, lambda msg: None, lambda v: None, None, output_dir=out,
+                     stop_flag=[False], recursive=True)
+        assert os.path.exists(os.path.join(out, "Show A", "Season 2", "Show.S01E02.[kor_chn].ass"))
+        assert os.path.exists(os.path.join(out, "Show A", "Season 2", "srt", "Show.S01E02.[chi].srt"))
+        assert not os.path.exists(os.path.join(root, "Show A", "Season 2", "Show.S01E02.[chi].srt"))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        shutil.rmtree(out, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_find_srt_dirs()
+    test_recursive_in_place()
+    test_recursive_mirrored_output()
+    print("✅ 递归模式测试通过")
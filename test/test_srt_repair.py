@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试SRT格式的内存修复
+验证序号、时间戳和文本在同一行的字幕能被正确解析，正常格式不受影响，且原始文件不被改写
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from font.srt2ass import load_srt, repair_srt_text, run_ass_task, DEFAULT_KOR_STYLE, DEFAULT_CHN_STYLE
+
+SAME_LINE = "1 00:00:00,000 --> 00:00:06,260 こんにちは。\n2 00:00:07,000 --> 00:00:08,500  元気です \n"
+NORMAL = "1\n00:00:00,000 --> 00:00:01,000\n2 apples\n\n2\n00:00:02,000 --> 00:00:03,000\nbye\n"
+
+
+def test_repair_srt_text():
+    """同一行的字幕块被拆开，正常格式原样返回"""
+    assert repair_srt_text(NORMAL) == NORMAL
+    assert repair_srt_text(SAME_LINE) == (
+        "1\n00:00:00,000 --> 00:00:06,260\nこんにちは。\n\n"
+        "2\n00:00:07,000 --> 00:00:08,500\n元気です\n\n"
+    )
+
+
+def test_load_srt_keeps_original():
+    """解析结果正确，转换后归档的原始文件与转换前逐字节相同"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        kor_path = os.path.join(work_dir, "Show.S01E01.[kor].srt")
+        chi_path = os.path.join(work_dir, "Show.S01E01.[chi].srt")
+        with open(kor_path, 'w', encoding='utf-8') as f:
+            f.write(SAME_LINE)
+        with open(chi_path, 'w', encoding='utf-8') as f:
+            f.write(NORMAL)
+        with open(kor_path, 'rb') as f:
+            original = f.read()
+
+        subs = load_srt(kor_path)
+        assert [(e.start, e.end, e.text) for e in subs] == [(0, 6260, "こんにちは。"), (7000, 8500, "元気です")]
+
+        run_ass_task(work_dir, {"kor": DEFAULT_KOR_STYLE, "chn": DEFAULT_CHN_STYLE},
+                     lambda msg: None, lambda v: None, None, stop_flag=[False])
+        with open(os.path.join(work_dir, "srt", "Show.S01E01.[kor].srt"), 'rb') as f:
+            assert f.read() == original
+        with open(os.path.join(work_dir, "Show.S01E01.[kor_chn].ass"), encoding='utf-8-sig') as f:
+            assert "Dialogue: 0,0:00:00.00,0:00:06.26,KOR - Noto Serif KR,,0,0,0,,こんにちは。" in f.read()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_repair_srt_text()
+    test_load_srt_keeps_original()
+    print("✅ SRT内存修复测试通过")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试字幕格式转换
+验证 SRT/VTT/ASS/SMI 的读取器与写入器往返一致、各格式的常见写法能正确解析，
+批量转换的输出与停止行为，并可单独运行输出各格式的读写吞吐量
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.subconvert import Cue, SUPPORTED_FORMATS, read_cues, write_cues, convert_subtitle_batch
+
+CUES = [
+    Cue(0, 1500, "안녕하세요"),
+    Cue(1500, 3210, "<i>两行</i>字幕\n第二行 & <more>"),
+    Cue(5000, 7250, "- [음악]"),
+    Cue(3600000, 3601990, "1 hour later"),
+]
+
+
+def _write(path, text, encoding='utf-8'):
+    with open(path, 'w', encoding=encoding) as f:
+        f.write(text)
+
+
+def test_round_trip():
+    """写入后再读取，每种格式都得到相同的字幕条目（ASS 时间精度为厘秒）"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        for fmt in SUPPORTED_FORMATS:
+            path = os.path.join(work_dir, "sample." + fmt)
+            assert write_cues(iter(CUES), path) == len(CUES)
+            assert list(read_cues(path)) == CUES, fmt
+            # 再转换一轮到其他格式，结果仍然相同
+            for other in SUPPORTED_FORMATS:
+                out = os.path.join(work_dir, f"{fmt}_to.{other}")
+                write_cues(read_cues(path), out)
+                assert list(read_cues(out)) == CUES, (fmt, other)
+        assert not [name for name in os.listdir(work_dir) if name.endswith(".tmp")]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_reader_variants():
+    """各格式的常见写法：同一行的SRT、带标识与设置的VTT、乱序字段的ASS、多语言与清屏的SMI"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        srt = os.path.join(work_dir, "a.srt")
+        _write(srt, "﻿1 00:00:00,000 --> 00:00:06,260 こんにちは。\r\n2\r\n00:00:07,000 --> 00:00:08,500\r\n2024\r\n\r\n")
+        assert list(read_cues(srt)) == [Cue(0, 6260, "こんにちは。"), Cue(7000, 8500, "2024")]
+
+        vtt = os.path.join(work_dir, "a.vtt")
+        _write(vtt, "WEBVTT\nKind: captions\nLanguage: ko\n\nNOTE 注释\n00:00:01.000 --> 00:00:02.000\n\n"
+                    "intro\n00:01.000 --> 00:02.500 align:start position:10%\n<v 甲><c.yellow>你好</c> &amp; 再见\n\n"
+                    "00:00:03.000 --> 00:00:04.000\n第二条\n")
+        assert list(read_cues(vtt)) == [Cue(1000, 2500, "你好 & 再见"), Cue(3000, 4000, "第二条")]
+
+        ass = os.path.join(work_dir, "a.ass")
+        _write(ass, "[Script Info]\nTitle: x\n\n[Events]\nFormat: Start, End, Layer, Style, Text\n"
+                    "Comment: 0:00:00.00,0:00:01.00,0,Default,跳过\n"
+                    "Dialogue: 0:00:01.50,0:00:02.00,0,Default,{\\pos(1,2)}甲,乙\\N{\\i1}丙{\\i0}\\h丁\n")
+        assert list(read_cues(ass)) == [Cue(1500, 2000, "甲,乙\n<i>丙</i> 丁")]
+
+        smi = os.path.join(work_dir, "a.smi")
+        _write(smi, "<SAMI><HEAD><STYLE><!-- .KRCC {} .ENCC {} --></STYLE></HEAD><BODY>\n"
+                    "<SYNC Start=1000><P Class=KRCC>첫 번째<br>줄\n<P Class=ENCC>first\n"
+                    "<SYNC Start=2000><P Class=KRCC>&nbsp;\n"
+                    "<sync start=\"3000\"><p class=krcc>두\n번째<SYNC Start=4500><P Class=KRCC>마지막\n"
+                    "</BODY></SAMI>\n", encoding='cp949')
+        assert list(read_cues(smi)) == [
+            Cue(1000, 2000, "첫 번째\n줄"), Cue(3000, 4500, "두 번째"), Cue(4500, 9500, "마지막"),
+        ]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_batch_convert():
+    """批量转换：递归查找、按相对路径镜像到输出目录、跳过目标格式与无效文件"""
+    work_dir = tempfile.mkdtemp()
+    out_dir = tempfile.mkdtemp()
+    try:
+        os.makedirs(os.path.join(work_dir, "season1"))
+        write_cues(CUES, os.path.join(work_dir, "ep1.ass"))
+        write_cues(CUES, os.path.join(work_dir, "season1", "ep2.vtt"))
+        write_cues(CUES, os.path.join(work_dir, "season1", "ep3.srt"))
+        _write(os.path.join(work_dir, "notes.txt"), "x")
+        logs = []
+        progress = []
+        assert convert_subtitle_batch([work_dir], "srt", logs.append, progress.append,
+                                      stop_flag=[False], output_dir=out_dir) == (2, 0)
+        assert sorted(os.path.relpath(os.path.join(root, f), out_dir)
+                      for root, _, files in os.walk(out_dir) for f in files) == [
+            "ep1.srt", os.path.join("season1", "ep2.srt")]
+        assert list(read_cues(os.path.join(out_dir, "season1", "ep2.srt"))) == CUES
+        assert progress[-1] == 100 and logs[-1] == "📂 字幕格式转换完成：成功 2 个，失败 0 个"
+
+        # 并行转换与串行结果相同；停止时不再开始新的文件
+        assert convert_subtitle_batch([work_dir], "smi", workers=2) == (3, 0)
+        assert list(read_cues(os.path.join(work_dir, "season1", "ep3.smi"))) == CUES
+        assert convert_subtitle_batch([work_dir], "vtt", stop_flag=[True]) == (0, 0)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def benchmark_formats(count=200000):
+    """各格式的流式写入与读取吞吐量"""
+    cues = [Cue(i * 2000, i * 2000 + 1500, f"第 {i} 条字幕\nline {i}") for i in range(count)]
+    work_dir = tempfile.mkdtemp()
+    try:
+        print(f"{count} 条字幕")
+        for fmt in SUPPORTED_FORMATS:
+            path = os.path.join(work_dir, "bench." + fmt)
+            start = time.perf_counter()
+            write_cues(iter(cues), path)
+            write_elapsed = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in read_cues(path):
+                pass
+            read_elapsed = time.perf_counter() - start
+            size = os.path.getsize(path) / 1024 / 1024
+            print(f"{fmt.upper()}: {size:5.1f} MB，写入 {count / write_elapsed:8.0f} 条/秒，"
+                  f"读取 {count / read_elapsed:8.0f} 条/秒 ({size / read_elapsed:5.1f} MB/秒)")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    benchmark_formats()
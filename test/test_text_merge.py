@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试TXT/Markdown合并
+验证不同编码（UTF-8、UTF-8 BOM、GBK、UTF-16）的输入统一输出为UTF-8，顺序与分隔符正确，
+并可单独运行输出合并数千个文本文件的耗时
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.file_utils import detect_text_encoding
+from function.merge import run_txt_merge_task, run_md_merge_task
+
+
+def test_detect_text_encoding():
+    """编码识别：BOM、无BOM的UTF-16与中文编码"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        samples = {
+            "utf8.txt": ("第一集 台词", "utf-8", ("utf-8", 0)),
+            "bom.txt": ("﻿第一集 台词", "utf-8", ("utf-8", 3)),
+            "gbk.txt": ("第一集 台词", "gbk", ("gb18030", 0)),
+            "utf16.txt": ("﻿Episode 1", "utf-16-le", ("utf-16-le", 2)),
+            "utf16_nobom.txt": ("Episode 1 dialogue", "utf-16-le", ("utf-16-le", 0)),
+            "ascii.txt": ("plain text", "ascii", ("utf-8", 0)),
+        }
+        for name, (text, encoding, expected) in samples.items():
+            path = os.path.join(work_dir, name)
+            with open(path, 'wb') as f:
+                f.write(text.encode(encoding))
+            assert detect_text_encoding(path) == expected, name
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_text_merge_mixed_encodings():
+    """混合编码输入合并为UTF-8，BOM被去除，顺序与分隔符正确"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        inputs = [
+            ("01.txt", "utf-8", "第一集 안녕하세요"),
+            ("02.txt", "utf-8-sig", "第二集 带BOM"),
+            ("03.txt", "gbk", "第三集 简体中文"),
+            ("04.txt", "utf-16", "第四集 UTF-16"),
+        ]
+        for name, encoding, text in inputs:
+            with open(os.path.join(work_dir, name), 'w', encoding=encoding, newline='') as f:
+                f.write(text + "\n第二行")
+        logs = []
+        run_txt_merge_task(work_dir, lambda msg, **k: logs.append(msg), lambda v: None, None, stop_flag=[False])
+        with open(os.path.join(work_dir, "TXT合并.txt"), 'rb') as f:
+            merged = f.read().decode("utf-8")
+
+        separator = ("\n\n" + "=" * 50 + "\n\n").replace("\n", os.linesep)
+        assert merged == "".join(text + "\n第二行" + separator for _, _, text in inputs)
+        assert any("GB18030 → UTF-8" in msg for msg in logs), logs
+
+        with open(os.path.join(work_dir, "a.md"), 'w', encoding='gbk') as f:
+            f.write("# 标题")
+        run_md_merge_task(work_dir, lambda *a, **k: None, lambda v: None, None, stop_flag=[False])
+        with open(os.path.join(work_dir, "Markdown合并.md"), 'rb') as f:
+            assert f.read().decode("utf-8") == "# 标题" + "\n\n---\n\n".replace("\n", os.linesep)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def benchmark_text_merge(count=3000, lines=400):
+    """合并数千个文本文件的耗时"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        body = "".join(f"[00:{i // 60:02d}:{i % 60:02d}]  第{i}句台词 dialogue line\n" for i in range(lines))
+        for i in range(count):
+            with open(os.path.join(work_dir, f"{i:05d}.txt"), 'w', encoding='utf-8') as f:
+                f.write(body)
+        total_mb = count * len(body.encode("utf-8")) / 1e6
+        start = time.perf_counter()
+        run_txt_merge_task(work_dir, lambda *a, **k: None, lambda v: None, None, stop_flag=[False])
+        elapsed = time.perf_counter() - start
+        print(f"合并 {count} 个文本文件（{total_mb:.1f} MB）: {elapsed:.2f} 秒，{total_mb / elapsed:.0f} MB/s")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_detect_text_encoding()
+    test_text_merge_mixed_encodings()
+    benchmark_text_merge()
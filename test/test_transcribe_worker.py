@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试语音识别工作进程
+用替身任务函数（不加载模型）验证：日志、进度与结果经队列转发，子进程在任务之间保持运行，
+请求停止后正常结束、不响应停止时被强制结束，没有识别进展时被强制结束（持续产出片段的长任务不受影响），
+任务出错与空闲超时的处理
+"""
+
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.transcribe_worker import TranscriptionWorker
+
+
+def _fake_runner(config, input_dir, log_callback, progress_callback, stop_flag, skip_existing, heartbeat):
+    log_callback(f"处理 {input_dir}")
+    for value in (50, 100):
+        progress_callback(value)
+    return [(os.path.join(input_dir, "a.mp3"), config["tag"], os.getpid())]
+
+
+def _stoppable_runner(config, input_dir, log_callback, progress_callback, stop_flag, skip_existing, heartbeat):
+    log_callback("开始")
+    while not stop_flag[0]:
+        time.sleep(0.05)
+    return []
+
+
+def _stuck_runner(config, input_dir, log_callback, progress_callback, stop_flag, skip_existing, heartbeat):
+    log_callback("开始")
+    time.sleep(60)
+
+
+def _failing_runner(config, input_dir, log_callback, progress_callback, stop_flag, skip_existing, heartbeat):
+    raise Exception("❌ 未设置 CUDA 路径 (cublas64_12.dll)")
+
+
+def _long_runner(config, input_dir, log_callback, progress_callback, stop_flag, skip_existing, heartbeat):
+    """长文件：很久没有日志与进度，但持续识别出片段"""
+    log_callback("开始")
+    for _ in range(30):
+        time.sleep(0.1)
+        heartbeat()
+    return ["完成"]
+
+
+class _StopAfterFirstLog:
+    """收到第一条任务日志后设置停止标志"""
+
+    def __init__(self, stop_flag):
+        self.stop_flag = stop_flag
+        self.logs = []
+
+    def __call__(self, msg):
+        self.logs.append(msg)
+        if msg == "开始":
+            self.stop_flag[0] = True
+
+
+def test_worker_stays_warm():
+    """日志、进度与结果按顺序转发；两次任务由同一个子进程执行"""
+    worker = TranscriptionWorker(idle_timeout=30, runner=_fake_runner)
+    try:
+        logs = []
+        progress = []
+        first = worker.run({"tag": "x"}, "dir1", logs.append, progress.append)
+        assert first[0][:2] == (os.path.join("dir1", "a.mp3"), "x")
+        assert first[0][2] == worker.pid != os.getpid()
+        assert logs[0].startswith("ⓘ 已启动语音识别进程") and logs[1:] == ["处理 dir1"]
+        assert progress == [50, 100]
+
+        logs = []
+        second = worker.run({"tag": "y"}, "dir2", logs.append)
+        assert second[0][2] == first[0][2] and logs == ["处理 dir2"]
+    finally:
+        worker.shutdown()
+    assert not worker.is_alive()
+
+
+def test_stop_and_kill():
+    """子进程响应停止时正常返回；不响应时宽限期后被强制结束，下一次任务重新启动子进程"""
+    worker = TranscriptionWorker(idle_timeout=30, stop_grace=1, runner=_stoppable_runner)
+    try:
+        stop_flag = [False]
+        assert worker.run({}, "d", _StopAfterFirstLog(stop_flag), stop_flag=stop_flag) == []
+        pid = worker.pid
+        assert pid is not None
+
+        worker.runner = _stuck_runner
+        worker.shutdown()
+        stop_flag = [False]
+        log = _StopAfterFirstLog(stop_flag)
+        start = time.monotonic()
+        assert worker.run({}, "d", log, stop_flag=stop_flag) is None
+        assert time.monotonic() - start < 10
+        assert not worker.is_alive() and "已强制结束" in log.logs[-1]
+
+        worker.runner = _failing_runner
+        try:
+            worker.run({}, "d", lambda msg: None)
+            assert False, "应抛出异常"
+        except Exception as e:
+            assert str(e) == "❌ 未设置 CUDA 路径 (cublas64_12.dll)"
+        assert worker.is_alive()
+    finally:
+        worker.shutdown()
+
+
+def test_hang_watchdog():
+    """超过 hang_timeout 秒没有识别进展时强制结束；持续发送片段心跳的长任务不受影响"""
+    worker = TranscriptionWorker(idle_timeout=30, hang_timeout=1.5, runner=_long_runner)
+    try:
+        assert worker.run({}, "d", lambda msg: None) == ["完成"]
+
+        worker.runner = _stuck_runner
+        worker.shutdown()
+        start = time.monotonic()
+        try:
+            worker.run({}, "d", lambda msg: None)
+            assert False, "应抛出异常"
+        except Exception as e:
+            assert str(e) == "❌ 语音识别进程超过 1.5 秒没有识别进展，已强制结束"
+        assert time.monotonic() - start < 10
+        assert not worker.is_alive()
+    finally:
+        worker.shutdown()
+
+
+def test_idle_shutdown():
+    """任务结束后空闲超时，子进程退出"""
+    worker = TranscriptionWorker(idle_timeout=0.5, runner=_fake_runner)
+    try:
+        worker.run({"tag": "x"}, "d", lambda msg: None)
+        assert worker.is_alive()
+        deadline = time.monotonic() + 10
+        while worker.is_alive() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert not worker.is_alive()
+    finally:
+        worker.shutdown()
+
+
+if __name__ == "__main__":
+    test_worker_stays_warm()
+    test_stop_and_kill()
+    test_hang_watchdog()
+    test_idle_shutdown()
+    print("✅ 语音识别工作进程测试通过")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试VTT批量转换
+验证文件与文件夹混合输入、递归查找（跳过隐藏与整理目录）、逐块写入的输出格式、进度汇总，
+转换失败时不留下半个SRT文件，以及已转换的VTT不再重复转换
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.vtt2srt import convert_vtt_batch, collect_vtt_files
+
+VTT = ("WEBVTT\nKind: captions\nLanguage: ko\n\n1\n00:00:01.000 --> 00:00:02.500\n안녕\n하세요\n\n"
+       "2\n00:00:03.000 --> 00:00:04.000\n잘 가\n")
+SRT = "1\n00:00:01,000 --> 00:00:02,500\n안녕\n하세요\n\n2\n00:00:03,000 --> 00:00:04,000\n잘 가\n\n"
+
+
+def _write(path, content, encoding='utf-8'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding=encoding) as f:
+        f.write(content)
+
+
+def test_batch_files_and_folders():
+    """文件夹递归查找，单独拖入的文件与无效文件分别处理，进度最终为100"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        for rel in ("Show/S1/E01.vtt", "Show/S1/E02.vtt", "Show/S2/E01.VTT", "single.vtt"):
+            _write(os.path.join(work_dir, rel), VTT)
+        _write(os.path.join(work_dir, "notes.txt"), "x")
+        paths = [os.path.join(work_dir, "Show"), os.path.join(work_dir, "single.vtt"), os.path.join(work_dir, "notes.txt")]
+
+        files, invalid = collect_vtt_files(paths)
+        assert [os.path.relpath(f, work_dir) for f in files] == [
+            os.path.join("Show", "S1", "E01.vtt"), os.path.join("Show", "S1", "E02.vtt"),
+            os.path.join("Show", "S2", "E01.VTT"), "single.vtt"]
+        assert invalid == [os.path.join(work_dir, "notes.txt")]
+
+        logs, progress = [], []
+        assert convert_vtt_batch(paths, logs.append, progress.append, workers=3) == (4, 0)
+        assert progress[-1] == 100 and progress == sorted(progress)
+        assert sum(msg.startswith("✅") for msg in logs) == 4
+        assert logs[0].startswith("⚠️ 跳过无效文件: notes.txt")
+        with open(os.path.join(work_dir, "Show", "S2", "E01.srt"), encoding='utf-8') as f:
+            assert f.read() == SRT
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_failed_conversion_leaves_no_partial_srt():
+    """无法解码的文件转换失败，不留下SRT文件，其他文件正常转换"""
+    work_dir = tempfile.mkdtemp()
+    try:
+        _write(os.path.join(work_dir, "good.vtt"), VTT)
+        _write(os.path.join(work_dir, "bad.vtt"), VTT + "한국어" * 10000, encoding='cp949')
+        logs = []
+        assert convert_vtt_batch([work_dir], logs.append) == (1, 1)
+        assert sorted(os.listdir(work_dir)) == ["bad.vtt", "good.srt", "good.vtt"]
+        assert any(msg.startswith("❌ 转换失败 bad.vtt") for msg in logs)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_skip_converted():
+    """已有同名SRT或SRT已归档到输出目录的VTT不再转换；递归时不进入 srt 等整理目录与隐藏目录"""
+    work_dir = tempfile.mkdtemp()
+    out_dir = tempfile.mkdtemp()
+    try:
+        for rel in ("E01.vtt", "E02.vtt", "E03.vtt", "S2/E01.vtt", "S2/E02.vtt", "srt/old.vtt", ".cache/x.vtt"):
+            _write(os.path.join(work_dir, rel), VTT)
+        _write(os.path.join(work_dir, "E01.srt"), "手动修改")
+        _write(os.path.join(out_dir, "srt", "E02.srt"), "已归档")
+        _write(os.path.join(out_dir, "S2", "srt", "E01.srt"), "已归档")
+
+        files, _ = collect_vtt_files([work_dir])
+        assert [os.path.relpath(f, work_dir) for f in files] == [
+            "E01.vtt", "E02.vtt", "E03.vtt", os.path.join("S2", "E01.vtt"), os.path.join("S2", "E02.vtt")]
+
+        logs = []
+        assert convert_vtt_batch([work_dir], logs.append, skip_converted=True, output_dir=out_dir) == (2, 0)
+        assert "⏭️ 跳过已转换的VTT: 3 个" in logs
+        assert os.path.exists(os.path.join(work_dir, "E03.srt")) and os.path.exists(os.path.join(work_dir, "S2", "E02.srt"))
+        assert not os.path.exists(os.path.join(work_dir, "E02.srt"))
+        with open(os.path.join(work_dir, "E01.srt"), encoding='utf-8') as f:
+            assert f.read() == "手动修改"
+
+        # 全部已转换时不再转换，也不提示未找到文件
+        logs = []
+        assert convert_vtt_batch([work_dir], logs.append, skip_converted=True, output_dir=out_dir) == (0, 0)
+        assert logs == ["⏭️ 跳过已转换的VTT: 5 个"]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_batch_files_and_folders()
+    test_failed_conversion_leaves_no_partial_srt()
+    test_skip_converted()
+    print("✅ VTT批量转换测试通过")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试Whisper模型缓存
+用不加载真实模型的替身验证：同一键复用、使用中的模型不被卸载、空闲超时与数量上限触发卸载，
+卸载时释放权重但不析构模型对象
+"""
+
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function import whisper_models
+from function.whisper_models import WhisperModelManager
+
+
+class _FakeCT2:
+    def __init__(self):
+        self.loaded = True
+
+    def unload_model(self):
+        self.loaded = False
+
+
+class _FakeWhisper:
+    """与 faster_whisper.WhisperModel 一样，权重在 .model（CTranslate2 模型）中"""
+
+    def __init__(self, name):
+        self.name = name
+        self.model = _FakeCT2()
+
+
+def _loader(name, loads):
+    def load():
+        loads.append(name)
+        return _FakeWhisper(name)
+    return load
+
+
+def test_reuse_and_capacity():
+    """同一键复用已加载的模型；超过数量上限时卸载空闲模型，使用中的模型保留"""
+    manager = WhisperModelManager(idle_timeout=60, max_models=1, min_available_mb=0)
+    loads = []
+    key_a = ("large-v3", "cpu", "float32")
+    key_b = ("medium", "cpu", "float32")
+
+    first = manager.acquire(key_a, _loader("a", loads))
+    manager.release(key_a)
+    logs = []
+    assert manager.acquire(key_a, _loader("a", loads), logs.append) is first
+    assert loads == ["a"] and logs == ["♻️ 复用已加载的模型"]
+
+    # a 仍在使用，加载 b 时不能卸载 a
+    second = manager.acquire(key_b, _loader("b", loads))
+    assert manager.loaded_keys() == [key_a, key_b] and first.model.loaded
+    manager.release(key_a)
+    manager.release(key_b)
+
+    # 再加载新模型时按最久未使用的顺序卸载空闲模型，直到不超过上限；权重被释放但对象保留
+    manager.max_models = 2
+    manager.acquire(key_a, _loader("a", loads))
+    manager.release(key_a)
+    key_c = ("small", "cpu", "float32")
+    manager.acquire(key_c, _loader("c", loads))
+    assert manager.loaded_keys() == [key_a, key_c]
+    assert first.model.loaded and not second.model.loaded
+    assert second in whisper_models._retired
+    manager.unload_all()
+    assert manager.loaded_keys() == [key_c]
+    manager.release(key_c)
+    manager.unload_all()
+    assert manager.loaded_keys() == [] and loads == ["a", "b", "c"]
+    # 保留的已卸载模型对象有上限，不随卸载次数增长
+    assert len(whisper_models._retired) == 2 and second not in whisper_models._retired
+
+
+def test_idle_timeout():
+    """引用归零后空闲超时卸载；超时前重新使用则取消卸载"""
+    manager = WhisperModelManager(idle_timeout=0.2, min_available_mb=0)
+    loads = []
+    key = ("large-v3", "cuda", "float16")
+    model = manager.acquire(key, _loader("a", loads))
+    manager.release(key)
+    time.sleep(0.1)
+    assert manager.acquire(key, _loader("a", loads)) is model
+    time.sleep(0.3)
+    # 使用中，计时器已取消
+    assert manager.loaded_keys() == [key]
+    manager.release(key)
+    time.sleep(0.4)
+    assert manager.loaded_keys() == [] and not model.model.loaded
+    assert loads == ["a"]
+
+    # idle_timeout 为 0 时释放后立即卸载；重复释放不出错
+    manager.idle_timeout = 0
+    manager.acquire(key, _loader("a", loads))
+    manager.release(key)
+    manager.release(key)
+    assert manager.loaded_keys() == [] and loads == ["a", "a"]
+
+
+if __name__ == "__main__":
+    test_reuse_and_capacity()
+    test_idle_timeout()
+    print("✅ Whisper模型缓存测试通过")
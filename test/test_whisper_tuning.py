@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试Whisper CPU模式自动调优
+用替身模型（不加载真实模型）验证：调优结果的保存格式与机器标识校验、候选线程数，
+两阶段试跑选出最快的配置、出错的配置被跳过、试跑后释放模型权重
+"""
+
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function import whisper_models, whisper_tuning
+from function.whisper_tuning import autotune_cpu, candidate_thread_counts, format_tuned, parse_tuned
+
+# 替身模型的识别耗时（秒）：int8 最快，8 线程比 16 线程更快
+SPEED = {"int8": 0.02, "int8_float32": 0.03, "float32": 0.05}
+THREAD_FACTOR = {16: 1.0, 8: 0.5, 4: 1.5}
+
+
+class _FakeCT2:
+    def __init__(self):
+        self.loaded = True
+
+    def unload_model(self):
+        self.loaded = False
+
+
+class _FakeWhisper:
+    def __init__(self, compute_type, threads):
+        self.delay = SPEED[compute_type] * THREAD_FACTOR[threads]
+        self.model = _FakeCT2()
+        self.options = None
+
+    def transcribe(self, audio, **options):
+        self.options = options
+
+        def generate():
+            time.sleep(self.delay)
+            yield "片段"
+        return generate(), None
+
+
+def test_tuned_format():
+    """调优结果按机器标识保存，其他机器或格式错误的结果不使用"""
+    value = format_tuned("int8", 8, fingerprint="node|x86_64|16")
+    assert value == "node|x86_64|16;int8;8"
+    assert parse_tuned(value, fingerprint="node|x86_64|16") == ("int8", 8)
+    assert parse_tuned(value, fingerprint="other|x86_64|16") is None
+    assert parse_tuned("", fingerprint="node|x86_64|16") is None
+    assert parse_tuned("node|x86_64|16;int4;8", fingerprint="node|x86_64|16") is None
+    assert parse_tuned("node|x86_64|16;int8;abc", fingerprint="node|x86_64|16") is None
+    assert parse_tuned(format_tuned("float32", 4)) == ("float32", 4)
+
+    assert candidate_thread_counts(16) == [16, 8, 4]
+    assert candidate_thread_counts(2) == [2, 1]
+    assert candidate_thread_counts(1) == [1]
+
+
+def test_autotune_picks_fastest():
+    """先比较计算类型，再比较线程数；加载失败的配置被跳过；每个试跑模型都释放权重"""
+    loaded = []
+
+    def load(compute_type, threads):
+        if compute_type == "int8_float32":
+            raise RuntimeError("unsupported compute type")
+        model = _FakeWhisper(compute_type, threads)
+        loaded.append((compute_type, threads, model))
+        return model
+
+    logs = []
+    compute_type, threads, timings = autotune_cpu(
+        load, "clip", language="ko",
+        compute_types=whisper_tuning.CANDIDATE_COMPUTE_TYPES,
+        thread_counts=[4, 16, 8],
+        log_callback=logs.append
+    )
+    assert (compute_type, threads) == ("int8", 8)
+    assert [(ct, n) for ct, n, _ in loaded] == [("int8", 16), ("float32", 16), ("int8", 8), ("int8", 4)]
+    assert set(timings) == {("int8", 16), ("float32", 16), ("int8", 8), ("int8", 4)}
+    assert all(not model.model.loaded for _, _, model in loaded)
+    # 试跑模型与管理器卸载的模型共用保留列表，不随调优次数增长
+    assert list(whisper_models._retired) == [model for _, _, model in loaded[-2:]]
+    assert loaded[0][2].options["language"] == "ko" and loaded[0][2].options["vad_filter"] is False
+    assert any(msg.startswith("⚠️ 调优 int8_float32 / 16 线程失败") for msg in logs)
+
+    try:
+        autotune_cpu(load, "clip", compute_types=["int8_float32"], thread_counts=[16])
+        assert False, "应抛出异常"
+    except Exception as e:
+        assert str(e) == "所有计算类型均无法运行"
+
+
+if __name__ == "__main__":
+    test_tuned_format()
+    test_autotune_picks_fastest()
+    print("✅ Whisper CPU自动调优测试通过")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试Word生成后端
+验证流式后端、基础文档快照与 python-docx 现场构建的可见输出一致，
+并可单独运行输出整季文档与500集单集模式的耗时对比
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from logic.word_logic import run_word_creation_task, build_base_snapshot, _build_docx_volume
+
+
+def _make_episodes(target_dir, episodes, cues):
+    """生成测试用的SRT字幕文件，最后一集为空字幕"""
+    for ep in range(episodes):
+        path = os.path.join(target_dir, f"Show.S01E{ep + 1:02d}.srt")
+        with open(path, 'w', encoding='utf-8') as f:
+            if ep == episodes - 1:
+                continue
+            for i in range(cues):
+                start = i * 3
+                f.write(f"{i + 1}\n")
+                f.write(f"00:{start // 60:02d}:{start % 60:02d},000 --> 00:{start // 60:02d}:{start % 60:02d},900\n")
+                f.write(f"第{ep + 1}集 台词 {i + 1} & <Tom> says \"hi\"\n\n")
+
+
+def _render(source_dir, backend):
+    """按指定后端生成整季文档，返回 (耗时秒数, 输出文件路径)"""
+    out_dir = tempfile.mkdtemp()
+    start = time.perf_counter()
+    run_word_creation_task(source_dir, lambda *a, **k: None, lambda v: None, None, 0, out_dir, "整季",
+                           stop_flag=[False], backend=backend)
+    elapsed = time.perf_counter() - start
+    return elapsed, os.path.join(out_dir, "script", "Show.S01.docx")
+
+
+def _visible_content(path):
+    """提取文档的可见内容：段落（样式、文字、加粗run、段后间距）、页眉与页边距"""
+    doc = Document(path)
+    paragraphs = []
+    for p in doc.paragraphs:
+        if not p.text:
+            continue
+        space_after = p.paragraph_format.space_after
+        paragraphs.append((
+            p.style.name,
+            p.text,
+            tuple(bool(r.bold) for r in p.runs),
+            space_after.pt if space_after is not None else None,
+        ))
+    sections = [
+        (s.header.paragraphs[0].text, s.header.paragraphs[0].alignment,
+         s.top_margin, s.bottom_margin, s.left_margin, s.right_margin, s.page_width, s.page_height)
+        for s in doc.sections
+    ]
+    return paragraphs, sections
+
+
+def test_stream_backend_matches_docx(episodes=4, cues=30):
+    """流式后端与 python-docx 后端的可见输出一致"""
+    source_dir = tempfile.mkdtemp()
+    outputs = []
+    try:
+        _make_episodes(source_dir, episodes, cues)
+        _, docx_path = _render(source_dir, "docx")
+        _, stream_path = _render(source_dir, "stream")
+        outputs = [docx_path, stream_path]
+
+        docx_paragraphs, docx_sections = _visible_content(docx_path)
+        stream_paragraphs, stream_sections = _visible_content(stream_path)
+
+        assert stream_paragraphs == docx_paragraphs
+        assert stream_sections == docx_sections
+        # 每集一个分节，页眉为各集标题
+        assert len(stream_sections) == episodes
+        assert len({s[0] for s in stream_sections}) == episodes
+        assert stream_paragraphs[-1][1] == "[无对白内容]"
+    finally:
+        shutil.rmtree(source_dir, ignore_errors=True)
+        for out_path in outputs:
+            shutil.rmtree(os.path.dirname(os.path.dirname(out_path)), ignore_errors=True)
+
+
+def test_stream_backend_stop_removes_partial_file():
+    """流式后端被停止时不留下未完成的文件"""
+    source_dir = tempfile.mkdtemp()
+    out_dir = tempfile.mkdtemp()
+    try:
+        _make_episodes(source_dir, 3, 10)
+        stop_flag = [False]
+
+        def progress(value):
+            # 第一集完成后请求停止
+            if value:
+                stop_flag[0] = True
+
+        run_word_creation_task(source_dir, lambda *a, **k: None, progress, None, 0, out_dir, "整季",
+                               stop_flag=stop_flag, backend="stream")
+        assert not os.path.exists(os.path.join(out_dir, "script", "Show.S01.docx"))
+    finally:
+        shutil.rmtree(source_dir, ignore_errors=True)
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def test_base_snapshot_matches_fresh_document(episodes=3, cues=10):
+    """从基础文档快照生成的文档与现场构建的文档可见输出一致（单分节与多分节）"""
+    source_dir = tempfile.mkdtemp()
+    out_dir = tempfile.mkdtemp()
+    try:
+        _make_episodes(source_dir, episodes, cues)
+        files = sorted(os.path.join(source_dir, f) for f in os.listdir(source_dir))
+        snapshot = build_base_snapshot()
+        for group in (files[:1], files):
+            fresh_path = os.path.join(out_dir, "fresh.docx")
+            snapshot_path = os.path.join(out_dir, "snapshot.docx")
+            assert _build_docx_volume(group, fresh_path, [False], lambda: None, None)
+            assert _build_docx_volume(group, snapshot_path, [False], lambda: None, snapshot)
+            assert _visible_content(snapshot_path) == _visible_content(fresh_path)
+            assert len(_visible_content(snapshot_path)[1]) == len(group)
+    finally:
+        shutil.rmtree(source_dir, ignore_errors=True)
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def benchmark_single_episode_mode(episodes=500, cues=40):
+    """单集模式（每集一个文档）：逐个现场构建基础文档 vs 复用基础文档快照"""
+    source_dir = tempfile.mkdtemp()
+    out_dir = tempfile.mkdtemp()
+    try:
+        _make_episodes(source_dir, episodes, cues)
+        files = sorted(os.path.join(source_dir, f) for f in os.listdir(source_dir))
+        print(f"单集模式: {episodes} 集 × {cues} 条字幕")
+
+        start = time.perf_counter()
+        for i, fp in enumerate(files):
+            _build_docx_volume([fp], os.path.join(out_dir, f"fresh_{i}.docx"), [False], lambda: None, None)
+        fresh_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        snapshot = build_base_snapshot()
+        for i, fp in enumerate(files):
+            _build_docx_volume([fp], os.path.join(out_dir, f"snapshot_{i}.docx"), [False], lambda: None, snapshot)
+        snapshot_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        run_word_creation_task(source_dir, lambda *a, **k: None, lambda v: None, None, 1, out_dir, "单集",
+                               stop_flag=[False])
+        task_elapsed = time.perf_counter() - start
+
+        print(f"现场构建基础文档: {fresh_elapsed:7.2f} 秒")
+        print(f"复用基础文档快照: {snapshot_elapsed:7.2f} 秒 ({fresh_elapsed / snapshot_elapsed:.2f}x)")
+        print(f"完整单集任务:     {task_elapsed:7.2f} 秒")
+    finally:
+        shutil.rmtree(source_dir, ignore_errors=True)
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def benchmark_word_backends(episodes=24, cues=600):
+    """输出两种后端生成整季文档的耗时对比"""
+    source_dir = tempfile.mkdtemp()
+    try:
+        _make_episodes(source_dir, episodes, cues)
+        print(f"整季语料: {episodes} 集 × {cues} 条字幕")
+        for backend in ("docx", "stream"):
+            elapsed, out_path = _render(source_dir, backend)
+            size_kb = os.path.getsize(out_path) / 1024
+            print(f"{backend:<8}{elapsed:>8.2f} 秒{size_kb:>10.1f} KB")
+            shutil.rmtree(os.path.dirname(os.path.dirname(out_path)), ignore_errors=True)
+    finally:
+        shutil.rmtree(source_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    benchmark_word_backends()
+    benchmark_single_episode_mode()